@@ -0,0 +1,127 @@
+import json
+import time
+from typing import Callable, Dict, Final, Optional, Tuple, TypeVar
+
+# Adaptive timeouts: the timeouts of a function whose paths are not exhausted are multiplied by the escalation factor,
+# up to the maximum timeout and as long as the global deadline is not reached. The timeouts of a function whose paths
+# are exhausted without escalation are divided by it for the next run, down to the initial timeouts
+TIMEOUT_ESCALATION_FACTOR: Final = 2.0
+DEFAULT_MAX_TIMEOUT: Final = 120.0
+DEFAULT_DEADLINE: Final = 600.0
+ADAPTIVE_TIMEOUTS_FILE: Final = "adaptive_timeouts.json"
+
+T = TypeVar("T")
+
+
+class AdaptiveTimeouts:
+    """
+    The policy choosing the per condition and per path timeouts with which the paths of each function are covered.
+    It does not depend on CrossHair: the path cover is given as a function of the timeouts, see run.
+    """
+
+    def __init__(self, per_condition_timeout: float, per_path_timeout: float, enabled: bool = False,
+                 max_timeout: float = DEFAULT_MAX_TIMEOUT, deadline: float = DEFAULT_DEADLINE,
+                 timeouts_file: Optional[str] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param per_condition_timeout: the per condition timeout to start with
+        :param per_path_timeout: the per path timeout to start with
+        :param enabled: whether the timeouts are escalated, otherwise the paths are covered once with the given timeouts
+        :param max_timeout: the maximum escalated timeout in seconds
+        :param deadline: the time in seconds from now after which the timeouts are not escalated anymore
+        :param timeouts_file: the file recording the timeouts of the functions that needed an escalation, if any
+        :param clock: the clock giving the current time in seconds, for the deadline
+        """
+        self.PER_CONDITION_TIMEOUT = per_condition_timeout
+        self.PER_PATH_TIMEOUT = per_path_timeout
+        self.ENABLED = enabled
+        self.MAX_TIMEOUT = max_timeout
+        self.TIMEOUTS_FILE = timeouts_file
+        self.__clock = clock
+        self.DEADLINE_AT = clock() + deadline
+        # (per condition timeout, per path timeout) per name of the functions that needed an escalation
+        self.escalated_timeouts: Dict[str, Tuple[float, float]] = self.load() if enabled else {}
+
+    def initial_timeouts(self, function_name: str) -> Tuple[float, float]:
+        """
+        :param function_name: the name of the function to cover
+        :return: the per condition and per path timeouts to start with, the ones of the previous run if the function needed an escalation
+        """
+        if function_name in self.escalated_timeouts:
+            per_condition_timeout, per_path_timeout = self.escalated_timeouts[function_name]
+            return max(per_condition_timeout, self.PER_CONDITION_TIMEOUT), max(per_path_timeout, self.PER_PATH_TIMEOUT)
+        return self.PER_CONDITION_TIMEOUT, self.PER_PATH_TIMEOUT
+
+    def next_timeouts(self, function_name: str, timeouts: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+        """
+        :param function_name: the name of the function whose paths are not exhausted
+        :param timeouts: the per condition and per path timeouts the paths were covered with
+        :return: the escalated timeouts, None if the maximum timeout or the deadline is reached
+        """
+        per_condition_timeout, per_path_timeout = timeouts
+        next_timeouts = (min(per_condition_timeout * TIMEOUT_ESCALATION_FACTOR, self.MAX_TIMEOUT),
+                         min(per_path_timeout * TIMEOUT_ESCALATION_FACTOR, self.MAX_TIMEOUT))
+        if next_timeouts == timeouts:
+            return None  # maximum timeout reached
+        if self.__clock() + next_timeouts[0] > self.DEADLINE_AT:
+            print(f"WARNING: deadline reached, cannot escalate the timeouts of {function_name}")
+            return None
+        return next_timeouts
+
+    def decayed_timeouts(self, timeouts: Tuple[float, float]) -> Tuple[float, float]:
+        """
+        :param timeouts: the per condition and per path timeouts with which the paths were exhausted without escalation
+        :return: the timeouts to start with in the next run, down to the initial timeouts
+        """
+        per_condition_timeout, per_path_timeout = timeouts
+        return (max(per_condition_timeout / TIMEOUT_ESCALATION_FACTOR, self.PER_CONDITION_TIMEOUT),
+                max(per_path_timeout / TIMEOUT_ESCALATION_FACTOR, self.PER_PATH_TIMEOUT))
+
+    def run(self, function_name: str, cover: Callable[[float, float], Tuple[T, bool]]) -> Tuple[T, bool]:
+        """
+        Covers the paths of a function, again with escalated timeouts as long as they are not exhausted if enabled.
+        If they are exhausted without escalation, the next run starts with decayed timeouts
+        :param function_name: the name of the function to cover
+        :param cover: the path cover of the function with the given per condition and per path timeouts, returning the
+        paths and whether they are exhausted
+        :return: the result of the last cover
+        """
+        timeouts = self.initial_timeouts(function_name)
+        paths, exhausted = cover(*timeouts)
+        escalated = False
+        while self.ENABLED and not exhausted:
+            next_timeouts = self.next_timeouts(function_name, timeouts)
+            if next_timeouts is None:
+                break
+            timeouts = next_timeouts
+            escalated = True
+            print(f"INFO: paths of {function_name} not exhausted, escalating the condition timeout to {timeouts[0]}s and the path timeout to {timeouts[1]}s")
+            paths, exhausted = cover(*timeouts)
+        if self.ENABLED:
+            if exhausted and not escalated:
+                timeouts = self.decayed_timeouts(timeouts)
+            if timeouts != (self.PER_CONDITION_TIMEOUT, self.PER_PATH_TIMEOUT):
+                self.escalated_timeouts[function_name] = timeouts
+            else:
+                self.escalated_timeouts.pop(function_name, None)
+        return paths, exhausted
+
+    def load(self) -> Dict[str, Tuple[float, float]]:
+        """
+        :return: the timeouts of the functions that needed an escalation in the previous runs, empty if there is no readable record
+        """
+        if self.TIMEOUTS_FILE is None:
+            return {}
+        try:
+            with open(self.TIMEOUTS_FILE, "r") as file:
+                return {name: (float(timeouts[0]), float(timeouts[1])) for name, timeouts in json.load(file).items()}
+        except (OSError, ValueError, TypeError, IndexError, AttributeError):
+            return {}
+
+    def save(self):
+        """
+        Records the timeouts of the functions that needed an escalation, so that the next run starts with them
+        """
+        if not self.ENABLED or self.TIMEOUTS_FILE is None:
+            return
+        with open(self.TIMEOUTS_FILE, "w") as file:
+            json.dump({name: list(timeouts) for name, timeouts in sorted(self.escalated_timeouts.items())}, file, indent=4)
@@ -3,25 +3,32 @@ import inspect
 import os
 import sys
 from types import ModuleType
-from typing import Final
+from typing import Dict, Final, Optional
+
+from verification.profiler import phase, start_profiling, stop_profiling
 
 from . import verification_functions
+from .read_write_sets import READ_WRITE_SETS_FILENAME, VERIFIED_READ_WRITE_SETS_FILENAME, invariants_to_skip, load_read_write_sets, save_read_write_sets
 
 
 
 SVSHI_HOME: Final = os.environ["SVSHI_HOME"]
+DEFAULT_PROFILE_FILENAME: Final = SVSHI_HOME + "/src/extended_verification/extended_verification_profile.json"
 
 
 class UnsatError(Exception):
     ...
 
 
-def run_extended_module_with_verification_file(module: ModuleType, verif_functions: verification_functions.VerificationFunctions):
+def run_extended_module_with_verification_file(module: ModuleType, verif_functions: verification_functions.VerificationFunctions, skipped_invariants: Optional[Dict[str, str]] = None):
     """
     run the extended verification on the given module
     :param module: the module to check, must contain a "system_behaviour" and "*invariant" function
+    :param skipped_invariants: the reason for not verifying each invariant function to skip, per function name
     :return: return nothing, prints "CONFIRMED" if no counterexamples were found
     """
+    if skipped_invariants is None:
+        skipped_invariants = {}
     fcts = dir(module)
     functions = inspect.getsource(module)
     with open(SVSHI_HOME + "/src/extended_verification/" + verification_functions.FUNCTION_VERIFICATION_FILE, "w") as funcfile:
@@ -30,13 +37,48 @@ def run_extended_module_with_verification_file(module: ModuleType, verif_functio
     if len(app_invariant_list) == 0:
         raise ValueError("No invariants on the files")
     for inv in app_invariant_list:
-        is_sat, out = verif_functions.check_iteration_satisfies_invariant(getattr(module, "system_behaviour"), getattr(module, inv))
+        if inv in skipped_invariants:
+            print(f"SKIPPED for invariant: {inv}, {skipped_invariants[inv]}")
+            continue
+        with phase("verify_invariant", invariant=inv):
+            is_sat, out = verif_functions.check_iteration_satisfies_invariant(getattr(module, "system_behaviour"), getattr(module, inv))
         if not is_sat:
             raise UnsatError(f"ERROR: unsat for invariant {inv} " + out)
         else:
             print(f"CONFIRMED for invariant: {inv}")
 
 
+def verify_module(module: ModuleType, verif_functions: verification_functions.VerificationFunctions, compositional: bool = True) -> int:
+    """
+    run the extended verification on the given module, printing the counterexample if one is found
+    If the read and write sets of the apps were generated next to the module and compositional is True, the invariants
+    that cannot be affected by the apps that changed since the last successful verification are skipped.
+    :param module: the module to check, must contain a "system_behaviour" and "*invariant" function
+    :param compositional: whether to skip the invariants that cannot be affected by the changed apps
+    :return: the exit code of the verification, 0 if no counterexamples were found
+    """
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    read_write_sets = load_read_write_sets(directory, READ_WRITE_SETS_FILENAME)
+    skipped_invariants = {}
+    if compositional and read_write_sets is not None:
+        verified_read_write_sets = load_read_write_sets(directory, VERIFIED_READ_WRITE_SETS_FILENAME)
+        if verified_read_write_sets is not None:
+            skipped_invariants = invariants_to_skip(read_write_sets, verified_read_write_sets)
+    try:
+        run_extended_module_with_verification_file(module, verif_functions=verif_functions, skipped_invariants=skipped_invariants)
+    except UnsatError as e:
+        exception_str = e.__str__()
+        #remove counterexample's condition to ease reading
+        counterexample = exception_str.split(" for condition:")[0]
+        print(counterexample)
+        return -1
+    finally:
+        verif_functions.save_escalated_timeouts()
+    if read_write_sets is not None:
+        save_read_write_sets(directory, VERIFIED_READ_WRITE_SETS_FILENAME, read_write_sets)
+    return 0
+
+
 
 
 if __name__ == '__main__':
@@ -47,17 +89,26 @@ if __name__ == '__main__':
     parser.add_argument("module_name", help="Module to verify, must contain system_behavior and invaraiant functions")
     parser.add_argument("-cto", "--per_condition_timeout", help="Crosshair's condition timeout in seconds, default: 30",type=float,default=30.0)
     parser.add_argument("-pto", "--per_path_timeout", help="Crosshair's path timeout in seconds, default: 30",type=float,default=30.0)
+    parser.add_argument("-at", "--adaptive_timeouts", help="Start with the given timeouts and escalate them for the functions whose paths are not exhausted", action="store_true")
+    parser.add_argument("-mt", "--max_timeout", help=f"Maximum escalated timeout in seconds with adaptive timeouts, default: {verification_functions.DEFAULT_MAX_TIMEOUT}", type=float, default=verification_functions.DEFAULT_MAX_TIMEOUT)
+    parser.add_argument("-d", "--deadline", help=f"Time in seconds after which the timeouts are not escalated anymore with adaptive timeouts, default: {verification_functions.DEFAULT_DEADLINE}", type=float, default=verification_functions.DEFAULT_DEADLINE)
+    parser.add_argument("-p", "--profile", help=f"Write the durations and memory peaks of the phases of the verification as JSON to the given file, default: {DEFAULT_PROFILE_FILENAME}", nargs="?", const=DEFAULT_PROFILE_FILENAME, default=None)
+    parser.add_argument("-te", "--time_encoding", help=f"Encoding of the time checks in z3, default: {verification_functions.QUANTIFIED_TIME_ENCODING}", choices=verification_functions.TIME_ENCODINGS, default=verification_functions.QUANTIFIED_TIME_ENCODING)
+    parser.add_argument("-f", "--full", help="Verify all the invariants, even the ones that cannot be affected by the apps that changed since the last successful verification", action="store_true")
+    parser.add_argument("-pe", "--path_encoding", help=f"Encoding of the iteration paths in z3, default: {verification_functions.NESTED_IFS_ENCODING}", choices=verification_functions.PATH_ENCODINGS, default=verification_functions.NESTED_IFS_ENCODING)
 
     args = parser.parse_args()
     module_name = args.module_name
-    verif_functions = verification_functions.VerificationFunctions(per_path_timeout = args.per_path_timeout, per_condition_timeout=args.per_condition_timeout)
+    verif_functions = verification_functions.VerificationFunctions(per_path_timeout = args.per_path_timeout, per_condition_timeout=args.per_condition_timeout, path_encoding=args.path_encoding, time_encoding=args.time_encoding, adaptive_timeouts=args.adaptive_timeouts, max_timeout=args.max_timeout, deadline=args.deadline)
 
-    module = importlib.import_module(module_name)
+    profiler = start_profiling("extended_verification.main") if args.profile else None
     try:
-        run_extended_module_with_verification_file(module, verif_functions=verif_functions)
-    except UnsatError as e:
-        exception_str = e.__str__()
-        #remove counterexample's condition to ease reading
-        counterexample = exception_str.split(" for condition:")[0]
-        print(counterexample)
-        exit(-1)
+        with phase("load_module"):
+            module = importlib.import_module(module_name)
+        exit_code = verify_module(module, verif_functions, compositional=not args.full)
+    finally:
+        if profiler is not None:
+            profiler.write(args.profile)
+            stop_profiling()
+    if exit_code != 0:
+        exit(exit_code)
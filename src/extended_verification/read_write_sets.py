@@ -0,0 +1,92 @@
+import json
+import os
+from typing import Dict, Final, List, Optional, Set
+
+READ_WRITE_SETS_FILENAME: Final = "app_read_write_sets.json"
+VERIFIED_READ_WRITE_SETS_FILENAME: Final = "verified_app_read_write_sets.json"
+
+INVARIANT_SUFFIX: Final = "_invariant"
+# Prefix of the fields read through the svshi_api functions (time, files, time checks, isolated functions values)
+INTERNAL_STATE_PREFIX: Final = "internal_state."
+
+
+def load_read_write_sets(directory: str, filename: str) -> Optional[Dict[str, dict]]:
+    """
+    load the read and write sets of the apps stored in the given file
+    :param directory: the directory of the file
+    :param filename: the name of the file
+    :return: the read and write sets per app name, None if the file does not exist or cannot be read
+    """
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_read_write_sets(directory: str, filename: str, read_write_sets: Dict[str, dict]):
+    """
+    store the read and write sets of the apps in the given file
+    :param directory: the directory of the file
+    :param filename: the name of the file
+    :param read_write_sets: the read and write sets per app name
+    """
+    with open(os.path.join(directory, filename), "w") as file:
+        json.dump(read_write_sets, file, indent=4)
+
+
+def invariants_to_skip(read_write_sets: Dict[str, dict], verified_read_write_sets: Dict[str, dict]) -> Dict[str, str]:
+    """
+    find the invariants that do not need to be verified again, given the read and write sets of the apps
+    of the last successful verification
+    An app changed if it is new or if its hash changed. The fields that may have changed are the ones written by the
+    iterations of the changed and removed apps and the ones read by their invariants, as the preconditions changed.
+    An unchanged app whose iteration reads one of these fields may behave differently, so its writes may change too.
+    The invariant of an unchanged app reading none of these fields still holds.
+    The internal state is not written by the iterations and is not tracked field by field, so the invariants reading it
+    are always verified.
+    :param read_write_sets: the read and write sets per app name of the apps to verify
+    :param verified_read_write_sets: the read and write sets per app name of the last successful verification
+    :return: the reason for skipping each invariant function that does not need to be verified, per function name
+    """
+    changed_apps = {
+        app_name
+        for app_name, sets in read_write_sets.items()
+        if app_name not in verified_read_write_sets or verified_read_write_sets[app_name]["hash"] != sets["hash"]
+    }
+    removed_apps = set(verified_read_write_sets) - set(read_write_sets)
+
+    changed_fields: Set[str] = set()
+    for app_name in changed_apps:
+        changed_fields.update(read_write_sets[app_name]["iteration_writes"])
+        changed_fields.update(read_write_sets[app_name]["invariant_reads"])
+    for app_name in removed_apps:
+        changed_fields.update(verified_read_write_sets[app_name]["iteration_writes"])
+        changed_fields.update(verified_read_write_sets[app_name]["invariant_reads"])
+
+    affected_apps = set(changed_apps)
+    unaffected_apps: List[str] = sorted(set(read_write_sets) - affected_apps)
+    propagated = True
+    while propagated:
+        propagated = False
+        for app_name in list(unaffected_apps):
+            if changed_fields.intersection(read_write_sets[app_name]["iteration_reads"]):
+                affected_apps.add(app_name)
+                unaffected_apps.remove(app_name)
+                changed_fields.update(read_write_sets[app_name]["iteration_writes"])
+                propagated = True
+
+    if changed_apps or removed_apps:
+        changes = ", ".join(sorted(changed_apps) + [f"{a} (removed)" for a in sorted(removed_apps)])
+        reason_suffix = f"the changed apps: {changes}"
+    else:
+        reason_suffix = "the changed apps: none"
+    return {
+        f"{app_name}{INVARIANT_SUFFIX}": f"its app did not change and it reads none of the fields that may be modified by {reason_suffix}"
+        for app_name in unaffected_apps
+        if not changed_fields.intersection(read_write_sets[app_name]["invariant_reads"])
+        and not any(field.startswith(INTERNAL_STATE_PREFIX) for field in read_write_sets[app_name]["invariant_reads"])
+    }
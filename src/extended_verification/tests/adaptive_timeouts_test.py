@@ -0,0 +1,110 @@
+from typing import List, Tuple
+
+from ..adaptive_timeouts import ADAPTIVE_TIMEOUTS_FILE, AdaptiveTimeouts
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCover:
+    """
+    Path cover whose paths are exhausted from the given call on, advancing the clock by the per condition timeout
+    """
+
+    def __init__(self, clock: FakeClock, exhausted_at_call: int = -1):
+        self.clock = clock
+        self.exhausted_at_call = exhausted_at_call
+        self.timeouts: List[Tuple[float, float]] = []
+
+    def __call__(self, per_condition_timeout: float, per_path_timeout: float) -> Tuple[str, bool]:
+        self.timeouts.append((per_condition_timeout, per_path_timeout))
+        self.clock.now += per_condition_timeout
+        return f"paths {len(self.timeouts)}", len(self.timeouts) - 1 == self.exhausted_at_call
+
+
+def test_timeouts_escalate_until_paths_are_exhausted(tmp_path):
+    timeouts_file = str(tmp_path / ADAPTIVE_TIMEOUTS_FILE)
+    clock = FakeClock()
+    cover = FakeCover(clock, exhausted_at_call=2)
+    timeouts = AdaptiveTimeouts(1.0, 3.0, enabled=True, timeouts_file=timeouts_file, clock=clock)
+
+    paths, exhausted = timeouts.run("app_invariant", cover)
+    timeouts.save()
+
+    assert (paths, exhausted) == ("paths 3", True)
+    assert cover.timeouts == [(1.0, 3.0), (2.0, 6.0), (4.0, 12.0)]
+    next_run = AdaptiveTimeouts(1.0, 3.0, enabled=True, timeouts_file=timeouts_file)
+    assert next_run.initial_timeouts("app_invariant") == (4.0, 12.0)
+    assert next_run.initial_timeouts("app_iteration") == (1.0, 3.0)
+
+
+def test_timeouts_decay_once_paths_are_exhausted_without_escalation(tmp_path):
+    timeouts_file = str(tmp_path / ADAPTIVE_TIMEOUTS_FILE)
+    cover = FakeCover(FakeClock(), exhausted_at_call=2)
+    timeouts = AdaptiveTimeouts(1.0, 1.0, enabled=True, timeouts_file=timeouts_file, clock=cover.clock)
+    timeouts.run("app_invariant", cover)
+    timeouts.save()
+
+    # the paths are now exhausted with the first timeouts of each run
+    starting_timeouts = []
+    for _ in range(3):
+        cover = FakeCover(FakeClock(), exhausted_at_call=0)
+        timeouts = AdaptiveTimeouts(1.0, 1.0, enabled=True, timeouts_file=timeouts_file, clock=cover.clock)
+        timeouts.run("app_invariant", cover)
+        timeouts.save()
+        starting_timeouts.append(cover.timeouts[0])
+
+    assert starting_timeouts == [(4.0, 4.0), (2.0, 2.0), (1.0, 1.0)]
+    assert timeouts.escalated_timeouts == {}
+
+
+def test_timeouts_stop_at_max_timeout():
+    clock = FakeClock()
+    cover = FakeCover(clock)
+    timeouts = AdaptiveTimeouts(1.0, 1.0, enabled=True, max_timeout=3.0, clock=clock)
+
+    _, exhausted = timeouts.run("app_invariant", cover)
+
+    assert not exhausted
+    assert cover.timeouts == [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)]
+    assert timeouts.escalated_timeouts == {"app_invariant": (3.0, 3.0)}
+
+
+def test_timeouts_stop_at_deadline():
+    clock = FakeClock()
+    cover = FakeCover(clock)
+    timeouts = AdaptiveTimeouts(1.0, 1.0, enabled=True, deadline=10.0, clock=clock)
+
+    timeouts.run("app_invariant", cover)
+
+    # 1 + 2 + 4 seconds are spent, the next 8 seconds would end after the deadline
+    assert cover.timeouts == [(1.0, 1.0), (2.0, 2.0), (4.0, 4.0)]
+    assert timeouts.next_timeouts("app_invariant", (4.0, 4.0)) is None
+
+
+def test_timeouts_are_not_escalated_when_disabled(tmp_path):
+    timeouts_file = str(tmp_path / ADAPTIVE_TIMEOUTS_FILE)
+    cover = FakeCover(FakeClock())
+    timeouts = AdaptiveTimeouts(1.0, 1.0, timeouts_file=timeouts_file)
+
+    _, exhausted = timeouts.run("app_invariant", cover)
+    timeouts.save()
+
+    assert not exhausted
+    assert cover.timeouts == [(1.0, 1.0)]
+    assert not (tmp_path / ADAPTIVE_TIMEOUTS_FILE).exists()
+
+
+def test_unreadable_timeouts_file_is_ignored(tmp_path):
+    timeouts_file = tmp_path / ADAPTIVE_TIMEOUTS_FILE
+    timeouts_file.write_text("{not json")
+
+    timeouts = AdaptiveTimeouts(1.0, 1.0, enabled=True, timeouts_file=str(timeouts_file))
+
+    assert timeouts.escalated_timeouts == {}
+    assert timeouts.initial_timeouts("app_invariant") == (1.0, 1.0)
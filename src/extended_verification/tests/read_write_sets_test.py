@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+
+from verification.generator import Generator
+from verification.parser import Parser
+
+from ..read_write_sets import (
+    READ_WRITE_SETS_FILENAME,
+    VERIFIED_READ_WRITE_SETS_FILENAME,
+    invariants_to_skip,
+    load_read_write_sets,
+    save_read_write_sets,
+)
+
+
+VERIFICATION_TESTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "verification", "tests")
+
+
+def sets(hash: str, invariant_reads=(), iteration_reads=(), iteration_writes=()) -> dict:
+    return {
+        "hash": hash,
+        "invariant_reads": list(invariant_reads),
+        "iteration_reads": list(iteration_reads),
+        "iteration_writes": list(iteration_writes),
+    }
+
+
+VERIFIED = {
+    "light_app": sets("light", ["GA_1"], ["GA_0"], ["GA_1"]),
+    "heating_app": sets("heating", ["GA_2", "GA_3"], ["GA_3"], ["GA_2"]),
+}
+
+
+def test_unrelated_new_app_skips_existing_invariants():
+    read_write_sets = {**VERIFIED, "blinds_app": sets("blinds", ["GA_4"], ["GA_5"], ["GA_4"])}
+
+    skipped = invariants_to_skip(read_write_sets, VERIFIED)
+
+    assert sorted(skipped) == ["heating_app_invariant", "light_app_invariant"]
+    assert "blinds_app" in skipped["light_app_invariant"]
+
+
+def test_new_app_writing_a_read_field_verifies_invariant():
+    read_write_sets = {**VERIFIED, "blinds_app": sets("blinds", [], [], ["GA_1"])}
+
+    skipped = invariants_to_skip(read_write_sets, VERIFIED)
+
+    assert sorted(skipped) == ["heating_app_invariant"]
+
+
+def test_changed_writes_propagate_through_iterations_reading_them():
+    read_write_sets = {**VERIFIED, "blinds_app": sets("blinds", [], [], ["GA_3"])}
+    read_write_sets["light_app"] = sets("light", ["GA_1"], ["GA_2"], ["GA_1"])
+    verified = {**VERIFIED, "light_app": read_write_sets["light_app"]}
+
+    skipped = invariants_to_skip(read_write_sets, verified)
+
+    # heating_app reads GA_3 and writes GA_2, read by the iteration of light_app which writes GA_1
+    assert skipped == {}
+
+
+def test_changed_app_verifies_its_invariant():
+    read_write_sets = {**VERIFIED, "light_app": sets("light changed", ["GA_1"], ["GA_0"], ["GA_1"])}
+
+    skipped = invariants_to_skip(read_write_sets, VERIFIED)
+
+    assert sorted(skipped) == ["heating_app_invariant"]
+
+
+def test_removed_app_verifies_invariants_reading_its_fields():
+    read_write_sets = {"heating_app": VERIFIED["heating_app"]}
+    verified = {**VERIFIED, "removed_app": sets("removed", ["GA_3"], [], [])}
+
+    skipped = invariants_to_skip(read_write_sets, verified)
+
+    assert skipped == {}
+
+
+def test_invariant_reading_the_internal_state_is_always_verified():
+    read_write_sets = {**VERIFIED, "clock_app": sets("clock", ["GA_6", "internal_state.get_hour_of_the_day"], ["internal_state.get_minute_in_hour"], ["GA_6"])}
+
+    skipped = invariants_to_skip(read_write_sets, read_write_sets)
+
+    # the iteration reading the time does not make the writes of its unchanged app change
+    assert sorted(skipped) == ["heating_app_invariant", "light_app_invariant"]
+
+
+def test_unchanged_library_skips_all_invariants():
+    skipped = invariants_to_skip(VERIFIED, VERIFIED)
+
+    assert sorted(skipped) == ["heating_app_invariant", "light_app_invariant"]
+
+
+def test_read_write_sets_are_saved_and_loaded(tmp_path):
+    assert load_read_write_sets(str(tmp_path), VERIFIED_READ_WRITE_SETS_FILENAME) is None
+
+    save_read_write_sets(str(tmp_path), VERIFIED_READ_WRITE_SETS_FILENAME, VERIFIED)
+
+    assert load_read_write_sets(str(tmp_path), VERIFIED_READ_WRITE_SETS_FILENAME) == VERIFIED
+
+
+def generate_read_write_sets(generated_path: str, directory: str) -> dict:
+    parser = Parser(generated_path, os.path.join(VERIFICATION_TESTS_DIRECTORY, "fake_app_library"))
+    generator = Generator(
+        os.path.join(directory, "verification_file.py"),
+        os.path.join(directory, "runtime_file.py"),
+        os.path.join(directory, "conditions.py"),
+        "files",
+        parser.parse_group_addresses(),
+        parser.parse_devices_instances(),
+        parser.parse_devices_classes(),
+        parser.get_app_names(),
+        parser.get_filenames(),
+        os.path.join(directory, "isolated_fns.json"),
+        read_write_sets_filename=os.path.join(directory, READ_WRITE_SETS_FILENAME),
+    )
+    generator.generate_verification_file(parser.get_app_priorities())
+    return load_read_write_sets(directory, READ_WRITE_SETS_FILENAME)
+
+
+def test_group_address_type_change_verifies_invariant_again(tmp_path):
+    generated_path = tmp_path / "generated"
+    shutil.copytree(os.path.join(VERIFICATION_TESTS_DIRECTORY, "fake_generated"), generated_path)
+    verified = generate_read_write_sets(str(generated_path), str(tmp_path))
+    # the invariants of the other apps read the internal state
+    assert sorted(invariants_to_skip(verified, verified)) == ["first_app_invariant"]
+
+    # Only the type of a group address of the apps changes, not their sources
+    group_addresses_path = generated_path / "group_addresses.json"
+    group_addresses = json.loads(group_addresses_path.read_text())
+    group_addresses["addresses"] = [[address, "int" if address == "0/0/3" else type] for address, type in group_addresses["addresses"]]
+    group_addresses_path.write_text(json.dumps(group_addresses))
+    read_write_sets = generate_read_write_sets(str(generated_path), str(tmp_path))
+
+    assert read_write_sets["first_app"]["hash"] != verified["first_app"]["hash"]
+    assert "first_app_invariant" not in invariants_to_skip(read_write_sets, verified)
@@ -0,0 +1,105 @@
+import os
+import re
+import time
+from typing import Dict, List, Tuple
+
+import pytest
+from z3 import Bool, ExprRef, Int, Not, Or, And, Solver, is_quantifier, sat, unsat, z3util
+
+from ..check_objs import *
+from ..time_checks import finite_domain_time_check, quantified_time_check
+
+PIPELINE5_PATH = f"{os.environ['SVSHI_HOME']}/src/core/res/endToEnd/pipeline5_check"
+PIPELINE5_APPS = ["test_app_two_two_hours_everyday_check", "test_app_two_twenty_hours_everyday_check"]
+CHECK_REGEX = re.compile(r"check_time_property\(svshi_api\.(\w+)\((\d+)\),\s*svshi_api\.(\w+)\((\d+)\)")
+SOLVER_TIMEOUT_MS = 30000
+
+# CrossHair suffixes the names of the variables with a number
+SWITCH = Bool("GA_0_0_1_12")
+TIME_HOUR = Int("time_hour_3")
+TIME_MIN = Int("time_min_4")
+TIME_DAY = Int("time_day_5")
+
+
+def values_dict(cdt: ExprRef) -> Dict[str, ExprRef]:
+    d = {"_".join(str(v).split("_")[:-1]): v for v in z3util.get_vars(cdt)}
+    for v in DateObj.internal_state_variable_names:
+        d.setdefault(v, Int(v))
+    return d
+
+
+def pipeline5_checks() -> List[Tuple[str, DateObj, DateObj]]:
+    date_objs = {c.__name__: c for c in DateObj.__subclasses__()}
+    checks = []
+    for app in PIPELINE5_APPS:
+        with open(f"{PIPELINE5_PATH}/{app}/main.py", "r") as file:
+            every, every_value, duration, duration_value = CHECK_REGEX.search(file.read()).groups()
+        checks.append((app, date_objs[every](int(every_value)), date_objs[duration](int(duration_value))))
+    return checks
+
+
+def solve(formula: ExprRef):
+    s = Solver()
+    s.set("timeout", SOLVER_TIMEOUT_MS)
+    s.add(formula)
+    return s.check()
+
+
+CASES = [
+    (Day(1), Hour(20), SWITCH),
+    (Day(1), Hour(2), SWITCH),
+    (Day(1), Hour(2), Or(SWITCH, TIME_HOUR >= 5)),
+    (Day(2), Hour(3), And(SWITCH, TIME_MIN < 50)),
+    (Day(3), Day(1), Or(SWITCH, TIME_DAY > 2)),
+    (Hour(1), Minute(10), Or(SWITCH, TIME_MIN > 30)),
+    (Month(1), Hour(30), SWITCH),
+]
+
+
+@pytest.mark.parametrize("every,duration,cdt", CASES)
+def test_finite_domain_time_check_is_equivalent_to_quantified(every, duration, cdt):
+    quantified = quantified_time_check(every, duration, cdt, values_dict(cdt))
+    finite_domain = finite_domain_time_check(every, duration, cdt, values_dict(cdt))
+
+    assert solve(quantified != finite_domain) == unsat
+
+
+def test_finite_domain_time_check_only_quantifies_unbounded_variables():
+    cdt = Or(SWITCH, TIME_HOUR >= 5)
+    finite_domain = finite_domain_time_check(Day(1), Hour(2), cdt, values_dict(cdt))
+
+    assert is_quantifier(finite_domain)
+    assert not is_quantifier(finite_domain.body())
+    assert "time_hour" not in str(finite_domain)
+
+
+def test_finite_domain_time_check_without_condition_variables_is_quantifier_free():
+    cdt = TIME_HOUR >= 5
+    finite_domain = finite_domain_time_check(Day(1), Hour(2), cdt, values_dict(cdt))
+
+    assert not is_quantifier(finite_domain)
+    assert solve(finite_domain) == sat
+    assert solve(Not(finite_domain)) == unsat
+
+
+def test_finite_domain_time_check_falls_back_to_quantified_above_max_copies():
+    cdt = Or(SWITCH, And(TIME_HOUR >= 5, TIME_MIN < 50, TIME_DAY > 2))
+
+    # 66 copies for the duration times 60 minutes times 31 days
+    finite_domain = finite_domain_time_check(Day(1), Hour(2), cdt, values_dict(cdt))
+    assert finite_domain.eq(quantified_time_check(Day(1), Hour(2), cdt, values_dict(cdt)))
+
+    finite_domain = finite_domain_time_check(Day(1), Hour(2), cdt, values_dict(cdt), max_copies=66 * 60 * 31)
+    assert "time_min" not in str(finite_domain)
+
+
+def test_time_check_encodings_benchmark_pipeline5():
+    print()
+    for app, every, duration in pipeline5_checks():
+        for encoding in [quantified_time_check, finite_domain_time_check]:
+            start = time.perf_counter()
+            formula = encoding(every, duration, SWITCH, values_dict(SWITCH))
+            results = (solve(formula), solve(Not(formula)))
+            elapsed = time.perf_counter() - start
+            print(f"{app} {encoding.__name__}: {results}, {elapsed * 1000:.2f}ms")
+            assert results == (unsat, sat)
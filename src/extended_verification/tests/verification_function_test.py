@@ -1,5 +1,6 @@
 import os
 import shutil
+import sys
 
 import pytest
 
@@ -384,6 +385,41 @@ def test_path_list_with_var_as_output_of_function():
     assert If(GA_0_0_2_11, c1_1a, If(And(Not(GA_0_0_2_11), c0_19 == 0), 0, -1)) == out
 
 
+def test_path_list_to_nested_ifs_many_paths_does_not_hit_recursion_limit():
+    c0_19 = Int('c0_19')
+    l = [(c0_19 == i, i % 2 == 0) for i in range(sys.getrecursionlimit() * 2)]
+    out = verif_functions.path_list_to_nested_ifs(l)
+    s.reset()
+    s.add(c0_19 == 3, out == 0)
+    assert s.check().__repr__() == "sat"
+
+
+def test_path_list_to_guarded_sum_no_elems():
+    out = VerificationFunctions(path_encoding=GUARDED_SUM_ENCODING).path_list_to_expr([])
+    assert out == -1
+
+
+def test_path_list_to_guarded_sum_is_equivalent_to_nested_ifs():
+    GA_0_0_2_11 = Bool('GA_0_0_2_11')
+    c0_19, c1_1a = Ints('c0_19 c1_1a')
+    l = [(GA_0_0_2_11, c1_1a), (And(Not(GA_0_0_2_11), c0_19 == 0), False), (And(Not(GA_0_0_2_11), c0_19 != 0), True)]
+    nested_ifs = verif_functions.path_list_to_nested_ifs(l)
+    guarded_sum = VerificationFunctions(path_encoding=GUARDED_SUM_ENCODING).path_list_to_expr(l)
+    s.reset()
+    s.add(nested_ifs != guarded_sum)
+    assert s.check().__repr__() == "unsat"
+
+
+def test_unknown_path_encoding_raises():
+    with pytest.raises(ValueError):
+        VerificationFunctions(path_encoding="unknown")
+
+
+def test_unknown_time_encoding_raises():
+    with pytest.raises(ValueError):
+        VerificationFunctions(time_encoding="unknown")
+
+
 def test_iteration_no_conditions_unsat():
     assert not verif_functions.check_iteration_satisfies_invariant(list_of_test_functions.switch_off, list_of_test_functions.app_one_invariant)[0]
 
@@ -470,3 +506,37 @@ def z3_expr_list_to_ast_vector(p):
     for cdt in p:
         vect.push(cdt)
     return vect
+
+
+def test_adaptive_timeouts_escalate_until_paths_are_exhausted(mocker, tmp_path):
+    timeouts_file = str(tmp_path / ADAPTIVE_TIMEOUTS_FILE)
+    path_cover_mock = mocker.patch("extended_verification.verification_functions.path_cover", side_effect=[([], False), ([], False), ([], True)])
+    functions = VerificationFunctions(per_path_timeout=1.0, per_condition_timeout=1.0, adaptive_timeouts=True, adaptive_timeouts_file=timeouts_file)
+    f = FunctionInfo.from_fn(list_of_test_functions.app_one_invariant)
+
+    _, exhausted = functions.get_paths(f)
+    functions.save_escalated_timeouts()
+
+    assert exhausted
+    assert [c.args[1].per_condition_timeout for c in path_cover_mock.call_args_list] == [1.0, 2.0, 4.0]
+    next_run = VerificationFunctions(per_path_timeout=1.0, per_condition_timeout=1.0, adaptive_timeouts=True, adaptive_timeouts_file=timeouts_file)
+    assert next_run.initial_timeouts(f.name) == (4.0, 4.0)
+
+
+def test_adaptive_timeouts_stop_at_max_timeout(mocker, tmp_path):
+    path_cover_mock = mocker.patch("extended_verification.verification_functions.path_cover", return_value=([], False))
+    functions = VerificationFunctions(per_path_timeout=1.0, per_condition_timeout=1.0, adaptive_timeouts=True, max_timeout=3.0, adaptive_timeouts_file=str(tmp_path / ADAPTIVE_TIMEOUTS_FILE))
+
+    _, exhausted = functions.get_paths(FunctionInfo.from_fn(list_of_test_functions.app_one_invariant))
+
+    assert not exhausted
+    assert [c.args[1].per_condition_timeout for c in path_cover_mock.call_args_list] == [1.0, 2.0, 3.0]
+
+
+def test_adaptive_timeouts_stop_at_deadline(mocker, tmp_path):
+    path_cover_mock = mocker.patch("extended_verification.verification_functions.path_cover", return_value=([], False))
+    functions = VerificationFunctions(per_path_timeout=1.0, per_condition_timeout=1.0, adaptive_timeouts=True, deadline=0.0, adaptive_timeouts_file=str(tmp_path / ADAPTIVE_TIMEOUTS_FILE))
+
+    functions.get_paths(FunctionInfo.from_fn(list_of_test_functions.app_one_invariant))
+
+    assert path_cover_mock.call_count == 1
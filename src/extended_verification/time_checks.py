@@ -0,0 +1,144 @@
+import functools
+from typing import Dict, Final, List
+
+from z3 import And, BoolVal, Exists, ExprRef, ForAll, Implies, Int, IntVal, Or, substitute, z3util
+
+from .check_objs import DateObj
+
+# Encodings of the calls to check_time_property into a z3 formula, see VerificationFunctions.check
+QUANTIFIED_TIME_ENCODING: Final = "quantified"
+FINITE_DOMAIN_TIME_ENCODING: Final = "finite_domain"
+TIME_ENCODINGS: Final = [QUANTIFIED_TIME_ENCODING, FINITE_DOMAIN_TIME_ENCODING]
+# Maximum number of copies of the condition in the finite-domain encoding, above which the quantified one is used
+MAX_FINITE_DOMAIN_COPIES: Final = 10000
+
+
+def date_obj_constraints(values_dict: Dict[str, ExprRef]) -> ExprRef:
+    """
+    :param values_dict: the z3 variables per time variable name
+    :return: the conjunction of the ranges of all the time variables that have one
+    """
+    date_obj_constraints_list = []
+    for date_obj in DateObj.__subclasses__():
+        # generating min_time<=i<=maxtime for every date, converted to z3
+        date_obj_constraints_list.append(date_obj.min_v <= values_dict.get(date_obj.descr, Int(date_obj.descr)))
+        date_obj_constraints_list.append(values_dict.get(date_obj.descr, Int(date_obj.descr)) <= date_obj.max_v)
+    return functools.reduce(lambda x, y: And(x, y), date_obj_constraints_list)
+
+
+def quantified_time_check(every: DateObj, duration: DateObj, cdt: ExprRef, values_dict: Dict[str, ExprRef]) -> ExprRef:
+    """
+    Generate from two DateObj and a condition a z3 expression: For every time t1 there exits a duration d s.t. condition
+    The time variables are quantified with nested ForAll and Exists.
+    :param every: A DateObj that gives the frequency of the property to check
+    :param duration: A DateObj that gives the duration of the property to check
+    :param cdt: The z3 condition to be checked
+    :param values_dict: the z3 variables of the condition and the time variables per name
+    :return: The z3 expression of the given property
+    """
+    t = Int('t')
+    duration_z3 = values_dict.get(duration.descr, Int(duration.descr))
+    duration_cdt = And(And(t >= duration.min_v, t <= duration.max_v - duration.value), ForAll(duration_z3,
+                                                                                            Implies(
+                                                                                                And(t <= duration_z3,
+                                                                                                    duration_z3 <= t + duration.value),
+                                                                                                cdt)))
+    every_descr = values_dict.get(every.descr, Int(every.descr))
+    dateobj_conjunction = date_obj_constraints(values_dict)
+    i = every.min_v
+    every_conditions_lists = []
+    if every.value > 1:
+        while i <= every.max_v:  # generates the interval of the duration of "every"
+            e = Exists([t, every_descr], And(dateobj_conjunction,
+                                            i <= every_descr,
+                                            every_descr <= min(i + every.value - 1, every.max_v),
+                                            duration_cdt))
+
+            every_conditions_lists.append(e)
+            i += every.get_value()
+    else:
+        every_conditions_lists.append(Exists(t, And(duration_cdt, dateobj_conjunction)))
+    t = functools.reduce(lambda x, y: And(x, y), every_conditions_lists)
+    final_check = ForAll(list(values_dict.values()), Implies(dateobj_conjunction,
+                                                            t))
+    return final_check
+
+
+def finite_domain_time_check(every: DateObj, duration: DateObj, cdt: ExprRef, values_dict: Dict[str, ExprRef],
+                             max_copies: int = MAX_FINITE_DOMAIN_COPIES) -> ExprRef:
+    """
+    Same property as quantified_time_check, with the quantifiers over the time variables expanded over their finite ranges.
+    Only the variables that occur in the condition are expanded, the other ones can take any value of their range.
+    The only quantifier left is a ForAll over the variables of the condition that are not bounded time variables, if any.
+    The condition is copied once per combination of values of the expanded variables: if there would be more than
+    max_copies copies, the quantified encoding is returned instead.
+    :param every: A DateObj that gives the frequency of the property to check
+    :param duration: A DateObj that gives the duration of the property to check
+    :param cdt: The z3 condition to be checked
+    :param values_dict: the z3 variables of the condition and the time variables per name
+    :param max_copies: the maximum number of copies of the condition
+    :return: The z3 expression of the given property
+    """
+    ranges = {date_obj.descr: (date_obj.min_v, date_obj.max_v) for date_obj in DateObj.__subclasses__()}
+    cdt_vars = z3util.get_vars(cdt)
+
+    def occurs(var: ExprRef) -> bool:
+        return any(var.eq(v) for v in cdt_vars)
+
+    def for_all_values(expr: ExprRef, var: ExprRef, values: range) -> ExprRef:
+        if not occurs(var):
+            return expr if len(values) > 0 else BoolVal(True)
+        return And([substitute(expr, (var, IntVal(v))) for v in values] + [BoolVal(True)])
+
+    def exists_value(expr_of_value, values: range) -> ExprRef:
+        return Or([expr_of_value(v) for v in values] + [BoolVal(False)])
+
+    duration_var = values_dict.get(duration.descr, Int(duration.descr))
+    every_var = values_dict.get(every.descr, Int(every.descr))
+    # The times at which the condition starts to hold during the whole duration
+    starts = range(duration.min_v, duration.max_v - duration.value + 1)
+
+    # The time variables that are not bound by every and duration can take any value of their range, the other
+    # variables of the condition are quantified
+    free_time_vars: List[ExprRef] = []
+    free_time_ranges: List[range] = []
+    free_vars: List[ExprRef] = []
+    for name, var in values_dict.items():
+        if var.eq(duration_var) or (every.value > 1 and var.eq(every_var)) or not occurs(var):
+            continue
+        if name in ranges:
+            min_v, max_v = ranges[name]
+            free_time_vars.append(var)
+            free_time_ranges.append(range(min_v, max_v + 1))
+        else:
+            free_vars.append(var)
+
+    nb_copies = functools.reduce(lambda x, y: x * len(y), free_time_ranges, 1)
+    if occurs(duration_var):
+        nb_copies *= len(starts) * (duration.value + 1)
+    if every.value > 1 and occurs(every_var) and not duration_var.eq(every_var):
+        nb_copies *= every.max_v - every.min_v + 1
+    if nb_copies > max_copies:
+        return quantified_time_check(every, duration, cdt, values_dict)
+
+    def holds_for_duration(expr: ExprRef) -> ExprRef:
+        if not occurs(duration_var):
+            return expr if len(starts) > 0 else BoolVal(False)
+        return exists_value(lambda start: for_all_values(expr, duration_var, range(start, start + duration.value + 1)), starts)
+
+    every_conditions_lists = []
+    if every.value > 1:
+        for i in range(every.min_v, every.max_v + 1, every.value):  # generates the interval of the duration of "every"
+            block = range(i, min(i + every.value - 1, every.max_v) + 1)
+            if duration_var.eq(every_var) or not occurs(every_var):
+                every_conditions_lists.append(holds_for_duration(cdt) if len(block) > 0 else BoolVal(False))
+            else:
+                every_conditions_lists.append(
+                    exists_value(lambda e: holds_for_duration(substitute(cdt, (every_var, IntVal(e)))), block))
+    else:
+        every_conditions_lists.append(holds_for_duration(cdt))
+    check = And(every_conditions_lists + [BoolVal(True)])
+
+    for var, values in zip(free_time_vars, free_time_ranges):
+        check = for_all_values(check, var, values)
+    return ForAll(free_vars, check) if free_vars else check
@@ -10,12 +10,15 @@ import re
 from typing import Callable
 import z3
 from crosshair.path_cover import path_cover, CoverageType
-from z3 import ArgumentError, is_not, Not, Int, And, ForAll, Exists, Implies, is_quantifier, Solver, simplify, \
-    Or, If, z3util, ExprRef, is_bool, is_const, unsat
+from z3 import ArgumentError, is_not, Not, Int, And, ForAll, is_quantifier, Solver, simplify, \
+    Or, If, Sum, z3util, ExprRef, is_bool, is_const, unsat
 from crosshair.options import (DEFAULT_OPTIONS, AnalysisOptionSet)
 
 from .check_objs import *
+from .adaptive_timeouts import ADAPTIVE_TIMEOUTS_FILE, DEFAULT_DEADLINE, DEFAULT_MAX_TIMEOUT, AdaptiveTimeouts
+from .time_checks import FINITE_DOMAIN_TIME_ENCODING, QUANTIFIED_TIME_ENCODING, TIME_ENCODINGS, finite_domain_time_check, quantified_time_check
 from crosshair import FunctionInfo
+from verification.profiler import phase
 
 APP_STATE_VARS_REGEX = r"INT_[0-3]\b|FLOAT_[0-3]\b|BOOL_[0-3]\b"
 
@@ -28,6 +31,12 @@ SVSHI_HOME: Final = os.environ["SVSHI_HOME"]
 DEBUG = False
 FUNCTION_VERIFICATION_FILE_NO_EXT = "functions_to_verify"
 FUNCTION_VERIFICATION_FILE = FUNCTION_VERIFICATION_FILE_NO_EXT + ".py"
+# Encodings of the paths of the iteration function into a z3 term, see path_list_to_expr
+NESTED_IFS_ENCODING = "nested_ifs"
+GUARDED_SUM_ENCODING = "guarded_sum"
+PATH_ENCODINGS = [NESTED_IFS_ENCODING, GUARDED_SUM_ENCODING]
+# Value returned when no path condition holds, see path_list_to_nested_ifs
+UNREACHABLE_PATH_VALUE = -1
 
 @dataclasses.dataclass
 class CheckContainer:
@@ -36,9 +45,19 @@ class CheckContainer:
 
 class VerificationFunctions:
 
-    def __init__(self, per_path_timeout=30.0, per_condition_timeout=25):
+    def __init__(self, per_path_timeout=30.0, per_condition_timeout=25, path_encoding=NESTED_IFS_ENCODING, time_encoding=QUANTIFIED_TIME_ENCODING,
+                 adaptive_timeouts=False, max_timeout=DEFAULT_MAX_TIMEOUT, deadline=DEFAULT_DEADLINE,
+                 adaptive_timeouts_file=SVSHI_HOME + "/src/extended_verification/" + ADAPTIVE_TIMEOUTS_FILE):
+        if path_encoding not in PATH_ENCODINGS:
+            raise ValueError(f"unknown path encoding {path_encoding}, must be one of {PATH_ENCODINGS}")
+        if time_encoding not in TIME_ENCODINGS:
+            raise ValueError(f"unknown time encoding {time_encoding}, must be one of {TIME_ENCODINGS}")
         self.PER_PATH_TIMEOUT = per_path_timeout
         self.PER_CONDITION_TIMEOUT = per_condition_timeout
+        self.PATH_ENCODING = path_encoding
+        self.TIME_ENCODING = time_encoding
+        self.adaptive_timeouts = AdaptiveTimeouts(per_condition_timeout, per_path_timeout, adaptive_timeouts, max_timeout, deadline,
+                                                  adaptive_timeouts_file)
         
     def debug(self, *s: str):
         if DEBUG:
@@ -67,27 +86,55 @@ class VerificationFunctions:
     def get_paths(self, f: FunctionInfo) -> Tuple[List[Tuple[ExprRef, object]], bool]:
         """
         Convert a function f into a list of paths (z3 expressions) using CrossHair and their symbolic values at return.
+        With adaptive timeouts, CrossHair is run again with escalated timeouts as long as the paths are not exhausted.
         :param f: a callable function
         :return: A tuple. The first element is the list of paths (paths being a list of z3 expressions), their symbolic values at return and whether crosshair exhausted all the paths.
         """
         if f is None:
             raise ValueError("no function to cover!")
+        return self.adaptive_timeouts.run(f.name, lambda per_condition_timeout, per_path_timeout:
+                                          self.run_path_cover(f, per_condition_timeout, per_path_timeout))
+
+
+    def run_path_cover(self, f: FunctionInfo, per_condition_timeout: float, per_path_timeout: float) -> Tuple[List[Tuple[ExprRef, object]], bool]:
+        """
+        Runs CrossHair's path cover on f with the given timeouts
+        :param f: a callable function
+        :return: the paths of the function and whether crosshair exhausted all the paths
+        """
         # code below from CrossHair
         defaults = DEFAULT_OPTIONS.overlay(
             AnalysisOptionSet(
-                per_condition_timeout=self.PER_CONDITION_TIMEOUT,
-                per_path_timeout=self.PER_PATH_TIMEOUT,  # mostly, we don't want to time out paths
+                per_condition_timeout=per_condition_timeout,
+                per_path_timeout=per_path_timeout,  # mostly, we don't want to time out paths
             )
         )
         defaults.stats = collections.Counter()
-        pc, exhausted = path_cover(f, defaults, CoverageType.OPCODE)
-        try:
-            print(pc)  # force the paths to realize?
-        except AssertionError:
-            raise ValueError(f"Failed to run crosshair path, check your function {f.name}")
+        with phase("path_cover", function=f.name):
+            pc, exhausted = path_cover(f, defaults, CoverageType.OPCODE)
+            try:
+                print(pc)  # force the paths to realize?
+            except AssertionError:
+                raise ValueError(f"Failed to run crosshair path, check your function {f.name}")
         return pc, exhausted
 
 
+    def initial_timeouts(self, function_name: str) -> Tuple[float, float]:
+        """
+        :param function_name: the name of the function to cover
+        :return: the per condition and per path timeouts to start with, see AdaptiveTimeouts.initial_timeouts
+        """
+        return self.adaptive_timeouts.initial_timeouts(function_name)
+
+
+    def save_escalated_timeouts(self):
+        """
+        Records the timeouts of the functions that needed an escalation, decayed if their paths were exhausted without it,
+        so that the next run starts with them
+        """
+        self.adaptive_timeouts.save()
+
+
     def print_paths_in_PathSummary_list(self, pc):
         for p in pc:
             for i in p.result:
@@ -248,9 +295,10 @@ class VerificationFunctions:
         return {self.crosshair_z3_var_to_var_str(x): x for x in crosshair_v}
 
 
-    def check(self, every: DateObj, duration: DateObj, cdt: ExprRef) -> List[ExprRef]:
+    def check(self, every: DateObj, duration: DateObj, cdt: ExprRef) -> ExprRef:
         """
         Generate from two DateObj and a condition a z3 expression: For every time t1 there exits a duration d s.t. condition
+        The time variables are either quantified or expanded over their finite ranges, depending on the time encoding
         :param every: A DateObj that gives the frequency of the property to check
         :param duration: A DateObj that gives the duration of the property to check
         :param cdt: The z3 condition to be checked
@@ -260,39 +308,11 @@ class VerificationFunctions:
         crosshair_variables = z3util.get_vars(cdt)
         values_dict = self.crosshair_variable_name_dict(
             crosshair_variables)  # get the CrossHair time variables that should be replaced
-        t = Int('t')
         for v in DateObj.internal_state_variable_names:
             values_dict.setdefault(v, Int(v)) # adds the z3 values that were not used on the iteration/invariant
-        duration_z3 = values_dict.get(duration.descr, Int(duration.descr))
-        duration_cdt = And(And(t >= duration.min_v, t <= duration.max_v - duration.value), ForAll(duration_z3,
-                                                                                                Implies(
-                                                                                                    And(t <= duration_z3,
-                                                                                                        duration_z3 <= t + duration.value),
-                                                                                                    cdt)))
-        every_descr = values_dict.get(every.descr, Int(every.descr))
-        date_obj_constraints_list = []
-        for date_obj in DateObj.__subclasses__():
-            # generating min_time<=i<=maxtime for every date, converted to z3
-            date_obj_constraints_list.append(date_obj.min_v <= values_dict.get(date_obj.descr, Int(date_obj.descr)))
-            date_obj_constraints_list.append(values_dict.get(date_obj.descr, Int(date_obj.descr)) <= date_obj.max_v)
-        dateobj_conjunction = self.expression_list_to_conjunction(date_obj_constraints_list)
-        i = every.min_v
-        every_conditions_lists = []
-        if every.value > 1:
-            while i <= every.max_v:  # generates the interval of the duration of "every"
-                e = Exists([t, every_descr], And(dateobj_conjunction,
-                                                i <= every_descr,
-                                                every_descr <= min(i + every.value - 1, every.max_v),
-                                                duration_cdt))
-
-                every_conditions_lists.append(e)
-                i += every.get_value()
-        else:
-            every_conditions_lists.append(Exists(t, And(duration_cdt, dateobj_conjunction)))
-        t = functools.reduce(lambda x, y: And(x, y), every_conditions_lists)
-        final_check = ForAll(list(values_dict.values()), Implies(dateobj_conjunction,
-                                                                t))
-        return final_check
+        if self.TIME_ENCODING == FINITE_DOMAIN_TIME_ENCODING:
+            return finite_domain_time_check(every, duration, cdt, values_dict)
+        return quantified_time_check(every, duration, cdt, values_dict)
 
 
     def run_crosshair_on_iteration_fct(self, fct: Callable, var_dict: Dict[str, z3.ExprRef] = None):
@@ -327,7 +347,7 @@ class VerificationFunctions:
                         raise ValueError(f"Duplicate key detected for key {var_name}")
                     cdt_list.append((condition, z3_expr))
                     self.add_z3_var_to_var_dict(var_dict, var_name, z3_expr)
-        cdt_dict = {k: self.path_list_to_nested_ifs(v) for k, v in tmp.items()}
+        cdt_dict = {k: self.path_list_to_expr(v) for k, v in tmp.items()}
         return cdt_dict
 
 
@@ -344,24 +364,60 @@ class VerificationFunctions:
                     f"multiples z3GA for the same name! name:{var_name} value in iteration : {z3_expr} value in dict {var_dict[var_name]}")
 
 
+    def path_list_to_expr(self, l: List[Tuple[ExprRef, Union[ExprRef, bool]]]) -> ExprRef:
+        """
+        Converts a list of paths and their return values into a z3 term, using the encoding given to the constructor
+        :param l: A list containing a Tuple of paths and their return
+        :return: a z3 expression equal to the return value of the path that holds, -1 if none holds
+        """
+        if self.PATH_ENCODING == GUARDED_SUM_ENCODING:
+            return self.path_list_to_guarded_sum(l)
+        return self.path_list_to_nested_ifs(l)
+
+
+    def path_result_to_int(self, result: Union[ExprRef, bool]) -> ExprRef:
+        """
+        Converts the boolean return value of a path into an int, to be compatible with the -1 (the unreachable condition)
+        :param result: the return value of a path
+        :return: 1 for true, 0 for false, the result itself if it is not a boolean
+        """
+        if isinstance(result, bool):
+            return 1 if result else 0
+        if is_bool(result):
+            return z3.IntSort().cast(result)
+        return result
+
+
     def path_list_to_nested_ifs(self, l: List[Tuple[ExprRef, Union[ExprRef, bool]]]) -> ExprRef:
         """
         Converts a list of paths and their return values into into a function made of z3 If : If(condition1,return1,(else if) condition2 ... )
         (i.e. [(And(t>0,c>0),a),(c>0,Not(a))]) into z3 If => If((And(t>0,c>0),a,If(c>0,Not(a),-1))
+        The chain is built iteratively from the last path, so that it neither copies the list nor hits the recursion limit
         :param l: A list containing a Tuple of paths and their return
         :return: a z3 expression of If
         """
+        # make sure this "unreachable condition" at the very end of the Ifs can never lead to a valid result because we use 1 for true and 0 for false, so -1 is invalid in the context -> leads to unsat in any case
+        nested_ifs = UNREACHABLE_PATH_VALUE
+        for path_condition, result in reversed(l):
+            nested_ifs = If(path_condition, self.path_result_to_int(result), nested_ifs)
+        return nested_ifs
+
+
+    def path_list_to_guarded_sum(self, l: List[Tuple[ExprRef, Union[ExprRef, bool]]]) -> ExprRef:
+        """
+        Converts a list of paths and their return values into a flat sum of guarded values:
+        Sum(If(condition1,return1,0), If(condition2,return2,0), ..., If(Or(condition1,condition2,...),0,-1))
+        The paths given by CrossHair are mutually exclusive, so this is equivalent to path_list_to_nested_ifs,
+        but every condition appears once at depth 2 instead of being nested n times, which keeps the formula small for large path counts
+        :param l: A list containing a Tuple of paths and their return
+        :return: a z3 expression of the sum
+        """
         if len(l) == 0:
-            return -1  # make sure this "unreachable condition" at the very end of the Ifs can never lead to a valid result because we use 1 for true and 0 for false, so -1 is invalid in the context -> leads to unsat in any case
-        else:
-            current_element = l[0]
-            path_condition = current_element[0]
-            result = current_element[1]
-            if isinstance(result, bool):
-                result = 1 if result else 0  # converts boolean result into an int, to be compatible with the -1 (the unreachable condition)
-            if is_bool(result):
-                result = z3.IntSort().cast(result)  # same here
-            return If(path_condition, result, self.path_list_to_nested_ifs(l[1:]))
+            return UNREACHABLE_PATH_VALUE
+        guarded_results = [If(path_condition, self.path_result_to_int(result), 0) for path_condition, result in l]
+        path_conditions = [path_condition for path_condition, _ in l]
+        guarded_results.append(If(Or(path_conditions), 0, UNREACHABLE_PATH_VALUE))
+        return Sum(guarded_results)
 
 
     def split_z3_expr_list_to_constraint_and_inv(self, path: List[ExprRef], cdt_dict, app_name: str) -> ExprRef:
@@ -450,25 +506,28 @@ class VerificationFunctions:
 
         cdt_dict = self.run_crosshair_on_iteration_fct(iteration_function, variable_dict)
 
-        translated_checks = self.replace_checks_from_path_list(replace_list, valid_paths_inv, cdt_dict, app_name)
+        with phase("z3_translation"):
+            translated_checks = self.replace_checks_from_path_list(replace_list, valid_paths_inv, cdt_dict, app_name)
 
-        all_cond = [self.split_z3_expr_list_to_constraint_and_inv(vp, cdt_dict, app_name) for vp in valid_paths_inv]
-        all_cond_z3 = Or(all_cond) #create a disjunction of all possible paths
+            all_cond = [self.split_z3_expr_list_to_constraint_and_inv(vp, cdt_dict, app_name) for vp in valid_paths_inv]
+            all_cond_z3 = Or(all_cond) #create a disjunction of all possible paths
         for v in variable_dict.values():
             if not is_const(v):
                 raise ArgumentError(f"invalid bounded var {v}")
         s = Solver()
         s.reset()
         s.add(ForAll(list(variable_dict.values()), all_cond_z3))
-        is_sat = s.check() != unsat
-        print("solver is ", s.check())
+        with phase("solver"):
+            is_sat = s.check() != unsat
+            print("solver is ", s.check())
         if is_sat:
             return is_sat,""
         else:
             s.reset()
             s.add(Not(all_cond_z3))
-            s.check()
-            is_sat = s.check() != unsat
+            with phase("solver_counterexample"):
+                s.check()
+                is_sat = s.check() != unsat
             if is_sat:
                 m = s.model()
                 simp = simplify(all_cond_z3)
@@ -11,26 +11,34 @@ sys.path.append("./web_api")
 
 from simulator.simulator import launch_simulation, stop_simulation, pyglet_running
 from simulator.tools import arguments_parser
-from web_api import app, host, port, sim_start_event, sim_stop_event, FlaskAppProp
-from simulator.svshi_interface import Interface
+from web_api import WebApiState, create_app
+from simulator.svshi_interface import Interface, InterfaceProp
 
 
-def flask_thread(host, port):
-    FlaskAppProp.HOST = host
-    app.run(host=host, port=port, debug=False, use_reloader=False)
+def flask_thread(web_api_state: WebApiState):
+    from system import STATE_STREAM
+
+    STATE_STREAM.enabled = True  # the rooms publish their states for the web API
+    app = create_app(web_api_state)
+    app.run(
+        host=web_api_state.host,
+        port=web_api_state.port,
+        debug=False,
+        use_reloader=False,
+    )
     # , "debug=True" enables reloader = relaod flask server when code changes, but must run on mainthread, so we remove it to run pyglet on main thread
 
 
-def sim_stop_thread():
+def sim_stop_thread(web_api_state: WebApiState):
     while True:
-        sim_stop_event.wait()
+        web_api_state.sim_stop_event.wait()
         sim_stop_state = (
             stop_simulation()
         )  # returns 1 if pyglet was running and window closed, 0 if pyglet was not running
         if sim_stop_state is not None and sim_stop_state == 1:
             print("\n>>>>>>> Simulation STOP <<<<<<<<\n")
 
-        sim_start_event.wait()
+        web_api_state.sim_start_event.wait()
         # else: # if simulation was not running, nothing to stop
 
 
@@ -50,26 +58,28 @@ def main(argv):
         address = address_port.split(":")[0]
         port = address_port.split(":")[1]
         Interface.HOST_ADDR = address
-        ft = threading.Thread(target=flask_thread, args=(address, port))
+        web_api_state = WebApiState(address, int(port))
+        ft = threading.Thread(target=flask_thread, args=(web_api_state,))
         # print(f"flask thread name: {ft.getName()}")
         ft.start()
 
-        sst = threading.Thread(target=sim_stop_thread, args=())
+        sst = threading.Thread(target=sim_stop_thread, args=(web_api_state,))
         # print(f"sim stop thread name: {sst.getName()}")
         sst.start()
 
         # print(f"sim event: {sim_start_event}, bool: {(sim_start_event.is_set())}\n")
         while True:
-            sim_start_event.wait()
+            web_api_state.sim_start_event.wait()
             print("\n>>>>>>> Simulation Starting <<<<<<<<\n")
-            from web_api import config_webapp_name
-
-            # global config_webapp_name
+            # the interface of this simulation marks ready the handle of the start that launched it
+            handle = web_api_state.current_sim_handle
+            InterfaceProp.ON_WAITING_FOR_SVSHI = handle.set_ready
+            config_webapp_name = web_api_state.config_webapp_name
             if config_webapp_name is not None:
                 print(f"run :: webapp name: {config_webapp_name}")
                 options[4] = "./config/" + config_webapp_name + ".json"
             launch_simulation(options, fresh_knx_interface=True)
-            sim_stop_event.wait()
+            web_api_state.sim_stop_event.wait()
             time.sleep(1)  # leave time to close simulation
 
     else:  # launch simulation in local without flask
@@ -0,0 +1,306 @@
+""" Runs scenario scripts in parallel, each one in its own headless simulator (and SVSHI runtime), and gathers the results. """
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Union
+
+SIMULATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(SIMULATOR_DIR, "scripts")
+CONFIG_DIR = os.path.join(SIMULATOR_DIR, "config")
+
+DEFAULT_BASE_PORT = 3671
+DEFAULT_TIMEOUT = 300
+DEFAULT_SVSHI_DELAY = 2
+# Number of lines of the output of the simulator kept in the results
+OUTPUT_TAIL_LINES = 20
+
+
+class Scenario:
+    """Scenario script run in its own simulator instance, waiting for SVSHI on its own KNX port"""
+
+    def __init__(self, index: int, script: str, config: str, knx_port: int) -> None:
+        """
+        index : number of the scenario, from 1
+        script : script name in scripts/ folder (without .txt extension) or path of a .txt script
+        config : configuration name in config/ folder (without .json extension) or path of a .json configuration
+        knx_port : port on which the simulator waits for SVSHI
+        """
+        self.index = index
+        self.script = script
+        self.config = config
+        self.knx_port = knx_port
+
+    def simulator_command(self, svshi_mode: bool, log_level: str) -> List[str]:
+        """Command starting the headless simulator running the script of the scenario"""
+        command = [
+            sys.executable,
+            "run.py",
+            "-i",
+            "headless",
+            "-c",
+            "script",
+            "-f",
+            file_name(self.script, SCRIPTS_DIR, ".txt"),
+            "-C",
+            "file",
+            "-F",
+            file_name(self.config, CONFIG_DIR, ".json"),
+            "-k",
+            str(self.knx_port),
+            "-l",
+            log_level,
+        ]
+        if svshi_mode:
+            command.append("-s")
+        return command
+
+
+def file_name(name: str, folder: str, extension: str) -> str:
+    """
+    Name of a file as expected by the simulator options, i.e. relative to the folder and without extension:
+    paths of existing files are converted, other names are kept.
+    """
+    if name.endswith(extension) and os.path.isfile(name):
+        return os.path.relpath(os.path.abspath(name), folder)[: -len(extension)]
+    return name
+
+
+def stop_process(process: Union[subprocess.Popen, None]) -> None:
+    """Stop a process started in its own session, with all its children (e.g. the JVM started by the svshi command)"""
+    if process is None or process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def run_scenario(
+    scenario: Scenario,
+    svshi_command: Union[str, None],
+    address: str,
+    svshi_delay: float,
+    timeout: float,
+    log_level: str,
+) -> Dict:
+    """
+    Run the scenario in a simulator subprocess, paired with its SVSHI runtime if a command is given,
+    and return its result. The scenario succeeds if the script of the simulator succeeds before the timeout.
+
+    svshi_command : command template starting SVSHI, formatted with the address, knx_port and index of the scenario
+    svshi_delay : seconds waited after the start of the simulator before starting SVSHI, so that the simulator listens
+    """
+    start = time.perf_counter()
+    simulator = subprocess.Popen(
+        scenario.simulator_command(svshi_command is not None, log_level),
+        cwd=SIMULATOR_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        start_new_session=True,
+    )
+    svshi = None
+    if svshi_command is not None:
+        time.sleep(svshi_delay)
+        svshi = subprocess.Popen(
+            svshi_command.format(
+                address=address, knx_port=scenario.knx_port, index=scenario.index
+            ),
+            shell=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    timed_out = False
+    try:
+        output, _ = simulator.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        stop_process(simulator)
+        output, _ = simulator.communicate()
+    finally:
+        stop_process(svshi)
+    return {
+        "index": scenario.index,
+        "script": scenario.script,
+        "config": scenario.config,
+        "knx_port": scenario.knx_port,
+        "returncode": simulator.returncode,
+        "timed_out": timed_out,
+        "success": simulator.returncode == 0 and not timed_out,
+        "duration": round(time.perf_counter() - start, 3),
+        "output_tail": output.splitlines()[-OUTPUT_TAIL_LINES:],
+    }
+
+
+def run_scenarios(
+    scenarios: List[Scenario],
+    parallelism: int,
+    svshi_command: Union[str, None] = None,
+    address: str = "127.0.0.1",
+    svshi_delay: float = DEFAULT_SVSHI_DELAY,
+    timeout: float = DEFAULT_TIMEOUT,
+    log_level: str = "WARNING",
+) -> List[Dict]:
+    """Run the scenarios, at most parallelism at a time, and return their results in the order of the scenarios"""
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+        futures = [
+            executor.submit(
+                run_scenario,
+                scenario,
+                svshi_command,
+                address,
+                svshi_delay,
+                timeout,
+                log_level,
+            )
+            for scenario in scenarios
+        ]
+        return [future.result() for future in futures]
+
+
+def create_scenarios(
+    scenario_args: List[str], default_config: str, base_port: int
+) -> List[Scenario]:
+    """Create the scenarios from 'script' or 'script:config' arguments, each one with its own KNX port from base_port"""
+    scenarios = []
+    for i, scenario_arg in enumerate(scenario_args):
+        script, _, config = scenario_arg.partition(":")
+        scenarios.append(
+            Scenario(i + 1, script, config or default_config, base_port + i)
+        )
+    return scenarios
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run scenario scripts in parallel, each one in an isolated headless simulator paired with its own SVSHI runtime.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "scenarios",
+        nargs="+",
+        help=(
+            "Scenario scripts, as script names in scripts/ folder (without .txt extension) or paths of .txt scripts,\noptionally followed by ':' and the configuration to use instead of the one given with -F.\nExample 'light light_temp:svshi_config_lighttemp'"
+        ),
+    )
+    parser.add_argument(
+        "-F",
+        "--fileconfig-name",
+        default="sim_config_bedroom",
+        help=(
+            "Configuration of the scenarios, as name in config/ folder (without .json extension) or path of a .json file.\n-> default='sim_config_bedroom'"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--parallelism",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number K of simulator instances running at the same time.\n-> default=number of CPUs",
+    )
+    parser.add_argument(
+        "-p",
+        "--base-port",
+        type=int,
+        default=DEFAULT_BASE_PORT,
+        help=f"KNX port of the first scenario, the i-th scenario uses the port base_port+i.\n-> default={DEFAULT_BASE_PORT}",
+    )
+    parser.add_argument(
+        "-a",
+        "--address",
+        default="127.0.0.1",
+        help="Address on which the simulators wait for SVSHI.\n-> default='127.0.0.1'",
+    )
+    parser.add_argument(
+        "-S",
+        "--svshi-command",
+        default=None,
+        help=(
+            "Command starting the SVSHI runtime paired with each simulator, formatted with {address}, {knx_port} and {index}.\nWithout it, the simulators run without SVSHI.\nExample: 'SVSHI_HOME=/tmp/svshi{index} svshi run -a {address}:{knx_port}'"
+        ),
+    )
+    parser.add_argument(
+        "-d",
+        "--svshi-delay",
+        type=float,
+        default=DEFAULT_SVSHI_DELAY,
+        help=f"Seconds waited after the start of a simulator before starting its SVSHI runtime.\n-> default={DEFAULT_SVSHI_DELAY}",
+    )
+    parser.add_argument(
+        "-T",
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds after which a scenario is stopped and failed.\n-> default={DEFAULT_TIMEOUT}",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Path of a JSON file in which the results are written.",
+    )
+    parser.add_argument(
+        "-l",
+        "--log",
+        default="WARNING",
+        help="Logging level of the simulators.\n-> default='WARNING'",
+    )
+    options = parser.parse_args(argv[1:])
+
+    scenarios = create_scenarios(
+        options.scenarios, options.fileconfig_name, options.base_port
+    )
+    print(
+        f"Running {len(scenarios)} scenarios, {options.parallelism} at a time"
+        + (
+            f", each one with SVSHI: {options.svshi_command}"
+            if options.svshi_command
+            else ""
+        )
+    )
+    start = time.perf_counter()
+    results = run_scenarios(
+        scenarios,
+        options.parallelism,
+        options.svshi_command,
+        options.address,
+        options.svshi_delay,
+        options.timeout,
+        options.log,
+    )
+    duration = time.perf_counter() - start
+
+    for result in results:
+        status = "SUCCESS" if result["success"] else "FAILURE"
+        if result["timed_out"]:
+            status += " (timeout)"
+        print(
+            f"[{status}] scenario {result['index']} '{result['script']}' on port {result['knx_port']} in {result['duration']}s"
+        )
+        if not result["success"]:
+            print("\n".join("    " + line for line in result["output_tail"]))
+    succeeded = sum(result["success"] for result in results)
+    print(f"{succeeded}/{len(results)} scenarios succeeded in {duration:.3f}s")
+    if options.output is not None:
+        with open(options.output, "w") as file:
+            json.dump(
+                {"duration": round(duration, 3), "results": results}, file, indent=2
+            )
+    return 0 if succeeded == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
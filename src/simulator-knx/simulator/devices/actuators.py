@@ -37,6 +37,8 @@ class LightActuator(Actuator, ABC):
 class LED(LightActuator):
     """Concrete class to represent LED actuators"""
 
+    STATE_ATTRIBUTES = Actuator.STATE_ATTRIBUTES + ["state_ratio", "state_value"]
+
     def __init__(
         self, name: str, individual_addr: IndividualAddress, state: bool = False
     ) -> None:
@@ -151,6 +153,8 @@ class LED(LightActuator):
 class TemperatureActuator(Actuator, ABC):
     """Abstract class to represent actuators acting on world's temperature"""
 
+    STATE_ATTRIBUTES = Actuator.STATE_ATTRIBUTES + ["state_ratio"]
+
     def __init__(
         self,
         name: str,
@@ -191,6 +195,8 @@ class TemperatureActuator(Actuator, ABC):
 class Heater(TemperatureActuator):
     """Concrete class to represent a heating device"""
 
+    STATE_ATTRIBUTES = TemperatureActuator.STATE_ATTRIBUTES + ["state_value"]
+
     def __init__(
         self,
         name: str,
@@ -299,6 +305,8 @@ class Heater(TemperatureActuator):
 class AC(TemperatureActuator):
     """Concrete class to represent a cooling device"""
 
+    STATE_ATTRIBUTES = TemperatureActuator.STATE_ATTRIBUTES + ["state_value"]
+
     def __init__(
         self,
         name: str,
@@ -405,6 +413,8 @@ class AC(TemperatureActuator):
 class Switch(Actuator):
     """Concrete class to represent a swicth indicator, can be linked to any real actuator device to indicate its state in GUI"""
 
+    STATE_ATTRIBUTES = Actuator.STATE_ATTRIBUTES + ["state_ratio", "state_value"]
+
     def __init__(
         self, name: str, individual_addr: IndividualAddress, state: bool = False
     ) -> None:
@@ -8,7 +8,7 @@ import sys
 import traceback
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, Dict, List, Union
 
 
 class Device(ABC):
@@ -18,6 +18,9 @@ class Device(ABC):
     from system.telegrams import Payload
     from system.knxbus import KNXBus
 
+    # Attributes saved in checkpoints, extended by each device class with its own states
+    STATE_ATTRIBUTES: List[str] = []
+
     def __init__(
         self, name: str, individual_addr: IndividualAddress
     ) -> None:  # The constructor is also a good place for imposing various checks on attribute values
@@ -85,6 +88,24 @@ class Device(ABC):
     def get_dev_info(self):
         """Abstract method that returns device's info in response to CLI command 'getinfo' from users"""
 
+    def get_state(self) -> Dict[str, Union[None, bool, int, float, str]]:
+        """
+        Return the states of the device saved in checkpoints: the attributes declared in STATE_ATTRIBUTES
+        (e.g. state, state_ratio, temperature, send policy's last sent value), None included.
+        """
+        return {
+            attribute: getattr(self, attribute, None)
+            for attribute in self.STATE_ATTRIBUTES
+        }
+
+    def set_state(self, state: Dict[str, Union[None, bool, int, float, str]]) -> None:
+        """
+        Restore the states of the device from a checkpoint,
+        the attributes declared in STATE_ATTRIBUTES that are missing from the checkpoint are reset to None.
+        """
+        for attribute in self.STATE_ATTRIBUTES:
+            setattr(self, attribute, state.get(attribute))
+
 
 class FunctionalModule(Device, ABC):
     """
@@ -94,6 +115,8 @@ class FunctionalModule(Device, ABC):
 
     from system.system_tools import IndividualAddress
 
+    STATE_ATTRIBUTES = ["state"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of a Functional Module instance"""
         super().__init__(name, individual_addr)
@@ -108,6 +131,65 @@ class FunctionalModule(Device, ABC):
         """
 
 
+class SendPolicy:
+    """
+    Class to represent when a sensor sends its measured value on the bus, as configured on real KNX sensors:
+    on a change of value (send-on-delta), at most every min_send_interval and at least every max_send_interval.
+    """
+
+    def __init__(
+        self,
+        send_on_delta: float = None,
+        send_on_delta_percent: float = None,
+        min_send_interval: float = 0,
+        max_send_interval: float = None,
+    ) -> None:
+        """
+        Initialization of a send policy, intervals are in simulated seconds.
+
+        send_on_delta : minimum absolute change of value since the last value sent to send a new one,
+        send_on_delta_percent : minimum change in percent of the last value sent to send a new one,
+        if both are None, any change of value is sent,
+        min_send_interval : minimum time between two values sent, even if the value changed,
+        max_send_interval : time after which the value is sent again even if it did not change, never if None.
+        """
+        self.send_on_delta = send_on_delta
+        self.send_on_delta_percent = send_on_delta_percent
+        self.min_send_interval = min_send_interval
+        self.max_send_interval = max_send_interval
+
+    def __repr__(self):
+        return f"SendPolicy({self.send_on_delta!r}, {self.send_on_delta_percent!r}, {self.min_send_interval!r}, {self.max_send_interval!r})"
+
+    def should_send(
+        self, value: float, last_sent_value: Union[float, None], elapsed: Union[float, None]
+    ) -> bool:
+        """
+        Return True if the value should be sent on the bus.
+
+        last_sent_value : None if no value was sent yet,
+        elapsed : time since the last value sent, None if the sensor has no clock, then intervals are not considered.
+        """
+        if last_sent_value is None:
+            return True
+        if elapsed is not None:
+            if elapsed < self.min_send_interval:
+                return False
+            if self.max_send_interval is not None and elapsed >= self.max_send_interval:
+                return True
+        change = abs(value - last_sent_value)
+        if change == 0:
+            return False
+        if self.send_on_delta is None and self.send_on_delta_percent is None:
+            return True
+        if self.send_on_delta is not None and change >= self.send_on_delta:
+            return True
+        return (
+            self.send_on_delta_percent is not None
+            and change >= abs(last_sent_value) * self.send_on_delta_percent / 100
+        )
+
+
 class Sensor(Device, ABC):
     """
     Abstract class to represent Sensor devices (that read world states):
@@ -116,10 +198,53 @@ class Sensor(Device, ABC):
 
     from system.system_tools import IndividualAddress
 
+    # The last sent value and time of the send policy are private, hence their mangled names
+    STATE_ATTRIBUTES = [
+        "suppressed_telegrams",
+        "_Sensor__last_sent_value",
+        "_Sensor__last_sent_time",
+    ]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
-        """Initialization of a Sensor instance"""
+        """
+        Initialization of a Sensor instance.
+
+        send_policy : SendPolicy filtering the values sent on the bus, all values are sent if None,
+        clock : function returning the simulation time in seconds, set when the sensor is added to a room,
+        suppressed_telegrams : number of telegrams not sent because of the send policy
+        """
         super().__init__(name, individual_addr)
         self.interface = None
+        self.send_policy: SendPolicy = None
+        self.clock: Callable[[], float] = None
+        self.suppressed_telegrams = 0
+        self.__last_sent_value = None
+        self.__last_sent_time = None
+
+    def send_measured_value(self, value: float) -> None:
+        """
+        Send the measured value on the bus in a FloatPayload if the send policy allows it,
+        only if the sensor is assigned to a group address and connected to the bus (in svshi mode).
+        Suppressed telegrams are counted by the sensor and by the bus.
+        """
+        from system import FloatPayload
+
+        if not (len(self.group_addresses) and hasattr(self, "knxbus")):
+            return
+        now = self.clock() if self.clock is not None else None
+        if self.send_policy is not None:
+            elapsed = (
+                now - self.__last_sent_time
+                if now is not None and self.__last_sent_time is not None
+                else None
+            )
+            if not self.send_policy.should_send(value, self.__last_sent_value, elapsed):
+                self.suppressed_telegrams += len(self.group_addresses)
+                self.knxbus.suppressed_telegrams += len(self.group_addresses)
+                return
+        self.__last_sent_value = value
+        self.__last_sent_time = now
+        self.send_telegram(FloatPayload(value))
 
     @abstractmethod
     def send_state(self):
@@ -139,6 +264,8 @@ class Actuator(Device, ABC):
     from system.system_tools import IndividualAddress
     from system.telegrams import Telegram
 
+    STATE_ATTRIBUTES = ["state"]
+
     def __init__(
         self, name: str, individual_addr: IndividualAddress, default_state: bool = False
     ) -> None:
@@ -46,6 +46,8 @@ class Button(FunctionalModule):
 class Dimmer(FunctionalModule):
     """Concrete class to represent a Dimmer Button"""
 
+    STATE_ATTRIBUTES = FunctionalModule.STATE_ATTRIBUTES + ["state_ratio"]
+
     def __init__(self, name, individual_addr: IndividualAddress) -> None:
         """Initialization of Dimmer device object"""
         super().__init__(name, individual_addr)
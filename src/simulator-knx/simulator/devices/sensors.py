@@ -13,6 +13,8 @@ from system.system_tools import IndividualAddress
 class Brightness(Sensor):
     """Concrete class to represent Brightness sensor"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["brightness"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of Brightness device object"""
         super().__init__(name, individual_addr)
@@ -34,19 +36,17 @@ class Brightness(Sensor):
 
     def send_state(self) -> None:
         """
-        Send sensor's measured value on the bus,
+        Send sensor's measured value on the bus, according to its send policy,
         only in svshi mode,
         only if the sensor is assigned to a group address."""
-        from system import FloatPayload
-
-        if len(self.group_addresses) and hasattr(self, "knxbus"):
-            payload = FloatPayload(self.brightness)
-            self.send_telegram(payload)
+        self.send_measured_value(self.brightness)
 
 
 class Thermometer(Sensor):
     """Concrete class to represent a Temperature sensor"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["temperature"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of Thermometer device object"""
         super().__init__(name, individual_addr)
@@ -69,19 +69,17 @@ class Thermometer(Sensor):
 
     def send_state(self) -> None:
         """
-        Send sensor's measured value on the bus,
+        Send sensor's measured value on the bus, according to its send policy,
         only in svshi mode,
         only if the sensor is assigned to a group address."""
-        from system import FloatPayload
-
-        if len(self.group_addresses) and hasattr(self, "knxbus"):
-            payload = FloatPayload(self.temperature)
-            self.send_telegram(payload)
+        self.send_measured_value(self.temperature)
 
 
 class HumidityAir(Sensor):
     """Concrete class to represent a Air Humidity sensor"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["humidity"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of HumidityAir device object"""
         super().__init__(name, individual_addr)
@@ -103,19 +101,17 @@ class HumidityAir(Sensor):
 
     def send_state(self) -> None:
         """
-        Send sensor's measured value on the bus,
+        Send sensor's measured value on the bus, according to its send policy,
         only in svshi mode,
         only if the sensor is assigned to a group address."""
-        from system import FloatPayload
-
-        if len(self.group_addresses) and hasattr(self, "knxbus"):
-            payload = FloatPayload(self.humidity)
-            self.send_telegram(payload)
+        self.send_measured_value(self.humidity)
 
 
 class CO2Sensor(Sensor):
     """Concrete class to represent a CO2 Sensor"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["co2"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of CO2Sensor device object"""
         super().__init__(name, individual_addr)
@@ -137,19 +133,17 @@ class CO2Sensor(Sensor):
 
     def send_state(self) -> None:
         """
-        Send sensor's measured value on the bus,
+        Send sensor's measured value on the bus, according to its send policy,
         only in svshi mode,
         only if the sensor is assigned to a group address."""
-        from system import FloatPayload
-
-        if len(self.group_addresses) and hasattr(self, "knxbus"):
-            payload = FloatPayload(self.co2)
-            self.send_telegram(payload)
+        self.send_measured_value(self.co2)
 
 
 class AirSensor(Sensor):
     """Concrete class to represent an Air Sensor: CO2, Humidity and/or Temperature"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["temperature", "humidity", "co2"]
+
     def __init__(
         self,
         name: str,
@@ -207,6 +201,8 @@ class AirSensor(Sensor):
 class HumiditySoil(Sensor):
     """Concrete class to represent a Soil Moisture sensor"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["humiditysoil"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of HumiditySoil device object"""
         super().__init__(name, individual_addr)
@@ -244,19 +240,17 @@ class HumiditySoil(Sensor):
 
     def send_state(self) -> None:
         """
-        Send sensor's measured value on the bus,
+        Send sensor's measured value on the bus, according to its send policy,
         only in svshi mode,
         only if the sensor is assigned to a group address."""
-        from system import FloatPayload
-
-        if len(self.group_addresses) and hasattr(self, "knxbus"):
-            payload = FloatPayload(self.humiditysoil)
-            self.send_telegram(payload)
+        self.send_measured_value(self.humiditysoil)
 
 
 class PresenceSensor(Sensor):
     """Concrete class to represent a Presence Sensor"""
 
+    STATE_ATTRIBUTES = Sensor.STATE_ATTRIBUTES + ["state"]
+
     def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
         """Initialization of PresenceSensor device object"""
         super().__init__(name, individual_addr)
@@ -291,11 +285,7 @@ class PresenceSensor(Sensor):
 
     def send_state(self) -> None:
         """
-        Send sensor's measured value on the bus,
+        Send sensor's measured value on the bus, according to its send policy,
         only in svshi mode,
         only if the sensor is assigned to a group address."""
-        from system import FloatPayload
-
-        if len(self.group_addresses) and hasattr(self, "knxbus"):
-            payload = FloatPayload(self.humiditysoil)
-            self.send_telegram(payload)
+        self.send_measured_value(self.state)
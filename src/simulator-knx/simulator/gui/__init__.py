@@ -1,8 +1,14 @@
 """ 
 GUI Package to visualize the simulated KNX system in a graphical window. 
 GUIWindow is used to initialize the Graphical window in simulator.py,
-update_gui_window is called in room.py after updating sensors values.
+update_gui_window is called in room.py after updating sensors values,
+schedule_world_update schedules the updates of the world of the room (of its building if any).
 """
 
-from .gui_knx import GUIWindow, update_gui_window
+from .gui_knx import (
+    GUIWindow,
+    update_gui_window,
+    schedule_world_update,
+    unschedule_world_update,
+)
 from .gui_config import ROOM_WIDTH, ROOM_LENGTH
@@ -10,7 +10,7 @@ import pyglet
 
 # Thrid-party libraries
 from time import time, sleep
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import numpy as np
 
 # Application libraries
@@ -36,6 +36,7 @@ class GUIWindow(pyglet.window.Window):
         room: Room = None,
         svshi_mode: bool = False,
         telegram_logging: bool = False,
+        knx_port: int = 3671,
     ) -> None:
         """
         Initialization of pyglet GUI Window object.
@@ -62,6 +63,7 @@ class GUIWindow(pyglet.window.Window):
         # Flags for svshi mode
         self.__svshi_mode = svshi_mode
         self.__telegram_logging = telegram_logging
+        self.__knx_port = knx_port
         # Room object to represent the KNX System
         try:
             self.room = room
@@ -73,10 +75,13 @@ class GUIWindow(pyglet.window.Window):
                 self.__DEFAULT_CONFIG_PATH,
                 svshi_mode=self.__svshi_mode,
                 telegram_logging=self.__telegram_logging,
+                knx_port=self.__knx_port,
             )
 
         # Array to store the devices added to the room (e.g., by dragging them in)
         self.__room_devices: List[gt.DeviceWidget] = []
+        # Same device widgets indexed by name, to update them from the sensors' values without scanning the room devices
+        self.__room_devices_by_name: Dict[str, gt.DeviceWidget] = {}
         self.__gui_windows: List[gt.WindowWidget] = []
         self.__devices_scroll = 0  # Keep state of the scroll position of devices list
         # Default individual addresses when adding devices during simulation
@@ -97,13 +102,11 @@ class GUIWindow(pyglet.window.Window):
         )
         # Array to store labels to display in room devices list
         self.__room_devices_labels: List[pyglet.text.Label] = []
-        # Array to store brightnesses & temperature in the room
-        self.__room_brightness_labels: List[pyglet.text.Label] = []
-        self.__room_brightness_levels: List[pyglet.text.Label] = []
-        self.__room_temperature_labels: List[pyglet.text.Label] = []
-        self.__room_temperature_levels: List[pyglet.text.Label] = []
-        self.__room_airquality_labels: List[pyglet.text.Label] = []
-        self.__room_airsensor_levels: List[pyglet.text.Label] = []
+        # Labels of brightness, temperature & air quality sensors in the room, indexed by sensor name,
+        # created when the sensors are added and updated in place at each world update
+        self.__room_brightness_widgets: Dict[str, gt.SensorLevelWidget] = {}
+        self.__room_temperature_widgets: Dict[str, gt.SensorLevelWidget] = {}
+        self.__room_airsensor_widgets: Dict[str, gt.SensorLevelWidget] = {}
 
         # Initialize the Available devices widgets to draw them on the left side, that a user can drag them in the room
         self.__available_devices = gt.AvailableDevices(
@@ -330,278 +333,93 @@ class GUIWindow(pyglet.window.Window):
 
     def __display_brightness_labels(self) -> None:
         """Display (or re-initialize) of the room brightness sensors' labels"""
-        for room_brightness_label in self.__room_brightness_labels:
-            room_brightness_label.delete()
-        self.__room_brightness_labels = []
-        room_brightness_counter = 0
+        for widget in self.__room_brightness_widgets.values():
+            widget.delete()
+        self.__room_brightness_widgets = {}
         bright_x = self.__brightness_label.x
         bright_y = self.__brightness_label.y - gc.OFFSET_TITLE
         for room_device in self.__room_devices:
             if "bright" in room_device.label.text.lower():
                 room_bright_x = (
-                    bright_x + room_brightness_counter * gc.OFFSET_SENSOR_LEVELS
+                    bright_x
+                    + len(self.__room_brightness_widgets) * gc.OFFSET_SENSOR_LEVELS
                 )
-                room_bright_y = bright_y
-                room_brightness_counter += 1
-                room_brightness_label = pyglet.text.Label(
+                self.__room_brightness_widgets[
+                    room_device.label_name
+                ] = gt.SensorLevelWidget(
                     "bright" + room_device.label.text[-1],
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LABEL,
-                    color=gc.COLOR_FONT_SENSORS_DEVICE,
-                    x=room_bright_x,
-                    y=room_bright_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
+                    room_bright_x,
+                    bright_y,
+                    self.__batch,
+                    self.__foreground,
                 )
-                self.__room_brightness_labels.append(room_brightness_label)
 
     def __display_temperature_labels(self) -> None:
         """Display (or re-initialize) the room temperature sensors' labels"""
-        for room_temperature_label in self.__room_temperature_labels:
-            room_temperature_label.delete()
-        self.__room_temperature_labels = []
-        room_temperature_counter = 0
+        for widget in self.__room_temperature_widgets.values():
+            widget.delete()
+        self.__room_temperature_widgets = {}
         temp_x = self.__temperature_label.x
         temp_y = self.__temperature_label.y - gc.OFFSET_TITLE
         for room_device in self.__room_devices:
             if "thermometer" in room_device.label.text.lower():
                 room_temp_x = (
-                    temp_x + room_temperature_counter * gc.OFFSET_SENSOR_LEVELS
+                    temp_x
+                    + len(self.__room_temperature_widgets) * gc.OFFSET_SENSOR_LEVELS
                 )
-                room_temp_y = temp_y
-                room_temperature_counter += 1
-                room_temperature_label = pyglet.text.Label(
+                self.__room_temperature_widgets[
+                    room_device.label_name
+                ] = gt.SensorLevelWidget(
                     "thermo" + room_device.label.text[-1],
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LABEL,
-                    color=gc.COLOR_FONT_SENSORS_DEVICE,
-                    x=room_temp_x,
-                    y=room_temp_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
+                    room_temp_x,
+                    temp_y,
+                    self.__batch,
+                    self.__foreground,
                 )
-                self.__room_temperature_labels.append(room_temperature_label)
 
     def __display_airsensor_labels(self) -> None:
         """Display (or re-initialize) the room air quality sensors' labels"""
-        for room_airquality_label in self.__room_airquality_labels:
-            room_airquality_label.delete()
-        self.__room_airquality_labels = []
+        for widget in self.__room_airsensor_widgets.values():
+            widget.delete()
+        self.__room_airsensor_widgets = {}
         air_x = self.__airquality_label.x
         air_y = self.__airquality_label.y - gc.OFFSET_TITLE
-        previous_airsensor_name = ""
+        # Air sensors display T°, CO2 and RH levels, the other sensors one level
+        airsensor_types = {"airsensor": 3, "co2sensor": 1, "humidityair": 1}
         for room_device in self.__room_devices:
-            if "airsensor" in room_device.label.text.lower():
-                offset_x = (
-                    gc.OFFSET_SENSOR_LEVELS if len(previous_airsensor_name) else 0
-                )
-                previous_airsensor_name = room_device.label.text.lower()
-                room_air_x = air_x + offset_x
-                air_x = room_air_x
-                room_air_y = air_y
-                room_airquality_label = pyglet.text.Label(
-                    "airsensor" + room_device.label.text[-1],
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LABEL,
-                    color=gc.COLOR_FONT_SENSORS_DEVICE,
-                    x=room_air_x,
-                    y=room_air_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
-                )
-                self.__room_airquality_labels.append(room_airquality_label)
-            elif "co2sensor" in room_device.label.text.lower():
-                offset_x = (
-                    gc.OFFSET_SENSOR_LEVELS if len(previous_airsensor_name) else 0
-                )
-                previous_airsensor_name = room_device.label.text.lower()
-                room_air_x = air_x + offset_x
-                air_x = room_air_x
-                room_air_y = air_y
-                room_airquality_label = pyglet.text.Label(
-                    "co2sensor" + room_device.label.text[-1],
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LABEL,
-                    color=gc.COLOR_FONT_SENSORS_DEVICE,
-                    x=room_air_x,
-                    y=room_air_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
-                )
-                self.__room_airquality_labels.append(room_airquality_label)
-            elif "humidityair" in room_device.label.text.lower():
-                offset_x = (
-                    gc.OFFSET_SENSOR_LEVELS if len(previous_airsensor_name) else 0
-                )
-                previous_airsensor_name = room_device.label.text.lower()
-                room_air_x = air_x + offset_x
-                air_x = room_air_x
-                room_air_y = air_y
-                room_airquality_label = pyglet.text.Label(
-                    "humidityair" + room_device.label.text[-1],
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LABEL,
-                    color=gc.COLOR_FONT_SENSORS_DEVICE,
-                    x=room_air_x,
-                    y=room_air_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
-                )
-                self.__room_airquality_labels.append(room_airquality_label)
+            for airsensor_type, nb_levels in airsensor_types.items():
+                if airsensor_type in room_device.label.text.lower():
+                    if len(self.__room_airsensor_widgets):
+                        air_x += gc.OFFSET_SENSOR_LEVELS
+                    self.__room_airsensor_widgets[
+                        room_device.label_name
+                    ] = gt.SensorLevelWidget(
+                        airsensor_type + room_device.label.text[-1],
+                        air_x,
+                        air_y,
+                        self.__batch,
+                        self.__foreground,
+                        nb_levels=nb_levels,
+                    )
+                    break
 
     def __display_airsensors_levels(self, airsensor_dict) -> None:
         """
         Display levels of air quality (T°, HR, CO2) for corresponding labels (sensors).
         airsensor_dict = dict[sensor_name][type][value], type can be 'temperature', 'humidity' or 'co2'.
         """
-        for airsensor in airsensor_dict:  # AirSensor names are the keys
-            temp = hum = co2 = None
-            airquality_level_text = ""
-            room_airquality_counter = 0
-            for room_airquality_label in self.__room_airquality_labels:
-                if "airsensor" in airsensor and airsensor == room_airquality_label.text:
-                    air_level_x = (
-                        room_airquality_label.x
-                        + room_airquality_counter * gc.OFFSET_SENSOR_LEVELS
-                    )
-                    air_level_y = room_airquality_label.y - gc.OFFSET_SENSOR_TITLE
-                    if "temperature" in airsensor_dict[airsensor]:
-                        temp = airsensor_dict[airsensor]["temperature"]
-                        airquality_level_text += str(temp) + " °C/"
-                    else:
-                        airquality_level_text += "-/"
-                    if "co2" in airsensor_dict[airsensor]:
-                        co2 = airsensor_dict[airsensor]["co2"]
-                        airquality_level_text += str(co2) + " ppm/"
-                    else:
-                        airquality_level_text += "-/"
-                    if "humidity" in airsensor_dict[airsensor]:
-                        hum = airsensor_dict[airsensor]["humidity"]
-                        airquality_level_text += str(hum) + " %"
-                    else:
-                        airquality_level_text += "-"
-                    airquality_levels_split_text = airquality_level_text.split("/")
-                    for air_value in airquality_levels_split_text:
-                        if air_value != "-":
-                            room_sensor_level = pyglet.text.Label(
-                                air_value,
-                                font_name=gc.FONT_SYSTEM_INFO,
-                                font_size=gc.FONT_SIZE_SENSOR_LEVEL,
-                                color=gc.COLOR_FONT_SENSORS_VALUE,
-                                x=air_level_x,
-                                y=air_level_y,
-                                anchor_x="left",
-                                anchor_y="bottom",
-                                batch=self.__batch,
-                                group=self.__foreground,
-                            )
-                            self.__room_airsensor_levels.append(room_sensor_level)
-                            air_level_y -= gc.OFFSET_AIRQUALITY_LEVELS
-                    air_level_y = room_airquality_label.y - gc.OFFSET_SENSOR_TITLE
-                    room_airquality_counter += 1
-                elif (
-                    "co2sensor" in airsensor and airsensor == room_airquality_label.text
-                ):
-                    air_level_x = (
-                        room_airquality_label.x
-                        + room_airquality_counter * gc.OFFSET_SENSOR_LEVELS
-                    )
-                    air_level_y = room_airquality_label.y - gc.OFFSET_SENSOR_TITLE
-                    co2 = str(airsensor_dict[airsensor]["co2"]) + " ppm"
-                    room_sensor_level = pyglet.text.Label(
-                        co2,
-                        font_name=gc.FONT_SYSTEM_INFO,
-                        font_size=gc.FONT_SIZE_SENSOR_LEVEL,
-                        color=gc.COLOR_FONT_SENSORS_VALUE,
-                        x=air_level_x,
-                        y=air_level_y,
-                        anchor_x="left",
-                        anchor_y="bottom",
-                        batch=self.__batch,
-                        group=self.__foreground,
-                    )
-                    self.__room_airsensor_levels.append(room_sensor_level)
-                    room_airquality_counter += 1
-                elif (
-                    "humidityair" in airsensor
-                    and airsensor == room_airquality_label.text
-                ):
-                    air_level_x = (
-                        room_airquality_label.x
-                        + room_airquality_counter * gc.OFFSET_SENSOR_LEVELS
-                    )
-                    air_level_y = room_airquality_label.y - gc.OFFSET_SENSOR_TITLE
-                    co2 = str(airsensor_dict[airsensor]["humidity"]) + " %"
-                    room_sensor_level = pyglet.text.Label(
-                        co2,
-                        font_name=gc.FONT_SYSTEM_INFO,
-                        font_size=gc.FONT_SIZE_SENSOR_LEVEL,
-                        color=gc.COLOR_FONT_SENSORS_VALUE,
-                        x=air_level_x,
-                        y=air_level_y,
-                        anchor_x="left",
-                        anchor_y="bottom",
-                        batch=self.__batch,
-                        group=self.__foreground,
-                    )
-                    self.__room_airsensor_levels.append(room_sensor_level)
-                    room_airquality_counter += 1
-
-    def __display_brightness_level(self, bright_name: str, brightness: float) -> None:
-        """Display levels of brightness for corresponding label (sensor)"""
-        room_brightness_counter = 0
-        for room_brightness_label in self.__room_brightness_labels:
-            if bright_name[-1] == room_brightness_label.text[-1]:  # digit id of sensor
-                bright_level_x = room_brightness_label.x
-                bright_level_y = room_brightness_label.y - gc.OFFSET_SENSOR_TITLE
-                bright_level_text = str(brightness)
-                room_brightness_level = pyglet.text.Label(
-                    bright_level_text + " lux",
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LEVEL,
-                    color=gc.COLOR_FONT_SENSORS_VALUE,
-                    x=bright_level_x,
-                    y=bright_level_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
-                )
-                self.__room_brightness_levels.append(room_brightness_level)
-            room_brightness_counter += 1
-
-    def __display_temperature_level(self, temp_name: str, temperature: float) -> None:
-        """Display levels of temperature for corresponding label (sensor)"""
-        room_temperature_counter = 0
-        for room_temperature_label in self.__room_temperature_labels:
-            if temp_name[-1] == room_temperature_label.text[-1]:  # digit id of sensor
-                temp_level_x = room_temperature_label.x
-                temp_level_y = room_temperature_label.y - gc.OFFSET_SENSOR_TITLE
-                temp_level_text = str(temperature)
-                room_temperature_level = pyglet.text.Label(
-                    temp_level_text + " °C",
-                    font_name=gc.FONT_SYSTEM_INFO,
-                    font_size=gc.FONT_SIZE_SENSOR_LEVEL,
-                    color=gc.COLOR_FONT_SENSORS_VALUE,
-                    x=temp_level_x,
-                    y=temp_level_y,
-                    anchor_x="left",
-                    anchor_y="bottom",
-                    batch=self.__batch,
-                    group=self.__foreground,
-                )
-                self.__room_temperature_levels.append(room_temperature_level)
-            room_temperature_counter += 1
+        for airsensor, levels in airsensor_dict.items():  # AirSensor names are the keys
+            widget = self.__room_airsensor_widgets.get(airsensor)
+            if widget is None:
+                continue
+            level_texts = []
+            if "temperature" in levels:
+                level_texts.append(str(levels["temperature"]) + " °C")
+            if "co2" in levels:
+                level_texts.append(str(levels["co2"]) + " ppm")
+            if "humidity" in levels:
+                level_texts.append(str(levels["humidity"]) + " %")
+            widget.update_levels(level_texts)
 
     def __display_windows(self) -> None:
         """Display windows on room's walls, with correct size and position."""
@@ -641,24 +459,12 @@ class GUIWindow(pyglet.window.Window):
                     room_device.sprite_state != room_device.in_room_device.device.state
                 ):  # GUI device sprite state is not the same as KNX device state
                     room_device.sprite_state = room_device.in_room_device.device.state
-                    room_device.sprite.delete()
+                    # The image is replaced in the sprite, that keeps its place in the batch
                     if room_device.sprite_state:  # device turned ON
-                        room_device.sprite = pyglet.sprite.Sprite(
-                            room_device.img_ON,
-                            x=room_device.origin_x,
-                            y=room_device.origin_y,
-                            batch=self.__batch,
-                            group=self.__foreground,
-                        )
+                        room_device.sprite.image = room_device.img_ON
                     else:  # device turned OFF
-                        room_device.sprite = pyglet.sprite.Sprite(
-                            room_device.img_OFF,
-                            x=room_device.origin_x,
-                            y=room_device.origin_y,
-                            batch=self.__batch,
-                            group=self.__foreground,
-                        )
-                    room_device.sprite.scale = gc.DOCKER_GUI_RATIO
+                        room_device.sprite.image = room_device.img_OFF
+                        room_device.sprite.opacity = gc.OPACITY_DEFAULT
                 if (
                     room_device.sprite_state
                     and room_device.sprite_state_ratio
@@ -727,6 +533,7 @@ class GUIWindow(pyglet.window.Window):
         )
         self._moving_device.update_position(pos_x, pos_y, loc_x, loc_y, update_loc=True)
         self.__room_devices.append(self._moving_device)
+        self.__room_devices_by_name[self._moving_device.label_name] = self._moving_device
         self.__add_device_to_config(
             new_device_name,
             new_device_class,
@@ -875,9 +682,7 @@ class GUIWindow(pyglet.window.Window):
                 self.__SYSTEM_DT = system_dt
             with open(config_path, "r") as config_file:
                 self.system_config_dict = json.load(config_file)
-        pyglet.clock.schedule_interval(
-            self.room.update_world, interval=system_dt, gui_mode=True
-        )
+        schedule_world_update(self.room, system_dt)
         # Ratio to translate room physical (simulated) size from meters to pixels
         self.__room_width_ratio = gc.ROOM_WIDTH / self.room.width
         self.__room_length_ratio = gc.ROOM_LENGTH / self.room.length
@@ -917,6 +722,7 @@ class GUIWindow(pyglet.window.Window):
             )
             device_widget.in_room_device = in_room_device
             self.__room_devices.append(device_widget)
+            self.__room_devices_by_name[device_widget.label_name] = device_widget
         self.__display_devices_list()
         self.__display_brightness_labels()
         self.__display_temperature_labels()
@@ -933,65 +739,47 @@ class GUIWindow(pyglet.window.Window):
         humiditysoil_levels: List[Tuple[str, float]],
         presence_sensors_states: List[Tuple[str, bool]],
     ) -> None:
-        """Display (re-Initialisation) of the room sensors list with updated values"""
-        for room_brightness_level in self.__room_brightness_levels:
-            room_brightness_level.delete()
-        self.__room_brightness_levels = []
-        for room_temperature_level in self.__room_temperature_levels:
-            room_temperature_level.delete()
-        self.__room_temperature_levels = []
-        for room_sensor_level in self.__room_airsensor_levels:
-            room_sensor_level.delete()
-        self.__room_airsensor_levels = []
+        """Update the room sensors' levels and sprites, only the widgets whose value changed are modified"""
         airsensor_dict = {}
 
-        for bright in brightness_levels:
-            bright_name, brightness = bright[0], round(bright[1], 1)
-            self.__display_brightness_level(bright_name, brightness)
-        for temp in temperature_levels:
-            temp_name, temperature = temp[0], round(temp[1], 2)
-            self.__display_temperature_level(temp_name, temperature)
-            for room_device in self.__room_devices:
-                if "thermometer" in room_device.label_name:
-                    room_device.update_thermometer_sprite(rising_temp)
+        for bright_name, brightness in brightness_levels:
+            widget = self.__room_brightness_widgets.get(bright_name)
+            if widget is not None:
+                widget.update_levels([str(round(brightness, 1)) + " lux"])
+        for temp_name, temperature in temperature_levels:
+            temperature = round(temperature, 2)
+            widget = self.__room_temperature_widgets.get(temp_name)
+            if widget is not None:
+                widget.update_levels([str(temperature) + " °C"])
             if "air" in temp_name:
-                try:
-                    airsensor_dict[temp_name]["temperature"] = temperature
-                except KeyError:
-                    airsensor_dict[temp_name] = {}
-                    airsensor_dict[temp_name]["temperature"] = temperature
-        for hum in humidity_levels:
-            hum_name, humidity = hum[0], hum[1]
-            if "air" or "humidityair" in hum_name:
-                try:
-                    airsensor_dict[hum_name]["humidity"] = humidity
-                except KeyError:
-                    airsensor_dict[hum_name] = {}
-                    airsensor_dict[hum_name]["humidity"] = humidity
-        for co2 in co2_levels:
-            co2_name, co2 = co2[0], co2[1]
-            if "air" or "co2" in co2_name:
-                try:
-                    airsensor_dict[co2_name]["co2"] = co2
-                except KeyError:
-                    airsensor_dict[co2_name] = {}
-                    airsensor_dict[co2_name]["co2"] = co2
+                airsensor_dict.setdefault(temp_name, {})["temperature"] = temperature
+        if len(temperature_levels):
+            for temp_name in self.__room_temperature_widgets:
+                self.__room_devices_by_name[temp_name].update_thermometer_sprite(
+                    rising_temp
+                )
+        for hum_name, humidity in humidity_levels:
+            airsensor_dict.setdefault(hum_name, {})["humidity"] = humidity
+        for co2_name, co2 in co2_levels:
+            airsensor_dict.setdefault(co2_name, {})["co2"] = co2
 
         if len(airsensor_dict) > 0:
             self.__display_airsensors_levels(airsensor_dict)
 
-        for humsoil in humiditysoil_levels:
-            humsoil_name, humiditysoil = humsoil[0], humsoil[1]
-            for room_device in self.__room_devices:
-                if humsoil_name == room_device.label_name:
-                    if hasattr(room_device, "humiditysoil"):
-                        room_device.humiditysoil = humiditysoil
-                        room_device.update_drop_sprite()
-        for presence in presence_sensors_states:
-            pres_name, _ = presence[0], presence[1]
-            for room_device in self.__room_devices:
-                if pres_name == room_device.label_name:
-                    self.__switch_sprite()
+        for humsoil_name, humiditysoil in humiditysoil_levels:
+            room_device = self.__room_devices_by_name.get(humsoil_name)
+            if (
+                room_device is not None
+                and hasattr(room_device, "humiditysoil")
+                and room_device.humiditysoil != humiditysoil
+            ):
+                room_device.humiditysoil = humiditysoil
+                room_device.update_drop_sprite()
+        if any(
+            pres_name in self.__room_devices_by_name
+            for pres_name, _ in presence_sensors_states
+        ):
+            self.__switch_sprite()
 
     def reload_simulation(
         self, default_config: bool = False, empty_config: bool = False
@@ -999,23 +787,26 @@ class GUIWindow(pyglet.window.Window):
         """Reload the simulation with initial configuration file"""
         from tools import configure_system_from_file
 
-        pyglet.clock.unschedule(self.room.update_world)
+        unschedule_world_update(self.room)
         for (
             room_device
         ) in self.__room_devices:  # Re-Initialisation of the room devices list
             room_device.delete()
         self.__room_devices = []
+        self.__room_devices_by_name = {}
         if hasattr(self, "person_sitting"):  # Removal of person img
             self.person_sitting.delete()
         if hasattr(self, "person_child"):
             self.person_child.delete()
-        for (
-            room_brightness_label
-        ) in (
-            self.__room_brightness_labels
-        ):  # Re-Initialisation of the room brightness labels list
-            room_brightness_label.delete()
-        self.__room_brightness_labels = []
+        # Re-Initialisation of the room sensors labels
+        for sensor_widgets in [
+            self.__room_brightness_widgets,
+            self.__room_temperature_widgets,
+            self.__room_airsensor_widgets,
+        ]:
+            for widget in sensor_widgets.values():
+                widget.delete()
+            sensor_widgets.clear()
         for (
             room_device_label
         ) in (
@@ -1036,6 +827,7 @@ class GUIWindow(pyglet.window.Window):
             config_path,
             svshi_mode=self.__svshi_mode,
             telegram_logging=self.__telegram_logging,
+            knx_port=self.__knx_port,
         )
         # Re-initialization of day time and weather
         self.daytimeweather_widget.delete()
@@ -1067,10 +859,9 @@ class GUIWindow(pyglet.window.Window):
             logging.info("The simulation is resumed !")
 
     def redraw(self) -> None:
-        """When SVSHI_MODE, redraw device sprites, in case telegrams have delay from svshi program"""
+        """When SVSHI_MODE, switch the sprites of the devices whose state changed, in case telegrams have delay from svshi program.
+        The batch is drawn once by on_draw() after the scheduled updates."""
         self.__switch_sprite()
-        self.clear()
-        self.__batch.draw()
     
     # def close(self) -> None: ## NOTE only for when usign flask in local
     #     print("window to close")
@@ -1431,6 +1222,19 @@ class GUIWindow(pyglet.window.Window):
             self.__display_devices_list(scroll=np.sign(scroll_y))
 
 
+def schedule_world_update(room, system_dt: float) -> None:  # room: system.Room
+    """Schedule the update of the room's world (of its building's if any) with the pyglet scheduler,
+    every system_dt seconds and with GUI updates"""
+    pyglet.clock.schedule_interval(
+        room.get_update_function(), interval=system_dt, gui_mode=True
+    )
+
+
+def unschedule_world_update(room) -> None:  # room: system.Room
+    """Unschedule the update of the room's world scheduled with schedule_world_update()"""
+    pyglet.clock.unschedule(room.get_update_function())
+
+
 # Cannot be a class method because first argument must be dt for scheduling, and thus cannot be self.
 def update_gui_window(
     dt,
@@ -1452,7 +1256,10 @@ def update_gui_window(
         window.vacuum_widget.move()
     sim_time = current_str_simulation_time
     datetime_str = date_time.strftime("%Y-%m-%d %H:%M:%S")
-    window.simtime_widget.simtime_value.text = f"{sim_time}"
-    window.simtime_widget.date_value.text = f"{datetime_str}"
+    # Setting a label's text lays it out again, even if unchanged
+    if window.simtime_widget.simtime_value.text != sim_time:
+        window.simtime_widget.simtime_value.text = f"{sim_time}"
+    if window.simtime_widget.date_value.text != datetime_str:
+        window.simtime_widget.date_value.text = f"{datetime_str}"
     window.daytimeweather_widget.update_out_state(weather, time_of_day, lux_out)
     print(f"World state update at simulation time: {sim_time}", end="\r")
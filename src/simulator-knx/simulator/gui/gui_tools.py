@@ -279,20 +279,27 @@ class DayTimeWeatherWidget(object):
         }
         self._tod_sprite = None
         self._weather_sprite = None
+        self.__sky = None  # (time_of_day, weather) of the displayed sprites
 
     def update_out_state(self, weather: str, time_of_day: str, lux_out: float) -> None:
         """
-        Update outside physical states in GUI.
+        Update outside physical states in GUI, the label and sprites are only updated if their value changed.
         weather is 'clear', 'overcast' or 'dark',
         time_of_day is 'sunrise', 'sun', 'sunset, 'moon'
         """
+        self.__lux_out = round(lux_out, 1) if lux_out > 1 else lux_out
+        new_out_states = self.__out_state_str + str(self.__lux_out) + "lux"
+        if self.__out_state_value.text != new_out_states:
+            self.__out_state_value.text = new_out_states
+        if self.__sky == (time_of_day, weather):
+            return
+        self.__sky = (time_of_day, weather)
         if self._tod_sprite is not None:
             self._tod_sprite.delete()
+            self._tod_sprite = None
         if self._weather_sprite is not None:
             self._weather_sprite.delete()
-        self.__lux_out = round(lux_out, 1) if lux_out > 1 else lux_out
-        new_out_states = self.__out_state_str + str(self.__lux_out) + "lux"
-        self.__out_state_value.text = new_out_states
+            self._weather_sprite = None
         if time_of_day in self.__tod_dict:
             self._tod_sprite = pyglet.sprite.Sprite(
                 self.__tod_dict[time_of_day]["img"],
@@ -302,7 +309,7 @@ class DayTimeWeatherWidget(object):
                 group=self.__group_daytime,
             )
             self._tod_sprite.scale = gc.DOCKER_GUI_RATIO
-        if weather in self.__weather_dict:
+        if weather in self.__weather_dict and self._tod_sprite is not None:
             self._weather_sprite = pyglet.sprite.Sprite(
                 self.__weather_dict[weather]["img"],
                 self._tod_sprite.x
@@ -562,6 +569,71 @@ class ButtonDefault(object):
 
 
 # Device widgets
+class SensorLevelWidget(object):
+    """Class to represent the name and the levels of a sensor in the sensors box, updated in place"""
+
+    def __init__(
+        self,
+        name: str,
+        x: float,
+        y: float,
+        batch: Batch,
+        group: OrderedGroup,
+        nb_levels: int = 1,
+    ) -> None:
+        """
+        Initialization of the sensor name label and of its level labels, empty until the first update.
+        nb_levels : number of levels displayed under each other, e.g. 3 for an air sensor (T°, CO2, RH)
+        """
+        self.name_label = pyglet.text.Label(
+            name,
+            font_name=gc.FONT_SYSTEM_INFO,
+            font_size=gc.FONT_SIZE_SENSOR_LABEL,
+            color=gc.COLOR_FONT_SENSORS_DEVICE,
+            x=x,
+            y=y,
+            anchor_x="left",
+            anchor_y="bottom",
+            batch=batch,
+            group=group,
+        )
+        self.level_labels: List[pyglet.text.Label] = []
+        for level in range(nb_levels):
+            level_label = pyglet.text.Label(
+                "",
+                font_name=gc.FONT_SYSTEM_INFO,
+                font_size=gc.FONT_SIZE_SENSOR_LEVEL,
+                color=gc.COLOR_FONT_SENSORS_VALUE,
+                x=x,
+                y=y - gc.OFFSET_SENSOR_TITLE - level * gc.OFFSET_AIRQUALITY_LEVELS,
+                anchor_x="left",
+                anchor_y="bottom",
+                batch=batch,
+                group=group,
+            )
+            self.level_labels.append(level_label)
+
+    def update_levels(self, level_texts: List[str]) -> bool:
+        """
+        Display the levels texts from the top label, the remaining labels are emptied.
+        Only the labels whose text changed are updated, as setting a text lays out the label again.
+        Return True if a label changed.
+        """
+        changed = False
+        for index, level_label in enumerate(self.level_labels):
+            text = level_texts[index] if index < len(level_texts) else ""
+            if level_label.text != text:
+                level_label.text = text
+                changed = True
+        return changed
+
+    def delete(self) -> None:
+        """Delete the name and level labels of the sensor"""
+        self.name_label.delete()
+        for level_label in self.level_labels:
+            level_label.delete()
+
+
 class DeviceWidget(object):
     """Class to represent a GUI Device widget"""
 
@@ -588,6 +660,7 @@ class DeviceWidget(object):
         self.label_name = self.device_class.lower() + device_number
         self.sprite_state = False
         self.sprite_state_ratio = 100
+        self.__rising_temp = None  # thermometer sprite displayed, neutral at first
         self.file_ON = img_file_ON
         self.file_OFF = img_file_OFF
         self.pos_x, self.pos_y = (
@@ -753,60 +826,22 @@ class DeviceWidget(object):
                 drop = self.__drop_green
             else:
                 drop = self.__drop_blue
-            self.__drop_sprite.delete()
-            self.__drop_label.delete()
-            self.__drop_sprite = pyglet.sprite.Sprite(
-                drop,
-                x=self.__drop_pos_x,
-                y=self.__drop_pos_y,
-                batch=self.__batch,
-                group=self.__group,
-            )
-            self.__drop_sprite.scale = gc.DOCKER_GUI_RATIO
-            self.__drop_label = pyglet.text.Label(
-                str(self.humiditysoil) + "%",
-                font_name=gc.FONT_INTERACTIVE,
-                font_size=gc.FONT_SIZE_INTERACTIVE,
-                color=color_from_humiditysoil(self.humiditysoil),
-                x=self.__drop_label_pos_x,
-                y=self.__drop_label_pos_y,
-                anchor_x="left",
-                anchor_y="center",
-                batch=self.__batch,
-                group=self.__group,
-            )
+            if self.__drop_sprite.image is not drop:
+                self.__drop_sprite.image = drop
+            self.__drop_label.text = str(self.humiditysoil) + "%"
+            self.__drop_label.color = color_from_humiditysoil(self.humiditysoil)
 
     def update_thermometer_sprite(self, rising_temp: bool) -> None:
         """Method specific for thermometer, update the color of the thermomneter if temp is stable, rising or decreasing."""
-        if "thermometer" in self.label_name:
+        if "thermometer" in self.label_name and rising_temp != self.__rising_temp:
+            self.__rising_temp = rising_temp
+            # The image is replaced in the sprite, that keeps its place in the batch
             if rising_temp is None and hasattr(self, "_img_neutral"):
-                self.sprite.delete()
-                self.sprite = pyglet.sprite.Sprite(
-                    self._img_neutral,
-                    x=self.origin_x,
-                    y=self.origin_y,
-                    batch=self.__batch,
-                    group=self.__group,
-                )
+                self.sprite.image = self._img_neutral
             elif rising_temp:
-                self.sprite.delete()
-                self.sprite = pyglet.sprite.Sprite(
-                    self.img_ON,
-                    x=self.origin_x,
-                    y=self.origin_y,
-                    batch=self.__batch,
-                    group=self.__group,
-                )
+                self.sprite.image = self.img_ON
             elif rising_temp == False:
-                self.sprite.delete()
-                self.sprite = pyglet.sprite.Sprite(
-                    self.img_OFF,
-                    x=self.origin_x,
-                    y=self.origin_y,
-                    batch=self.__batch,
-                    group=self.__group,
-                )
-            self.sprite.scale = gc.DOCKER_GUI_RATIO
+                self.sprite.image = self.img_OFF
 
 
 class AvailableDevices(object):
@@ -1,6 +1,9 @@
 """ Parser of ETS project files """
 from bs4 import BeautifulSoup
 import os, sys, logging
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import IO, Dict, Iterator, List, Tuple, Union
 
 """
 Devices types:
@@ -44,7 +47,7 @@ def build_manufacturers_list(master_parser, project_files_path):
                         logging.info(
                             f" <ETS files parser> No Default Language for {man_name} ({man_refid})."
                         )
-                        man_obj = Manufacturer(man_refid, man_name, man_language)
+                    man_obj = Manufacturer(man_refid, man_name, man_language)
                     man_list.append(man_obj)
     return man_list
 
@@ -165,18 +168,187 @@ def build_devices_list(project_files_path, manufacturers_list):
     return items
 
 
-def main():  # TODO: consider device number in the case of multiple instances of the same deviiec in a project
-    # get and parse the master file to build list of manufacturers names, reference Id and languages
-    project_files_path = "./docs/catalog/catalogproject_sensors/"
-    master_file = open(project_files_path + "knx_master.xml", "r")
-    master_content = master_file.read()
-    master_parser = BeautifulSoup(master_content, "xml")  # 'xml' for knx_master
-    # print(f"[INFO] Size of master_parser: {sys.getsizeof(master_parser)} bytes")
-    manufacturers_list = build_manufacturers_list(master_parser, project_files_path)
+# Streaming parser: the XML files are parsed incrementally, directly from the zipped .knxproj or from its extracted folder
+ENGLISH_LANGUAGE = "en-US"
+MASTER_FILE_NAME = "knx_master.xml"
+CATALOG_FILE_NAME = "Catalog.xml"
+
+
+def local_tag(tag: str) -> str:
+    """Tag of an element without its namespace, that depends on the ETS version (e.g. '{http://knx.org/xml/project/21}Catalog')"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iterparse_starts(xml_file: IO[bytes]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Yield the local tag and attributes of each element of the XML file as soon as it is opened,
+    the elements are cleared once closed, and removed from the root, so that the memory used does not grow with the file.
+    """
+    root = None
+    for event, element in ET.iterparse(xml_file, events=("start", "end")):
+        if root is None:  # first start event
+            root = element
+        if event == "start":
+            yield local_tag(element.tag), element.attrib
+        else:
+            element.clear()
+            root.clear()
+
+
+def stream_manufacturers(
+    master_file: IO[bytes], manufacturer_refids: List[str]
+) -> List[Manufacturer]:
+    """Parse knx_master.xml incrementally to create the manufacturers of the refids, in the order of the refids"""
+    manufacturers = {}
+    for tag, attributes in iterparse_starts(master_file):
+        if tag == "Manufacturer" and attributes.get("Id") in manufacturer_refids:
+            man_refid = attributes["Id"]
+            man_language = attributes.get("DefaultLanguage", "")
+            if not man_language:
+                logging.info(
+                    f" <ETS files parser> No Default Language for {attributes.get('Name')} ({man_refid})."
+                )
+            manufacturers[man_refid] = Manufacturer(
+                man_refid, attributes.get("Name"), man_language
+            )
+    return [manufacturers[r] for r in manufacturer_refids if r in manufacturers]
+
+
+def stream_catalog_items(
+    catalog_file: IO[bytes], manufacturer: Manufacturer
+) -> List[Item]:
+    """
+    Parse a Catalog.xml file incrementally to list its devices (called items), in one pass:
+    the items are collected with the refids of their 2 levels of catalog sections while the english names
+    are indexed by refid, and the names are resolved once the whole file is read (the Languages come after the Catalog).
+    """
+    english_names = {}  # refid -> english name
+    default_names = {}  # refid -> name in the default language of the manufacturer
+    sections = []  # (refid) of the catalog sections opened, from the 1st level
+    items = []  # (1st level section refid, 2nd level section refid, item attributes)
+    in_catalog = False
+    language = None
+    translation_refid = None
+    root = None
+    for event, element in ET.iterparse(catalog_file, events=("start", "end")):
+        if root is None:  # first start event
+            root = element
+        tag = local_tag(element.tag)
+        if event == "end":
+            if tag == "CatalogSection":
+                sections.pop()
+            elif tag == "Catalog":
+                in_catalog = False
+            element.clear()
+            root.clear()
+            continue
+        attributes = element.attrib
+        if tag == "Catalog":
+            in_catalog = True
+        elif tag == "CatalogSection" and in_catalog:
+            sections.append(attributes["Id"])
+            default_names[attributes["Id"]] = attributes.get("Name")
+        elif tag == "CatalogItem" and in_catalog and len(sections) == 2:
+            # only items directly under 2nd level sections are devices of the project
+            items.append((sections[0], sections[1], dict(attributes)))
+            default_names[attributes["Id"]] = attributes.get("Name")
+        elif tag == "Language":
+            language = attributes.get("Identifier")
+        elif tag == "TranslationElement":
+            translation_refid = attributes.get("RefId")
+        elif (
+            tag == "Translation"
+            and language == ENGLISH_LANGUAGE
+            and attributes.get("AttributeName") == "Name"
+        ):
+            english_names.setdefault(translation_refid, attributes.get("Text"))
+
+    def name(refid: str) -> str:
+        return english_names.get(refid) or default_names.get(refid)
+
+    return [
+        Item(
+            manufacturer.man_refid,
+            manufacturer.man_name,
+            firstlevel_section_refid,
+            name(firstlevel_section_refid),
+            secondlevel_section_refid,
+            name(secondlevel_section_refid),
+            attributes["Id"],
+            name(attributes["Id"]),
+            attributes.get("ProductRefId"),
+            attributes.get("Hardware2ProgramRefId"),
+        )
+        for firstlevel_section_refid, secondlevel_section_refid, attributes in items
+    ]
+
+
+def parse_ets_project(
+    project_path: str,
+) -> Union[Tuple[List[Manufacturer], List[Item]], None]:
+    """
+    Parse the manufacturers and devices (items) of an ETS project with the streaming parser,
+    from the .knxproj archive without extracting it or from its extracted folder.
+    Return None if the project has no knx_master.xml file.
+    """
+    if zipfile.is_zipfile(project_path):
+        with zipfile.ZipFile(project_path) as archive:
+            file_names = archive.namelist()
+            return parse_ets_files(sorted(file_names), archive.open)
+    file_names = []
+    for root, _, files in os.walk(project_path):
+        for file_name in files:
+            file_path = os.path.join(root, file_name)
+            file_names.append(
+                os.path.relpath(file_path, project_path).replace(os.sep, "/")
+            )
+    return parse_ets_files(
+        sorted(file_names), lambda n: open(os.path.join(project_path, n), "rb")
+    )
+
+
+def parse_ets_files(
+    file_names: List[str], open_file
+) -> Union[Tuple[List[Manufacturer], List[Item]], None]:
+    """
+    Parse the manufacturers and devices of the project files.
+
+    file_names : paths of the files of the project, relative to the project root and '/'-separated
+    open_file : function opening a file of the project in binary mode from its name
+    """
+    if MASTER_FILE_NAME not in file_names:
+        logging.error(
+            f" <ETS files parser> The project has no {MASTER_FILE_NAME} file, it cannot be parsed."
+        )
+        return None
+    # folders with the refid of a manufacturer
+    catalog_files = {
+        n.split("/")[0]: n
+        for n in file_names
+        if n.startswith("M-")
+        and n.endswith("/" + CATALOG_FILE_NAME)
+        and n.count("/") == 1
+    }
+    with open_file(MASTER_FILE_NAME) as master_file:
+        manufacturers = stream_manufacturers(master_file, list(catalog_files))
+    items = []
+    for manufacturer in manufacturers:
+        with open_file(catalog_files[manufacturer.man_refid]) as catalog_file:
+            items.extend(stream_catalog_items(catalog_file, manufacturer))
+    return manufacturers, items
+
+
+def main(
+    project_path: str = "./docs/catalog/catalogproject_sensors/",
+):  # TODO: consider device number in the case of multiple instances of the same deviiec in a project
+    # parse the master file to build list of manufacturers names, reference Id and languages, and their Catalog.xml files
+    parsed_project = parse_ets_project(project_path)
+    if parsed_project is None:
+        return
+    manufacturers_list, items_list = parsed_project
     print("\n------ Manufacturers in this project ------ \n")
     for man in manufacturers_list:
         print(man)
-    items_list = build_devices_list(project_files_path, manufacturers_list)
     print("\n------ Devices(Items) in this project ------ ")
     for item in items_list:
         print(item)
@@ -190,4 +362,4 @@ def main():  # TODO: consider device number in the case of multiple instances of
 
 
 if __name__ == "__main__":
-    main()
+    main(*sys.argv[1:2])
@@ -6,6 +6,7 @@ Main module, managing start of simulator in selected or default mode, launch of
 import logging
 import sys
 import time
+from typing import Union
 
 # Third party imports
 import aioconsole
@@ -15,11 +16,10 @@ import pyglet
 from contextlib import suppress
 
 # Local application imports
-import gui
 import tools
 import tools.config_tools as ct
 from system.room import Room
-from svshi_interface import InterfaceProp
+from svshi_interface import InterfaceProp, AsyncioInterface
 import os
 
 pp = pprint.PrettyPrinter(compact=True)
@@ -60,6 +60,8 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
         TELEGRAM_LOGGING,
         _,
         HOST_ADDR_PORT,
+        LOAD_SPEC_PATH,
+        KNX_PORT,
     ) = options
 
     if TELEGRAM_LOGGING:
@@ -68,6 +70,16 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
     HOST_ADDR = HOST_ADDR_PORT.split(":")[0]
 
     InterfaceProp.HOST = HOST_ADDR
+    # Without GUI, the interface with SVSHI runs on the asyncio event loop of the simulator
+    InterfaceProp.ASYNCIO = INTERFACE_MODE in [
+        ct.CLI_INT_MODE,
+        ct.HEADLESS_INT_MODE,
+        ct.LOAD_INT_MODE,
+    ]
+    # Load generator, the system is generated from the load spec instead of the config
+    if INTERFACE_MODE == ct.LOAD_INT_MODE:
+        launch_load_generator(LOAD_SPEC_PATH, TELEGRAM_LOGGING, KNX_PORT)
+        return
     # System configuration from function configure_system()
     if CONFIG_MODE == ct.DEV_CONFIG:
         while True:
@@ -81,6 +93,7 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
             svshi_mode=SVSHI_MODE,
             telegram_logging=TELEGRAM_LOGGING,
             fresh_knx_interface=fresh_knx_interface,
+            knx_port=KNX_PORT,
         )
     # Default, empty or file config from function congirue_system_from_file()
     else:
@@ -95,11 +108,14 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
             svshi_mode=SVSHI_MODE,
             telegram_logging=TELEGRAM_LOGGING,
             fresh_knx_interface=fresh_knx_interface,
+            knx_port=KNX_PORT,
         )
 
     global window
     # GUI interface with the user
     if INTERFACE_MODE == ct.GUI_MODE:
+        import gui  # imported only in GUI mode, as pyglet needs a display to create its windows
+
         window = gui.GUIWindow(
             CONFIG_PATH,
             ct.DEFAULT_CONFIG_PATH,
@@ -108,6 +124,7 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
             room1,
             svshi_mode=SVSHI_MODE,
             telegram_logging=TELEGRAM_LOGGING,
+            knx_port=KNX_PORT,
         )  # CONFIG_PATH can be a normal file, default or empty
         window.initialize_system(
             save_config=True, system_dt=system_dt
@@ -128,19 +145,37 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
         print("The GUI window has been closed and the simulation terminated.")
 
     # Terminal interface with the user (no visual feedback)
-    elif INTERFACE_MODE == ct.CLI_INT_MODE:
-        room1.world.time.scheduler_init()
+    # or headless script run, with world updates driven by the script waits on a virtual clock
+    elif INTERFACE_MODE in [ct.CLI_INT_MODE, ct.HEADLESS_INT_MODE]:
+        headless = INTERFACE_MODE == ct.HEADLESS_INT_MODE
+        if headless and COMMAND_MODE != ct.SCRIPT_MODE:
+            logging.info("The command mode is set to SCRIPT in headless mode.")
+            COMMAND_MODE = ct.SCRIPT_MODE
+        room1.world.time.scheduler_init(virtual=headless)
         room1.world.time.scheduler_add_job(
-            room1.update_world
+            room1.get_update_function()
         )  # we pass the update function as argument to the Time class object for scheduling
         room1.world.time.scheduler_start()  # set also start_time of world.time object
 
+        # Exit code of the program, 0 only if a script was run and succeeded, so that scenario runners can gather results
+        exit_code = 1
         try:
             loop = asyncio.get_event_loop()
-            print(
-                "\n>>> The simulation is started in Command Line Interface Mode (no visual feedback) <<<"
+            if headless:
+                print(
+                    "\n>>> The simulation is started in Headless Mode (virtual clock, no visual feedback) <<<"
+                )
+            else:
+                print(
+                    "\n>>> The simulation is started in Command Line Interface Mode (no visual feedback) <<<"
+                )
+            script_result = loop.run_until_complete(
+                async_main(
+                    loop, room1, COMMAND_MODE, SCRIPT_PATH, wait_for_svshi=headless
+                )
             )
-            loop.run_until_complete(async_main(loop, room1, COMMAND_MODE, SCRIPT_PATH))
+            if script_result == 1:
+                exit_code = 0
         except (KeyboardInterrupt, SystemExit):
             loop.run_until_complete(kill_tasks())
         finally:
@@ -148,7 +183,53 @@ def launch_simulation(options, fresh_knx_interface: bool = False) -> None:
             loop.close()
             logging.info("Simulation Terminated.")
             print("\nThe simulation program has been ended.")
-            sys.exit(1)
+            sys.exit(exit_code)
+
+
+def launch_load_generator(
+    load_spec_path: str, telegram_logging: bool, knx_port: int = ct.KNX_PORT
+) -> None:
+    """Generate the devices of the load spec, send its traffic to SVSHI once connected and print the latencies report"""
+    configured = tools.configure_load_from_file(
+        load_spec_path,
+        ct.EMPTY_CONFIG_PATH,
+        svshi_mode=True,
+        telegram_logging=telegram_logging,
+        knx_port=knx_port,
+    )
+    if configured is None:
+        logging.error(
+            f"The load spec {load_spec_path} is incorrect, the load generator cannot be started."
+        )
+        sys.exit(1)
+    room1, load_generator = configured
+    print(
+        "\n>>> The simulation is started in Load Generator Mode (no visual feedback) <<<"
+    )
+    loop = asyncio.get_event_loop()
+    try:
+        report = loop.run_until_complete(load_main(room1, load_generator))
+        print("Load report:")
+        pp.pprint(report)
+    except (KeyboardInterrupt, SystemExit):
+        print("Partial load report:")
+        pp.pprint(load_generator.get_report())
+    finally:
+        loop.run_until_complete(kill_tasks())
+        loop.close()
+        print("\nThe simulation program has been ended.")
+
+
+async def load_main(room: Room, load_generator: tools.LoadGenerator) -> dict:
+    """Start the interface, wait for SVSHI to connect and run the load generator"""
+    interface = room.get_interface()
+    await interface.start()
+    print(">>>>>> Waiting for SVSHI to connect before sending the load")
+    while not interface.get_info()["connected"]:
+        await asyncio.sleep(0.1)
+    report = await load_generator.run()
+    interface.stop()
+    return report
 
 
 async def user_input_loop(room: Room) -> None:
@@ -161,32 +242,28 @@ async def user_input_loop(room: Room) -> None:
 
 
 async def simulator_script_loop(room: Room, file_path: str) -> int:
-    """Asyncio loop to await user command from a .txt script"""
+    """Asyncio loop to run the commands of a .txt script, compiled before running so that syntax errors are reported upfront"""
     script_parser = tools.ScriptParser()
     with open(file_path, "r") as f:
-        commands = f.readlines()
-        for command in commands:
-            ret, assertions = await script_parser.script_command_parser(room, command)
-            if ret is None:
-                logging.warning("The script has failed.")
-                print("Failed script recap:")
-                pp.pprint(script_parser.stored_values)
-                pp.pprint(assertions)
-                return 0
-            elif ret == 0:  # ret=0 is signal from end command to termninate script
-                logging.info("The script has completed successfully.")
-                print("Successful script recap:")
-                pp.pprint(script_parser.stored_values)
-                pp.pprint(assertions)
-                return 1
-        if (
-            ret is not None
-        ):  # if no end command, script ends when no more commands/lines
-            logging.info("The script has completed successfully.")
-            print("Successful script recap:")
-            pp.pprint(script_parser.stored_values)
-            pp.pprint(assertions)
-            return 1
+        commands = script_parser.compile_script(f.readlines())
+    if commands is None:
+        logging.warning(
+            f"The script has {len(script_parser.syntax_errors)} syntax errors and cannot run."
+        )
+        return 0
+    ret, assertions = await script_parser.run_script(room, commands)
+    if ret is None:
+        logging.warning("The script has failed.")
+        print("Failed script recap:")
+        pp.pprint(script_parser.stored_values)
+        pp.pprint(assertions)
+        return 0
+    # ret=0 is signal from end command to termninate script, if no end command script ends when no more commands/lines
+    logging.info("The script has completed successfully.")
+    print("Successful script recap:")
+    pp.pprint(script_parser.stored_values)
+    pp.pprint(assertions)
+    return 1
 
 
 async def kill_tasks() -> None:
@@ -201,11 +278,25 @@ async def kill_tasks() -> None:
         return None
 
 
-async def async_main(loop, room: Room, command_mode: str, script_path: str) -> None:
-    """Manager function of asyncio tasks
+async def async_main(
+    loop,
+    room: Room,
+    command_mode: str,
+    script_path: str,
+    wait_for_svshi: bool = False,
+) -> Union[int, None]:
+    """Manager function of asyncio tasks, return the result of the script in script mode (1 if it succeeded, 0 otherwise)
 
     loop : asyncio get event loop
+    wait_for_svshi : if True, the commands start once SVSHI is connected to the interface, if in SVSHI mode
     """
+    interface = room.get_interface()
+    if isinstance(interface, AsyncioInterface):
+        await interface.start()
+        if wait_for_svshi:
+            print(">>>>>> Waiting for SVSHI to connect before running the script")
+            while not interface.get_info()["connected"]:
+                await asyncio.sleep(0.1)
     tasks = []
     if command_mode == ct.CLI_COM_MODE:
         print(">>>>>> The Command mode is set to CLI (commands through terminal)")
@@ -218,6 +309,9 @@ async def async_main(loop, room: Room, command_mode: str, script_path: str) -> N
         script_task = loop.create_task(simulator_script_loop(room, script_path))
         tasks.append(script_task)
     await asyncio.wait(tasks)
+    if command_mode == ct.SCRIPT_MODE:
+        return script_task.result()
+    return None
 
 
 if __name__ == "__main__":
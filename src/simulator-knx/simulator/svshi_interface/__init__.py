@@ -4,3 +4,5 @@ Package containing modules used for the parsing of telegrams (from KNX to simula
 
 from .main import *
 from .telegram_parser import *
+from .asyncio_interface import AsyncioInterface
+from .telegram_logger import TelegramLogger
@@ -0,0 +1,337 @@
+"""
+Interface with SVSHI running on the simulator's asyncio event loop, implemented as a datagram protocol
+"""
+
+import asyncio
+import collections
+import logging
+import statistics
+import time
+from typing import Any, Deque, Dict, Final, List, Tuple, Union
+
+import xknx.telegram.telegram as real_t
+from xknx import XKNX
+from xknx.exceptions import CouldNotParseKNXIP
+from xknx.knxip import (
+    CEMIFrame,
+    CEMIMessageCode,
+    ConnectRequest,
+    ConnectResponse,
+    ConnectionStateRequest,
+    ConnectionStateResponse,
+    DisconnectRequest,
+    DisconnectResponse,
+    KNXIPFrame,
+    TunnellingAck,
+    TunnellingRequest,
+)
+
+from .main import InterfaceProp, KNX_PORT
+
+COMMUNICATION_CHANNEL: Final = 1
+# Time to wait for the TUNNELLING_ACK of a request, which is repeated once if not acknowledged in time (KNXnet/IP tunnelling)
+TUNNELLING_REQUEST_TIMEOUT: Final = 1.0
+SEQUENCE_COUNTER_MODULO: Final = 256
+MAX_ROUND_TRIP_TIMES: Final = 1000
+# Datagram sent by SVSHI to stop the interface
+STOP_DATAGRAM: Final = b"\x11"
+
+
+class AsyncioInterface(asyncio.DatagramProtocol):
+    """
+    Interface with SVSHI as a KNXnet/IP tunnelling server, running on the asyncio event loop of the simulator
+    instead of a thread. Same API as Interface, but the connection is started with `await start()`.
+    Telegrams to send are queued and the whole queue is sent on each wakeup,
+    one TUNNELLING_REQUEST at a time: the next one is sent when the previous one is acknowledged.
+    """
+
+    def __init__(
+        self, room, telegram_logging: bool, testing=False, port: int = KNX_PORT
+    ) -> None:
+        """
+        Initalizes the interface used for communication with SVSHI, the socket is opened by start().
+
+        room : Room whose bus receives the telegrams from SVSHI
+        telegram_logging : log the telegrams sent and received in the room's telegram logging file
+        testing : do not signal the web api that the simulator is waiting for SVSHI
+        port : UDP port on which the interface listens for SVSHI
+        """
+        from svshi_interface.telegram_parser import TelegramParser
+        from svshi_interface.telegram_logger import TelegramLogger
+
+        self.room = room
+        self.testing_mode = testing
+        self.port = port
+        self.__telegram_parser = TelegramParser()
+        # Telegrams written to the room's logging file by the thread of the logger
+        self.__telegram_logger = (
+            TelegramLogger(self.__telegram_parser) if telegram_logging else None
+        )
+        self.__xknx = XKNX()
+        self.__loop: asyncio.AbstractEventLoop = None
+        self.__transport: asyncio.DatagramTransport = None
+        self.__sender_task: asyncio.Task = None
+        self.__wakeup: asyncio.Event = None
+        # CEMI frames to send, appended from any thread, confirmations of received requests are sent first
+        self.__sending_queue: Deque[CEMIFrame] = collections.deque()
+        # SVSHI connection
+        self.__svshi_addr: Tuple[str, int] = None
+        self.__send_sequence_counter = 0
+        self.__receive_sequence_counter = 0
+        # Result True when the request is acknowledged, False when SVSHI disconnects before
+        self.__pending_ack: asyncio.Future = None
+        # Statistics
+        self.round_trip_times: Deque[float] = collections.deque(
+            maxlen=MAX_ROUND_TRIP_TIMES
+        )  # in seconds, per telegram acknowledged
+        self.telegrams_sent = 0
+        self.telegrams_received = 0
+        self.repeated_requests = 0
+        self.unacknowledged_requests = 0
+
+    def set_ga_to_payload_dict(self, group_address_to_payload):
+        self.__telegram_parser.set_ga_to_payload_dict(group_address_to_payload)
+
+    # MAIN
+    async def start(self, port: int = None) -> None:
+        """
+        Opens the socket on the running event loop and starts the task sending the queued telegrams,
+        on the port of the interface if port is None.
+        """
+        if port is not None:
+            self.port = port
+        port = self.port
+        self.__loop = asyncio.get_running_loop()
+        self.__wakeup = asyncio.Event()
+        print("Waiting on port:", port, "at address", InterfaceProp.HOST)
+        await self.__loop.create_datagram_endpoint(
+            lambda: self, local_addr=(InterfaceProp.HOST, port)
+        )
+        self.__sender_task = self.__loop.create_task(self.__send_queued_telegrams())
+        if self.__sending_queue:
+            self.__wakeup.set()
+        if not self.testing_mode and InterfaceProp.ON_WAITING_FOR_SVSHI is not None:
+            InterfaceProp.ON_WAITING_FOR_SVSHI()
+
+    def stop(self) -> None:
+        """Closes the socket and stops sending telegrams, can be called from any thread"""
+        print("Stopping the KNX interface")
+        if self.__loop is not None and not self.__loop.is_closed():
+            self.__loop.call_soon_threadsafe(self.__close)
+
+    def __close(self) -> None:
+        if self.__sender_task is not None:
+            self.__sender_task.cancel()
+            self.__sender_task = None
+        if self.__transport is not None:
+            self.__transport.close()
+        if self.__telegram_logger is not None:
+            self.__telegram_logger.close()
+
+    # DATAGRAM PROTOCOL
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.__transport = transport
+
+    def connection_lost(self, exc: Union[Exception, None]) -> None:
+        print("Socket closed. Bye!")
+        self.__transport = None
+        self.__disconnect()
+
+    def error_received(self, exc: Exception) -> None:
+        logging.warning(f"Error on the KNX interface socket: {exc}")
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Answers the connection management requests of SVSHI, and receives its telegrams and acknowledgements"""
+        if data == STOP_DATAGRAM:
+            self.__close()
+            return
+        frame = KNXIPFrame(self.__xknx)
+        try:
+            frame.from_knx(data)
+        except CouldNotParseKNXIP as msg:
+            logging.warning(f"Cannot parse the datagram received from {addr}: {msg}")
+            return
+        body = frame.body
+        if isinstance(body, TunnellingRequest):
+            self.__receiving_telegram(body, addr)
+        elif isinstance(body, TunnellingAck):
+            if (
+                self.__pending_ack is not None
+                and not self.__pending_ack.done()
+                and body.sequence_counter == self.__send_sequence_counter
+            ):
+                self.__pending_ack.set_result(True)
+        elif isinstance(body, ConnectRequest):
+            print("Address of SVSHI:", addr)
+            self.__svshi_addr = addr
+            self.__send_sequence_counter = 0
+            self.__receive_sequence_counter = 0
+            self.__send(
+                ConnectResponse(
+                    self.__xknx, communication_channel=COMMUNICATION_CHANNEL
+                ),
+                addr,
+            )
+            self.__wakeup.set()  # telegrams may have been queued before the connection
+        elif isinstance(body, ConnectionStateRequest):
+            self.__send(
+                ConnectionStateResponse(
+                    self.__xknx, communication_channel_id=COMMUNICATION_CHANNEL
+                ),
+                addr,
+            )
+        elif isinstance(body, DisconnectRequest):
+            self.__send(
+                DisconnectResponse(
+                    self.__xknx, communication_channel_id=COMMUNICATION_CHANNEL
+                ),
+                addr,
+            )
+            self.__disconnect()
+
+    def __disconnect(self) -> None:
+        """Forgets the address of SVSHI and cancels the repetition of the request waiting for an ACK"""
+        self.__svshi_addr = None
+        if self.__pending_ack is not None and not self.__pending_ack.done():
+            self.__pending_ack.set_result(False)
+
+    def __send(self, body, addr: Tuple[str, int]) -> None:
+        if self.__transport is not None:
+            self.__transport.sendto(bytes(KNXIPFrame.init_from_body(body).to_knx()), addr)
+
+    # RECEIVING TELEGRAMS
+    def __receiving_telegram(self, request: TunnellingRequest, addr: Any) -> None:
+        """
+        Acknowledges a telegram received from SVSHI and forwards it to the system.
+        A request repeated by SVSHI (same sequence counter as the last one) is acknowledged again but not forwarded,
+        and requests with an unexpected sequence counter are discarded.
+        """
+        expected = self.__receive_sequence_counter
+        if request.sequence_counter == (expected - 1) % SEQUENCE_COUNTER_MODULO:
+            self.__send_ack(request, addr)
+            return
+        if request.sequence_counter != expected:
+            logging.warning(
+                f"Tunnelling request discarded: sequence counter {request.sequence_counter} received, {expected} expected."
+            )
+            return
+        self.__send_ack(request, addr)
+        self.__receive_sequence_counter = (expected + 1) % SEQUENCE_COUNTER_MODULO
+        if request.cemi is None:
+            return
+        telegram: real_t.Telegram = request.cemi.telegram
+        self.telegrams_received += 1
+        sim_telegram = self.__telegram_parser.from_knx_telegram(telegram)
+        self.__log_telegram(telegram, sent=False, sim_telegram=sim_telegram)
+        if sim_telegram is not None:
+            self.room.knxbus.transmit_telegram(sim_telegram)
+        # Data link layer confirmation, sent before the queued telegrams
+        request.cemi.code = CEMIMessageCode.L_DATA_CON
+        self.__sending_queue.appendleft(request.cemi)
+        self.__wakeup.set()
+
+    def __send_ack(self, request: TunnellingRequest, addr: Any) -> None:
+        self.__send(
+            TunnellingAck(
+                self.__xknx,
+                communication_channel_id=request.communication_channel_id,
+                sequence_counter=request.sequence_counter,
+            ),
+            addr,
+        )
+
+    # SENDING TELEGRAMS
+    def add_to_sending_queue(self, teleg) -> None:
+        """Adds to the queue of telegrams to be sent to the external interface, can be called from any thread"""
+        for t in teleg:
+            t_xknx = self.__telegram_parser.from_simulator_telegram(t)
+            if t_xknx is not None:
+                self.__sending_queue.append(
+                    CEMIFrame(self.__xknx).init_from_telegram(self.__xknx, t_xknx)
+                )
+        if self.__loop is not None and not self.__loop.is_closed():
+            self.__loop.call_soon_threadsafe(self.__wakeup.set)
+
+    async def __send_queued_telegrams(self) -> None:
+        """Sends all the queued telegrams on each wakeup, once SVSHI is connected"""
+        while True:
+            await self.__wakeup.wait()
+            self.__wakeup.clear()
+            while self.__sending_queue and self.__svshi_addr is not None:
+                await self.__send_tunnelling_request(self.__sending_queue.popleft())
+
+    async def __send_tunnelling_request(self, cemi: CEMIFrame) -> None:
+        """
+        Sends a telegram and waits for its TUNNELLING_ACK, the request is repeated once if it is not acknowledged in time
+        and SVSHI is still connected. The round-trip time is measured from the last sending of the request.
+        """
+        request = TunnellingRequest(
+            self.__xknx,
+            communication_channel_id=COMMUNICATION_CHANNEL,
+            sequence_counter=self.__send_sequence_counter,
+            cemi=cemi,
+        )
+        acknowledged = False
+        for attempt in range(2):
+            if self.__svshi_addr is None:
+                break  # SVSHI disconnected, the request is not sent
+            self.__pending_ack = self.__loop.create_future()
+            sent_time = time.perf_counter()
+            self.__send(request, self.__svshi_addr)
+            if attempt == 0:
+                if cemi.code is not CEMIMessageCode.L_DATA_CON:
+                    self.telegrams_sent += 1
+                    self.__log_telegram(cemi.telegram, sent=True)
+            else:
+                self.repeated_requests += 1
+            try:
+                acknowledged = await asyncio.wait_for(
+                    self.__pending_ack, timeout=TUNNELLING_REQUEST_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                continue
+            if acknowledged:
+                self.round_trip_times.append(time.perf_counter() - sent_time)
+            break
+        if not acknowledged:
+            self.unacknowledged_requests += 1
+            logging.warning(
+                f"Tunnelling request {request.sequence_counter} was not acknowledged by SVSHI."
+            )
+        self.__pending_ack = None
+        self.__send_sequence_counter = (
+            self.__send_sequence_counter + 1
+        ) % SEQUENCE_COUNTER_MODULO
+
+    def __log_telegram(
+        self, telegram: real_t.Telegram, sent: bool, sim_telegram=None
+    ) -> None:
+        if sent:
+            logging.debug("Sending telegram: %s", telegram)
+        else:
+            logging.debug("Received a telegram: %s", telegram)
+        if self.__telegram_logger is not None:
+            self.__telegram_logger.log(
+                self.room.telegram_logging_file_path, sent, telegram, sim_telegram
+            )
+
+    def get_info(self) -> Dict[str, Union[int, float, bool]]:
+        """Return the numbers of telegrams exchanged with SVSHI, and the round-trip times statistics in ms"""
+        info = {
+            "connected": self.__svshi_addr is not None,
+            "telegrams_sent": self.telegrams_sent,
+            "telegrams_received": self.telegrams_received,
+            "telegrams_queued": len(self.__sending_queue),
+            "repeated_requests": self.repeated_requests,
+            "unacknowledged_requests": self.unacknowledged_requests,
+        }
+        round_trip_times: List[float] = sorted(self.round_trip_times)
+        if round_trip_times:
+            info.update(
+                {
+                    "round_trip_mean_ms": statistics.mean(round_trip_times) * 1000,
+                    "round_trip_median_ms": statistics.median(round_trip_times) * 1000,
+                    "round_trip_max_ms": round_trip_times[-1] * 1000,
+                }
+            )
+        return info
@@ -2,6 +2,7 @@
 Main class that implements the interface with sending and receving operations
 """
 
+import logging
 import queue
 import sys
 import socket
@@ -9,7 +10,7 @@ import select
 import threading
 import time
 
-from typing import List, Tuple, Dict
+from typing import Callable, Dict, Final, List, Optional, Tuple
 from _thread import *
 
 import xknx.telegram.telegram as real_t
@@ -27,21 +28,30 @@ sys.path.append("..")
 sys.path.append("../..")
 
 
+# Default KNXnet/IP port, each simulator instance can listen on its own port
+KNX_PORT: Final = 3671
+
+
 # This property is set in launch_simulation function
 class InterfaceProp:
     HOST: str = "127.0.0.1"
+    # Use the AsyncioInterface, on the event loop of the simulator, instead of the threaded Interface
+    ASYNCIO: bool = False
+    # Called when the interface waits for SVSHI connection, set by run.py for each simulation started by the web API
+    ON_WAITING_FOR_SVSHI: Optional[Callable[[], None]] = None
 
 
 class Interface:
-    def __init__(self, room, telegram_logging: bool, testing=False) -> None:
-        """Initalizes the interface used for communication with SVSHI"""
+    def __init__(
+        self, room, telegram_logging: bool, testing=False, port: int = KNX_PORT
+    ) -> None:
+        """Initalizes the interface used for communication with SVSHI, listening on the given UDP port"""
         from svshi_interface.telegram_parser import TelegramParser
+        from svshi_interface.telegram_logger import TelegramLogger
         import system.telegrams as sim_t
 
         self.__stop_flag = False
 
-        self.__telegram_logging = telegram_logging
-        self.__last_tel_logged = None
         self.__sending_queue: queue.Queue[sim_t.Telegram] = queue.Queue()
 
         # Any data sent to ssock shows up on rsock
@@ -50,11 +60,16 @@ class Interface:
 
         # TODO : TelegramParser constructor => pass the dictionary as argument (I suggest taking it as argument of the __init__ here)
         self.__telegram_parser = TelegramParser()
+        # Telegrams written to the room's logging file by the thread of the logger
+        self.__telegram_logger = (
+            TelegramLogger(self.__telegram_parser) if telegram_logging else None
+        )
 
         # hostname = socket.gethostname()
         # self.__IPAddr = socket.gethostbyname(hostname)
         self.__IPAddr = InterfaceProp.HOST
-        server_address = (self.__IPAddr, 3671)
+        self.port = port
+        server_address = (self.__IPAddr, self.port)
         self.__sock.bind(server_address)
         self.room = room  # to get telegram file path because fails when reloading (cannot stop thread)
         self.testing_mode = testing
@@ -62,14 +77,13 @@ class Interface:
             self.start()
 
     def set_ga_to_payload_dict(self, group_address_to_payload):  #group_address_to_payload: Dict[str, sim_t.Payload]
-        self.__telegram_parser.group_address_to_payload = group_address_to_payload
+        self.__telegram_parser.set_ga_to_payload_dict(group_address_to_payload)
 
     # INITIALIZATION OF THE CONNECTION #
     def __create_connection(self, xknx: XKNX) -> Tuple[KNXIPFrame, Any]:
         """Creates a connection between a client and ourselves, with sequence number 0 and individual address 0.0.0"""
-        if not self.testing_mode:
-            from web_api import sim_waiting_for_svshi
-            sim_waiting_for_svshi.set()
+        if not self.testing_mode and InterfaceProp.ON_WAITING_FOR_SVSHI is not None:
+            InterfaceProp.ON_WAITING_FOR_SVSHI()
         data, addr = self.__sock.recvfrom(1024)
         print("Address of SVSHI:", addr)
 
@@ -136,16 +150,11 @@ class Interface:
             sim_telegram: sim_t.Telegram = self.__telegram_parser.from_knx_telegram(
                 telegram
             )
-            print("Received a telegram :\n", sim_telegram)
-            if self.__telegram_logging:
-                with open(self.room.telegram_logging_file_path, "a+") as log_file:
-                    if (
-                        self.__last_tel_logged is None
-                        or self.__last_tel_logged == "sent"
-                    ):
-                        log_file.write("\n++++++++++ Telegram received ++++++++++")
-                        self.__last_tel_logged = "recv"
-                    log_file.write(f"\nSVSHI -> Simulator: {telegram}")
+            logging.debug("Received a telegram: %s", sim_telegram)
+            if self.__telegram_logger is not None:
+                self.__telegram_logger.log(
+                    self.room.telegram_logging_file_path, False, telegram, sim_telegram
+                )
 
             if sim_telegram is not None:
                 knxbus.transmit_telegram(sim_telegram)
@@ -170,30 +179,28 @@ class Interface:
         self.__ssock.send(b"\x00")
 
     def __process_telegram_queue(self, addr: Any) -> None:
-        """Processes telegrams to be sent to the external interface"""
-        # Breaking up queue if None is pushed to the queue
-        if self.__sending_queue:
-            teleg = self.__sending_queue.get()
-            if teleg is None:
+        """Processes all the telegrams queued to be sent to the external interface"""
+        while True:
+            try:
+                teleg = self.__sending_queue.get_nowait()
+            except queue.Empty:
                 return
+            # Simulator telegrams that cannot be translated are None
+            if teleg is None:
+                continue
             sender = KNXIPFrame(self.__xknx)
             cemif = CEMIFrame(self.__xknx).init_from_telegram(self.__xknx, teleg)
             req = TunnellingRequest(self.__xknx, cemi=cemif)
 
-            print("Sending telegram:\n", teleg)
+            logging.debug("Sending telegram: %s", teleg)
 
             # Wait to receive the ACK
             sender = sender.init_from_body(req)
             self.__sock.sendto(bytes(sender.to_knx()), addr)
-            if self.__telegram_logging:
-                with open(self.room.telegram_logging_file_path, "a+") as log_file:
-                    if (
-                        self.__last_tel_logged is None
-                        or self.__last_tel_logged == "recv"
-                    ):
-                        log_file.write("\n---------- Telegram sent ----------")
-                        self.__last_tel_logged = "sent"
-                    log_file.write(f"\nSimulator -> SVSHI: {teleg}")
+            if self.__telegram_logger is not None:
+                self.__telegram_logger.log(
+                    self.room.telegram_logging_file_path, True, teleg
+                )
 
     def stop(self) -> None:
         """Set a flag to stop the treaded KNX interface. The time to complete stop is not guaranteed but it should be closed when this function returns"""
@@ -206,12 +213,12 @@ class Interface:
     def start(self) -> None:
         """Initializes the communication between any external KNX interface and us"""
 
-        print("Waiting on port:", 3671, "at address", self.__IPAddr)
+        print("Waiting on port:", self.port, "at address", self.__IPAddr)
         connection_config = ConnectionConfig(
             route_back=True,  # To enable connection through the docker
             connection_type=ConnectionType.TUNNELING,
             gateway_ip=self.__IPAddr,
-            gateway_port=3671,
+            gateway_port=self.port,
         )
         self.__xknx = XKNX(connection_config=connection_config)
 
@@ -247,6 +254,8 @@ class Interface:
             print("Threaded loop ended.")
             print("Closing the socket.")
             self.__sock.close()
+            if self.__telegram_logger is not None:
+                self.__telegram_logger.close()
             print("Socket closed. Bye!")
 
         self.main_functions = threading.Thread(target=threaded, args=())
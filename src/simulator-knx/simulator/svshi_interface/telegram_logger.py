@@ -0,0 +1,145 @@
+"""
+Buffered writer of the telegrams exchanged with SVSHI, as JSON lines written by a background thread
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+
+from typing import Any, Dict, IO, Union
+
+import xknx.telegram.telegram as real_t
+
+import system.telegrams as sim_t
+
+# Maximum time in seconds between the logging of a telegram and its writing in the file
+FLUSH_INTERVAL = 0.5
+
+
+class TelegramLogger:
+    """
+    Logs the telegrams exchanged with SVSHI in JSONL files, one record per telegram:
+    direction, timestamp, source, group address, raw APDU and value decoded by the telegram parser.
+    The interface only queues the telegrams, they are decoded, formatted and written in batches by a daemon thread,
+    the file is kept open between batches.
+    """
+
+    def __init__(self, telegram_parser, flush_interval: float = FLUSH_INTERVAL) -> None:
+        """
+        Initializes the logger and starts its writer thread.
+
+        telegram_parser : TelegramParser of the interface, decodes the values of the telegrams sent
+        flush_interval : maximum time in seconds between the logging of a telegram and its writing
+        """
+        self.__telegram_parser = telegram_parser
+        self.__flush_interval = flush_interval
+        self.__queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.__file: IO = None
+        self.__file_path: str = None
+        self.records_written = 0
+        self.__writer = threading.Thread(
+            target=self.__write_records, name="telegram-logger", daemon=True
+        )
+        self.__writer.start()
+
+    def log(
+        self,
+        file_path: str,
+        sent: bool,
+        telegram: real_t.Telegram,
+        sim_telegram: Union[sim_t.Telegram, None] = None,
+    ) -> None:
+        """
+        Queues a telegram to be logged in file_path, can be called from any thread.
+
+        sent : True if the telegram is sent to SVSHI, False if it is received from SVSHI
+        sim_telegram : simulator telegram parsed from a received telegram, the telegrams sent are decoded by the writer thread
+        """
+        self.__queue.put((file_path, sent, time.time(), telegram, sim_telegram))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Waits until the telegrams logged before the call are written, return False if the timeout expired"""
+        written = threading.Event()
+        self.__queue.put(written)
+        return written.wait(timeout)
+
+    def close(self) -> None:
+        """Writes the remaining telegrams, closes the file and stops the writer thread"""
+        if self.__writer.is_alive():
+            self.__queue.put(None)
+            self.__writer.join()
+
+    def __write_records(self) -> None:
+        """Writer thread: waits for a telegram then writes all the telegrams queued in the mean time"""
+        running = True
+        while running:
+            try:
+                entries = [self.__queue.get(timeout=self.__flush_interval)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    entries.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            flushed = []
+            for entry in entries:
+                if entry is None:
+                    running = False
+                elif isinstance(entry, threading.Event):
+                    flushed.append(entry)
+                else:
+                    self.__write_record(*entry)
+            if self.__file is not None:
+                self.__file.flush()
+            for event in flushed:
+                event.set()
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __write_record(
+        self,
+        file_path: str,
+        sent: bool,
+        timestamp: float,
+        telegram: real_t.Telegram,
+        sim_telegram: Union[sim_t.Telegram, None],
+    ) -> None:
+        if file_path != self.__file_path:  # simulation reloaded with a new logs folder
+            if self.__file is not None:
+                self.__file.close()
+            self.__file = open(file_path, "a")
+            self.__file_path = file_path
+        try:
+            if sent:
+                sim_telegram = self.__telegram_parser.from_knx_telegram(telegram)
+            record = self.__create_record(sent, timestamp, telegram, sim_telegram)
+            self.__file.write(json.dumps(record) + "\n")
+            self.records_written += 1
+        except Exception as msg:
+            logging.warning(f"The telegram {telegram} cannot be logged: {msg}")
+
+    @staticmethod
+    def __create_record(
+        sent: bool,
+        timestamp: float,
+        telegram: real_t.Telegram,
+        sim_telegram: Union[sim_t.Telegram, None],
+    ) -> Dict[str, Any]:
+        record = {
+            "direction": "sent" if sent else "received",
+            "timestamp": timestamp,
+            "source": str(telegram.source_address),
+            "group_address": str(telegram.destination_address),
+            "apdu": bytes(telegram.payload.to_knx()).hex(),
+            "value": None,
+        }
+        if sim_telegram is not None:
+            payload = sim_telegram.payload
+            record["value"] = payload.content
+            if isinstance(payload, sim_t.DimmerPayload):
+                record["state_ratio"] = payload.state_ratio
+        return record
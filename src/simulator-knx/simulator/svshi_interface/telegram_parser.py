@@ -4,18 +4,14 @@ Class that allows translation of telegrams from KNX to simulated and oppositely
 
 import sys
 import logging
-from typing import Dict, Final, Union
-from numpy import isin
+from typing import Any, Callable, Dict, Final, NamedTuple, Tuple, Union
 
-from xknx.dpt.dpt import DPTArray, DPTBinary, DPTNumeric
+from xknx.dpt.dpt import DPTArray, DPTBinary
 from xknx.telegram.apci import GroupValueWrite
 from xknx.telegram.telegram import Telegram
 from xknx.telegram.address import GroupAddress, IndividualAddress, GroupAddressType
-from xknx.dpt.dpt_4byte_float import DPT4ByteFloat
 from xknx.dpt.dpt_2byte_float import DPT2ByteFloat
 from xknx.dpt.dpt_1byte_uint import DPTValue1ByteUnsigned
-from xknx.xknx import XKNX
-import math
 
 import system.telegrams as sim_t
 
@@ -23,15 +19,20 @@ sys.path.append(".")
 sys.path.append("..")
 
 
+class GroupAddressCodec(NamedTuple):
+    """Prebuilt addresses and decoder of a group address, see TelegramParser.set_ga_to_payload_dict"""
+
+    sim_address: Any  # system.GroupAddress
+    knx_address: GroupAddress
+    # Function creating a simulator payload from the value of a GroupValueWrite, None if the payload type is not supported
+    decode: Union[Callable[[Union[DPTBinary, DPTArray]], sim_t.Payload], None]
+
+
 class TelegramParser:
     """Class that implements a parser for telegrams, from simulated telegrams to real telegrams and the other way around"""
 
-    # TODO : Here the dictionary is taken and used below
     def __init__(self) -> None:
         """Initializes an instance of a telegram parser"""
-        self.group_address_to_payload: Dict[
-            str, sim_t.Payload
-        ] = {}  # dict set later when group addr are parsed from file
         self.payload_to_dpt: Dict[sim_t.Payload, Union[DPTBinary, DPTArray]] = {
             sim_t.FloatPayload: DPTArray,
             sim_t.BinaryPayload: DPTBinary,
@@ -51,144 +52,179 @@ class TelegramParser:
             "2-levels": self.__SHORT,
             "3-levels": self.__LONG,
         }
+        # Number of levels of the group addresses strings to their encoding style
+        self.__levels_to_sim_encoding: Final = {
+            1: "free",
+            2: "2-levels",
+            3: "3-levels",
+        }
+        # Encoders of the simulator payloads to the values of GroupValueWrite, by payload type
+        self.__encoders: Final = {
+            sim_t.BinaryPayload: self.__encode_binary,
+            sim_t.DimmerPayload: self.__encode_dimmer,
+            sim_t.FloatPayload: self.__encode_float,
+        }
+        # Codecs of the group addresses, by (raw address, levels) of the xknx address for the telegrams received
+        # and by name of the simulator address for the telegrams sent
+        self.__knx_codecs: Dict[Tuple[int, GroupAddressType], GroupAddressCodec] = {}
+        self.__sim_codecs: Dict[str, GroupAddressCodec] = {}
+        # Individual addresses converted, by raw xknx address and by simulator address string
+        self.__knx_sources: Dict[int, Any] = {}
+        self.__sim_sources: Dict[str, IndividualAddress] = {}
+        self.__group_address_to_payload: Dict[str, sim_t.Payload] = {}
+
+    @property
+    def group_address_to_payload(self) -> Dict[str, sim_t.Payload]:
+        """Payload types by group address string, set when group addresses are parsed from the config file"""
+        return self.__group_address_to_payload
+
+    @group_address_to_payload.setter
+    def group_address_to_payload(
+        self, group_address_to_payload: Dict[str, sim_t.Payload]
+    ) -> None:
+        self.set_ga_to_payload_dict(group_address_to_payload)
+
+    def set_ga_to_payload_dict(
+        self, group_address_to_payload: Dict[str, sim_t.Payload]
+    ) -> None:
+        """
+        Sets the payload types of the group addresses and builds their codecs:
+        the simulator and xknx addresses and the decoder of the payload type are created once per group address,
+        so that parsing a telegram only requires dictionary lookups.
+        """
+        from system import GroupAddress as SimGroupAddress
+
+        self.__group_address_to_payload = group_address_to_payload
+        self.__knx_codecs = {}
+        self.__sim_codecs = {}
+        for address, payload_type in group_address_to_payload.items():
+            encoding = self.__levels_to_sim_encoding.get(len(str(address).split("/")))
+            if encoding is None:
+                logging.warning(f"The group address {address} cannot be parsed.")
+                continue
+            knx_address = self.__create_knx_address(str(address), encoding)
+            ga_split = str(knx_address).split("/")
+            if encoding == "3-levels":
+                sim_address = SimGroupAddress(
+                    encoding, ga_split[0], ga_split[1], ga_split[2]
+                )
+            elif encoding == "2-levels":
+                sim_address = SimGroupAddress(encoding, ga_split[0], sub=ga_split[1])
+            else:
+                sim_address = SimGroupAddress(encoding, ga_split[0])
+            codec = GroupAddressCodec(
+                sim_address, knx_address, self.__create_decoder(payload_type)
+            )
+            self.__knx_codecs[(knx_address.raw, knx_address.levels)] = codec
+            self.__sim_codecs[sim_address.name] = codec
+
+    def __create_knx_address(self, address: str, encoding: str) -> GroupAddress:
+        ga = GroupAddress(address)
+        ga.levels = self.__sim_encoding_to_xknx.get(encoding)
+        return ga
+
+    def __create_decoder(
+        self, payload_type: sim_t.Payload
+    ) -> Union[Callable[[Union[DPTBinary, DPTArray]], sim_t.Payload], None]:
+        """Return the function creating a payload of payload_type from the value of a GroupValueWrite"""
+        dpt = self.payload_to_dpt.get(payload_type)
+        if dpt == DPTBinary:
+            return lambda v: payload_type(binary_state=v.value == self.__TRUE)
+        if dpt == DPTArray:
+            if payload_type == sim_t.DimmerPayload:
+                return self.__decode_dimmer
+            if payload_type == sim_t.FloatPayload:
+                return lambda v: sim_t.FloatPayload(DPT2ByteFloat.from_knx(v.value))
+        return None
+
+    @staticmethod
+    def __decode_dimmer(v: DPTArray) -> sim_t.DimmerPayload:
+        conv_v = DPTValue1ByteUnsigned.from_knx(v.value)  # 0 <= x <= 255
+        mapped_0_100 = (conv_v / 255.0) * 100
+        logging.debug(
+            "In from_knx_telegram, conv_v = %s, mapped = %s", conv_v, mapped_0_100
+        )
+        return sim_t.DimmerPayload(
+            binary_state=mapped_0_100 != 0, state_ratio=mapped_0_100
+        )
 
     def from_knx_telegram(self, telegram: Telegram) -> Union[sim_t.Telegram, None]:
         """Creates a simulator telegram from a knx telegram if possible"""
-        from system import GroupAddress, IndividualAddress
-
         payload = telegram.payload
-
-        print(
-            "In from_knx_telegram, payload = ",
-            payload,
-            " address = ",
-            telegram.destination_address,
+        destination = telegram.destination_address
+        logging.debug(
+            "In from_knx_telegram, payload = %s, address = %s", payload, destination
         )
-        ga_split = str(telegram.destination_address).split("/")
-
-        if telegram.destination_address.levels == self.__sim_encoding_to_xknx.get(
-            "free"
-        ):
-            address = GroupAddress("free", ga_split[0])
-        elif telegram.destination_address.levels == self.__sim_encoding_to_xknx.get(
-            "2-levels"
-        ):
-            address = GroupAddress("2-levels", ga_split[0], sub=ga_split[1])
-        else:
-            address = GroupAddress("3-levels", ga_split[0], ga_split[1], ga_split[2])
-
-        source = IndividualAddress(
-            telegram.source_address.area,
-            telegram.source_address.main,
-            telegram.source_address.line,
-        )
-        output = None
-
-        if isinstance(payload, GroupValueWrite):
+        if not isinstance(payload, GroupValueWrite):
             # For the moment, similarly to SVSHI, we only support GroupValueWrtie as there is no reading involved
-            v = payload.value
-
-            if v:
-                # We assume that we receive by default a Binary value
-                # TODO Maybe remove the default value to not have this kind of surprise later again?
-                print(self.group_address_to_payload)
-                # dpt = self.payload_to_dpt.get(
-                #     self.group_address_to_payload.get(
-                #         str(address), sim_t.BinaryPayload
-                #     ),
-                #     None,
-                # )
-                dpt = self.payload_to_dpt.get(
-                    self.group_address_to_payload.get(str(address))
-                )
-                print("In from_knx_telegram, dpt = ", dpt)
-                if dpt == DPTBinary:
-                    payload = self.group_address_to_payload.get(
-                        str(address), sim_t.BinaryPayload
-                    )(binary_state=True if v.value == self.__TRUE else False)
-                    output = sim_t.Telegram(source, address, payload)
-
-                elif dpt == DPTArray:
-                    payload_type = self.group_address_to_payload.get(
-                        str(address), sim_t.BinaryPayload
-                    )
-                    print("In from_knx_telegram, payload type = ", payload_type)
-                    if payload_type == sim_t.DimmerPayload:
-                        decoder = DPTValue1ByteUnsigned()
-                        conv_v = decoder.from_knx(v.value)  # 0 <= x <= 255
-                        print("In from_knx_telegram, conv_v = ", conv_v)
-                        mapped_0_100 = (conv_v / 255.0) * 100
-                        print("In from_knx_telegram, mapped = ", mapped_0_100)
-                        binary_state = mapped_0_100 != 0
-                        print("In from_knx_telegram, binary_state = ", binary_state)
-                        payload = sim_t.DimmerPayload(
-                            binary_state=binary_state, state_ratio=mapped_0_100
-                        )
-                        print("In from_knx_telegram, payload = ", payload_type)
-                        output = sim_t.Telegram(source, address, payload)
-                    elif payload_type == sim_t.FloatPayload:
-                        decoder = DPT2ByteFloat()
-
-                        conv_v = decoder.from_knx(v.value)
-                        payload = sim_t.FloatPayload(conv_v)
-                        output = sim_t.Telegram(source, address, payload)
-                else:  # if dpt is None
-                    logging.warning("The DataType is neither Binary nor Array.")
-        return output
+            return None
+        v = payload.value
+        if not v:
+            return None
+        codec = self.__knx_codecs.get((destination.raw, destination.levels))
+        if codec is None or codec.decode is None:
+            logging.warning("The DataType is neither Binary nor Array.")
+            return None
+        source = self.__knx_sources.get(telegram.source_address.raw)
+        if source is None:
+            from system import IndividualAddress as SimIndividualAddress
+
+            source = SimIndividualAddress(
+                telegram.source_address.area,
+                telegram.source_address.main,
+                telegram.source_address.line,
+            )
+            self.__knx_sources[telegram.source_address.raw] = source
+        return sim_t.Telegram(source, codec.sim_address, codec.decode(v))
 
     def from_simulator_telegram(
         self, telegram: sim_t.Telegram
     ) -> Union[Telegram, None]:
         """Creates a knx telegram from a simulator telegram, if possible"""
-        address = str(telegram.destination)
         payload = telegram.payload
-
-        encoding = telegram.destination.encoding_style
-
-        dpt = None
-        value = None
-        if payload.content is not None:
-            if isinstance(payload, sim_t.BinaryPayload) and not isinstance(
-                payload, sim_t.DimmerPayload
-            ):
-                dpt = self.payload_to_dpt.get(sim_t.BinaryPayload)
-                value = payload.content
-
-            elif isinstance(payload, sim_t.FloatPayload):
-                dpt = self.payload_to_dpt.get(sim_t.FloatPayload)
-                decoder = DPT2ByteFloat()
-                value = decoder.to_knx(payload.content)
-            elif isinstance(payload, sim_t.DimmerPayload):
-                # Convert to DPT5 becasue XKNx (and thus SVSHI) only support this one
-                # So if state = False, send 0
-                # else send the float (0 <= x <= 100) mapped to uint 0 <= y <= 255
-                dpt = self.payload_to_dpt.get(sim_t.DimmerPayload)
-                decoder = DPTValue1ByteUnsigned()
-                mapped = 0
-                if payload.content:
-                    mapped = round((payload.state_ratio / 100) * 255)
-                value = decoder.to_knx(mapped)
-
-        else:
+        if payload.content is None:
+            return None
+        encoder = self.__encoders.get(type(payload))
+        if encoder is None:
             return None
 
-        if dpt != None and value != None:
-
-            if dpt == DPTBinary:
-                binary_value = self.__TRUE if value else self.__FALSE
-                write_content = DPTBinary(value=binary_value)
-            else:
-                write_content = DPTArray(value)
-            ga = GroupAddress(address)
-            ga.levels = self.__sim_encoding_to_xknx.get(encoding)
-
-            newTelegram = Telegram(
-                source_address=IndividualAddress(
-                    f"{telegram.source.area}.{telegram.source.line}.{telegram.source.device}"
+        destination = telegram.destination
+        codec = self.__sim_codecs.get(destination.name)
+        if codec is None:  # group address without payload type, only its xknx address is created
+            codec = GroupAddressCodec(
+                destination,
+                self.__create_knx_address(
+                    destination.name, destination.encoding_style
                 ),
-                destination_address=ga,
-                payload=GroupValueWrite(write_content),
+                None,
             )
-            return newTelegram
-        else:
-            return None
+            self.__sim_codecs[destination.name] = codec
+        source = self.__sim_sources.get(telegram.source.ia_str)
+        if source is None:
+            source = IndividualAddress(
+                f"{telegram.source.area}.{telegram.source.line}.{telegram.source.device}"
+            )
+            self.__sim_sources[telegram.source.ia_str] = source
+
+        return Telegram(
+            source_address=source,
+            destination_address=codec.knx_address,
+            payload=GroupValueWrite(encoder(payload)),
+        )
+
+    def __encode_binary(self, payload: sim_t.BinaryPayload) -> DPTBinary:
+        return DPTBinary(value=self.__TRUE if payload.content else self.__FALSE)
+
+    @staticmethod
+    def __encode_float(payload: sim_t.FloatPayload) -> DPTArray:
+        return DPTArray(DPT2ByteFloat.to_knx(payload.content))
+
+    @staticmethod
+    def __encode_dimmer(payload: sim_t.DimmerPayload) -> DPTArray:
+        # Convert to DPT5 becasue XKNx (and thus SVSHI) only support this one
+        # So if state = False, send 0
+        # else send the float (0 <= x <= 100) mapped to uint 0 <= y <= 255
+        mapped = 0
+        if payload.content:
+            mapped = round((payload.state_ratio / 100) * 255)
+        return DPTArray(DPTValue1ByteUnsigned.to_knx(mapped))
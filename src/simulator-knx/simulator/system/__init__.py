@@ -1,9 +1,11 @@
 """
 Package system gather all abstractions and representations of KNX system related elements: KNX Bus, Telegrams, Room object.
 system_tools gather also usefull classes for system cnfiguration: Location, IndividualAddress and GroupAddress, Window represents the room's windows.
+state_stream publishes the simulation state to external clients, e.g. the web API event stream.
 """
 
 from .room import Room, InRoomDevice
 from .knxbus import KNXBus, GroupAddressBus
 from .telegrams import Telegram, Payload, BinaryPayload, FloatPayload
 from .system_tools import Location, IndividualAddress, GroupAddress, Window
+from .state_stream import StateStream, STATE_STREAM
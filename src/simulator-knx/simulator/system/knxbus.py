@@ -10,6 +10,7 @@ from typing import List, Dict, Union
 
 from system.system_tools import GroupAddress
 from system.telegrams import Telegram
+from system.state_stream import STATE_STREAM
 
 
 class KNXBus:
@@ -24,10 +25,15 @@ class KNXBus:
 
         group_addresses : list of group addresses defined in the system
         __ga_buses : list of GroupAddressBus objects, 
-        containing list of devices assigned to a particular group address"""
+        containing list of devices assigned to a particular group address
+        __ga_buses_by_name : GroupAddressBus objects indexed by group address name,
+        to route telegrams and find the bus of a group address without scanning __ga_buses
+        suppressed_telegrams : number of telegrams not sent by sensors because of their send policy"""
         self.name = "KNX Bus"
+        self.suppressed_telegrams = 0
         self.group_addresses = []
         self.__ga_buses: List[GroupAddressBus] = []
+        self.__ga_buses_by_name: Dict[str, GroupAddressBus] = {}
 
     def attach(
         self, device, group_address: GroupAddress
@@ -42,12 +48,15 @@ class KNXBus:
 
         device : Device, not InRoomDevice
         """
-        if group_address in device.group_addresses:
+        # Checked on the ga_bus rather than on the device's group addresses,
+        # that the ip interface has for all group addresses in svshi mode
+        ga_bus = self.__ga_buses_by_name.get(group_address.name)
+        if ga_bus is not None and ga_bus.has_device(device):
             logging.info(
                 f"{device.name} is already connected to the KNX Bus through {group_address.name}."
             )
         else:
-            if group_address not in self.group_addresses:
+            if ga_bus is None:
                 logging.info(
                     f"Creation of a ga_bus ({group_address.name}) for {device.name}."
                 )
@@ -55,20 +64,20 @@ class KNXBus:
                 ga_bus = GroupAddressBus(group_address)
                 ga_bus.add_device(device)
                 self.__ga_buses.append(ga_bus)
+                self.__ga_buses_by_name[group_address.name] = ga_bus
             else:
-                for ga_bus in self.__ga_buses:
-                    if ga_bus.group_address == group_address:
-                        logging.info(
-                            f"{device.name} is added to the ga_bus ({group_address.name})."
-                        )
-                        ga_bus.add_device(device)
+                logging.info(
+                    f"{device.name} is added to the ga_bus ({group_address.name})."
+                )
+                ga_bus.add_device(device)
 
     def detach(
         self, device, group_address: GroupAddress
     ) -> None:  # device : Device, not InRoomDevice
         """Remove devices from KNX Bus object, from GroupAddressBus objects, 
         and delete group adrress from device' group addresses list."""
-        if group_address not in self.group_addresses:
+        ga_bus = self.__ga_buses_by_name.get(group_address.name)
+        if ga_bus is None:
             logging.warning(
                 f"The group address '{group_address.name}' is not linked to any device, thus device {device.name} cannot be detached from it"
             )
@@ -76,44 +85,50 @@ class KNXBus:
             logging.warning(
                 f"The group address '{group_address.name}' is not linked to {device.name}, that thus cannot be detached from it."
             )
-        else:
-            for ga_bus in self.__ga_buses:
-                if ga_bus.group_address == group_address:
-                    if not ga_bus.detach_device(
-                        device
-                    ):  # return number of devices linked to this ga_bus after removal of device, if none, we delete the ga bus
-                        self.__ga_buses.remove(ga_bus)
-                        self.group_addresses.remove(group_address)
-                        logging.info(
-                            f"The ga_bus ({group_address.name}) is deleted as no devices are connected to it."
-                        )
+        elif not ga_bus.detach_device(
+            device
+        ):  # return number of devices linked to this ga_bus after removal of device, if none, we delete the ga bus
+            del self.__ga_buses_by_name[group_address.name]
+            self.__ga_buses.remove(ga_bus)
+            self.group_addresses.remove(group_address)
+            logging.info(
+                f"The ga_bus ({group_address.name}) is deleted as no devices are connected to it."
+            )
 
     def transmit_telegram(self, telegram: Telegram) -> None:
         """
         Transmit a telegram on the bus to other devicdes assigned to the destination address.
         Method called when Device.send_telegram() is called or when svshi interface receives a telegram from svshi.
         """
-        for ga_bus in self.__ga_buses:
-            if telegram.destination == ga_bus.group_address:
-                # Only actuators for now, but sensors and functional module could also receive telegrams to read state for instance.
-                for actuator in ga_bus.actuators:
-                    try:
-                        actuator.update_state(telegram)
-                    except AttributeError:
-                        logging.warning(
-                            f"The actuator {actuator.name} or the telegram created is missing an Attribute."
-                        )
-                    except:
-                        exc = sys.exc_info()[0]
-                        trace = traceback.format_exc()
-                        logging.warning(
-                            f"[KNXBus.transmit_telegram()] - Transmission of the telegram from source '{telegram.source}' failed: {exc} with trace \n{trace}."
-                        )
+        # Group addresses are equal if their names are equal, see GroupAddress.__eq__
+        if STATE_STREAM.enabled:
+            STATE_STREAM.publish_telegram(telegram)
+        ga_bus = self.__ga_buses_by_name.get(str(telegram.destination))
+        if ga_bus is None:
+            return
+        # Only actuators for now, but sensors and functional module could also receive telegrams to read state for instance.
+        for actuator in ga_bus.actuators:
+            try:
+                actuator.update_state(telegram)
+            except AttributeError:
+                logging.warning(
+                    f"The actuator {actuator.name} or the telegram created is missing an Attribute."
+                )
+            except:
+                exc = sys.exc_info()[0]
+                trace = traceback.format_exc()
+                logging.warning(
+                    f"[KNXBus.transmit_telegram()] - Transmission of the telegram from source '{telegram.source}' failed: {exc} with trace \n{trace}."
+                )
 
     def get_info(self) -> Dict[str, Union[str, Dict[str, Dict[str, List[str]]]]]:
         """Return information about the KNX Bus configuration, 
         and the devices assigned to each group address, method called via CLI commmand 'getinfo'"""
-        bus_dict = {"name": self.name, "group_addresses": {}}
+        bus_dict = {
+            "name": self.name,
+            "suppressed_telegrams": self.suppressed_telegrams,
+            "group_addresses": {},
+        }
         for ga_bus in self.__ga_buses:
             str_ga = ga_bus.group_address.name
             ga_dict = {str_ga: {}}
@@ -148,6 +163,13 @@ class GroupAddressBus:
         self.actuators: List[Actuator] = []
         self.functional_modules: List[FunctionalModule] = []
 
+    def has_device(self, device) -> bool:  # device : Device, not InRoomDevice
+        """Return True if the device is assigned to the group address"""
+        return any(
+            device is ga_device
+            for ga_device in self.sensors + self.actuators + self.functional_modules
+        )
+
     def add_device(self, device) -> None:  # device : Device, not InRoomDevice
         """Add a device to the corresponding list (actuators, sensors or functional modules), 
         and add the group address to the device's list of ga"""
@@ -7,7 +7,7 @@ import logging
 import numbers
 import os
 import sys
-from typing import List, Dict, Tuple, Union
+from typing import Callable, List, Dict, Tuple, Union
 from datetime import datetime
 
 import world
@@ -15,8 +15,9 @@ import world
 from system.system_tools import Location, Window
 from tools.check_tools import check_group_address, check_room_config
 from .knxbus import KNXBus
+from .state_stream import STATE_STREAM
 
-from svshi_interface.main import Interface
+from svshi_interface.main import Interface, InterfaceProp, KNX_PORT
 import system.telegrams as sim_t
 
 
@@ -65,6 +66,7 @@ class InRoomDevice:
         new_x = self.location.x if new_x is None else new_x
         new_loc = Location(self.room, new_x, new_y, new_z)
         self.location = new_loc
+        self.room.world.ambient_light.locations_changed()
 
     def get_irdev_info(
         self, attribute: str = None
@@ -124,6 +126,8 @@ class Room:
         svshi_mode: bool = False,
         telegram_logging: bool = False,
         interface: Interface = None,
+        building: world.Building = None,
+        knx_port: int = KNX_PORT,
     ):
         """
         Initialization of a romm object, central class during a simulation, gathering all simulated elements.
@@ -134,6 +138,9 @@ class Room:
         telegram_logging : if in svshi mode, indicate to log telegrams in subfloder of logs/ folder,
         interface : if a user reloads the simulation in the GUI,
         the interface that initiated the connection with svshi is used to avoid stopping the thread.
+        building : if the room is part of a building, its world states are stored and updated with the other rooms'
+        (Building.update() is then scheduled instead of update_world()).
+        knx_port : UDP port on which the interface listens for SVSHI, different for each simulator running on the host.
         """
         self.__test_mode = test_mode
         # Room main attributes
@@ -166,7 +173,11 @@ class Room:
             temp_in,
             hum_in,
             co2_in,
+            building=building,
         )  # date_time is simply a string keyword from config file at this point"
+        self.building = building
+        if building is not None:
+            building.rooms.append(self)
         self.knxbus = KNXBus()
         self.devices: List[InRoomDevice] = []
         self.windows: List[InRoomDevice] = []
@@ -179,8 +190,9 @@ class Room:
         if telegram_logging:
             tel_logging_path = "./logs/" + datetime.now().strftime("%d-%m-%Y_%H%M%S")
             os.mkdir(tel_logging_path)
-            self.telegram_logging_file_path = tel_logging_path + "/telegram_logs.txt"
+            self.telegram_logging_file_path = tel_logging_path + "/telegram_logs.jsonl"
         self.svshi_mode = svshi_mode
+        self.knx_port = knx_port
         self.telegram_logging = telegram_logging
         if self.svshi_mode:
             if (
@@ -189,7 +201,16 @@ class Room:
                 self.__interface = interface
                 self.__interface.room = self
             else:
-                self.__interface = Interface(self, self.telegram_logging)
+                if InterfaceProp.ASYNCIO:  # started on the event loop by the simulator
+                    from svshi_interface import AsyncioInterface
+
+                    self.__interface = AsyncioInterface(
+                        self, self.telegram_logging, port=knx_port
+                    )
+                else:
+                    self.__interface = Interface(
+                        self, self.telegram_logging, port=knx_port
+                    )
             from devices.actuators import IPInterface
             from system import IndividualAddress
 
@@ -242,6 +263,7 @@ class Room:
         elif isinstance(device, Sensor):
             if self.svshi_mode:
                 device.connect_to(self.knxbus)
+            device.clock = self.world.time.simulation_time # for the send policy intervals
             if isinstance(device, Brightness):
                 self.world.ambient_light.add_sensor(in_room_device)
             elif isinstance(device, Thermometer):
@@ -297,6 +319,13 @@ class Room:
         else:
             return False
 
+    def get_update_function(self) -> Callable[..., None]:
+        """Return the function to schedule to update the world and sensors values:
+        Building.update() if the room is part of a building, update_world() otherwise."""
+        if self.building is not None:
+            return self.building.update
+        return self.update_world
+
     def update_world(self, interval: float = 1, gui_mode: bool = False) -> None:
         """
         Update the world states and sensors values by calling world.update()
@@ -325,6 +354,8 @@ class Room:
                 presence_sensors_states,
             ) = self.world.update(self.__first_update)
             self.__first_update = False
+            if STATE_STREAM.enabled:  # e.g. web API event stream
+                STATE_STREAM.publish_room(self)
             if (
                 gui_mode and not self.__test_mode
             ):  # testing with pyglet blocked by gui during github CI
@@ -369,6 +400,76 @@ class Room:
                 end="\r",
             )
 
+    def get_state(self) -> Union[Dict, None]:
+        """
+        Return the simulation state of the room, saved in checkpoints:
+        the world states, the states, locations and group addresses of the devices, and the bus counters.
+        Return None if the room is in a building.
+        """
+        world_state = self.world.get_state()
+        if world_state is None:
+            return None
+        devices_state = {}
+        for ir_device in self.devices:
+            devices_state[ir_device.name] = {
+                "class_name": type(ir_device.device).__name__,
+                "location": list(ir_device.location.pos),
+                "group_addresses": [
+                    ga.name for ga in ir_device.device.group_addresses
+                ],
+                "state": ir_device.device.get_state(),
+            }
+        return {
+            "room": self.name,
+            "first_update": self.__first_update,
+            "world": world_state,
+            "devices": devices_state,
+            "bus": {"suppressed_telegrams": self.knxbus.suppressed_telegrams},
+        }
+
+    def set_state(self, state: Dict) -> Union[None, int]:
+        """
+        Restore the simulation state of the room from a checkpoint,
+        the devices of the checkpoint should be in the room, configured from the same configuration file.
+        Return None if the state cannot be restored, 1 otherwise.
+        """
+        ir_devices = {ir_device.name: ir_device for ir_device in self.devices}
+        # Checked before restoring anything, not to leave the room half restored
+        for name, device_state in state["devices"].items():
+            if name not in ir_devices:
+                logging.error(
+                    f"The device '{name}' of the checkpoint is not in room '{self.name}'."
+                )
+                return None
+            if type(ir_devices[name].device).__name__ != device_state["class_name"]:
+                logging.error(
+                    f"The device '{name}' is a {device_state['class_name']} in the checkpoint, but a {type(ir_devices[name].device).__name__} in room '{self.name}'."
+                )
+                return None
+        if self.world.set_state(state["world"]) is None:
+            return None
+        self.__first_update = state["first_update"]
+        for name, device_state in state["devices"].items():
+            ir_device = ir_devices[name]
+            x, y, z = device_state["location"]
+            if [x, y, z] != list(ir_device.location.pos):
+                ir_device.update_location(x, y, z)
+            ir_device.device.set_state(device_state["state"])
+            current_gas = [ga.name for ga in ir_device.device.group_addresses]
+            for ga in current_gas:
+                if ga not in device_state["group_addresses"]:
+                    self.detach(ir_device.device, ga)
+            for ga in device_state["group_addresses"]:
+                if ga not in current_gas:
+                    self.attach(ir_device.device, ga)
+        for name in ir_devices:
+            if name not in state["devices"]:
+                logging.warning(
+                    f"The device '{name}' is not in the checkpoint, it keeps its configured state."
+                )
+        self.knxbus.suppressed_telegrams = state["bus"]["suppressed_telegrams"]
+        return 1
+
     def get_interface(self) -> Union[Interface, None]:
         """Return the interface used to set up svshi connection if in svshi mode.
         Used to store it and reusi it if simulation reloaded."""
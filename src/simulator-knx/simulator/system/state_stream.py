@@ -0,0 +1,239 @@
+"""
+Class definitions to stream the simulation state to external clients (e.g. the event stream of the web API).
+The StateStream publishes the deltas of the devices' states and of the world ambient values after each update,
+and the telegrams transmitted on the KNX Bus as they happen.
+Each client reads the events from its own bounded queue, a slow client is resynchronized with a snapshot instead of slowing down the simulation.
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, List, Union
+
+from system.telegrams import Telegram
+
+MAX_CLIENT_EVENTS = 256
+
+
+class StreamClient:
+    """Class to represent a client of the state stream, with its bounded queue of events"""
+
+    def __init__(self, max_events: int = MAX_CLIENT_EVENTS) -> None:
+        """
+        Initialization of a stream client.
+
+        max_events : number of events queued before the client is considered too slow,
+        its queued events are then dropped and replaced by a snapshot of the state
+        needs_snapshot : True if the next read starts with a snapshot, for new and lagging clients
+        dropped_events : total number of events dropped because the client did not keep up
+        """
+        self.max_events = max_events
+        self.needs_snapshot = True
+        self.dropped_events = 0
+        self.closed = False
+        self.__fresh = True
+        self.__snapshot_seq = 0
+        self.__events = deque()
+        self.__condition = threading.Condition()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Queues an event, or drops the queued events if the client is too slow, never blocks the publisher"""
+        with self.__condition:
+            if self.needs_snapshot:  # the event is covered by the next snapshot
+                if not self.__fresh:
+                    self.dropped_events += 1
+            elif len(self.__events) >= self.max_events:
+                self.dropped_events += len(self.__events) + 1
+                self.__events.clear()
+                self.needs_snapshot = True
+            else:
+                self.__events.append(event)
+            self.__condition.notify()
+
+    def pop_events(self, stream, timeout: float = None) -> List[Dict[str, Any]]:
+        """
+        Waits for events and returns all the events queued, or an empty list if the timeout expired.
+        A snapshot of the stream's state is returned first if the client is new or did not keep up.
+
+        stream : StateStream, taking the snapshot
+        """
+        with self.__condition:
+            self.__condition.wait_for(
+                lambda: self.__events or self.needs_snapshot or self.closed, timeout
+            )
+            if self.closed:
+                return []
+            take_snapshot = self.needs_snapshot
+            self.needs_snapshot = False
+            self.__fresh = False
+            # Events published before the last snapshot are already contained in it
+            events = [e for e in self.__events if e["seq"] > self.__snapshot_seq]
+            self.__events.clear()
+        if take_snapshot:  # out of the client's lock, the publisher holds the stream's lock when pushing
+            snapshot = stream.snapshot(self.dropped_events)
+            self.__snapshot_seq = snapshot["seq"]
+            events = [snapshot] + [e for e in events if e["seq"] > snapshot["seq"]]
+        return events
+
+    def close(self) -> None:
+        """Wakes up the reader of the client, that stops reading events"""
+        with self.__condition:
+            self.closed = True
+            self.__condition.notify()
+
+
+class StateStream:
+    """
+    Class to represent the stream of the simulation state, published by the rooms and the KNX Bus from the simulation thread,
+    and read by any number of clients from other threads.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization of the state stream, disabled until a consumer (e.g. the web API) enables it.
+
+        enabled : True if the rooms publish their state, the disabled stream costs one attribute read per update
+        __states : last published state of each room, indexed by room name, used for the snapshots
+        __seq : sequence number of the last event, shared by all clients
+        """
+        self.enabled = False
+        self.__states: Dict[str, Dict[str, Any]] = {}
+        self.__clients: List[StreamClient] = []
+        self.__seq = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def has_clients(self) -> bool:
+        return len(self.__clients) > 0
+
+    def subscribe(self, max_events: int = MAX_CLIENT_EVENTS) -> StreamClient:
+        """Add a client to the stream, its first read returns a snapshot of the current state"""
+        client = StreamClient(max_events)
+        with self.__lock:
+            self.__clients.append(client)
+        return client
+
+    def unsubscribe(self, client: StreamClient) -> None:
+        with self.__lock:
+            if client in self.__clients:
+                self.__clients.remove(client)
+        client.close()
+
+    def reset(self) -> None:
+        """Forget the state of the previous simulation, the clients are resynchronized with the new one"""
+        with self.__lock:
+            self.__states = {}
+            for client in self.__clients:
+                client.push(self.__next_event("reset", {}))
+
+    def snapshot(self, dropped_events: int = 0) -> Dict[str, Any]:
+        """Return an event with the last published state of all rooms"""
+        with self.__lock:
+            # The published states are replaced at each update and never modified
+            return self.__next_event(
+                "snapshot",
+                {"rooms": dict(self.__states), "dropped_events": dropped_events},
+            )
+
+    def publish_room(self, room) -> None:
+        """
+        Publish the changes of the room's world ambient values and devices' states since the last update,
+        called by Room.update_world() when the stream is enabled.
+        """
+        world_info = room.get_world_info("all", str_mode=False)
+        simtime = str(world_info.pop("simtime"))
+        world_state = {key: json_value(value) for key, value in world_info.items()}
+        devices_state = {}
+        for ir_device in room.devices:
+            device_info = ir_device.get_irdev_info()
+            devices_state[ir_device.name] = {
+                key: json_value(value) for key, value in device_info.items()
+            }
+        with self.__lock:
+            previous = self.__states.get(room.name)
+            self.__states[room.name] = {
+                "simtime": simtime,
+                "world": world_state,
+                "devices": devices_state,
+            }
+            if not self.__clients:
+                return
+            if previous is None:
+                world_delta, devices_delta = world_state, devices_state
+            else:
+                world_delta = dict_delta(previous["world"], world_state)
+                devices_delta = {}
+                for name, state in devices_state.items():
+                    delta = dict_delta(previous["devices"].get(name, {}), state)
+                    if delta:
+                        devices_delta[name] = delta
+                for name in previous["devices"]:
+                    if name not in devices_state:  # device removed from the room
+                        devices_delta[name] = None
+            if not world_delta and not devices_delta:
+                return
+            event = self.__next_event(
+                "delta",
+                {
+                    "room": room.name,
+                    "simtime": simtime,
+                    "world": world_delta,
+                    "devices": devices_delta,
+                },
+            )
+            for client in self.__clients:
+                client.push(event)
+
+    def publish_telegram(self, telegram: Telegram) -> None:
+        """Publish a telegram transmitted on the KNX Bus, called by KNXBus.transmit_telegram()"""
+        if not self.__clients:  # telegrams are not part of the snapshots
+            return
+        payload = {"content": json_value(telegram.payload.content)}
+        if hasattr(telegram.payload, "state_ratio"):
+            payload["state_ratio"] = json_value(telegram.payload.state_ratio)
+        with self.__lock:
+            if not self.__clients:
+                return
+            event = self.__next_event(
+                "telegram",
+                {
+                    "source": str(telegram.source),
+                    "destination": str(telegram.destination),
+                    "payload": payload,
+                },
+            )
+            for client in self.__clients:
+                client.push(event)
+
+    def __next_event(self, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Called with the lock held
+        self.__seq += 1
+        event = {"seq": self.__seq, "type": event_type}
+        event.update(data)
+        return event
+
+
+def json_value(value: Any) -> Union[str, float, int, bool, list, None]:
+    """Return the value in a form that can be serialized in json, numpy numbers and tuples included"""
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        return round(float(value), 2)
+    if isinstance(value, (tuple, list)):
+        return [json_value(v) for v in value]
+    if hasattr(value, "item"):  # numpy scalar
+        return json_value(value.item())
+    return str(value)
+
+
+def dict_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the entries of new that are not in old or that changed"""
+    return {key: value for key, value in new.items() if old.get(key, None) != value}
+
+
+def format_sse_event(event: Dict[str, Any]) -> str:
+    """Return the Server-Sent Events message of an event, with its sequence number as id"""
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+STATE_STREAM = StateStream()
@@ -0,0 +1,48 @@
+""" Shared configuration and fixtures of the simulator tests"""
+
+import sys, os
+sys.path.append("..")
+
+import pytest
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+test_config_path = f"{SVSHI_HOME}/src/simulator-knx/config/config_test_config.json"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run the tests comparing execution times, skipped by default",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: test comparing execution times, run with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
+@pytest.fixture
+def headless_room():
+    """Create rooms configured from a file, the test config by default, whose world is updated on a virtual clock"""
+    import tools
+
+    def create(path: str = test_config_path):
+        room, _ = tools.configure_system_from_file(path, system_dt=1, test_mode=True)
+        room.world.time.scheduler_init(virtual=True)
+        room.world.time.scheduler_add_job(room.get_update_function())
+        room.world.time.scheduler_start()
+        return room
+
+    return create
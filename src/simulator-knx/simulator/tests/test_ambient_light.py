@@ -0,0 +1,137 @@
+""" Test the brightness measured by sensors, computed with a cached matrix of lux per lumen"""
+
+import math
+import random
+import sys
+import time
+
+sys.path.append("..")
+
+import pytest
+
+import system
+import world
+import devices as dev
+
+weather = "clear"
+date_time = "2022/06/13/11/00"
+
+
+def reference_sensor_brightness(ambient_light, brightness_sensor) -> float:
+    """Brightness of a sensor computed source by source, as the simulator did before caching the distances"""
+
+    def lux_from_lightsource(source, distance):
+        if distance <= 0.01:
+            return source.device.effective_lumen()
+        solid_angle = 4 * math.pi * (math.sin(source.device.beam_angle / 4)) ** 2
+        return source.device.effective_lumen() / (solid_angle * distance**2)
+
+    brightness = 0
+    for source in ambient_light._AmbientLight__light_sources:
+        if source.device.state:
+            distance = world.compute_distance(source, brightness_sensor)
+            brightness += lux_from_lightsource(source, distance)
+    for window in ambient_light._AmbientLight__windows:
+        distance = world.compute_distance_from_window(window, brightness_sensor)
+        brightness += lux_from_lightsource(window, distance)
+    return brightness
+
+
+def room_with_lights(nb_leds: int, nb_sensors: int, seed: int = 0):
+    rand = random.Random(seed)
+    room = system.Room(
+        "bedroom1",
+        20,
+        15,
+        3,
+        180,
+        "3-levels",
+        date_time=date_time,
+        weather=weather,
+        test_mode=True,
+    )
+    for wall, offset in [("north", 4), ("south", 10), ("east", 7), ("west", 3)]:
+        room.add_window(system.Window(f"window_{wall}", room, wall, offset, [2, 1.5], test_mode=True))
+    leds, sensors = [], []
+    for i in range(nb_leds):
+        led = dev.LED(f"led{i}", system.IndividualAddress(0, 0, 1), state=i % 3 != 0)
+        led.state_ratio = rand.uniform(10, 100)
+        room.add_device(led, rand.uniform(0, 20), rand.uniform(0, 15), rand.uniform(0, 3))
+        leds.append(led)
+    for i in range(nb_sensors):
+        sensor = dev.Brightness(f"brightness{i}", system.IndividualAddress(0, 0, 2))
+        sensors.append(
+            room.add_device(sensor, rand.uniform(0, 20), rand.uniform(0, 15), 1)
+        )
+    # A sensor at the same place as a LED
+    sensor = dev.Brightness("brightness_on_led", system.IndividualAddress(0, 0, 3))
+    on_led = room.devices[4]
+    sensors.append(room.add_device(sensor, *on_led.location.pos))
+    return room, leds, sensors
+
+
+def assert_brightness_equals_reference(room, sensors):
+    ambient_light = room.world.ambient_light
+    for sensor in sensors:
+        assert sensor.device.brightness == pytest.approx(
+            reference_sensor_brightness(ambient_light, sensor), rel=1e-9
+        )
+
+
+def test_sensors_brightness_equals_source_by_source_computation():
+    room, leds, sensors = room_with_lights(20, 10)
+
+    room.world.update(first_update=True)
+    assert_brightness_equals_reference(room, sensors)
+
+    room.world.update(first_update=False)
+    assert_brightness_equals_reference(room, sensors)
+
+    assert room.world.ambient_light.get_global_brightness() == round(
+        sum(s.device.brightness for s in sensors) / len(sensors), 2
+    )
+
+
+def test_sensors_brightness_follows_states_and_locations():
+    room, leds, sensors = room_with_lights(5, 3)
+    room.world.update(first_update=True)
+
+    leds[1].state = not leds[1].state
+    sensors[0].update_location(new_x=1, new_y=2)
+    room.devices[0].update_location(new_x=19)
+    room.world.update(first_update=True)
+
+    assert_brightness_equals_reference(room, sensors)
+
+
+def test_sensors_brightness_without_sources():
+    room = system.Room("bedroom1", 20, 15, 3, 180, "3-levels", test_mode=True)
+    sensor = room.add_device(
+        dev.Brightness("brightness1", system.IndividualAddress(0, 0, 2)), 5, 5, 1
+    )
+
+    room.world.update(first_update=True)
+
+    assert sensor.device.brightness == 0
+
+
+@pytest.mark.benchmark
+def test_brightness_update_benchmark():
+    room, leds, sensors = room_with_lights(200, 100)
+    ambient_light = room.world.ambient_light
+    date_time = room.world.time.date_time
+    nb_updates = 20
+
+    start = time.perf_counter()
+    for _ in range(nb_updates):
+        ambient_light.update(date_time, first_update=True)
+    elapsed = (time.perf_counter() - start) / nb_updates
+
+    start = time.perf_counter()
+    for sensor in sensors:
+        reference_sensor_brightness(ambient_light, sensor)
+    reference_elapsed = time.perf_counter() - start
+    print(
+        f"\n200 LEDs, 4 windows, 101 sensors: {elapsed * 1000:.2f}ms per update, {reference_elapsed * 1000:.2f}ms source by source"
+    )
+    assert elapsed < reference_elapsed
@@ -0,0 +1,218 @@
+""" Test the asyncio interface with SVSHI: connection, ACK pacing of the sent telegrams and received telegrams"""
+
+import sys
+sys.path.append("..")
+
+import asyncio
+
+import pytest
+
+from xknx import XKNX
+from xknx.dpt.dpt import DPTBinary
+from xknx.knxip import (
+    CEMIFrame,
+    CEMIMessageCode,
+    ConnectRequest,
+    ConnectResponse,
+    DisconnectRequest,
+    DisconnectResponse,
+    KNXIPFrame,
+    TunnellingAck,
+    TunnellingRequest,
+)
+from xknx.telegram.address import GroupAddress
+from xknx.telegram.apci import GroupValueWrite
+from xknx.telegram.telegram import Telegram
+
+import system
+import system.telegrams as sim_t
+import devices as dev
+from svshi_interface import AsyncioInterface, InterfaceProp
+
+PORT = 13671
+
+
+class FakeSVSHI(asyncio.DatagramProtocol):
+    """SVSHI side of the connection, frames received are put in a queue"""
+
+    def __init__(self) -> None:
+        self.xknx = XKNX()
+        self.frames: asyncio.Queue = asyncio.Queue()
+        self.transport = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        frame = KNXIPFrame(self.xknx)
+        frame.from_knx(data)
+        self.frames.put_nowait(frame.body)
+
+    def send(self, body) -> None:
+        self.transport.sendto(
+            bytes(KNXIPFrame.init_from_body(body).to_knx()), (InterfaceProp.HOST, PORT)
+        )
+
+    async def receive(self, timeout: float = 1):
+        return await asyncio.wait_for(self.frames.get(), timeout)
+
+    def ack(self, request: TunnellingRequest) -> None:
+        self.send(
+            TunnellingAck(
+                self.xknx,
+                communication_channel_id=request.communication_channel_id,
+                sequence_counter=request.sequence_counter,
+            )
+        )
+
+
+def create_room():
+    room = system.Room(
+        "bedroom1", 20, 20, 3, 180, "3-levels", insulation="good", test_mode=True
+    )
+    led1 = dev.LED("led1", system.IndividualAddress(0, 0, 1))
+    room.add_device(led1, 5, 5, 1)
+    room.attach(led1, "1/1/1")
+    return room, led1
+
+
+async def connected_interface(room):
+    interface = AsyncioInterface(room, False, testing=True)
+    interface.set_ga_to_payload_dict({"1/1/1": sim_t.BinaryPayload})
+    await interface.start(PORT)
+    loop = asyncio.get_running_loop()
+    _, svshi = await loop.create_datagram_endpoint(
+        FakeSVSHI, local_addr=(InterfaceProp.HOST, 0)
+    )
+    svshi.send(ConnectRequest(svshi.xknx))
+    assert isinstance(await svshi.receive(), ConnectResponse)
+    return interface, svshi
+
+
+def simulator_telegram(value: bool) -> sim_t.Telegram:
+    return sim_t.Telegram(
+        system.IndividualAddress(0, 0, 5),
+        system.GroupAddress("3-levels", 1, 1, 1),
+        sim_t.BinaryPayload(value),
+    )
+
+
+@pytest.mark.asyncio
+async def test_queued_telegrams_are_all_sent_one_ack_at_a_time():
+    room, _ = create_room()
+    interface, svshi = await connected_interface(room)
+    try:
+        interface.add_to_sending_queue([simulator_telegram(i % 2 == 0) for i in range(5)])
+
+        for sequence_counter in range(5):
+            request = await svshi.receive()
+            assert isinstance(request, TunnellingRequest)
+            assert request.sequence_counter == sequence_counter
+            # the next telegram is only sent when this one is acknowledged
+            with pytest.raises(asyncio.TimeoutError):
+                await svshi.receive(timeout=0.05)
+            svshi.ack(request)
+
+        await asyncio.sleep(0.05)
+        info = interface.get_info()
+        assert info["connected"]
+        assert info["telegrams_sent"] == 5
+        assert info["telegrams_queued"] == 0
+        assert info["repeated_requests"] == 0
+        assert len(interface.round_trip_times) == 5
+        assert info["round_trip_max_ms"] >= 50
+    finally:
+        interface.stop()
+        svshi.transport.close()
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_request_is_repeated_once(monkeypatch):
+    import svshi_interface.asyncio_interface as asyncio_interface
+
+    monkeypatch.setattr(asyncio_interface, "TUNNELLING_REQUEST_TIMEOUT", 0.05)
+    room, _ = create_room()
+    interface, svshi = await connected_interface(room)
+    try:
+        interface.add_to_sending_queue([simulator_telegram(True), simulator_telegram(False)])
+        first = await svshi.receive()
+        repeated = await svshi.receive()
+        assert first.sequence_counter == repeated.sequence_counter == 0
+        # not acknowledged twice, the next telegram is sent
+        second = await svshi.receive()
+        assert second.sequence_counter == 1
+        svshi.ack(second)
+        await asyncio.sleep(0.01)
+        info = interface.get_info()
+        assert info["repeated_requests"] == 1
+        assert info["unacknowledged_requests"] == 1
+    finally:
+        interface.stop()
+        svshi.transport.close()
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_request_is_not_repeated_after_disconnection(monkeypatch):
+    import svshi_interface.asyncio_interface as asyncio_interface
+
+    monkeypatch.setattr(asyncio_interface, "TUNNELLING_REQUEST_TIMEOUT", 0.05)
+    room, _ = create_room()
+    interface, svshi = await connected_interface(room)
+    try:
+        interface.add_to_sending_queue([simulator_telegram(True)])
+        request = await svshi.receive()
+        assert isinstance(request, TunnellingRequest)
+        svshi.send(DisconnectRequest(svshi.xknx))
+        assert isinstance(await svshi.receive(), DisconnectResponse)
+        # the pending retry is cancelled instead of being sent to a forgotten address
+        with pytest.raises(asyncio.TimeoutError):
+            await svshi.receive(timeout=0.15)
+        info = interface.get_info()
+        assert not info["connected"]
+        assert info["repeated_requests"] == 0
+        assert info["unacknowledged_requests"] == 1
+    finally:
+        interface.stop()
+        svshi.transport.close()
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_received_telegram_is_acknowledged_confirmed_and_transmitted():
+    room, led1 = create_room()
+    interface, svshi = await connected_interface(room)
+    try:
+        telegram = Telegram(
+            destination_address=GroupAddress("1/1/1"),
+            payload=GroupValueWrite(DPTBinary(1)),
+        )
+        cemi = CEMIFrame(svshi.xknx, code=CEMIMessageCode.L_DATA_REQ).init_from_telegram(
+            svshi.xknx, telegram, code=CEMIMessageCode.L_DATA_REQ
+        )
+        request = TunnellingRequest(svshi.xknx, sequence_counter=0, cemi=cemi)
+        svshi.send(request)
+
+        ack = await svshi.receive()
+        assert isinstance(ack, TunnellingAck)
+        assert ack.sequence_counter == 0
+        confirmation = await svshi.receive()
+        assert isinstance(confirmation, TunnellingRequest)
+        assert confirmation.cemi.code is CEMIMessageCode.L_DATA_CON
+        svshi.ack(confirmation)
+        assert led1.state
+
+        # a repeated request is acknowledged again but not transmitted twice
+        led1.state = False
+        svshi.send(request)
+        ack = await svshi.receive()
+        assert isinstance(ack, TunnellingAck)
+        with pytest.raises(asyncio.TimeoutError):
+            await svshi.receive(timeout=0.05)
+        assert not led1.state
+        assert interface.get_info()["telegrams_received"] == 1
+    finally:
+        interface.stop()
+        svshi.transport.close()
+        await asyncio.sleep(0.01)
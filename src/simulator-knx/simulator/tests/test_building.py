@@ -0,0 +1,232 @@
+""" Test the building world engine, updating the world states of all rooms at once in arrays"""
+
+import sys, os
+sys.path.append("..")
+
+import json
+import time
+
+import pytest
+
+import system
+import tools
+import world
+import devices as dev
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+config_path = f"{SVSHI_HOME}/src/simulator-knx/config/config_test_config.json"
+
+speed_factor = 180
+system_dt = 1
+date_time = "2022/06/13/11/00"
+weather = "clear"
+insulations = ["perfect", "good", "average", "bad"]
+
+
+def create_room(index: int, building: world.Building = None) -> system.Room:
+    """Room whose insulation, initial states and heating devices depend on its index"""
+    room = system.Room(
+        f"room{index}",
+        12.5,
+        10,
+        3,
+        speed_factor,
+        "3-levels",
+        system_dt,
+        insulations[index % len(insulations)],
+        temp_out=15.0 + index % 7,
+        hum_out=40.0 + index % 5,
+        co2_out=300,
+        temp_in=20.0 + index % 3,
+        hum_in=35.0 + index % 11,
+        co2_in=600 + 10 * (index % 13),
+        date_time=date_time,
+        weather=weather,
+        test_mode=True,
+        building=building,
+    )
+    if index % 2:
+        heater = dev.Heater(f"heater{index}", system.IndividualAddress(0, 0, 11), 400)
+        heater.state = True
+        heater.state_ratio = 50 + index % 50
+        room.add_device(heater, 1, 1, 1)
+    if index % 3 == 0:
+        ac = dev.AC(f"ac{index}", system.IndividualAddress(0, 0, 12), 300)
+        ac.state = index % 2 == 1
+        room.add_device(ac, 2, 2, 1)
+    room.add_device(
+        dev.AirSensor(f"airsensor{index}", system.IndividualAddress(0, 0, 55)), 5, 5, 1
+    )
+    room.add_device(
+        dev.Brightness(f"brightness{index}", system.IndividualAddress(0, 0, 5)), 6, 6, 1
+    )
+    room.add_device(dev.LED(f"led{index}", system.IndividualAddress(0, 0, 1)), 7, 7, 1)
+    return room
+
+
+def create_rooms(nb_rooms: int):
+    standalone_rooms = [create_room(i) for i in range(nb_rooms)]
+    building = world.Building(speed_factor, system_dt, date_time, weather, capacity=4)
+    building_rooms = [create_room(i, building) for i in range(nb_rooms)]
+    return standalone_rooms, building, building_rooms
+
+
+def test_building_updates_are_equivalent_to_standalone_rooms():
+    standalone_rooms, building, building_rooms = create_rooms(12)
+    assert len(building) == 12
+    assert building.rooms == building_rooms
+
+    for _ in range(50):
+        for room in standalone_rooms:
+            room.update_world()
+        building.update()
+
+    for standalone, in_building in zip(standalone_rooms, building_rooms):
+        assert in_building.world.time.simulation_time() == standalone.world.time.simulation_time()
+        for ambient in ["temperature", "humidity", "co2", "brightness"]:
+            assert in_building.get_world_info(ambient, str_mode=False) == pytest.approx(
+                standalone.get_world_info(ambient, str_mode=False)
+            )
+        for standalone_device, building_device in zip(standalone.devices, in_building.devices):
+            assert building_device.device.get_dev_info() == pytest.approx(
+                standalone_device.device.get_dev_info()
+            )
+
+
+def test_building_get_info_returns_read_only_views():
+    _, building, building_rooms = create_rooms(5)
+    building.update()  # first update, sensors are initialized
+    info = building.get_info()
+    assert info["rooms"] == [room.name for room in building_rooms]
+    temperatures = info["temperature_in"]
+    assert len(temperatures) == 5
+    with pytest.raises(ValueError):
+        temperatures[0] = 0
+
+    initial_temperatures = temperatures.copy()
+    building.update()
+    # the view reflects the update
+    assert list(temperatures) != list(initial_temperatures)
+    for room, temperature, co2 in zip(building_rooms, temperatures, info["co2_in"]):
+        assert room.world.ambient_temperature.get_temperature() == round(temperature, 2)
+        assert room.world.ambient_co2.get_co2() == round(co2, 2)
+
+
+def test_building_rooms_set_ambient_values():
+    _, building, building_rooms = create_rooms(3)
+    room = building_rooms[1]
+    assert room.world.set_ambient_value("temperature_in", 30) == 1
+    assert room.world.set_ambient_value("humidity_out", 60) == 1
+    assert room.world.set_ambient_value("co2_in", 1000) == 1
+    assert room.world.ambient_temperature.set_temperature("elsewhere", 10) == 0
+
+    info = building.get_info()
+    assert list(info["temperature_in"]) == [20.0, 30.0, 22.0]
+    assert info["humidity_out"][1] == 60
+    assert info["co2_in"][1] == 1000
+    airsensor = next(d for d in room.devices if d.name == "airsensor1")
+    assert airsensor.device.co2 == 1000
+    assert room.world.ambient_humidity.humidity_out == 60
+
+
+def configure_building_from_file(tmp_path) -> system.Room:
+    """First room of a building of 4 rooms configured from a file"""
+    with open(config_path, "r") as file:
+        config_dict = json.load(file)
+    rooms_config = config_dict["world"]["rooms"]
+    for r in range(2, 5):
+        rooms_config[f"room{r}"] = {
+            "name": f"office{r}",
+            "dimensions": [5, 5, 3],
+            "insulation": "good",
+            "windows": {},
+            "room_devices": {},
+        }
+    config_dict["world"]["number_of_rooms"] = 4
+    multi_room_config_path = tmp_path / "multi_room_config.json"
+    with open(multi_room_config_path, "w") as file:
+        json.dump(config_dict, file)
+
+    room, _ = tools.configure_system_from_file(
+        str(multi_room_config_path), system_dt=system_dt, test_mode=True
+    )
+    return room
+
+
+def test_building_configured_from_file(tmp_path):
+    room = configure_building_from_file(tmp_path)
+    building = room.building
+    assert building is not None
+    assert building.get_info()["rooms"] == ["bedroom1", "office2", "office3", "office4"]
+    assert all(r.world.time is building.time for r in building.rooms)
+
+    building.update()
+    building.update()
+    assert building.time.simulation_time() == speed_factor * system_dt
+    assert room.get_world_info("temperature", str_mode=False)["temperature_in"] < 25.0
+
+
+def test_gui_schedules_building_update(tmp_path, monkeypatch):
+    pyglet = pytest.importorskip("pyglet")
+    pyglet.options["headless"] = True
+    try:
+        import gui
+    except Exception:
+        pytest.skip("the GUI cannot be imported without a display")
+    scheduled = []
+    monkeypatch.setattr(
+        pyglet.clock,
+        "schedule_interval",
+        lambda func, interval, *args, **kwargs: scheduled.append(
+            (func, interval, kwargs)
+        ),
+    )
+    room = configure_building_from_file(tmp_path)
+    temperature_in = room.get_world_info("temperature", str_mode=False)[
+        "temperature_in"
+    ]
+
+    gui.schedule_world_update(room, system_dt)
+    assert len(scheduled) == 1
+    update, interval, kwargs = scheduled[0]
+    assert update == room.building.update
+    update(interval, **kwargs)
+    update(interval, **kwargs)
+
+    assert room.world.time.simulation_time() == speed_factor * system_dt
+    assert (
+        room.get_world_info("temperature", str_mode=False)["temperature_in"]
+        != temperature_in
+    )
+
+
+@pytest.mark.benchmark
+def test_building_update_benchmark():
+    nb_rooms, nb_updates = 200, 20
+    standalone_rooms, building, _ = create_rooms(nb_rooms)
+    for room in standalone_rooms:
+        room.update_world()
+    building.update()
+
+    start = time.perf_counter()
+    for _ in range(nb_updates):
+        for room in standalone_rooms:
+            room.world.ambient_temperature.update()
+            room.world.ambient_humidity.update(
+                room.world.ambient_temperature.get_temperature()
+            )
+            room.world.ambient_co2.update()
+    standalone_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(nb_updates):
+        building._Building__update_temperature(building.time.update_rule_ratio)
+        building._Building__update_humidity(building.time.update_rule_ratio)
+        building._Building__update_co2(building.time.update_rule_ratio)
+    building_time = time.perf_counter() - start
+
+    print(
+        f"\n{nb_rooms} rooms, temperature/humidity/co2 updates: {standalone_time / nb_updates * 1000:.3f}ms per update with standalone rooms, "
+        f"{building_time / nb_updates * 1000:.3f}ms per update with a building"
+    )
+    assert building_time < standalone_time
@@ -0,0 +1,162 @@
+""" Test the checkpoints of the simulation state, saved from a room and restored to continue the simulation"""
+
+import sys, os
+sys.path.append("..")
+
+import gzip
+import json
+
+import pytest
+
+import tools
+from tools.script_tools import CheckpointCommand, compile_script
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+empty_config_path = f"{SVSHI_HOME}/src/simulator-knx/config/empty_config.json"
+
+first_week_day = """
+set button1 ON
+set presence true
+set humiditysoil1 80
+wait 5 h
+set weather overcast
+wait 2 h
+"""
+next_hours = """
+wait 3 h
+store world temperature temp
+store world humidity hum
+store world co2 co2
+store world brightness bright
+store world simtime simtime
+store heater1 state heater_state
+store humiditysoil1 humiditysoil soil
+store presencesensor1 state presence
+"""
+
+
+async def run(room, script: str):
+    parser = tools.ScriptParser()
+    commands, errors = compile_script(script.splitlines())
+    assert errors == []
+    ret, _ = await parser.run_script(room, commands)
+    assert ret == 1
+    return parser.stored_values
+
+
+def get_device(room, name: str):
+    return [d for d in room.devices if d.name == name][0].device
+
+
+@pytest.mark.asyncio
+async def test_restored_simulation_continues_as_the_saved_one(tmp_path, headless_room):
+    checkpoint = str(tmp_path / "first_week_day.ckpt")
+    room = headless_room()
+    await run(room, first_week_day)
+    assert tools.save_checkpoint(room, checkpoint) == 1
+    expected_values = await run(room, next_hours)
+
+    restored_room = headless_room()
+    assert tools.load_checkpoint(restored_room, checkpoint) == 1
+    restored_values = await run(restored_room, next_hours)
+
+    assert restored_values == expected_values
+    # the first update of the world only initializes it
+    assert expected_values["simtime"] == "9:57:00"
+    assert expected_values["heater_state"] is True
+    assert restored_room.world.weather == "overcast"
+
+
+def test_group_addresses_are_restored(tmp_path, headless_room):
+    checkpoint = str(tmp_path / "detached.ckpt")
+    room = headless_room()
+    button_device = get_device(room, "button1")
+    ga = button_device.group_addresses[0].name
+    room.detach(button_device, ga)
+    tools.save_checkpoint(room, checkpoint)
+
+    restored_room = headless_room()
+    tools.load_checkpoint(restored_room, checkpoint)
+    restored_button = get_device(restored_room, "button1")
+    assert ga not in [g.name for g in restored_button.group_addresses]
+    assert "button1" not in str(restored_room.get_bus_info()["group_addresses"])
+
+
+def test_checkpoint_of_another_configuration_is_rejected(tmp_path, headless_room):
+    checkpoint = str(tmp_path / "room.ckpt")
+    room = headless_room()
+    room.world.set_ambient_value("temperature_in", 30)
+    tools.save_checkpoint(room, checkpoint)
+
+    empty_room = headless_room(empty_config_path)
+    temperature = empty_room.world.ambient_temperature.get_temperature()
+    # the devices of the checkpoint are missing, nothing is restored
+    assert tools.load_checkpoint(empty_room, checkpoint) is None
+    assert empty_room.world.ambient_temperature.get_temperature() == temperature
+    assert tools.load_checkpoint(room, str(tmp_path / "missing.ckpt")) is None
+
+
+def test_checkpoint_is_compressed_json(tmp_path, headless_room):
+    checkpoint = str(tmp_path / "room.ckpt")
+    room = headless_room()
+    tools.save_checkpoint(room, checkpoint)
+
+    with gzip.open(checkpoint, "rt") as checkpoint_file:
+        state = json.load(checkpoint_file)
+    assert state["version"] == 1
+    assert state["devices"]["led1"]["class_name"] == "LED"
+    assert list(state["devices"]["led1"]["state"]) == [
+        "state",
+        "state_ratio",
+        "state_value",
+    ]
+    assert state["devices"]["airsensor1"]["state"]["temperature"] is None
+    assert os.path.getsize(checkpoint) < len(json.dumps(state))
+
+
+def test_declared_states_are_reset_even_if_none_or_missing(tmp_path, headless_room):
+    checkpoint = str(tmp_path / "room.ckpt")
+    room = headless_room()
+    tools.save_checkpoint(room, checkpoint)
+
+    restored_room = headless_room()
+    airsensor = get_device(restored_room, "airsensor1")
+    airsensor.set_state(
+        dict(airsensor.get_state(), temperature=22.0, _Sensor__last_sent_value=22.0)
+    )
+    assert tools.load_checkpoint(restored_room, checkpoint) == 1
+    # the sensor is unsupported and has sent nothing in the checkpoint
+    assert airsensor.temperature is None
+    assert airsensor.get_state() == get_device(room, "airsensor1").get_state()
+
+    led = get_device(restored_room, "led1")
+    led.set_state({"state": True})
+    assert led.get_state() == {"state": True, "state_ratio": None, "state_value": None}
+
+
+def test_checkpoint_script_command():
+    commands, errors = compile_script(
+        [
+            "checkpoint save week1",
+            "checkpoint load ./saved/week1.ckpt",
+            "checkpoint week1",
+        ]
+    )
+    assert isinstance(commands[0], CheckpointCommand)
+    assert commands[0].action == "save"
+    assert (
+        commands[0].file_path
+        == f"{SVSHI_HOME}/src/simulator-knx/checkpoints/week1.ckpt"
+    )
+    assert commands[1].file_path == "./saved/week1.ckpt"
+    assert len(errors) == 1 and errors[0].startswith("Line 3")
+
+
+def test_checkpoint_name_keeps_its_case():
+    commands, errors = compile_script(
+        ["CHECKPOINT Save Week1", "checkpoint load ./Saved/Week1.ckpt"]
+    )
+    assert errors == []
+    assert commands[0].action == "save"
+    assert commands[0].file_path.endswith("/Week1.ckpt")
+    assert commands[1].file_path == "./Saved/Week1.ckpt"
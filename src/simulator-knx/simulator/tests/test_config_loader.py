@@ -0,0 +1,121 @@
+""" Test the loading of generated building configuration files of increasing size"""
+
+import sys, os
+sys.path.append("..")
+
+import json
+import logging
+
+import system
+import tools
+import devices as dev
+from system.room import InRoomDevice
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+config_path = f"{SVSHI_HOME}/src/simulator-knx/config/config_test_config.json"
+
+DEVICES_PER_LINE = 250
+
+
+def generate_building_config(nb_rooms: int, devices_per_room: int) -> dict:
+    """
+    Building config with nb_rooms rooms of devices_per_room devices, alternating buttons and LEDs,
+    each button and the following LED share a group address.
+    """
+    with open(config_path, "r") as file:
+        config_dict = json.load(file)
+    world_config = config_dict["world"]
+    world_config["number_of_rooms"] = nb_rooms
+    world_config["rooms"] = {}
+    lines_devices = []
+    group_addresses = []
+    for r in range(nb_rooms):
+        room_devices = {}
+        for d in range(devices_per_room):
+            index = r * devices_per_room + d
+            if index % DEVICES_PER_LINE == 0:
+                lines_devices.append({})
+            line = len(lines_devices) - 1
+            dev_class = "Button" if d % 2 == 0 else "LED"
+            name = f"{dev_class.lower()}{index}"
+            area, line = divmod(line, 16)
+            lines_devices[-1][name] = {
+                "class": dev_class,
+                "knx_location": f"{area}.{line}.{index % DEVICES_PER_LINE + 1}",
+            }
+            room_devices[name] = [d % 10 + 0.5, d // 10 % 10 + 0.5, 1]
+            if dev_class == "LED":
+                main, sub = divmod(index // 2, 256)
+                group_addresses.append(
+                    {
+                        "address": f"{main // 8 % 32}/{main % 8}/{sub}",
+                        "group_devices": [f"button{index - 1}", name],
+                    }
+                )
+        world_config["rooms"][f"room{r + 1}"] = {
+            "name": f"office{r + 1}",
+            "dimensions": [10, 10, 3],
+            "insulation": "good",
+            "windows": {},
+            "room_devices": room_devices,
+        }
+    knx_config = {"number_of_areas": len(lines_devices) // 16 + 1}
+    for i, line_devices in enumerate(lines_devices):
+        area, line = divmod(i, 16)
+        area_config = knx_config.setdefault(f"area{area}", {"number_of_lines": 0})
+        area_config["number_of_lines"] += 1
+        area_config[f"line{line}"] = {"devices": line_devices}
+    knx_config["group_address_style"] = "3-levels"
+    knx_config["group_addresses"] = group_addresses
+    config_dict["knx"] = knx_config
+    return config_dict
+
+
+def load_generated_config(tmp_path, nb_rooms: int, devices_per_room: int):
+    generated_config_path = tmp_path / f"building_{nb_rooms}_{devices_per_room}.json"
+    with open(generated_config_path, "w") as file:
+        json.dump(generate_building_config(nb_rooms, devices_per_room), file)
+    room, _ = tools.configure_system_from_file(
+        str(generated_config_path), system_dt=1, test_mode=True
+    )
+    return room
+
+
+def test_generated_building_config_is_loaded(tmp_path):
+    room = load_generated_config(tmp_path, 3, 40)
+    rooms = room.building.rooms
+    assert [r.name for r in rooms] == ["office1", "office2", "office3"]
+    assert all(len(r.devices) == 40 for r in rooms)
+    led = next(d.device for d in rooms[2].devices if d.name == "led81")
+    assert isinstance(led, dev.LED)
+    assert led.group_addresses == [system.GroupAddress("3-levels", 0, 0, 40)]
+    bus_info = rooms[2].knxbus.get_info()
+    assert "led81" in str(bus_info)
+    assert "button80" in str(bus_info)
+
+
+def test_config_loader_visits_each_device_a_bounded_number_of_times(
+    tmp_path, caplog, monkeypatch
+):
+    caplog.set_level(logging.WARNING)
+    # Devices are found by name with indexes, counted by the reads of the names of the devices added to the rooms
+    name_reads = 0
+
+    def get_name(in_room_device):
+        nonlocal name_reads
+        name_reads += 1
+        return in_room_device.__dict__["name"]
+
+    def set_name(in_room_device, name):
+        in_room_device.__dict__["name"] = name
+
+    monkeypatch.setattr(
+        InRoomDevice, "name", property(get_name, set_name), raising=False
+    )
+    reads_per_device = []
+    for nb_rooms, devices_per_room in [(2, 50), (4, 100), (8, 200)]:
+        name_reads = 0
+        load_generated_config(tmp_path, nb_rooms, devices_per_room)
+        reads_per_device.append(name_reads / (nb_rooms * devices_per_room))
+    # linear loading: the reads per device do not grow with the size of the config
+    assert reads_per_device[-1] == reads_per_device[0]
@@ -0,0 +1,78 @@
+""" Test the headless mode, with world updates driven by a virtual clock"""
+
+import sys
+sys.path.append("..")
+
+import pytest
+
+import tools
+import world
+
+# 2 simulated days with a speed factor of 180: 960 world updates of system_dt = 1 system second
+long_scenario = """
+# the room cools down towards the outdoor temperature during a simulated day, then warms up
+store world temperature temp_start
+wait 24 h
+store world temperature temp_cooled
+assert temp_cooled <= temp_start
+set temperature 30 out
+wait 24 h
+store world temperature temp_warmed
+assert temp_warmed >= temp_cooled
+store world simtime simtime_end
+end
+"""
+
+
+def test_virtual_clock_runs_jobs_in_time_order():
+    clock = world.VirtualClock()
+    calls = []
+    clock.add_job(lambda: calls.append(("update", clock.now)), 1)
+    clock.call_at(2.5, lambda: calls.append(("once", clock.now)))
+    clock.call_at(2, lambda: calls.append(("same_time", clock.now)))
+
+    assert clock.advance(3) == 5
+    assert calls == [
+        ("update", 1),
+        ("same_time", 2),  # scheduled before the next update was
+        ("update", 2),
+        ("once", 2.5),
+        ("update", 3),
+    ]
+    assert clock.now == 3
+
+    assert clock.advance(0.5) == 0
+    assert clock.now == 3.5
+
+
+@pytest.mark.asyncio
+async def test_wait_runs_world_updates_of_simulated_time(headless_room):
+    room = headless_room()
+    parser = tools.ScriptParser()
+
+    ret, _ = await parser.script_command_parser(room, "wait 1 h")
+
+    assert ret == 1
+    # speed factor of 180: 1 simulated hour is 20 system seconds, the first update only initializes the sensors
+    assert room.world.time.virtual_clock.now == 20
+    assert room.world.time.simulation_time() == 19 * 180
+
+
+@pytest.mark.asyncio
+async def test_long_scenario_script_runs_on_the_virtual_clock(headless_room):
+    room = headless_room()
+    parser = tools.ScriptParser()
+
+    for command in long_scenario.splitlines():
+        ret, assertions = await parser.script_command_parser(room, command)
+        assert ret is not None
+        if ret == 0:
+            break
+
+    assert ret == 0
+    assert len(assertions) == 2
+    assert parser.stored_values["temp_cooled"] < parser.stored_values["temp_start"]
+    assert parser.stored_values["temp_warmed"] > parser.stored_values["temp_cooled"]
+    assert parser.stored_values["simtime_end"] == "1 day, 23:57:00"
+    # 2 simulated days would take 16 minutes of real time with a speed factor of 180, they are not waited for
+    assert room.world.time.virtual_clock.now == 960
@@ -0,0 +1,116 @@
+""" Test routing of telegrams on the KNX Bus, and its cost when the number of group addresses grows"""
+
+import sys
+
+sys.path.append("..")
+
+from system import KNXBus, Telegram, BinaryPayload
+import devices as dev
+from system.system_tools import GroupAddress, IndividualAddress
+
+ga_counts = [10, 100, 1000, 10000]
+nb_telegrams = 200
+# The telegrams are sent to the same number of destinations whatever the number of group addresses,
+# so that only the routing, and not the updated actuators, depends on it
+nb_destinations = 10
+
+
+class CountingReceiveDevice(dev.Actuator):
+    def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
+        super().__init__(name, individual_addr)
+        self.received = 0
+
+    from system.telegrams import Telegram
+
+    def update_state(self, telegram: Telegram) -> None:
+        self.received += 1
+
+    def user_input(self):
+        return
+
+    def get_dev_info(self):
+        pass
+
+
+def group_address(index: int) -> GroupAddress:
+    return GroupAddress("3-levels", index // 2048, (index // 256) % 8, index % 256)
+
+
+def bus_with_group_addresses(ga_count: int):
+    knxbus = KNXBus()
+    receivers = []
+    for i in range(ga_count):
+        receiver = CountingReceiveDevice(f"receiver{i}", IndividualAddress(0, 0, 1))
+        knxbus.attach(receiver, group_address(i))
+        receivers.append(receiver)
+    return knxbus, receivers
+
+
+def test_telegram_routed_to_actuators_of_destination_only():
+    knxbus, receivers = bus_with_group_addresses(10)
+    other_receiver = CountingReceiveDevice("other_receiver", IndividualAddress(0, 0, 2))
+    knxbus.attach(other_receiver, group_address(3))
+
+    knxbus.transmit_telegram(
+        Telegram(IndividualAddress(0, 0, 3), group_address(3), BinaryPayload(True))
+    )
+    # Destination given by its name, as group addresses are compared by name
+    knxbus.transmit_telegram(
+        Telegram(IndividualAddress(0, 0, 3), "0/0/3", BinaryPayload(True))
+    )
+
+    assert [r.received for r in receivers] == [0, 0, 0, 2, 0, 0, 0, 0, 0, 0]
+    assert other_receiver.received == 2
+
+
+def test_telegram_not_routed_after_detach():
+    knxbus, receivers = bus_with_group_addresses(2)
+    knxbus.detach(receivers[1], group_address(1))
+
+    knxbus.transmit_telegram(
+        Telegram(IndividualAddress(0, 0, 3), group_address(1), BinaryPayload(True))
+    )
+
+    assert receivers[1].received == 0
+    assert group_address(1) not in knxbus.group_addresses
+    assert "0/0/1" not in knxbus.get_info()["group_addresses"]
+
+    knxbus.attach(receivers[1], group_address(1))
+    knxbus.transmit_telegram(
+        Telegram(IndividualAddress(0, 0, 3), group_address(1), BinaryPayload(True))
+    )
+
+    assert receivers[1].received == 1
+
+
+def test_routing_cost_does_not_grow_with_group_addresses(monkeypatch):
+    # Routing is a dictionary lookup: the group addresses compared and the actuators visited per telegram
+    # should not depend on the number of group addresses
+    comparisons = 0
+    group_address_eq = GroupAddress.__eq__
+
+    def counting_eq(self, other):
+        nonlocal comparisons
+        comparisons += 1
+        return group_address_eq(self, other)
+
+    monkeypatch.setattr(GroupAddress, "__eq__", counting_eq)
+    costs = {}
+    for ga_count in ga_counts:
+        knxbus, receivers = bus_with_group_addresses(ga_count)
+        telegrams = [
+            Telegram(
+                IndividualAddress(0, 0, 3),
+                group_address((i % nb_destinations) * 7919 % ga_count),
+                BinaryPayload(True),
+            )
+            for i in range(nb_telegrams)
+        ]
+        comparisons = 0
+        for telegram in telegrams:
+            knxbus.transmit_telegram(telegram)
+        visited = sum(r.received for r in receivers)
+        costs[ga_count] = (comparisons / nb_telegrams, visited / nb_telegrams)
+
+    assert all(cost == costs[ga_counts[0]] for cost in costs.values())
+    assert costs[ga_counts[0]] == (0, 1)
@@ -0,0 +1,182 @@
+""" Test the load generator mode: devices generated from a load spec, scheduled traffic and latencies of the responses"""
+
+import sys, os
+sys.path.append("..")
+
+import asyncio
+import json
+
+import pytest
+
+import system
+import tools
+import devices as dev
+from tools.load_tools import offset_group_address
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+empty_config_path = f"{SVSHI_HOME}/src/simulator-knx/config/empty_config.json"
+
+RESPONSE_DELAY = 0.02
+
+
+class FakeSVSHIApp(dev.Actuator):
+    """App receiving the telegrams of the senders, that responds on the group address of their actuator after a delay"""
+
+    def __init__(self, room, response_addresses, delay: float = RESPONSE_DELAY):
+        super().__init__("fakeapp", system.IndividualAddress(1, 1, 250))
+        self.room = room
+        self.response_addresses = response_addresses
+        self.delay = delay
+        self.received = 0
+
+    def update_state(self, telegram) -> None:
+        self.received += 1
+        response = system.Telegram(
+            self.individual_addr,
+            self.response_addresses[str(telegram.destination)],
+            telegram.payload,
+        )
+        asyncio.get_running_loop().call_later(
+            self.delay, self.room.knxbus.transmit_telegram, response
+        )
+
+    def user_input(self):
+        return
+
+    def get_dev_info(self):
+        pass
+
+
+def write_load_spec(tmp_path, load_spec: dict) -> str:
+    load_spec_path = str(tmp_path / "load_spec.json")
+    with open(load_spec_path, "w") as file:
+        json.dump(load_spec, file)
+    return load_spec_path
+
+
+LOAD_SPEC = {
+    "duration": 0.5,
+    "response_timeout": 0.2,
+    "seed": 1,
+    "group_address_style": "3-levels",
+    "groups": [
+        {
+            "name": "buttons",
+            "class": "Button",
+            "count": 5,
+            "rate": 20,
+            "jitter": 0.005,
+            "group_address": "1/0/254",
+            "response_class": "LED",
+            "response_group_address": "2/0/1",
+        },
+        {
+            "name": "dimmers",
+            "class": "Dimmer",
+            "count": 2,
+            "rate": 20,
+            "burst_size": 5,
+            "group_address": "1/1/100",
+        },
+    ],
+}
+
+
+def test_offset_group_addresses():
+    assert offset_group_address("1/0/254", "3-levels", 3) == "1/1/1"
+    assert offset_group_address("1/7/255", "3-levels", 1) == "2/0/0"
+    assert offset_group_address("31/7/255", "3-levels", 1) is None
+    assert offset_group_address("1/2046", "2-levels", 3) == "2/1"
+    assert offset_group_address("65530", "free", 5) == "65535"
+
+
+def test_load_spec_generates_devices(tmp_path):
+    room, load_generator = tools.configure_load_from_file(
+        write_load_spec(tmp_path, LOAD_SPEC),
+        empty_config_path,
+        test_mode=True,
+        svshi_mode=False,
+    )
+    with open(str(tmp_path / "load_spec_generated.json"), "r") as file:
+        generated_config = json.load(file)
+    assert len(generated_config["knx"]["group_addresses"]) == 12
+    devices = {d.name: d.device for d in room.devices}
+    assert sorted(devices) == sorted(
+        [f"button{i}" for i in range(1, 6)]
+        + [f"led{i}" for i in range(1, 6)]
+        + ["dimmer6", "dimmer7"]
+    )
+    assert devices["button3"].group_addresses[0].name == "1/1/0"
+    assert devices["led5"].group_addresses[0].name == "2/0/5"
+    assert devices["dimmer7"].group_addresses[0].name == "1/1/101"
+    # the probe receives the telegrams on the response group addresses
+    assert load_generator.probe.group_addresses[0].name == "2/0/1"
+
+
+@pytest.mark.parametrize(
+    "group_config",
+    [
+        {"class": "LED", "group_address": "1/0/0"},  # actuators cannot send
+        {"class": "Button", "response_class": "Dimmer", "response_group_address": "2/0/0"},
+        {"class": "Button", "response_class": "LED"},  # no response group address
+        {"class": "Button", "rate": 0},
+        {"class": "Button", "count": 10, "group_address": "31/7/250"},
+        {"class": "Button", "period": 1},
+    ],
+)
+def test_incorrect_traffic_groups_are_rejected(tmp_path, group_config):
+    load_spec = dict(LOAD_SPEC, groups=[group_config])
+    assert (
+        tools.configure_load_from_file(
+            write_load_spec(tmp_path, load_spec), empty_config_path, test_mode=True
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_generator_measures_latencies(tmp_path):
+    room, load_generator = tools.configure_load_from_file(
+        write_load_spec(tmp_path, LOAD_SPEC),
+        empty_config_path,
+        test_mode=True,
+        svshi_mode=False,
+    )
+    devices = {d.name: d.device for d in room.devices}
+    response_addresses = {
+        str(devices[f"button{i}"].group_addresses[0]): devices[
+            f"led{i}"
+        ].group_addresses[0]
+        for i in range(1, 6)
+    }
+    app = FakeSVSHIApp(room, response_addresses)
+    for address in response_addresses:
+        room.knxbus.attach(
+            app, system.GroupAddress("3-levels", *map(int, address.split("/")))
+        )
+
+    report = await load_generator.run()
+
+    # 20 telegrams/s during 0.5s for each sender
+    groups = report["groups"]
+    assert 45 <= groups["buttons"]["telegrams_sent"] <= 55
+    assert 15 <= groups["dimmers"]["telegrams_sent"] <= 25
+    assert groups["dimmers"]["telegrams_sent"] % 5 == 0  # sent in bursts
+    assert report["telegrams_sent"] == sum(g["telegrams_sent"] for g in groups.values())
+    assert app.received == groups["buttons"]["telegrams_sent"]
+    # every telegram of the buttons is matched with the response on its LED
+    assert report["responses"] == groups["buttons"]["responses"] == app.received
+    assert report["unanswered"] == report["unmatched_responses"] == 0
+    assert groups["dimmers"]["latency_ms"] == {"count": 0}
+    latency = report["latency_ms"]
+    assert RESPONSE_DELAY * 1000 <= latency["p50"] <= latency["max"] < 200
+    assert report["schedule_lag_ms"]["p50"] < 20
+    # the LEDs followed the responses
+    assert devices["led1"].state == devices["button1"].state
+
+    # without responses, the telegrams are counted as unanswered after the timeout
+    for address in response_addresses:
+        app.response_addresses[address] = system.GroupAddress("3-levels", 5, 0, 0)
+    report = await load_generator.run()
+    assert report["responses"] == 0
+    assert report["unanswered"] == report["groups"]["buttons"]["telegrams_sent"]
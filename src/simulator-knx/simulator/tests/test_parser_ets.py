@@ -0,0 +1,156 @@
+""" Test the streaming parser of ETS projects, from the zipped .knxproj or its extracted folder"""
+
+import sys, os
+sys.path.append("..")
+
+import zipfile
+
+from bs4 import BeautifulSoup
+
+import parser_ets
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+project_path = f"{SVSHI_HOME}/src/simulator-knx/docs/catalog/catalogproject_sensors/"
+
+SYNTHETIC_CATALOG = """<?xml version="1.0" encoding="utf-8"?>
+<KNX xmlns="http://knx.org/xml/project/20">
+  <ManufacturerData>
+    <Manufacturer RefId="M-0001">
+      <Catalog>
+        <CatalogSection Id="M-0001_CS-1" Name="Sensoren">
+          <CatalogItem Id="M-0001_CI-0" Name="Ignored" ProductRefId="P-0" Hardware2ProgramRefId="HP-0" />
+          <CatalogSection Id="M-0001_CS-1-1" Name="Helligkeit">
+            <CatalogItem Id="M-0001_CI-1" Name="Lichtsensor" ProductRefId="P-1" Hardware2ProgramRefId="HP-1" />
+            <CatalogItem Id="M-0001_CI-2" Name="Dämmerungsschalter" ProductRefId="P-2" Hardware2ProgramRefId="HP-2" />
+          </CatalogSection>
+        </CatalogSection>
+      </Catalog>
+      <Languages>
+        <Language Identifier="de-DE">
+          <TranslationUnit RefId="M-0001_CS-1">
+            <TranslationElement RefId="M-0001_CS-1">
+              <Translation AttributeName="Name" Text="Sensoren" />
+            </TranslationElement>
+          </TranslationUnit>
+        </Language>
+        <Language Identifier="en-US">
+          <TranslationUnit RefId="M-0001_CS-1">
+            <TranslationElement RefId="M-0001_CS-1">
+              <Translation AttributeName="Name" Text="Sensors" />
+            </TranslationElement>
+            <TranslationElement RefId="M-0001_CI-1">
+              <Translation AttributeName="VisibleDescription" Text="Measures the brightness" />
+              <Translation AttributeName="Name" Text="Light sensor" />
+            </TranslationElement>
+          </TranslationUnit>
+        </Language>
+      </Languages>
+    </Manufacturer>
+  </ManufacturerData>
+</KNX>
+"""
+
+
+def item_values(items):
+    return [sorted(vars(item).items()) for item in items]
+
+
+def zip_project(folder_path: str, knxproj_path: str) -> None:
+    with zipfile.ZipFile(knxproj_path, "w") as archive:
+        for root, _, files in os.walk(folder_path):
+            for file_name in files:
+                file_path = os.path.join(root, file_name)
+                archive.write(file_path, os.path.relpath(file_path, folder_path))
+
+
+def test_items_are_named_in_english_from_one_pass(tmp_path):
+    catalog_path = tmp_path / "Catalog.xml"
+    catalog_path.write_text(SYNTHETIC_CATALOG, encoding="utf-8")
+    manufacturer = parser_ets.Manufacturer("M-0001", "Siemens", "de-DE")
+
+    with open(catalog_path, "rb") as catalog_file:
+        items = parser_ets.stream_catalog_items(catalog_file, manufacturer)
+
+    # only the items under 2nd level sections are devices
+    assert [item.item_refid for item in items] == ["M-0001_CI-1", "M-0001_CI-2"]
+    assert items[0].item_name == "Light sensor"
+    assert items[0].firstlevel_section_name == "Sensors"
+    assert items[0].item_product_refid == "P-1"
+    assert items[0].item_hardware2program_refid == "HP-1"
+    # without english translation, the name in the default language is kept
+    assert items[1].item_name == "Dämmerungsschalter"
+    assert items[1].secondlevel_section_name == "Helligkeit"
+
+
+def test_parsed_elements_are_released(tmp_path, monkeypatch):
+    nb_items = 2000
+    catalog_items = "".join(
+        f'<CatalogItem Id="M-0001_CI-{i}" Name="Sensor {i}" ProductRefId="P-{i}" Hardware2ProgramRefId="HP-{i}" />'
+        for i in range(3, 3 + nb_items)
+    )
+    catalog_path = tmp_path / "Catalog.xml"
+    catalog_path.write_text(
+        SYNTHETIC_CATALOG.replace(
+            "</CatalogSection>", catalog_items + "</CatalogSection>", 1
+        ),
+        encoding="utf-8",
+    )
+    manufacturer = parser_ets.Manufacturer("M-0001", "Siemens", "de-DE")
+    # Largest number of elements reachable from the root during each parsing
+    max_reachable = []
+    iterparse = parser_ets.ET.iterparse
+
+    def recording_iterparse(*args, **kwargs):
+        events = iterparse(*args, **kwargs)
+        event, root = next(events)
+        max_reachable.append(1)
+        yield event, root
+        for event, element in events:
+            max_reachable[-1] = max(max_reachable[-1], sum(1 for _ in root.iter()))
+            yield event, element
+
+    monkeypatch.setattr(parser_ets.ET, "iterparse", recording_iterparse)
+
+    with open(catalog_path, "rb") as catalog_file:
+        items = parser_ets.stream_catalog_items(catalog_file, manufacturer)
+    with open(catalog_path, "rb") as catalog_file:
+        tags = [tag for tag, _ in parser_ets.iterparse_starts(catalog_file)]
+
+    assert len(items) == 2 + nb_items
+    assert tags.count("CatalogItem") == 3 + nb_items
+    # the elements parsed are not kept by the root, only the ones opened or read ahead by the parser are reachable
+    assert len(max_reachable) == 2
+    assert all(reachable < nb_items / 4 for reachable in max_reachable)
+
+
+def test_zipped_project_gives_the_same_items_as_the_extracted_one(tmp_path):
+    with open(project_path + "knx_master.xml", "r") as master_file:
+        master_parser = BeautifulSoup(master_file.read(), "xml")
+    manufacturers = parser_ets.build_manufacturers_list(master_parser, project_path)
+    expected_items = parser_ets.build_devices_list(project_path, manufacturers)
+    knxproj_path = str(tmp_path / "project.knxproj")
+    zip_project(project_path, knxproj_path)
+
+    zip_manufacturers, zip_items = parser_ets.parse_ets_project(knxproj_path)
+    folder_manufacturers, folder_items = parser_ets.parse_ets_project(project_path)
+
+    assert [m.man_refid for m in zip_manufacturers] == [
+        "M-0002",
+        "M-0004",
+        "M-0006",
+        "M-006C",
+        "M-0083",
+    ]
+    assert zip_manufacturers[0].man_name == "ABB"
+    assert zip_manufacturers[0].man_language == "en-US"
+    assert len(zip_items) == 7
+    assert item_values(zip_items) == item_values(folder_items)
+    assert sorted(item_values(zip_items)) == sorted(item_values(expected_items))
+
+
+def test_project_without_master_file_is_rejected(tmp_path):
+    knxproj_path = str(tmp_path / "project.knxproj")
+    with zipfile.ZipFile(knxproj_path, "w") as archive:
+        archive.writestr("M-0001/Catalog.xml", SYNTHETIC_CATALOG)
+
+    assert parser_ets.parse_ets_project(knxproj_path) is None
@@ -0,0 +1,67 @@
+""" Test the parallel run of scenarios, each one in its own headless simulator on its own KNX port"""
+
+import sys, os
+sys.path.append("..")
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+sys.path.append(f"{SVSHI_HOME}/src/simulator-knx")
+
+import scenario_runner
+
+empty_config_path = f"{SVSHI_HOME}/src/simulator-knx/config/empty_config.json"
+
+successful_scenario = """
+store world temperature temp_start
+wait 1 h
+store world temperature temp_end
+assert temp_end >= -100
+end
+"""
+failed_scenario = """
+store world temperature temp_start
+assert temp_start >= 1000
+end
+"""
+
+
+def write_script(tmp_path, name: str, script: str) -> str:
+    script_path = str(tmp_path / f"{name}.txt")
+    with open(script_path, "w") as file:
+        file.write(script)
+    return script_path
+
+
+def test_scenario_arguments_get_distinct_ports():
+    scenarios = scenario_runner.create_scenarios(
+        ["light", "light_temp:svshi_config_lighttemp", "full_script"],
+        "sim_config_bedroom",
+        4000,
+    )
+    assert [s.knx_port for s in scenarios] == [4000, 4001, 4002]
+    assert [s.config for s in scenarios] == [
+        "sim_config_bedroom",
+        "svshi_config_lighttemp",
+        "sim_config_bedroom",
+    ]
+    command = scenarios[1].simulator_command(True, "WARNING")
+    assert command[command.index("-k") + 1] == "4001"
+    assert command[command.index("-f") + 1] == "light_temp"
+    assert "-s" in command
+
+
+def test_scenarios_run_in_parallel_simulators(tmp_path):
+    scenarios = scenario_runner.create_scenarios(
+        [
+            write_script(tmp_path, "successful", successful_scenario),
+            write_script(tmp_path, "failed", failed_scenario),
+        ],
+        empty_config_path,
+        4100,
+    )
+    results = scenario_runner.run_scenarios(scenarios, parallelism=2, timeout=60)
+
+    assert [r["knx_port"] for r in results] == [4100, 4101]
+    assert results[0]["success"] and results[0]["returncode"] == 0
+    assert not results[1]["success"] and results[1]["returncode"] == 1
+    assert not any(r["timed_out"] for r in results)
+    assert "Failed script recap:" in results[1]["output_tail"]
@@ -0,0 +1,131 @@
+""" Test the compilation of scripts into commands before they run, and the execution of the compiled commands"""
+
+import sys
+sys.path.append("..")
+
+import pytest
+
+import tools
+from tools.script_tools import (
+    AssertBatch,
+    SetFunctionalModuleCommand,
+    StoreDeviceCommand,
+    WaitCommand,
+    compile_script,
+)
+
+regression_scenario = """
+# the heater follows the button
+set button1 ON
+wait 10 m
+store heater1 state heater_on
+store world temperature temp_on
+set button1 OFF
+wait 1 h
+store heater1 state heater_off
+store world temperature temp_off
+assert heater_on == True
+assert heater_off == False
+assert temp_off <= temp_on
+end
+"""
+
+
+def test_script_is_compiled_into_typed_commands():
+    commands, errors = compile_script(regression_scenario.splitlines())
+
+    assert errors == []
+    assert [type(c) for c in commands[:3]] == [
+        SetFunctionalModuleCommand,
+        WaitCommand,
+        StoreDeviceCommand,
+    ]
+    assert commands[0].state is True and commands[0].line_number == 3
+    assert commands[1].duration == 10 and commands[1].unit_seconds == 60
+    # the consecutive assertions are evaluated in one batch
+    assert isinstance(commands[-2], AssertBatch)
+    assert len(commands[-2].assertions) == 3
+
+
+def test_all_syntax_errors_are_reported_before_running():
+    script = [
+        "wait 2 x",
+        "store world state world_1",
+        "set dimmer1 ON 160",
+        "set temperature 21",
+        "assert temp == or <= temp2",
+        "fly away",
+        "show all",
+    ]
+    parser = tools.ScriptParser()
+
+    assert parser.compile_script(script) is None
+    assert len(parser.syntax_errors) == 6
+    assert parser.syntax_errors[0].startswith("Line 1 'wait 2 x'")
+    assert parser.syntax_errors[5].startswith("Line 6 'fly away'")
+
+
+@pytest.mark.asyncio
+async def test_store_reads_the_same_values_as_getinfo(headless_room):
+    room = headless_room()
+    parser = tools.ScriptParser()
+    commands = parser.compile_script(
+        [
+            "wait 1 h",
+            "store world temperature temp",
+            "store world brightness bright",
+            "store world weather weather",
+            "store led1 max_lumen lumen",
+            "store heater1 effective_power power",
+        ]
+    )
+    ret, _ = await parser.run_script(room, commands)
+
+    assert ret == 1
+    world_info = room.get_world_info(ambient="temperature", str_mode=False)
+    assert parser.stored_values["temp"] == round(world_info["temperature_in"], 2)
+    world_info = room.get_world_info(ambient="brightness", str_mode=False)
+    assert parser.stored_values["bright"] == round(world_info["brightness_in"], 2)
+    assert parser.stored_values["weather"] == room.get_world_info("weather")["weather"]
+    assert parser.stored_values["lumen"] == room.get_device_info("led1", "max_lumen")
+    assert parser.stored_values["power"] == room.get_device_info(
+        "heater1", "effective_power"
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_assertions_of_a_batch_are_all_reported(headless_room):
+    room = headless_room()
+    parser = tools.ScriptParser()
+    commands = parser.compile_script(
+        [
+            "store world temperature temp",
+            "assert temp >= 1000",
+            "assert temp <= 1000",
+            "assert temp == 1000",
+            "end",
+        ]
+    )
+    ret, assertions = await parser.run_script(room, commands)
+
+    assert ret is None
+    assert len(assertions) == 3
+    keys = list(assertions)
+    assert keys[0].startswith("Assertion False0 FAILED")
+    assert keys[1].startswith("Assertion True1")
+    assert keys[2].startswith("Assertion False2 FAILED")
+
+
+@pytest.mark.asyncio
+async def test_compiled_scenario_runs_repeatedly(headless_room):
+    commands, _ = compile_script(regression_scenario.splitlines())
+
+    for _ in range(20):
+        parser = tools.ScriptParser()
+        ret, assertions = await parser.run_script(headless_room(), commands)
+        assert ret == 0
+        assert len(assertions) == 3
+        assert all(key.startswith("Assertion True") for key in assertions)
+        # device states are stored as booleans, not rounded to numbers
+        assert parser.stored_values["heater_on"] is True
+        assert parser.stored_values["heater_off"] is False
@@ -0,0 +1,165 @@
+""" Test the send policies filtering the telegrams sent by sensors"""
+
+import json
+import os
+import sys
+
+sys.path.append("..")
+
+from system import Room, IndividualAddress
+import devices as dev
+import tools
+
+system_dt = 1
+simulation_speed_factor = 60  # one simulated minute per update
+
+
+class CountingReceiveDevice(dev.Actuator):
+    def __init__(self, name: str, individual_addr: IndividualAddress) -> None:
+        super().__init__(name, individual_addr)
+        self.received = []
+
+    from system.telegrams import Telegram
+
+    def update_state(self, telegram: Telegram) -> None:
+        self.received.append(telegram.payload.content)
+
+    def user_input(self):
+        return
+
+    def get_dev_info(self):
+        pass
+
+
+def room_with_thermometer(send_policy):
+    room = Room(
+        "bedroom1",
+        20,
+        20,
+        3,
+        simulation_speed_factor,
+        "3-levels",
+        system_dt,
+        "good",
+        20.0,
+        50.0,
+        300,
+        test_mode=True,
+        svshi_mode=False,
+        telegram_logging=False,
+    )
+    thermometer = dev.Thermometer("thermometer1", IndividualAddress(0, 0, 7))
+    thermometer.send_policy = send_policy
+    receiver = CountingReceiveDevice("receiver", IndividualAddress(0, 0, 30))
+    room.add_device(thermometer, 10, 10, 1)
+    thermometer.connect_to(room.knxbus)
+    room.add_device(receiver, 0, 1, 0)
+    room.attach(thermometer, "1/1/1")
+    room.attach(receiver, "1/1/1")
+    return room, thermometer, receiver
+
+
+def update(room, temperature):
+    room.world.ambient_temperature.set_temperature("in", temperature)
+    room.world.ambient_temperature.set_temperature("out", temperature)
+    room.world.time.update_datetime()
+    room.world.ambient_temperature.update()
+
+
+def test_all_values_sent_without_policy():
+    room, thermometer, receiver = room_with_thermometer(None)
+
+    for temperature in [20, 20, 20]:
+        update(room, temperature)
+
+    assert receiver.received == [20, 20, 20]
+    assert thermometer.suppressed_telegrams == 0
+
+
+def test_unchanged_values_suppressed_until_max_send_interval():
+    # Sent again after 3 simulated minutes without change
+    room, thermometer, receiver = room_with_thermometer(
+        dev.SendPolicy(max_send_interval=180)
+    )
+
+    for temperature in [20, 20, 20, 20, 21, 21]:
+        update(room, temperature)
+
+    # first value, after 180s, on change
+    assert receiver.received == [20, 20, 21]
+    assert thermometer.suppressed_telegrams == 3
+    assert room.knxbus.suppressed_telegrams == 3
+    assert room.get_bus_info()["suppressed_telegrams"] == 3
+
+
+def test_values_sent_on_delta():
+    room, thermometer, receiver = room_with_thermometer(
+        dev.SendPolicy(send_on_delta=0.5)
+    )
+
+    for temperature in [20, 20.2, 20.4, 20.5, 21.1, 20.9]:
+        update(room, temperature)
+
+    # the change is computed from the last value sent
+    assert receiver.received == [20, 20.5, 21.1]
+    assert thermometer.suppressed_telegrams == 3
+
+
+def test_values_sent_on_delta_percent_at_most_every_min_send_interval():
+    room, thermometer, receiver = room_with_thermometer(
+        dev.SendPolicy(send_on_delta_percent=10, min_send_interval=120)
+    )
+
+    for temperature in [20, 25, 25, 24, 24, 21]:
+        update(room, temperature)
+
+    # updates every 60s: the first 25 and 24 are suppressed by the min interval,
+    # the second 24 is less than 10% away from 25, 21 is not
+    assert receiver.received == [20, 25, 21]
+    assert thermometer.suppressed_telegrams == 3
+
+
+def test_check_send_policy():
+    send_policy = tools.check_send_policy(
+        "thermometer1", {"send_on_delta": 0.5, "max_send_interval": 600}
+    )
+    assert send_policy.send_on_delta == 0.5
+    assert send_policy.send_on_delta_percent is None
+    assert send_policy.min_send_interval == 0
+    assert send_policy.max_send_interval == 600
+
+    assert tools.check_send_policy("thermometer1", {"send_on_change": 1}) is None
+    assert tools.check_send_policy("thermometer1", {"send_on_delta": -1}) is None
+    assert tools.check_send_policy("thermometer1", {"send_on_delta": "1"}) is None
+    assert (
+        tools.check_send_policy(
+            "thermometer1", {"min_send_interval": 60, "max_send_interval": 10}
+        )
+        is None
+    )
+
+
+def test_send_policy_from_config_file(tmp_path):
+    SVSHI_HOME = os.environ["SVSHI_HOME"]
+    config_path = f"{SVSHI_HOME}/src/simulator-knx/config/config_test_config.json"
+    with open(config_path, "r") as file:
+        config_dict = json.load(file)
+    devices_config = config_dict["knx"]["area0"]["line0"]["devices"]
+    devices_config["brightness1"]["send_policy"] = {
+        "send_on_delta_percent": 5,
+        "min_send_interval": 10,
+    }
+    devices_config["led1"]["send_policy"] = {"send_on_delta": 1}
+    policy_config_path = tmp_path / "send_policy_config.json"
+    with open(policy_config_path, "w") as file:
+        json.dump(config_dict, file)
+
+    room_conf, _ = tools.configure_system_from_file(
+        str(policy_config_path), system_dt, test_mode=True
+    )
+
+    devices_conf = {ir_dev.name: ir_dev.device for ir_dev in room_conf.devices}
+    assert devices_conf["brightness1"].send_policy.send_on_delta_percent == 5
+    assert devices_conf["brightness1"].send_policy.min_send_interval == 10
+    assert devices_conf["airsensor1"].send_policy is None
+    assert not hasattr(devices_conf["led1"], "send_policy")
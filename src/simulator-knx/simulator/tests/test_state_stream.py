@@ -0,0 +1,177 @@
+""" Test the stream of the simulation state, and the event stream and non-blocking start of the web API"""
+
+import sys, os
+sys.path.append("..")
+
+import json
+
+import pytest
+
+import system
+import tools
+from system import STATE_STREAM, StateStream
+from system.state_stream import format_sse_event
+
+SVSHI_HOME = os.environ["SVSHI_HOME"]
+sys.path.append(f"{SVSHI_HOME}/src/simulator-knx/web_api")
+config_path = f"{SVSHI_HOME}/src/simulator-knx/config/config_test_config.json"
+
+
+@pytest.fixture
+def stream():
+    STATE_STREAM.enabled = True
+    yield STATE_STREAM
+    STATE_STREAM.enabled = False
+    STATE_STREAM.reset()
+
+
+def configured_room():
+    room, _ = tools.configure_system_from_file(config_path, system_dt=1, test_mode=True)
+    return room
+
+
+def test_new_client_gets_a_snapshot_then_deltas(stream):
+    room = configured_room()
+    room.update_world()
+    client = stream.subscribe()
+
+    snapshot = client.pop_events(stream, timeout=0)[0]
+    assert snapshot["type"] == "snapshot"
+    room_state = snapshot["rooms"][room.name]
+    assert room_state["devices"]["led1"]["state"] is False
+    assert "temperature_in" in room_state["world"]
+
+    led = room.devices[[d.name for d in room.devices].index("led1")].device
+    led.state = True
+    room.update_world()
+    deltas = [e for e in client.pop_events(stream, timeout=0) if e["type"] == "delta"]
+    assert len(deltas) == 1
+    # only the states that changed are sent
+    assert deltas[0]["devices"]["led1"]["state"] is True
+    assert "max_lumen" not in deltas[0]["devices"]["led1"]
+    assert deltas[0]["seq"] > snapshot["seq"]
+    stream.unsubscribe(client)
+
+
+def test_telegrams_are_streamed_as_they_are_transmitted(stream):
+    room = configured_room()
+    client = stream.subscribe()
+    client.pop_events(stream, timeout=0)  # snapshot
+
+    telegram = system.Telegram(
+        system.IndividualAddress(0, 0, 1),
+        system.GroupAddress("3-levels", main=1, middle=1, sub=1),
+        system.BinaryPayload(True),
+    )
+    room.knxbus.transmit_telegram(telegram)
+    event = client.pop_events(stream, timeout=0)[0]
+
+    assert event["type"] == "telegram"
+    assert event["source"] == "0.0.1"
+    assert event["destination"] == "1/1/1"
+    assert event["payload"] == {"content": True}
+    json.loads(format_sse_event(event).split("data: ")[1])
+    stream.unsubscribe(client)
+
+
+def test_slow_client_is_resynchronized_without_blocking_the_publisher():
+    stream = StateStream()
+    fast_client = stream.subscribe()
+    slow_client = stream.subscribe(max_events=3)
+    fast_client.pop_events(stream, timeout=0)
+    slow_client.pop_events(stream, timeout=0)
+
+    telegram = system.Telegram(
+        system.IndividualAddress(0, 0, 1),
+        system.GroupAddress("3-levels", main=1, middle=1, sub=1),
+        system.FloatPayload(21.5),
+    )
+    for _ in range(10):
+        stream.publish_telegram(telegram)
+
+    assert len(fast_client.pop_events(stream, timeout=0)) == 10
+    events = slow_client.pop_events(stream, timeout=0)
+    # the queued events were dropped, the client restarts from a snapshot
+    assert [e["type"] for e in events] == ["snapshot"]
+    assert events[0]["dropped_events"] == 10
+    assert slow_client.dropped_events == 10
+
+
+def test_start_returns_a_handle_polled_until_ready(stream):
+    import web_api
+
+    state = web_api.WebApiState()
+    client = web_api.create_app(state).test_client()
+    response = client.post("/simulator/start")
+    assert response.status_code == 202
+    handle = response.get_json()["handle"]
+    assert response.get_json()["state"] == "starting"
+    assert state.sim_start_event.is_set()
+
+    # called by the interface of the simulation launched for this start when it waits for svshi connection
+    state.current_sim_handle.set_ready()
+    response = client.get(f"/simulator/start/{handle}")
+    assert response.get_json()["state"] == "ready"
+    assert response.get_json()["ready"]
+
+    client.post("/simulator/stop")
+    assert client.get(f"/simulator/start/{handle}").get_json()["state"] == "stopped"
+    assert client.get("/simulator/start/unknown").status_code == 404
+
+
+def test_handles_of_previous_starts_stay_stopped(stream):
+    import web_api
+
+    state = web_api.WebApiState()
+    client = web_api.create_app(state).test_client()
+    handle = client.post("/simulator/start").get_json()["handle"]
+    set_first_ready = state.current_sim_handle.set_ready
+    new_handle = client.post("/simulator/start").get_json()["handle"]
+    assert client.get(f"/simulator/start/{handle}").get_json()["state"] == "stopped"
+    response = client.get(f"/simulator/start/{new_handle}")
+    assert response.get_json()["state"] == "starting"
+
+    # the simulation of the newest start is ready, the late one of the previous start changes nothing
+    state.current_sim_handle.set_ready()
+    set_first_ready()
+    assert client.get(f"/simulator/start/{handle}").get_json()["state"] == "stopped"
+    assert client.get(f"/simulator/start/{new_handle}").get_json()["state"] == "ready"
+    client.post("/simulator/stop")
+    assert client.get(f"/simulator/start/{new_handle}").get_json()["state"] == "stopped"
+
+
+def test_web_api_apps_have_their_own_state(stream):
+    import web_api
+
+    first_state = web_api.WebApiState("127.0.0.1", 4646)
+    second_state = web_api.WebApiState("127.0.0.2", 4647)
+    first_client = web_api.create_app(first_state).test_client()
+    second_client = web_api.create_app(second_state).test_client()
+    handle = first_client.post("/simulator/start").get_json()["handle"]
+    assert first_client.get("/simulator/running").get_json()["isRunning"]
+    assert not second_client.get("/simulator/running").get_json()["isRunning"]
+    assert second_client.get(f"/simulator/start/{handle}").status_code == 404
+    assert second_client.get("/simulator/ipAddr").get_json()["address"] == "127.0.0.2"
+    first_client.post("/simulator/stop")
+
+
+def test_event_stream_sends_server_sent_events(stream):
+    import web_api
+
+    room = configured_room()
+    room.update_world()
+    client = web_api.create_app(web_api.WebApiState()).test_client()
+    state = client.get("/simulator/simulation-state").get_json()
+    assert "led1" in state["rooms"][room.name]["devices"]
+
+    response = client.get("/simulator/events", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    chunks = response.response
+    message = next(chunks).decode()
+    assert message.startswith("id: ")
+    assert "event: snapshot" in message
+    room.update_world()  # simulated time changes
+    message = next(chunks).decode()
+    assert "event: delta" in message
+    assert json.loads(message.split("data: ")[1])["room"] == room.name
+    response.close()
@@ -0,0 +1,81 @@
+""" Test the buffered logging of the telegrams exchanged with SVSHI in JSONL files"""
+
+import sys
+sys.path.append("..")
+
+import json
+
+import system
+import system.telegrams as sim_t
+from svshi_interface import TelegramLogger, TelegramParser
+
+
+def create_parser() -> TelegramParser:
+    parser = TelegramParser()
+    parser.group_address_to_payload = {
+        "1/1/1": sim_t.BinaryPayload,
+        "1/1/2": sim_t.FloatPayload,
+        "1/1/3": sim_t.DimmerPayload,
+    }
+    return parser
+
+
+def knx_telegram(parser: TelegramParser, sub: int, payload: sim_t.Payload):
+    return parser.from_simulator_telegram(
+        sim_t.Telegram(
+            system.IndividualAddress(0, 0, 5),
+            system.GroupAddress("3-levels", 1, 1, sub),
+            payload,
+        )
+    )
+
+
+def read_records(path):
+    with open(path, "r") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_telegrams_are_logged_as_json_lines(tmp_path):
+    parser = create_parser()
+    logger = TelegramLogger(parser)
+    log_path = str(tmp_path / "telegram_logs.jsonl")
+
+    binary = knx_telegram(parser, 1, sim_t.BinaryPayload(True))
+    logger.log(log_path, True, binary)
+    logger.log(log_path, True, knx_telegram(parser, 2, sim_t.FloatPayload(21.5)))
+    logger.log(log_path, True, knx_telegram(parser, 3, sim_t.DimmerPayload(True, 40)))
+    received = knx_telegram(parser, 1, sim_t.BinaryPayload(False))
+    logger.log(log_path, False, received, parser.from_knx_telegram(received))
+    assert logger.flush(timeout=5)
+
+    records = read_records(log_path)
+    assert [r["direction"] for r in records] == ["sent"] * 3 + ["received"]
+    assert records[0]["group_address"] == "1/1/1"
+    assert records[0]["source"] == "0.0.5"
+    assert records[0]["apdu"] == "0081"
+    assert records[0]["value"] is True
+    assert records[1]["value"] == 21.5
+    assert records[2]["value"] is True
+    assert records[2]["state_ratio"] == round(40 / 100 * 255) / 255 * 100
+    assert records[3]["value"] is False
+    assert records[0]["timestamp"] <= records[3]["timestamp"]
+    logger.close()
+
+
+def test_logger_switches_file_and_writes_remaining_telegrams_on_close(tmp_path):
+    parser = create_parser()
+    logger = TelegramLogger(parser, flush_interval=10)
+    first_path = str(tmp_path / "first.jsonl")
+    second_path = str(tmp_path / "second.jsonl")
+    telegram = knx_telegram(parser, 1, sim_t.BinaryPayload(True))
+
+    logger.log(first_path, True, telegram)
+    assert logger.flush(timeout=5)
+    # simulation reloaded, the logs are written in the new room's file
+    for _ in range(100):
+        logger.log(second_path, True, telegram)
+    logger.close()
+
+    assert len(read_records(first_path)) == 1
+    assert len(read_records(second_path)) == 100
+    assert logger.records_written == 101
@@ -1,13 +1,16 @@
 """ Test parsing of telegrams"""
 
+import collections
 import pytest
 import sys
 
 sys.path.append("..")
+import system
 import system.telegrams as sim_t
 import system.system_tools as sim_addr
 from system.telegrams import FloatPayload, BinaryPayload
 from svshi_interface.telegram_parser import *
+import svshi_interface.telegram_parser as telegram_parser
 
 
 def test_telegram_from_simulated_1():
@@ -102,3 +105,79 @@ def test_telegram_from_simulated_3():
     knx_t = parser.from_simulator_telegram(simulator_t)
 
     assert str(simulator_t) == str(parser.from_knx_telegram(knx_t))
+
+
+def test_telegram_codecs_of_group_addresses():
+    parser = TelegramParser()
+    parser.set_ga_to_payload_dict(
+        {"1/1/1": BinaryPayload, "1/1/2": FloatPayload, "1/1/3": sim_t.DimmerPayload}
+    )
+    ia1 = sim_addr.IndividualAddress(1, 1, 2)
+
+    simulator_t = sim_t.Telegram(
+        ia1, sim_addr.GroupAddress("3-levels", 1, 1, 3), sim_t.DimmerPayload(True, 40)
+    )
+    received_t = parser.from_knx_telegram(parser.from_simulator_telegram(simulator_t))
+    assert received_t.payload.content
+    assert received_t.payload.state_ratio == pytest.approx(40, abs=0.5)
+    # the addresses are created once per group address and individual address
+    assert received_t.destination is parser.from_knx_telegram(
+        parser.from_simulator_telegram(simulator_t)
+    ).destination
+    assert str(received_t.source) == str(ia1)
+
+    # group address without payload type: sent but not received
+    simulator_t = sim_t.Telegram(
+        ia1, sim_addr.GroupAddress("3-levels", 1, 1, 4), BinaryPayload(True)
+    )
+    knx_t = parser.from_simulator_telegram(simulator_t)
+    assert str(knx_t.destination_address) == "1/1/4"
+    assert parser.from_knx_telegram(knx_t) is None
+
+
+def test_telegram_parser_creates_addresses_once(monkeypatch):
+    # Addresses created during parsing, counted by module and class
+    created = collections.Counter()
+
+    def counting(module, class_name):
+        address_class = getattr(module, class_name)
+
+        def create(*args, **kwargs):
+            created[f"{module.__name__}.{class_name}"] += 1
+            return address_class(*args, **kwargs)
+
+        monkeypatch.setattr(module, class_name, create)
+
+    payload_types = [BinaryPayload, FloatPayload, sim_t.DimmerPayload]
+    payloads = [BinaryPayload(True), FloatPayload(21.5), sim_t.DimmerPayload(True, 40)]
+    nb_addresses, nb_sources, nb_telegrams = 1000, 200, 5000
+    parser = TelegramParser()
+    parser.set_ga_to_payload_dict(
+        {f"1/{i // 256}/{i % 256}": payload_types[i % 3] for i in range(nb_addresses)}
+    )
+    simulator_telegrams = [
+        sim_t.Telegram(
+            sim_addr.IndividualAddress(0, 0, i % nb_sources + 1),
+            sim_addr.GroupAddress("3-levels", 1, i // 256, i % 256),
+            payloads[i % 3],
+        )
+        for i in range(nb_addresses)
+    ] * (nb_telegrams // nb_addresses)
+    counting(telegram_parser, "GroupAddress")
+    counting(telegram_parser, "IndividualAddress")
+    counting(system, "GroupAddress")
+    counting(system, "IndividualAddress")
+
+    knx_telegrams = [parser.from_simulator_telegram(t) for t in simulator_telegrams]
+    received_telegrams = [parser.from_knx_telegram(t) for t in knx_telegrams]
+
+    assert all(t is not None for t in received_telegrams)
+    # binary and float payloads are received unchanged, the dimmer ratio is rounded to a byte
+    assert str(received_telegrams[0]) == str(simulator_telegrams[0])
+    assert str(received_telegrams[1]) == str(simulator_telegrams[1])
+    # parsing only requires dictionary lookups: the group addresses are created by set_ga_to_payload_dict,
+    # and each individual address is created once whatever the number of telegrams
+    assert created == {
+        "svshi_interface.telegram_parser.IndividualAddress": nb_sources,
+        "system.IndividualAddress": nb_sources,
+    }
@@ -3,6 +3,9 @@ Package tools that gather classes and function tools necessary for the good func
 parser: parse CLIarguments, CLI and API commands
 check: check functions to verify values when intializing or modifying classes or elements
 config: functions to configure the system at start or when the user reloads it.
+script: commands of the script API, compiled from the scripts before they run
+checkpoint: save the simulation state of a room in a file, and restore it to continue the simulation
+load: load generator mode, sending telegrams to SVSHI on a schedule to measure latencies.
 """
 
 from .parser_tools import (
@@ -18,8 +21,13 @@ from .check_tools import (
     check_group_address,
     check_room_config,
     check_device_config,
+    check_send_policy,
+    check_traffic_group,
     check_location,
     check_weather_date,
     check_window,
 )
+from .script_tools import compile_script
+from .checkpoint_tools import save_checkpoint, load_checkpoint
 from .config_tools import configure_system, configure_system_from_file, DEV_CLASSES
+from .load_tools import configure_load_from_file, LoadGenerator
@@ -388,6 +388,149 @@ def check_device_config(
     return name, individual_addr
 
 
+SEND_POLICY_KEYS = [
+    "send_on_delta",
+    "send_on_delta_percent",
+    "min_send_interval",
+    "max_send_interval",
+]
+
+
+def check_send_policy(name: str, send_policy_config: dict):
+    """
+    Check the send policy of a sensor from the config file, and return the SendPolicy object,
+    or None if it is incorrect, the sensor then sends all its values.
+    """
+    from devices import SendPolicy
+
+    try:
+        assert isinstance(send_policy_config, dict)
+        unknown_keys = [k for k in send_policy_config if k not in SEND_POLICY_KEYS]
+        assert not unknown_keys
+    except AssertionError:
+        logging.error(
+            f"The send policy of {name} should be a dict with keys in {SEND_POLICY_KEYS}, but '{send_policy_config}' was given -> all values are sent."
+        )
+        return None
+    for key, value in send_policy_config.items():
+        try:
+            assert (
+                value is None
+                or isinstance(value, numbers.Number)
+                and not isinstance(value, bool)
+                and value >= 0
+            )
+        except AssertionError:
+            logging.error(
+                f"The send policy '{key}' of {name} should be a positive number, but '{value}' was given -> all values are sent."
+            )
+            return None
+    min_send_interval = send_policy_config.get("min_send_interval") or 0
+    max_send_interval = send_policy_config.get("max_send_interval")
+    try:
+        assert max_send_interval is None or max_send_interval >= min_send_interval
+    except AssertionError:
+        logging.error(
+            f"The max_send_interval of {name} should be greater than its min_send_interval, but {max_send_interval} < {min_send_interval} -> all values are sent."
+        )
+        return None
+    return SendPolicy(
+        send_policy_config.get("send_on_delta"),
+        send_policy_config.get("send_on_delta_percent"),
+        min_send_interval,
+        max_send_interval,
+    )
+
+
+TRAFFIC_GROUP_KEYS = [
+    "name",
+    "class",
+    "count",
+    "rate",
+    "jitter",
+    "burst_size",
+    "group_address",
+    "response_class",
+    "response_group_address",
+    "value_range",
+]
+
+
+def check_traffic_group(name: str, group_config: dict, group_address_style: str):
+    """
+    Check a traffic group of a load spec, and return the TrafficGroup object or None if it is incorrect:
+    senders are functional modules or sensors, response actuators are actuators,
+    and all the group addresses of the senders and actuators are in bounds.
+    """
+    from devices import Actuator, FunctionalModule, Sensor
+    from tools.config_tools import DEV_CLASSES
+    from tools.load_tools import TrafficGroup, offset_group_address
+
+    try:
+        assert isinstance(group_config, dict)
+        unknown_keys = [k for k in group_config if k not in TRAFFIC_GROUP_KEYS]
+        assert not unknown_keys
+        sender_class = DEV_CLASSES.get(group_config.get("class"))
+        assert sender_class is not None and issubclass(
+            sender_class, (FunctionalModule, Sensor)
+        )
+        response_class = group_config.get("response_class")
+        if response_class is not None:
+            assert issubclass(DEV_CLASSES.get(response_class, object), Actuator)
+            assert "response_group_address" in group_config
+    except AssertionError:
+        logging.error(
+            f"The traffic group {name} should be a dict with keys in {TRAFFIC_GROUP_KEYS}, a sender 'class' of sensor or functional module, and an actuator 'response_class' with its 'response_group_address', but '{group_config}' was given."
+        )
+        return None
+    count = group_config.get("count", 1)
+    rate = group_config.get("rate", 1)
+    jitter = group_config.get("jitter", 0)
+    burst_size = group_config.get("burst_size", 1)
+    try:
+        assert isinstance(count, int) and count >= 1
+        assert isinstance(burst_size, int) and burst_size >= 1
+        assert isinstance(rate, numbers.Number) and rate > 0
+        assert isinstance(jitter, numbers.Number) and jitter >= 0
+    except AssertionError:
+        logging.error(
+            f"The traffic group {name} should have positive count, burst_size (int), rate and jitter, but count={count}, burst_size={burst_size}, rate={rate}, jitter={jitter} were given."
+        )
+        return None
+    value_range = group_config.get("value_range", [0, 100])
+    try:
+        assert len(value_range) == 2 and value_range[0] <= value_range[1]
+    except (AssertionError, TypeError):
+        logging.error(
+            f"The value_range of the traffic group {name} should be [min, max], but '{value_range}' was given."
+        )
+        return None
+    group_address = group_config.get("group_address", "1/0/0")
+    response_group_address = group_config.get("response_group_address")
+    for address in [group_address, response_group_address]:
+        if address is None:
+            continue
+        if not check_group_address(group_address_style, str(address)):
+            return None
+        if offset_group_address(str(address), group_address_style, count - 1) is None:
+            logging.error(
+                f"The {count} group addresses of the traffic group {name} from {address} are out of bounds."
+            )
+            return None
+    return TrafficGroup(
+        name,
+        group_config["class"],
+        count,
+        rate,
+        jitter,
+        burst_size,
+        str(group_address),
+        response_class,
+        None if response_group_address is None else str(response_group_address),
+        value_range,
+    )
+
+
 def check_location(
     bounds: Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]],
     x: float,
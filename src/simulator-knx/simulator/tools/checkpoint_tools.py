@@ -0,0 +1,77 @@
+"""
+Module that saves the simulation state of a room in a checkpoint file, and restores it to continue a simulation from it.
+A checkpoint is a gzip compressed JSON file with the world, devices and bus states returned by Room.get_state().
+"""
+
+import gzip
+import json
+import logging
+import os
+from typing import Union
+
+CHECKPOINT_VERSION = 1
+# The checkpoints/ folder is next to the config/ and scripts/ folders, whatever the working directory
+SIMULATOR_PATH = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+CHECKPOINTS_PATH = os.path.join(SIMULATOR_PATH, "checkpoints") + "/"
+CHECKPOINT_EXTENSION = ".ckpt"
+
+
+def checkpoint_path(name: str) -> str:
+    """Return the path of a checkpoint, name is a file path ending with .ckpt or a checkpoint name in the checkpoints/ folder of the simulator"""
+    if name.endswith(CHECKPOINT_EXTENSION):
+        return name
+    return CHECKPOINTS_PATH + name + CHECKPOINT_EXTENSION
+
+
+def save_checkpoint(room, file_path: str) -> Union[None, int]:
+    """
+    Save the simulation state of the room in a checkpoint file, creating its folder if needed.
+    Return None if the state could not be saved, 1 otherwise.
+
+    room : Room, not in a building
+    """
+    state = room.get_state()
+    if state is None:
+        return None
+    checkpoint = {"version": CHECKPOINT_VERSION}
+    checkpoint.update(state)
+    folder_path = os.path.dirname(file_path)
+    try:
+        if folder_path:
+            os.makedirs(folder_path, exist_ok=True)
+        with gzip.open(file_path, "wt", encoding="utf-8") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file, separators=(",", ":"))
+    except OSError as msg:
+        logging.error(f"The checkpoint '{file_path}' cannot be written: '{msg}'.")
+        return None
+    logging.info(f"Checkpoint of room '{room.name}' saved in '{file_path}'.")
+    return 1
+
+
+def load_checkpoint(room, file_path: str) -> Union[None, int]:
+    """
+    Restore the simulation state of the room from a checkpoint file,
+    the room should be configured from the same configuration file as the room of the checkpoint.
+    Return None if the checkpoint could not be restored, 1 otherwise.
+    """
+    try:
+        with gzip.open(file_path, "rt", encoding="utf-8") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except (OSError, EOFError, ValueError) as msg:
+        logging.error(f"The checkpoint '{file_path}' cannot be read: '{msg}'.")
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        logging.error(
+            f"The checkpoint '{file_path}' has version {checkpoint.get('version')}, but version {CHECKPOINT_VERSION} is expected."
+        )
+        return None
+    if checkpoint["room"] != room.name:
+        logging.warning(
+            f"The checkpoint '{file_path}' was saved from room '{checkpoint['room']}', and is restored in room '{room.name}'."
+        )
+    if room.set_state(checkpoint) is None:
+        return None
+    logging.info(f"Checkpoint '{file_path}' restored in room '{room.name}'.")
+    return 1
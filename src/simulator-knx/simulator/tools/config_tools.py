@@ -6,12 +6,18 @@ import json
 import logging
 import os
 import sys
-from typing import Tuple
+from typing import Dict, List, Tuple, Union
 
 import devices as dev
+import world
 from system.system_tools import IndividualAddress, Window
-from .check_tools import check_group_address, check_simulation_speed_factor
+from .check_tools import (
+    check_group_address,
+    check_simulation_speed_factor,
+    check_send_policy,
+)
 import system.telegrams as sim_t
+from svshi_interface import AsyncioInterface, Interface, KNX_PORT
 
 DEV_CLASSES = {
     "LED": dev.LED,
@@ -47,6 +53,8 @@ DEV_PAYLOAD = {
 ## User command mode (script or CLI)
 GUI_MODE = "gui"
 CLI_INT_MODE = "cli"
+HEADLESS_INT_MODE = "headless"  # no user interface, script run with a virtual clock
+LOAD_INT_MODE = "load"  # no user interface, traffic of a load spec sent to SVSHI
 ## User interface mode, this flag is only taken into account if INTERFACE_MODE = CLI_MODE, no CLI if GUI launched
 SCRIPT_MODE = "script"
 CLI_COM_MODE = "cli"
@@ -63,7 +71,8 @@ DEFAULT_CONFIG_PATH = "./config/default_config.json"
 EMPTY_CONFIG_PATH = "./config/empty_config.json"
 SVSHI_CONFIG_PATH = "./config/svshi_config.json"
 
-interface = None
+# Interfaces with SVSHI by KNX port, kept when the simulation is reloaded to maintain the connection
+interfaces: Dict[int, Union[Interface, AsyncioInterface]] = {}
 
 
 def configure_system(
@@ -73,6 +82,7 @@ def configure_system(
     svshi_mode: bool = False,
     telegram_logging: bool = False,
     fresh_knx_interface: bool = False,
+    knx_port: int = KNX_PORT,
 ):
     """
     System configuration "manually" with python functions and classes.
@@ -81,7 +91,6 @@ def configure_system(
     """
     from system import Room
 
-    global interface, interface_device
     # Declaration of sensors, actuators and functional modules
     led1 = dev.LED("led1", IndividualAddress(0, 0, 1))  # Area 0, Line 0, Device 0
     led2 = dev.LED("led2", IndividualAddress(0, 0, 2))
@@ -92,10 +101,10 @@ def configure_system(
     button2 = dev.Button("button2", IndividualAddress(0, 0, 21))
     bright1 = dev.Brightness("brightness1", IndividualAddress(0, 0, 5))
 
-    interface_to_pass = interface
-    if fresh_knx_interface and interface is not None:
+    interface_to_pass = interfaces.get(knx_port)
+    if fresh_knx_interface and interface_to_pass is not None:
         print("Killing current interface to start rooms with a fresh one.")
-        interface.stop()
+        interface_to_pass.stop()
         interface_to_pass = None
 
     outside_temperature = 20.0
@@ -119,8 +128,9 @@ def configure_system(
         svshi_mode=svshi_mode,
         telegram_logging=telegram_logging,
         interface=interface_to_pass,
+        knx_port=knx_port,
     )
-    interface = room1.get_interface()
+    interfaces[knx_port] = room1.get_interface()
     room1.add_device(led1, 5, 5, 1)
     room1.add_device(led2, 10, 19, 1)
     room1.add_device(button1, 0, 0, 1)
@@ -145,11 +155,11 @@ def configure_system_from_file(
     svshi_mode: bool = False,
     telegram_logging: bool = False,
     fresh_knx_interface: bool = False,
+    knx_port: int = KNX_PORT,
 ):
     """System configuration from JSON configuration file parsing."""
     from system import Room
 
-    global interface, interface_device
     with open(config_file_path, "r") as file:
         config_dict = json.load(file)  ###
     knx_config = config_dict["knx"]
@@ -188,18 +198,28 @@ def configure_system_from_file(
     weather = world_config["weather"]
     system_dt_config = world_config["system_dt"]
 
-    # rooms_builders will contain list of list of room obj and device dict in the shape:
-    # [[room_object1, {'led1': [5, 5, 1], 'led2': [10, 19, 1], 'button': [0, 1, 1], 'bright1': [20, 20, 1]}], [room_object2, ]
+    # device_locations will contain the rooms and physical positions of each device name, in the shape:
+    # {'led1': [(room_object1, [5, 5, 1])], 'button1': [(room_object1, [0, 1, 1])], 'bright1': [(room_object2, [20, 20, 1])]}
 
-    interface_to_pass = interface
-    if fresh_knx_interface and interface is not None:
+    interface_to_pass = interfaces.get(knx_port)
+    if fresh_knx_interface and interface_to_pass is not None:
         print("Killing current interface to start rooms with a fresh one.")
-        interface.stop()
+        interface_to_pass.stop()
         interface_to_pass = None
 
-    rooms_builders = []
+    # With several rooms, their world states are stored and updated together in a building
+    building = None
+    if number_of_rooms > 1:
+        building = world.Building(
+            simulation_speed_factor,
+            system_dt_config,
+            datetime,
+            weather,
+            capacity=number_of_rooms,
+        )
+
+    device_locations: Dict[str, List[Tuple[Room, List[float]]]] = {}
     rooms = []
-    ga_builders = []
     rooms_config = world_config["rooms"]
     for r in range(1, number_of_rooms + 1):  # if multiple rooms
         room_key = "room" + str(r)
@@ -234,8 +254,10 @@ def configure_system_from_file(
             svshi_mode=svshi_mode,
             telegram_logging=telegram_logging,
             interface=interface_to_pass,
+            building=building,
+            knx_port=knx_port,
         )
-        interface = room.get_interface()
+        interfaces[knx_port] = room.get_interface()
         windows = []
         for window in room_config["windows"]:
             wall = room_config["windows"][window]["wall"]
@@ -251,13 +273,15 @@ def configure_system_from_file(
                 logging.error(msg)
         # Store room object to return to main
         rooms.append(room)
-        room_devices_config = room_config["room_devices"]
         # Store temporarily the room object with devices and their physical position
-        rooms_builders.append([room, room_devices_config])
+        for dev_key, dev_pos in room_config["room_devices"].items():
+            device_locations.setdefault(dev_key, []).append((room, dev_pos))
     # Parsing of devices to add in the room
     print(" ------- Room devices from configuration file -------")
     logging.info(" ------- Room devices from configuration file -------")
     devices_payload = {}  # dict with dev names as keys and payload as values
+    # dict with dev names as keys and the rooms and device objects as values, to attach them to group addresses
+    room_devices: Dict[str, List[Tuple[Room, dev.Device]]] = {}
     for a in range(number_of_areas):
         area_key = "area" + str(a)  # area0, area1,...
         number_of_lines = knx_config[area_key]["number_of_lines"]
@@ -297,23 +321,28 @@ def configure_system_from_file(
                         f"Individual address out of bounds, should be in 0.0.0 -> 15.15.255 ==> device is rejected."
                     )
                     continue
-                print(dev_key)
-                # room_builder = list of [room_object, room_devices_config] for all rooms of the system
-                for room_builder in rooms_builders:
-                    if dev_key in room_builder[1].keys():
-                        dev_pos = room_builder[1][dev_key]
-                        # Create the device object before adding it to the room
-                        dev_object = DEV_CLASSES[dev_class](
-                            dev_key, IndividualAddress(_a, _l, _d)
-                        )  # state False(OFF) by default
-                        room_builder[0].add_device(
-                            dev_object, dev_pos[0], dev_pos[1], dev_pos[2]
-                        )
-                    else:
-                        logging.warning(
-                            f"{dev_key} is defined on KNX system but no physical location in the room was given ==> device is rejected."
-                        )
-                        continue
+                logging.info(f"Device {dev_key} configured on {area_key}.{line_key}.")
+                if dev_key not in device_locations:
+                    logging.warning(
+                        f"{dev_key} is defined on KNX system but no physical location in the room was given ==> device is rejected."
+                    )
+                    continue
+                for room, dev_pos in device_locations[dev_key]:
+                    # Create the device object before adding it to the room
+                    dev_object = DEV_CLASSES[dev_class](
+                        dev_key, IndividualAddress(_a, _l, _d)
+                    )  # state False(OFF) by default
+                    if "send_policy" in device_config:
+                        if isinstance(dev_object, dev.Sensor):
+                            dev_object.send_policy = check_send_policy(
+                                dev_key, device_config["send_policy"]
+                            )
+                        else:
+                            logging.warning(
+                                f"Only sensors have a send policy, the one of {dev_key} is ignored."
+                            )
+                    room.add_device(dev_object, dev_pos[0], dev_pos[1], dev_pos[2])
+                    room_devices.setdefault(dev_key, []).append((room, dev_object))
     # Parsing of group addresses to connect devices together
     logging.info(" ------- KNX System Configuration -------")
     ga_style = knx_config["group_address_style"]
@@ -323,24 +352,20 @@ def configure_system_from_file(
         for ga_builder in ga_builders:
             group_address = ga_builder["address"]
             group_devices = ga_builder["group_devices"]
-            print(f"group_address:{group_address},  group_devices:{group_devices}")
+            logging.info(
+                f"Group address {group_address} assigned to devices {group_devices}."
+            )
             # Loop on devices connected to this ga
             for dev_name in group_devices:
-                print(f"dev_name:{group_devices}")
-                for room in rooms:
-                    for in_room_device in room.devices:
-                        if in_room_device.name == dev_name:
-                            dev_object = in_room_device.device
-                            # Link the device to the ga (internal test to check Group Address format)
-                            room.attach(dev_object, group_address)
-                            if (
-                                svshi_mode
-                            ):  # in svshi mode, only one ga per device, so we assign a dpt to this ga for svshi interface attr group_address_to_payload
-                                group_address_to_payload[
-                                    group_address
-                                ] = devices_payload[
-                                    dev_name
-                                ]  # link ga to payload
+                for room, dev_object in room_devices.get(dev_name, []):
+                    # Link the device to the ga (internal test to check Group Address format)
+                    room.attach(dev_object, group_address)
+                    if (
+                        svshi_mode
+                    ):  # in svshi mode, only one ga per device, so we assign a dpt to this ga for svshi interface attr group_address_to_payload
+                        group_address_to_payload[group_address] = devices_payload[
+                            dev_name
+                        ]  # link ga to payload
     else:
         logging.info("No group address is defined in config file.")
 
@@ -0,0 +1,479 @@
+"""
+Load generator mode, to stress SVSHI with controlled traffic over the KNXnet/IP tunnel:
+a population of virtual devices is generated from a compact spec, the senders send telegrams on a precise schedule
+and the responses of SVSHI on the group addresses of the actuators are matched to report end-to-end latencies.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Union
+
+import numpy as np
+
+import devices as dev
+import system.telegrams as sim_t
+from devices.device_abstractions import Actuator
+from svshi_interface.main import KNX_PORT
+
+# Individual addresses per line of the generated devices
+DEVICES_PER_LINE = 255
+LINES_PER_AREA = 16
+# Room containing the generated devices, their positions are on a grid of 1m
+LOAD_ROOM_DIMENSIONS = [20, 20, 3]
+# Values of the generated devices: Binary payloads alternate, Dimmer ratios and Float values are drawn in the ranges
+DEFAULT_VALUE_RANGE = [0, 100]
+# Time in seconds after which a telegram sent without response is counted as unanswered
+DEFAULT_RESPONSE_TIMEOUT = 2.0
+# Maximum group address, in 'free' style
+MAX_RAW_GROUP_ADDRESS = 65535
+
+
+class TrafficGroup:
+    """Group of identical senders of the load spec, each one sending on its own group address"""
+
+    def __init__(
+        self,
+        name: str,
+        sender_class: str,
+        count: int,
+        rate: float,
+        jitter: float = 0,
+        burst_size: int = 1,
+        group_address: str = "1/0/0",
+        response_class: str = None,
+        response_group_address: str = None,
+        value_range: List[float] = DEFAULT_VALUE_RANGE,
+    ) -> None:
+        """
+        Initialization of a traffic group, checked by check_traffic_group().
+
+        count : number of senders in the group
+        rate : average number of telegrams sent per second by each sender
+        jitter : maximum random offset in seconds of each burst from its nominal time
+        burst_size : number of telegrams sent back to back by a sender, every burst_size/rate seconds
+        group_address : group address of the first sender, the next senders use the following addresses
+        response_class : class of the actuators receiving the responses of SVSHI, one per sender,
+        response_group_address : group address of the first actuator, the next actuators use the following addresses
+        value_range : range of the Float values and Dimmer ratios sent
+        """
+        self.name = name
+        self.sender_class = sender_class
+        self.count = count
+        self.rate = rate
+        self.jitter = jitter
+        self.burst_size = burst_size
+        self.group_address = group_address
+        self.response_class = response_class
+        self.response_group_address = response_group_address
+        self.value_range = value_range
+
+    def __repr__(self):
+        return f"TrafficGroup({self.name!r}, {self.sender_class!r}, count={self.count}, rate={self.rate})"
+
+
+def offset_group_address(
+    group_address: str, group_address_style: str, offset: int
+) -> Union[str, None]:
+    """Return the group address following group_address by offset addresses, or None if it is out of bounds"""
+    levels = [int(level) for level in group_address.split("/")]
+    if group_address_style == "3-levels":
+        raw = (levels[0] << 11) + (levels[1] << 8) + levels[2] + offset
+        if raw > MAX_RAW_GROUP_ADDRESS:
+            return None
+        return f"{raw >> 11}/{(raw >> 8) & 0x7}/{raw & 0xFF}"
+    elif group_address_style == "2-levels":
+        raw = (levels[0] << 11) + levels[1] + offset
+        if raw > MAX_RAW_GROUP_ADDRESS:
+            return None
+        return f"{raw >> 11}/{raw & 0x7FF}"
+    raw = levels[0] + offset
+    return str(raw) if raw <= MAX_RAW_GROUP_ADDRESS else None
+
+
+def generate_load_config(
+    base_config: dict, group_address_style: str, traffic_groups: List[TrafficGroup]
+) -> dict:
+    """
+    Create the simulator configuration of the device population described by the traffic groups,
+    in a single room of base_config whose KNX system and devices are replaced.
+    The senders are named after their class and numbered in the order of the groups, their response actuators have the same number.
+    """
+    room_config = next(iter(base_config["world"]["rooms"].values()))
+    room_config.update(
+        {"dimensions": LOAD_ROOM_DIMENSIONS, "windows": {}, "room_devices": {}}
+    )
+    base_config["world"]["rooms"] = {"room1": room_config}
+    base_config["world"]["number_of_rooms"] = 1
+    lines_devices: List[Dict[str, dict]] = []
+    group_addresses = []
+
+    def add_device(dev_class: str, number: int, group_address: str) -> None:
+        name = f"{dev_class.lower()}{number}"
+        index = sum(len(devices) for devices in lines_devices)
+        if index % DEVICES_PER_LINE == 0:
+            lines_devices.append({})
+        area, line = divmod(len(lines_devices) - 1, LINES_PER_AREA)
+        lines_devices[-1][name] = {
+            "class": dev_class,
+            "knx_location": f"{area}.{line}.{index % DEVICES_PER_LINE + 1}",
+        }
+        room_config["room_devices"][name] = [
+            index % (LOAD_ROOM_DIMENSIONS[0] - 1) + 0.5,
+            index // (LOAD_ROOM_DIMENSIONS[0] - 1) % (LOAD_ROOM_DIMENSIONS[1] - 1) + 0.5,
+            1,
+        ]
+        group_addresses.append({"address": group_address, "group_devices": [name]})
+
+    number = 0
+    for group in traffic_groups:
+        for i in range(group.count):
+            number += 1
+            add_device(
+                group.sender_class,
+                number,
+                offset_group_address(group.group_address, group_address_style, i),
+            )
+            if group.response_class is not None:
+                add_device(
+                    group.response_class,
+                    number,
+                    offset_group_address(
+                        group.response_group_address, group_address_style, i
+                    ),
+                )
+
+    knx_config = {"number_of_areas": (len(lines_devices) - 1) // LINES_PER_AREA + 1}
+    for i, line_devices in enumerate(lines_devices):
+        area, line = divmod(i, LINES_PER_AREA)
+        area_config = knx_config.setdefault(f"area{area}", {"number_of_lines": 0})
+        area_config["number_of_lines"] += 1
+        area_config[f"line{line}"] = {"devices": line_devices}
+    knx_config["group_address_style"] = group_address_style
+    knx_config["group_addresses"] = group_addresses
+    base_config["knx"] = knx_config
+    return base_config
+
+
+class LoadProbe(Actuator):
+    """
+    Actuator attached to the response group addresses, not added to the room,
+    that transmits the telegrams received on the bus to the load generator
+    """
+
+    def __init__(self, load_generator) -> None:  # load_generator : LoadGenerator
+        from system import IndividualAddress
+
+        super().__init__("loadprobe", IndividualAddress(0, 0, 0))
+        self.load_generator = load_generator
+
+    def update_state(self, telegram: sim_t.Telegram) -> None:
+        self.load_generator.record_response(telegram)
+
+    def user_input(self):
+        pass
+
+    def get_dev_info(self):
+        return self.load_generator.get_report()
+
+
+class LoadGenerator:
+    """
+    Drives the senders of the generated population on a precise schedule:
+    the bursts are sent at absolute times from the start (nominal time + random jitter), so that delays do not accumulate,
+    and the lag of each burst from its scheduled time is measured.
+    Each telegram sent is matched with the next response of SVSHI on the group address of its actuator,
+    in sending order, to measure end-to-end latencies.
+    """
+
+    def __init__(
+        self,
+        room,
+        traffic_groups: List[TrafficGroup],
+        duration: float,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+        seed: int = None,
+    ) -> None:
+        """
+        Initialization of the load generator on a room configured by generate_load_config().
+
+        duration : time in seconds during which telegrams are sent
+        response_timeout : time in seconds after which a telegram without response is counted as unanswered
+        seed : seed of the random jitters, phases and values, for reproducible loads
+        """
+        self.room = room
+        self.traffic_groups = traffic_groups
+        self.duration = duration
+        self.response_timeout = response_timeout
+        self.__random = random.Random(seed)
+        # (group index, sender device, response group address name or None) of each sender
+        self.__senders: List[Tuple[int, dev.Device, Union[str, None]]] = []
+        self.__response_groups: Dict[str, int] = {}
+        # Sending times of the telegrams waiting for a response, by response group address name
+        self.__pending: Dict[str, Deque[float]] = {}
+        self.__generated_addresses = set()
+        self.probe = LoadProbe(self)
+
+        devices_by_name = {
+            in_room_device.name: in_room_device.device
+            for in_room_device in room.devices
+        }
+        number = 0
+        for group_index, group in enumerate(traffic_groups):
+            for _ in range(group.count):
+                number += 1
+                sender = devices_by_name.get(f"{group.sender_class.lower()}{number}")
+                if sender is None or not sender.group_addresses:
+                    logging.warning(
+                        f"The sender {group.sender_class.lower()}{number} of the load spec is not configured."
+                    )
+                    continue
+                self.__generated_addresses.add(sender.individual_addr.ia_str)
+                response_address = None
+                if group.response_class is not None:
+                    actuator = devices_by_name.get(
+                        f"{group.response_class.lower()}{number}"
+                    )
+                    if actuator is not None and actuator.group_addresses:
+                        self.__generated_addresses.add(actuator.individual_addr.ia_str)
+                        response_address = actuator.group_addresses[0].name
+                        self.__response_groups[response_address] = group_index
+                        self.__pending[response_address] = deque()
+                        room.knxbus.attach(self.probe, actuator.group_addresses[0])
+                self.__senders.append((group_index, sender, response_address))
+        self.__reset_measures()
+
+    def __reset_measures(self) -> None:
+        self.telegrams_sent = [0] * len(self.traffic_groups)
+        self.latencies: List[List[float]] = [[] for _ in self.traffic_groups]
+        self.unanswered = [0] * len(self.traffic_groups)
+        self.unmatched_responses = 0
+        self.schedule_lags: List[float] = []
+        self.elapsed_time = 0
+        for pending in self.__pending.values():
+            pending.clear()
+
+    async def run(self) -> Dict[str, Union[int, float, dict]]:
+        """Sends the scheduled bursts during the load duration, waits for the last responses and return the report"""
+        self.__reset_measures()
+        loop = asyncio.get_running_loop()
+        schedule = []
+        for sender_index, (group_index, _, _) in enumerate(self.__senders):
+            period = self.__period(self.traffic_groups[group_index])
+            phase = self.__random.uniform(0, period)
+            heapq.heappush(
+                schedule, (self.__jittered(phase, group_index), sender_index, 0, phase)
+            )
+        start = loop.time()
+        while schedule and schedule[0][0] < self.duration:
+            delay = start + schedule[0][0] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            now = loop.time() - start
+            # Bursts due at the same time are sent without yielding to the event loop
+            while schedule and schedule[0][0] <= now:
+                scheduled_time, sender_index, burst, phase = heapq.heappop(schedule)
+                self.schedule_lags.append(now - scheduled_time)
+                self.__send_burst(sender_index)
+                group_index = self.__senders[sender_index][0]
+                nominal_time = phase + (burst + 1) * self.__period(
+                    self.traffic_groups[group_index]
+                )
+                heapq.heappush(
+                    schedule,
+                    (
+                        self.__jittered(nominal_time, group_index),
+                        sender_index,
+                        burst + 1,
+                        phase,
+                    ),
+                )
+        self.elapsed_time = loop.time() - start
+        if self.__pending:
+            await asyncio.sleep(self.response_timeout)
+        return self.get_report()
+
+    @staticmethod
+    def __period(group: TrafficGroup) -> float:
+        return group.burst_size / group.rate
+
+    def __jittered(self, nominal_time: float, group_index: int) -> float:
+        jitter = self.traffic_groups[group_index].jitter
+        if not jitter:
+            return nominal_time
+        return max(0, nominal_time + self.__random.uniform(-jitter, jitter))
+
+    def __send_burst(self, sender_index: int) -> None:
+        group_index, sender, response_address = self.__senders[sender_index]
+        group = self.traffic_groups[group_index]
+        for _ in range(group.burst_size):
+            payload = self.__create_payload(group, sender)
+            if response_address is not None:
+                self.__pending[response_address].append(time.perf_counter())
+            sender.send_telegram(payload)
+            self.telegrams_sent[group_index] += 1
+
+    def __create_payload(self, group: TrafficGroup, sender: dev.Device) -> sim_t.Payload:
+        from tools.config_tools import DEV_PAYLOAD
+
+        payload_type = DEV_PAYLOAD[group.sender_class]
+        if payload_type == sim_t.DimmerPayload:
+            ratio = round(self.__random.uniform(*group.value_range), 1)
+            return sim_t.DimmerPayload(binary_state=ratio > 0, state_ratio=ratio)
+        elif payload_type == sim_t.FloatPayload:
+            return sim_t.FloatPayload(round(self.__random.uniform(*group.value_range), 2))
+        # Binary senders alternate their state, as a user pressing a button
+        sender.state = not getattr(sender, "state", False)
+        return sim_t.BinaryPayload(binary_state=sender.state)
+
+    def record_response(self, telegram: sim_t.Telegram) -> None:
+        """
+        Matches a telegram received on a response group address with the oldest telegram waiting for it,
+        telegrams sent by the generated devices (e.g. the state of an actuator that changed) are ignored.
+        """
+        if str(telegram.source) in self.__generated_addresses:
+            return
+        response_time = time.perf_counter()
+        address = str(telegram.destination)
+        pending = self.__pending.get(address)
+        group_index = self.__response_groups.get(address)
+        # Telegrams waiting for longer than the timeout are not matched
+        while pending and response_time - pending[0] > self.response_timeout:
+            pending.popleft()
+            self.unanswered[group_index] += 1
+        if not pending:
+            self.unmatched_responses += 1
+            return
+        self.latencies[group_index].append(response_time - pending.popleft())
+
+    def get_report(self) -> Dict[str, Union[int, float, dict]]:
+        """
+        Return the numbers of telegrams sent and responses, with the distributions in ms of the end-to-end latencies
+        (overall and per traffic group) and of the lags of the bursts from their schedule.
+        """
+        unanswered = [
+            count + sum(1 for _ in self.__pending_of_group(group_index))
+            for group_index, count in enumerate(self.unanswered)
+        ]
+        all_latencies = [latency for latencies in self.latencies for latency in latencies]
+        report = {
+            "devices": len(self.__senders),
+            "duration": round(self.elapsed_time, 3),
+            "telegrams_sent": sum(self.telegrams_sent),
+            "send_rate": round(sum(self.telegrams_sent) / self.elapsed_time, 1)
+            if self.elapsed_time
+            else 0,
+            "responses": len(all_latencies),
+            "unanswered": sum(unanswered),
+            "unmatched_responses": self.unmatched_responses,
+            "latency_ms": distribution(all_latencies),
+            "schedule_lag_ms": distribution(self.schedule_lags),
+            "groups": {
+                group.name: {
+                    "telegrams_sent": self.telegrams_sent[group_index],
+                    "responses": len(self.latencies[group_index]),
+                    "unanswered": unanswered[group_index],
+                    "latency_ms": distribution(self.latencies[group_index]),
+                }
+                for group_index, group in enumerate(self.traffic_groups)
+            },
+        }
+        interface = self.room.get_interface() if self.room.svshi_mode else None
+        if hasattr(interface, "get_info"):
+            report["interface"] = interface.get_info()
+        return report
+
+    def __pending_of_group(self, group_index: int):
+        for address, pending in self.__pending.items():
+            if self.__response_groups[address] == group_index:
+                yield from pending
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    """Return the statistics in ms of durations in seconds: count, min, mean, percentiles 50/90/99 and max"""
+    if not values:
+        return {"count": 0}
+    values_ms = np.array(values) * 1000
+    p50, p90, p99 = np.percentile(values_ms, [50, 90, 99])
+    return {
+        "count": len(values),
+        "min": round(float(values_ms.min()), 3),
+        "mean": round(float(values_ms.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values_ms.max()), 3),
+    }
+
+
+def configure_load_from_file(
+    load_spec_path: str,
+    base_config_path: str,
+    test_mode: bool = False,
+    svshi_mode: bool = True,
+    telegram_logging: bool = False,
+    knx_port: int = KNX_PORT,
+) -> Union[Tuple[object, LoadGenerator], None]:
+    """
+    Load generator configuration from a JSON load spec, return the room of the generated devices and its load generator,
+    or None if the spec is incorrect.
+    The simulator configuration generated is written next to the spec (with '_generated' suffix) and loaded,
+    so that the same system can be configured in SVSHI.
+
+    base_config_path : configuration file whose world is used for the room of the generated devices
+    knx_port : port on which the interface waits for SVSHI
+    """
+    from tools import check_group_address, check_traffic_group
+    from tools.config_tools import configure_system_from_file
+
+    with open(load_spec_path, "r") as file:
+        load_spec = json.load(file)
+    group_address_style = check_group_address(
+        load_spec.get("group_address_style", "3-levels"), style_check=True
+    )
+    if not group_address_style:
+        return None
+    traffic_groups = []
+    for i, group_config in enumerate(load_spec.get("groups", [])):
+        group = check_traffic_group(
+            group_config.get("name", f"group{i + 1}"), group_config, group_address_style
+        )
+        if group is None:
+            return None
+        traffic_groups.append(group)
+    duration = load_spec.get("duration", 10)
+    response_timeout = load_spec.get("response_timeout", DEFAULT_RESPONSE_TIMEOUT)
+    try:
+        assert traffic_groups
+        assert isinstance(duration, (int, float)) and duration > 0
+        assert isinstance(response_timeout, (int, float)) and response_timeout >= 0
+    except AssertionError:
+        logging.error(
+            f"The load spec should have traffic groups, a positive duration and response_timeout, but '{load_spec}' was given."
+        )
+        return None
+
+    with open(base_config_path, "r") as file:
+        base_config = json.load(file)
+    generated_config_path = load_spec_path.replace(".json", "") + "_generated.json"
+    with open(generated_config_path, "w") as file:
+        json.dump(
+            generate_load_config(base_config, group_address_style, traffic_groups),
+            file,
+            indent=2,
+        )
+    room, _ = configure_system_from_file(
+        generated_config_path,
+        test_mode=test_mode,
+        svshi_mode=svshi_mode,
+        telegram_logging=telegram_logging,
+        knx_port=knx_port,
+    )
+    load_generator = LoadGenerator(
+        room, traffic_groups, duration, response_timeout, load_spec.get("seed")
+    )
+    return room, load_generator
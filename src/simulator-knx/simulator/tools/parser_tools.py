@@ -7,12 +7,12 @@ import sys
 import json
 import numbers
 import pprint
-from typing import Tuple, Union, Dict
+from typing import Dict, Iterable, List, Tuple, Union
 
 import argparse
-import asyncio
 
 import devices as dev
+from .script_tools import ScriptCommand, compile_script
 
 pp = pprint.PrettyPrinter(compact=True)
 
@@ -54,9 +54,9 @@ def arguments_parser(argv) -> Tuple[str, str, str, str, str, bool, bool]:
         action="store",
         default="gui",
         type=str.lower,
-        choices=["gui", "cli"],
+        choices=["gui", "cli", "headless", "load"],
         help=(
-            "Provide user interface mode.\nExample '-i cli' or '--interface=cli'\n-> default='gui'."
+            "Provide user interface mode, 'headless' runs a script as fast as possible with a virtual clock, 'load' sends the traffic of a load spec to SVSHI and reports latencies.\nExample '-i cli' or '--interface=cli'\n-> default='gui'."
         ),
     )
     # Command argument definition
@@ -68,7 +68,7 @@ def arguments_parser(argv) -> Tuple[str, str, str, str, str, bool, bool]:
         type=str.lower,
         choices=["script", "cli"],
         help=(
-            "Provide command mode (only if interface mode is CLI).\nExample '-c script' or '--command-mode=script'\n-> default='cli'"
+            "Provide command mode (only if interface mode is CLI, always script if headless).\nExample '-c script' or '--command-mode=script'\n-> default='cli'"
         ),
     )
     # Config File Name argument definition
@@ -105,6 +105,17 @@ def arguments_parser(argv) -> Tuple[str, str, str, str, str, bool, bool]:
             "Provide configuration file name (without .json extension).\nExample '-F sim_config_bedroom' or '--file-name=sim_config_bedroom'\n-> default='sim_config_bedroom'"
         ),
     )
+    # Load Spec File Name argument definition
+    parser.add_argument(
+        "-L",
+        "--load-spec-name",
+        action="store",
+        default="load_spec",
+        type=str.lower,
+        help=(
+            "Provide load spec file name (without .json extension) in config/ folder, used in 'load' interface mode.\nExample '-L load_spec' or '--load-spec-name=load_spec'\n-> default='load_spec'"
+        ),
+    )
     # SVSHI mode argument definition
     parser.add_argument(
         "-s",
@@ -142,6 +153,17 @@ def arguments_parser(argv) -> Tuple[str, str, str, str, str, bool, bool]:
             "Specifies the host address and port for the Flask server when started with -w option. Example of string '127.0.0.1:4646'. The address can be a container name when running in docker compose."
         ),
     )
+    # KNX port of the interface with SVSHI
+    parser.add_argument(
+        "-k",
+        "--knx-port",
+        action="store",
+        default=3671,
+        type=int,
+        help=(
+            "Specifies the port on which the simulator waits for SVSHI when started with -s option, distinct ports allow several simulators to run side by side.\nExample '-k 3672' or '--knx-port=3672'\n-> default=3671"
+        ),
+    )
 
     # Get the arguments from command line
     options = parser.parse_args()
@@ -173,6 +195,10 @@ def arguments_parser(argv) -> Tuple[str, str, str, str, str, bool, bool]:
     WEB_APP = options.web_app
     # WEB_APP_ADDRESS
     HOST_ADDRESS_PORT = options.address_port
+    # Load Spec File Name argument parser
+    LOAD_SPEC_PATH = "./config/" + options.load_spec_name + ".json"
+    # KNX port argument parser
+    KNX_PORT = options.knx_port
 
     return [
         INTERFACE_MODE,
@@ -184,6 +210,8 @@ def arguments_parser(argv) -> Tuple[str, str, str, str, str, bool, bool]:
         TELEGRAM_LOGGING,
         WEB_APP,
         HOST_ADDRESS_PORT,
+        LOAD_SPEC_PATH,
+        KNX_PORT,
     ]
 
 
@@ -398,337 +426,58 @@ class ScriptParser:
 
         stored_values : dict of variable stored during script
         assertions: dict of assertions that passed during script
+        syntax_errors: syntax errors of the last script compiled
         """
         self.stored_values = {}
         self.assertions = {}
         self.assert_counter = 0
+        self.syntax_errors = []
+        # Devices of the room running the script by name, rebuilt if the room or its devices change
+        self.__devices_room = None
+        self.__devices = {}
+
+    def find_device(self, room, name: str):
+        """Return the InRoomDevice of the room with this name, or None if the room has no such device"""
+        if self.__devices_room is not room or len(self.__devices) != len(room.devices):
+            self.__devices_room = room
+            self.__devices = {ir_device.name: ir_device for ir_device in room.devices}
+        return self.__devices.get(name)
+
+    def compile_script(self, lines: Iterable[str]) -> Union[List[ScriptCommand], None]:
+        """
+        Compile the lines of a script into commands before it runs,
+        return None and log all the syntax errors if some lines are incorrect.
+        """
+        commands, self.syntax_errors = compile_script(lines)
+        for error in self.syntax_errors:
+            logging.error(error)
+        if self.syntax_errors:
+            return None
+        return commands
+
+    async def run_script(
+        self, room, commands: List[ScriptCommand]
+    ) -> Tuple[Union[None, int], Dict[str, str]]:
+        """
+        Run compiled commands on the room until one fails (None returned) or ends the script (0 returned),
+        1 is returned if all commands were executed.
+        """
+        ret = 1
+        for command in commands:
+            command.print_command()
+            ret = await command.execute(self, room)
+            if ret is None or ret == 0:
+                break
+        return ret, self.assertions
 
     async def script_command_parser(
         self, room, command: str
     ) -> Tuple[Union[None, int], Dict[str, str]]:
-        """Method handling parsing of commands from txt API script."""
-        command = (
-            command.strip().lower()
-        )  # remove new line symbol and put in lower case
-        if command.startswith("#") or len(command) == 0:  # comment line or empty line
-            return 1, self.assertions
-        print(f"Command >>> '{command}' <<<")
-        command_split = command.split(" ")
-        # 'wait' command
-        if command.startswith("wait"):
-            if len(command_split) == 3:
-                if command_split[2] in [
-                    "h",
-                    "hour",
-                    "hours",
-                ]:  # time to wait in simulated hours, not computer seconds
-                    speed_factor = room.world.time.speed_factor
-                    sleep_time = int(
-                        float(command_split[1]) * 3600 / speed_factor
-                    )  # time to wait in computer system seconds
-                elif command_split[2] in [
-                    "m",
-                    "minute",
-                    "minutes",
-                ]:  # time to wait in simulated minutes, not computer seconds
-                    speed_factor = room.world.time.speed_factor
-                    sleep_time = int(
-                        float(command_split[1]) / 60 * 3600 / speed_factor
-                    )  # time to wait in computer system seconds
-                elif command_split[2] in [
-                    "s",
-                    "second",
-                    "seconds",
-                ]:  # time to wait in simulated seconds, not computer seconds
-                    speed_factor = room.world.time.speed_factor
-                    sleep_time = int(
-                        float(command_split[1]) / 3600 * 3600 / speed_factor
-                    )  # time to wait in computer system seconds
-                else:
-                    logging.error(
-                        f"'wait' command expect 'h', 'm' or 's' as second argument, but {command_split[2]} was given."
-                    )
-                    return None, self.assertions
-            elif len(command_split) == 2:
-                try:
-                    sleep_time = int(command_split[1])
-                except (NameError, ValueError):
-                    logging.error(
-                        f"A number was excpected for the time to wait, but {command_split[1]} was given."
-                    )
-                    return None, self.assertions
-            else:
-                logging.warning(
-                    f"'wait' command expect 1 or 2 arguments, but {len(command_split)-1} was given."
-                )
-                return None, self.assertions
-            logging.info(f"[SCRIPT] Wait for {sleep_time} sec")
-            await asyncio.sleep(sleep_time)
-            return 1, self.assertions
-        # 'store' command to keep one current system value in memory
-        elif command.startswith("store"):
-            if len(command_split) != 4:
-                logging.error(
-                    f"The 'store' command requires 3 arguments, but only {len(command_split)-1} were given."
-                )
-                return None, self.assertions
-            if command_split[1] == "world":
-                var_name = command_split[3]
-                ambient = command_split[2].lower()
-                try:
-                    assert ambient in [
-                        "simtime",
-                        "temperature",
-                        "humidity",
-                        "co2",
-                        "brightness",
-                        "weather",
-                    ]
-                except AssertionError:
-                    logging.error(
-                        f"'store world' command expect ambient argument in ['simtime', 'temperature', 'humidity', 'co2', 'brightness', 'weather'], but {ambient} was given."
-                    )
-                    return None, self.assertions
-                if ambient == "weather" or ambient == "simtime":
-                    self.stored_values[var_name] = room.get_world_info(ambient=ambient)[
-                        ambient
-                    ]
-                else:
-                    self.stored_values[var_name] = round(
-                        room.get_world_info(ambient=ambient, str_mode=False)[
-                            ambient + "_in"
-                        ],
-                        2,
-                    )
-                if self.stored_values[var_name] is None:
-                    return None, self.assertions
-                logging.info(
-                    f"[SCRIPT] The world {ambient} is stored in variable {var_name}={self.stored_values[var_name]}."
-                )
-                return 1, self.assertions
-            else:  # store a device attribute/method result
-                device_name = command_split[1]
-                var_name = command_split[3]
-                attribute = command_split[2].lower()
-                self.stored_values[var_name] = room.get_device_info(
-                    device_name, attribute=attribute
-                )
-                if self.stored_values[var_name] is None:
-                    return None, self.assertions
-                logging.info(
-                    f"[SCRIPT] The device {attribute} is stored in variable {var_name}={self.stored_values[var_name]}."
-                )
-                return 1, self.assertions
-        # 'assert' command
-        elif command.startswith("assert"):
-            if len(command_split) != 4:
-                logging.error(
-                    f"The 'assert' command requires 3 arguments, but only {len(command_split)-1} were given."
-                )
-                return None, self.assertions
-            var_name = command_split[1]
-            value = None
-            if (
-                command_split[3] in self.stored_values
-            ):  # if we compare to a stored variable
-                var = str(self.stored_values[command_split[3]])
-                var_to_compare = command_split[3]
-            else:  # if we compare to a value
-                var = str(
-                    command_split[3]
-                )  # can be a bool, or a str for weather (e.g. 'clear')
-                var_to_compare = "new_var"
-            try:
-                if "false" in var:
-                    var = False
-                elif "true" in var:
-                    var = True
-                elif var in ["clear", "overcast", "dark"]:
-                    pass
-                else:
-                    var = float(var)
-                    value = float(self.stored_values[var_name])
-                if value is None:
-                    value = self.stored_values[var_name]
-                if command_split[2] == "==":
-                    if type(value) == float:
-                        var, value = str(var), str(value)
-                    assert value == var
-                elif command_split[2] == "!=":
-                    assert value != var
-                elif command_split[2] == "<=":
-                    if type(var) == float:
-                        assert value <= var
-                    else:
-                        logging.warning(
-                            f"Cannot compare string or bool with inequality symbols."
-                        )
-                        return None, self.assertions
-                elif command_split[2] == ">=":
-                    if type(var) == float:
-                        assert value >= var
-                    else:
-                        logging.warning(
-                            f"Cannot compare string or bool with inequality symbols."
-                        )
-                        return None, self.assertions
-                else:
-                    logging.error(
-                        f"The comparison sign should be in ['=='/'!='/'<='/'>='], but {command_split[2]} was given."
-                    )
-                    return None, self.assertions
-                recap_str = (
-                    f"({value}) {var_name} {command_split[2]} {var_to_compare} ({var})"
-                )
-                logging.info(f"[SCRIPT] The comparison '{recap_str}' is correct.")
-                print(f"Assertion True")
-                simtime = room.world.time.simulation_time(str_mode=True)
-                self.assertions[
-                    "Assertion True"
-                    + str(self.assert_counter)
-                    + " at simtime "
-                    + str(simtime)
-                ] = recap_str
-                self.assert_counter += 1
-                return 1, self.assertions
-            except AssertionError:
-                recap_str = f"({value}) {var_name} {command_split[2]} {var_to_compare} ({value})"
-                logging.info(f"[SCRIPT] The comparison '{recap_str}' is not correct.")
-                print(f"Assertion False")
-                simtime = room.world.time.simulation_time(str_mode=True)
-                self.assertions[
-                    "Assertion False"
-                    + str(self.assert_counter)
-                    + " FAILED at simtime "
-                    + str(simtime)
-                ] = recap_str
-                self.assert_counter += 1
-                return None, self.assertions
-        # 'set' command
-        elif command.startswith("set"):
-            if len(command_split) in [3, 4]:
-                if command_split[1] in [
-                    "temperature",
-                    "humidity",
-                    "co2",
-                    "presence",
-                    "weather",
-                ]:  # set ambient state
-                    value = command_split[2]
-                    if command_split[1] == "presence":
-                        if len(command_split) == 4:
-                            logging.warning(
-                                f" 'set presence' command accepts only 1 additional argument, but '{command_split[3]}' was given."
-                            )
-                            return None, self.assertions
-                        ret = room.world.set_ambient_value("presence", value)
-                    elif command_split[1] == "weather":
-                        if len(command_split) == 4:
-                            logging.warning(
-                                f" 'set weather' command accepts only 1 additional argument, but '{command_split[3]}' was given."
-                            )
-                            return None, self.assertions
-                        ret = room.world.set_ambient_value("weather", value)
-                    else:
-                        if len(command_split) == 4:
-                            try:
-                                assert value.isnumeric()
-                                value = float(value)
-                            except AssertionError:
-                                logging.warning(
-                                    f"The value should be a number, but '{value}' was given."
-                                )
-                                return None, self.assertions
-                            ambient = (
-                                command_split[1] + "_" + command_split[3]
-                            )  # we add '_in' or '_out'
-                            ret = room.world.set_ambient_value(ambient, value)
-                        else:
-                            logging.warning(
-                                f"No specification of indoor/outdoor ambient to set, the third argument of 'set' command should be 'in' or 'out' with temperature, humidity and co2."
-                            )
-                            return None, self.assertions
-                    return ret, self.assertions  # ret is None or 1
-                else:
-                    # Sensors humiditysoil and presence or ON/OFF a functional module -> user command parser
-                    if len(command_split) >= 3:
-                        # set sensor value
-                        if (
-                            "humiditysoil" in command_split[1]
-                            or "presencesensor" in command_split[1]
-                        ):
-                            if "humiditysoil" in command_split[1]:
-                                try:
-                                    assert command_split[2].isnumeric()
-                                except AssertionError:
-                                    logging.warning(
-                                        f"The value {command_split[2]} given to set {command_split[1]} is not a number."
-                                    )
-                                    return None, self.assertions
-                                value = float(command_split[2])
-                            elif "presencesensor" in command_split[1]:
-                                try:
-                                    assert command_split[2].lower() in (
-                                        "true",
-                                        "on",
-                                        "false",
-                                        "off",
-                                    )
-                                except AssertionError:
-                                    logging.warning(
-                                        f"The value {command_split[2]} given to set {command_split[1]} is not a boolean."
-                                    )
-                                    return None, self.assertions
-                                value = (
-                                    True
-                                    if command_split[2].lower() in ("true", "on")
-                                    else False
-                                )
-                            for ir_device in room.devices:
-                                if command_split[1] == ir_device.name:
-                                    ret = ir_device.device.set_value(value)
-                                    return ret, self.assertions  # ret is None or 1
-                            # If device not found
-                            logging.warning(
-                                f"The device {command_split[1]} is not found in room's devices list."
-                            )
-                            return None, self.assertions
-
-                        # set functional module on or off, with possible value for state_ratio
-                        elif (
-                            "button" in command_split[1] or "dimmer" in command_split[1]
-                        ):
-                            if not user_command_parser(command, room):  # return 0
-                                return None, self.assertions
-                            else:  # return 1
-                                return 1, self.assertions
-                        else:
-                            logging.warning(
-                                f"Device {command_split[1]} cannot be set with 'set' API command, or does not exist."
-                            )
-                            return None, self.assertions
-            else:
-                logging.error(
-                    f"'set' command requires 2 or 3 arguments, but {len(command_split)-1} was provided."
-                )
-                return None, self.assertions
-        # 'show' command
-        elif command.startswith("show"):
-            if len(command_split) == 1 or command_split[1].lower() == "all":
-                pp.pprint(self.stored_values)
-            elif len(command_split) == 2:
-                if command_split[1] in self.stored_values:
-                    print(
-                        f"{command_split[1]} = {self.stored_values[command_split[1]]}"
-                    )
-            else:
-                logging.warning(f"'show' command requires 0 or 1 argument.")
-                return None, self.assertions
-            return 1, self.assertions
-        # 'end' command
-        elif command.startswith("end"):
-            print("End of script")
-            return 0, self.assertions
+        """Method handling parsing of commands from txt API script, compiled and run one at a time."""
+        commands = self.compile_script([command])
+        if commands is None:
+            return None, self.assertions
+        return await self.run_script(room, commands)
 
 
 def config_from_request(
@@ -0,0 +1,548 @@
+"""
+Module that define the commands of the script API, and the compilation of scripts into these commands before they run.
+"""
+
+import logging
+import numbers
+import pprint
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Tuple, Union
+
+import devices as dev
+from .checkpoint_tools import checkpoint_path, load_checkpoint, save_checkpoint
+
+pp = pprint.PrettyPrinter(compact=True)
+
+# Simulated seconds of the time units of the 'wait' command
+WAIT_UNITS = {
+    "h": 3600,
+    "hour": 3600,
+    "hours": 3600,
+    "m": 60,
+    "minute": 60,
+    "minutes": 60,
+    "s": 1,
+    "second": 1,
+    "seconds": 1,
+}
+WORLD_AMBIENTS = ["simtime", "temperature", "humidity", "co2", "brightness", "weather"]
+SET_AMBIENTS = ["temperature", "humidity", "co2", "presence", "weather"]
+WEATHERS = ["clear", "overcast", "dark"]
+COMPARISON_SIGNS = ["==", "!=", "<=", ">="]
+CHECKPOINT_ACTIONS = ["save", "load"]
+
+
+class ScriptSyntaxError(Exception):
+    """Error in the syntax of a script command, detected when the script is compiled"""
+
+
+class ScriptCommand(ABC):
+    """Command of a script, compiled from a line of the script"""
+
+    def __init__(self, line_number: int, text: str) -> None:
+        """
+        line_number : number of the line of the command in the script, from 1
+        text : line of the command, stripped and in lower case
+        """
+        self.line_number = line_number
+        self.text = text
+
+    def print_command(self) -> None:
+        print(f"Command >>> '{self.text}' <<<")
+
+    @abstractmethod
+    async def execute(self, parser, room) -> Union[None, int]:
+        """
+        Execute the command on the room, with the stored values and assertions of the script parser.
+        Return None if the command failed, 0 if the script should end, and 1 otherwise.
+        """
+
+
+class WaitCommand(ScriptCommand):
+    """'wait [duration] [h/m/s]' command, waiting for system seconds, or for simulated time if a unit is given"""
+
+    def __init__(
+        self, line_number: int, text: str, duration: float, unit_seconds: int = None
+    ) -> None:
+        super().__init__(line_number, text)
+        self.duration = duration
+        self.unit_seconds = unit_seconds
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        if self.unit_seconds is None:
+            sleep_time = int(self.duration)
+        else:  # time to wait in computer system seconds
+            sleep_time = int(
+                self.duration * self.unit_seconds / room.world.time.speed_factor
+            )
+        logging.info(f"[SCRIPT] Wait for {sleep_time} sec")
+        await room.world.time.sleep(sleep_time)
+        return 1
+
+
+class StoreWorldCommand(ScriptCommand):
+    """'store world [ambient] [variable]' command, reading the world state directly"""
+
+    def __init__(self, line_number: int, text: str, ambient: str, var_name: str):
+        super().__init__(line_number, text)
+        self.ambient = ambient
+        self.var_name = var_name
+
+    def read(self, room) -> Union[str, float, None]:
+        world = room.world
+        if self.ambient == "simtime":
+            return world.time.simulation_time(str_mode=True)
+        if self.ambient == "weather":
+            return world.weather
+        if self.ambient == "temperature":
+            value = world.ambient_temperature.get_temperature()
+        elif self.ambient == "humidity":
+            value = world.ambient_humidity.get_humidity()
+        elif self.ambient == "co2":
+            value = world.ambient_co2.get_co2()
+        else:
+            value = world.ambient_light.get_global_brightness(room)
+        return None if value is None else round(value, 2)
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        value = self.read(room)
+        parser.stored_values[self.var_name] = value
+        if value is None:
+            return None
+        logging.info(
+            f"[SCRIPT] The world {self.ambient} is stored in variable {self.var_name}={value}."
+        )
+        return 1
+
+
+class StoreDeviceCommand(ScriptCommand):
+    """'store [device] [attribute] [variable]' command, reading the attribute of the device directly"""
+
+    def __init__(
+        self,
+        line_number: int,
+        text: str,
+        device_name: str,
+        attribute: str,
+        var_name: str,
+    ) -> None:
+        super().__init__(line_number, text)
+        self.device_name = device_name
+        self.attribute = attribute
+        self.var_name = var_name
+
+    def read(self, parser, room):
+        ir_device = parser.find_device(room, self.device_name)
+        if ir_device is None:
+            logging.warning(
+                f" Device's name '{self.device_name}' not found in list of room '{room.name}'."
+            )
+            return None
+        try:
+            attr = getattr(ir_device.device, self.attribute)
+            if "effective" in self.attribute:
+                return round(attr(), 2)
+        except AttributeError:
+            logging.error(
+                f"The device {self.device_name} has no attribute/method '{self.attribute}'."
+            )
+            return None
+        if isinstance(attr, bool):  # bool is a Number, stored as is
+            return attr
+        if isinstance(attr, numbers.Number):
+            return round(attr, 2)
+        # Information dict of the device, as with 'getinfo' command
+        return ir_device.get_irdev_info(attribute=self.attribute)
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        value = self.read(parser, room)
+        parser.stored_values[self.var_name] = value
+        if value is None:
+            return None
+        logging.info(
+            f"[SCRIPT] The device {self.attribute} is stored in variable {self.var_name}={value}."
+        )
+        return 1
+
+
+class AssertCommand(ScriptCommand):
+    """'assert [variable] [==/!=/<=/>=] [variable/value]' command"""
+
+    def __init__(
+        self, line_number: int, text: str, var_name: str, sign: str, operand: str
+    ) -> None:
+        super().__init__(line_number, text)
+        self.var_name = var_name
+        self.sign = sign
+        self.operand = operand
+
+    def evaluate(
+        self, stored_values: Dict
+    ) -> Tuple[Union[bool, None], Union[str, None]]:
+        """
+        Evaluate the comparison with the stored values,
+        return if it is correct (None if it cannot be evaluated) and its recap string.
+        """
+        if self.var_name not in stored_values:
+            logging.error(f"The variable {self.var_name} is not stored.")
+            return None, None
+        value = None
+        if self.operand in stored_values:  # if we compare to a stored variable
+            var = stored_values[self.operand]
+            if not isinstance(var, bool):  # stored device states are compared as bools
+                var = str(var)
+            var_to_compare = self.operand
+        else:  # if we compare to a value, can be a bool, or a str for weather (e.g. 'clear')
+            var = self.operand
+            var_to_compare = "new_var"
+        try:
+            if isinstance(var, bool):
+                pass
+            elif "false" in var:
+                var = False
+            elif "true" in var:
+                var = True
+            elif var not in WEATHERS:
+                var = float(var)
+                value = float(stored_values[self.var_name])
+        except (ValueError, TypeError):
+            logging.error(
+                f"The values of {self.var_name} ({stored_values[self.var_name]}) and {var_to_compare} ({var}) cannot be compared."
+            )
+            return None, None
+        if value is None:
+            value = stored_values[self.var_name]
+        if self.sign in ["<=", ">="] and type(var) != float:
+            logging.warning("Cannot compare string or bool with inequality symbols.")
+            return None, None
+        if self.sign == "==":
+            if type(value) == float:
+                var, value = str(var), str(value)
+            correct = value == var
+        elif self.sign == "!=":
+            correct = value != var
+        elif self.sign == "<=":
+            correct = value <= var
+        else:
+            correct = value >= var
+        return correct, f"({value}) {self.var_name} {self.sign} {var_to_compare} ({var})"
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        """Evaluate the assertion alone, as a batch of one assertion"""
+        return await AssertBatch([self]).execute(parser, room)
+
+
+class AssertBatch(ScriptCommand):
+    """Consecutive 'assert' commands, evaluated together on the same state of the simulation"""
+
+    def __init__(self, assertions: List[AssertCommand]) -> None:
+        super().__init__(assertions[0].line_number, assertions[0].text)
+        self.assertions = assertions
+
+    def print_command(self) -> None:
+        for assertion in self.assertions:
+            assertion.print_command()
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        """Evaluate all the assertions of the batch, and fail if one of them is not correct"""
+        simtime = room.world.time.simulation_time(str_mode=True)
+        ret = 1
+        for assertion in self.assertions:
+            correct, recap_str = assertion.evaluate(parser.stored_values)
+            if correct is None:
+                ret = None
+                continue
+            if correct:
+                logging.info(f"[SCRIPT] The comparison '{recap_str}' is correct.")
+                print("Assertion True")
+                key = f"Assertion True{parser.assert_counter} at simtime {simtime}"
+            else:
+                logging.info(f"[SCRIPT] The comparison '{recap_str}' is not correct.")
+                print("Assertion False")
+                key = f"Assertion False{parser.assert_counter} FAILED at simtime {simtime}"
+                ret = None
+            parser.assertions[key] = recap_str
+            parser.assert_counter += 1
+        return ret
+
+
+class SetAmbientCommand(ScriptCommand):
+    """'set [ambient] [value] [in/out]' command, setting a state of the world"""
+
+    def __init__(
+        self, line_number: int, text: str, ambient: str, value: Union[str, float]
+    ) -> None:
+        """ambient : ambient to set, with '_in' or '_out' suffix for temperature, humidity and co2"""
+        super().__init__(line_number, text)
+        self.ambient = ambient
+        self.value = value
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        return room.world.set_ambient_value(self.ambient, self.value)  # None or 1
+
+
+class SetSensorCommand(ScriptCommand):
+    """'set [humiditysoil/presencesensor] [value]' command, setting the value measured by a sensor"""
+
+    def __init__(
+        self, line_number: int, text: str, device_name: str, value: Union[float, bool]
+    ) -> None:
+        super().__init__(line_number, text)
+        self.device_name = device_name
+        self.value = value
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        ir_device = parser.find_device(room, self.device_name)
+        if ir_device is None:
+            logging.warning(
+                f"The device {self.device_name} is not found in room's devices list."
+            )
+            return None
+        return ir_device.device.set_value(self.value)  # None or 1
+
+
+class SetFunctionalModuleCommand(ScriptCommand):
+    """'set [button/dimmer] [ON/OFF] [state_ratio]' command, acting on a functional module as a user"""
+
+    def __init__(
+        self,
+        line_number: int,
+        text: str,
+        device_name: str,
+        state: bool,
+        state_ratio: int = None,
+    ) -> None:
+        super().__init__(line_number, text)
+        self.device_name = device_name
+        self.state = state
+        self.state_ratio = state_ratio
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        ir_device = parser.find_device(room, self.device_name)
+        if ir_device is None:
+            logging.warning(
+                f"The device {self.device_name} is not found in room's devices list."
+            )
+            return None
+        if not isinstance(ir_device.device, dev.FunctionalModule):
+            logging.warning("Users can only interact with a Functional Module.")
+            return None
+        if self.state_ratio is None:
+            ir_device.device.user_input(state=self.state)
+        else:
+            ir_device.device.user_input(state=self.state, state_ratio=self.state_ratio)
+        return 1
+
+
+class ShowCommand(ScriptCommand):
+    """'show [variable/all]' command, printing stored values"""
+
+    def __init__(self, line_number: int, text: str, var_name: str = None) -> None:
+        """var_name : variable to print, all variables if None"""
+        super().__init__(line_number, text)
+        self.var_name = var_name
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        if self.var_name is None:
+            pp.pprint(parser.stored_values)
+        elif self.var_name in parser.stored_values:
+            print(f"{self.var_name} = {parser.stored_values[self.var_name]}")
+        return 1
+
+
+class CheckpointCommand(ScriptCommand):
+    """'checkpoint [save/load] [name]' command, saving the simulation state or continuing from a saved one"""
+
+    def __init__(self, line_number: int, text: str, action: str, name: str) -> None:
+        """name : checkpoint name in the checkpoints/ folder, or path of a .ckpt file"""
+        super().__init__(line_number, text)
+        self.action = action
+        self.file_path = checkpoint_path(name)
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        if self.action == "save":
+            return save_checkpoint(room, self.file_path)  # None or 1
+        return load_checkpoint(room, self.file_path)  # None or 1
+
+
+class EndCommand(ScriptCommand):
+    """'end' command, terminating the script"""
+
+    async def execute(self, parser, room) -> Union[None, int]:
+        print("End of script")
+        return 0
+
+
+def compile_command(line_number: int, line: str) -> ScriptCommand:
+    """
+    Create the command of a stripped line of script, raise a ScriptSyntaxError if its syntax is incorrect.
+    The line is case insensitive, except for the checkpoint names and paths.
+    """
+    text = line.lower()
+    command_split = text.split()
+    name, args = command_split[0], command_split[1:]
+    if name == "wait":
+        if len(args) not in [1, 2]:
+            raise ScriptSyntaxError(
+                f"'wait' command expect 1 or 2 arguments, but {len(args)} was given."
+            )
+        if len(args) == 1:
+            try:
+                return WaitCommand(line_number, text, int(args[0]))
+            except ValueError:
+                raise ScriptSyntaxError(
+                    f"A number was excpected for the time to wait, but {args[0]} was given."
+                )
+        if args[1] not in WAIT_UNITS:
+            raise ScriptSyntaxError(
+                f"'wait' command expect 'h', 'm' or 's' as second argument, but {args[1]} was given."
+            )
+        try:
+            return WaitCommand(line_number, text, float(args[0]), WAIT_UNITS[args[1]])
+        except ValueError:
+            raise ScriptSyntaxError(
+                f"A number was excpected for the time to wait, but {args[0]} was given."
+            )
+    elif name == "store":
+        if len(args) != 3:
+            raise ScriptSyntaxError(
+                f"The 'store' command requires 3 arguments, but {len(args)} were given."
+            )
+        if args[0] == "world":
+            if args[1] not in WORLD_AMBIENTS:
+                raise ScriptSyntaxError(
+                    f"'store world' command expect ambient argument in {WORLD_AMBIENTS}, but {args[1]} was given."
+                )
+            return StoreWorldCommand(line_number, text, args[1], args[2])
+        return StoreDeviceCommand(line_number, text, *args)
+    elif name == "assert":
+        if len(args) != 3:
+            raise ScriptSyntaxError(
+                f"The 'assert' command requires 3 arguments, but {len(args)} were given."
+            )
+        if args[1] not in COMPARISON_SIGNS:
+            raise ScriptSyntaxError(
+                f"The comparison sign should be in {COMPARISON_SIGNS}, but {args[1]} was given."
+            )
+        return AssertCommand(line_number, text, *args)
+    elif name == "set":
+        return compile_set_command(line_number, text, args)
+    elif name == "show":
+        if len(args) > 1:
+            raise ScriptSyntaxError("'show' command requires 0 or 1 argument.")
+        if len(args) == 0 or args[0] == "all":
+            return ShowCommand(line_number, text)
+        return ShowCommand(line_number, text, args[0])
+    elif name == "checkpoint":
+        if len(args) != 2 or args[0] not in CHECKPOINT_ACTIONS:
+            raise ScriptSyntaxError(
+                f"'checkpoint' command expect {CHECKPOINT_ACTIONS} and a checkpoint name as arguments."
+            )
+        # the name is a file path, its case is kept
+        return CheckpointCommand(line_number, text, args[0], line.split()[2])
+    elif name == "end":
+        return EndCommand(line_number, text)
+    raise ScriptSyntaxError(
+        f"The command '{name}' is not a script command, it should be in ['wait', 'store', 'assert', 'set', 'show', 'checkpoint', 'end']."
+    )
+
+
+def parse_number(value: str, error_message: str) -> float:
+    """Return the number of a command argument, raise a ScriptSyntaxError with the message if it is not a number"""
+    try:
+        return float(value)
+    except ValueError:
+        raise ScriptSyntaxError(error_message)
+
+
+def compile_set_command(line_number: int, text: str, args: List[str]) -> ScriptCommand:
+    """Create the command of a 'set' line of script, raise a ScriptSyntaxError if its syntax is incorrect"""
+    if len(args) not in [2, 3]:
+        raise ScriptSyntaxError(
+            f"'set' command requires 2 or 3 arguments, but {len(args)} was provided."
+        )
+    target, value = args[0], args[1]
+    # set ambient state
+    if target in ["presence", "weather"]:
+        if len(args) == 3:
+            raise ScriptSyntaxError(
+                f" 'set {target}' command accepts only 1 additional argument, but '{args[2]}' was given."
+            )
+        return SetAmbientCommand(line_number, text, target, value)
+    if target in SET_AMBIENTS:
+        if len(args) == 2 or args[2] not in ["in", "out"]:
+            raise ScriptSyntaxError(
+                "No specification of indoor/outdoor ambient to set, the third argument of 'set' command should be 'in' or 'out' with temperature, humidity and co2."
+            )
+        return SetAmbientCommand(
+            line_number,
+            text,
+            target + "_" + args[2],  # we add '_in' or '_out'
+            parse_number(
+                value, f"The value should be a number, but '{value}' was given."
+            ),
+        )
+    # set sensor value
+    if "humiditysoil" in target:
+        return SetSensorCommand(
+            line_number,
+            text,
+            target,
+            parse_number(
+                value, f"The value {value} given to set {target} is not a number."
+            ),
+        )
+    if "presencesensor" in target:
+        if value not in ["true", "on", "false", "off"]:
+            raise ScriptSyntaxError(
+                f"The value {value} given to set {target} is not a boolean."
+            )
+        return SetSensorCommand(line_number, text, target, value in ["true", "on"])
+    # set functional module on or off, with possible value for state_ratio
+    if "button" in target or "dimmer" in target:
+        if value not in ["on", "off"]:
+            raise ScriptSyntaxError(
+                f"The state of {target} should be 'ON' or 'OFF', but '{value}' was given."
+            )
+        state_ratio = None
+        if len(args) == 3:
+            try:
+                state_ratio = int(args[2])
+                assert 0 <= state_ratio <= 100
+            except (ValueError, AssertionError):
+                raise ScriptSyntaxError(
+                    f"The value '{args[2]}' given should be a ratio (0-100), the command is incorrect."
+                )
+        return SetFunctionalModuleCommand(
+            line_number, text, target, value == "on", state_ratio
+        )
+    raise ScriptSyntaxError(
+        f"Device {target} cannot be set with 'set' API command, or does not exist."
+    )
+
+
+def compile_script(lines: Iterable[str]) -> Tuple[List[ScriptCommand], List[str]]:
+    """
+    Compile the lines of a script into commands, ignoring comments and empty lines,
+    consecutive 'assert' commands being grouped in batches.
+    Return the commands and the syntax errors of all the lines, the script can run only if there are none.
+    """
+    commands = []
+    errors = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if line.startswith("#") or len(line) == 0:  # comment line or empty line
+            continue
+        try:
+            command = compile_command(line_number, line)
+        except ScriptSyntaxError as e:
+            errors.append(f"Line {line_number} '{line.lower()}': {e}")
+            continue
+        if isinstance(command, AssertCommand):
+            if commands and isinstance(commands[-1], AssertBatch):
+                commands[-1].assertions.append(command)
+            else:
+                commands.append(AssertBatch([command]))
+        else:
+            commands.append(command)
+    return commands, errors
@@ -1,12 +1,17 @@
 """ 
 Package world to model and update physical world states, such as Temperature, Humidity, Co2, Brightness, Time, Soil Humidity or Presence.
+The states of the rooms of a building can be stored in arrays and updated at once with a Building.
 """
 
 from .world import Time, AmbientTemperature, AmbientLight, World
+from .virtual_clock import VirtualClock
+from .building import Building, BuildingTemperature, BuildingHumidity, BuildingCO2
 from .world_tools import (
     outdoor_light,
     compute_distance,
     compute_distance_from_window,
+    compute_distances,
+    compute_distances_from_windows,
     INSULATION_TO_TEMPERATURE_FACTOR,
     INSULATION_TO_HUMIDITY_FACTOR,
     INSULATION_TO_CO2_FACTOR,
@@ -0,0 +1,523 @@
+"""
+Classes definitions for the simulation of the physical world states of all the rooms of a building at once:
+Building, and the per-room views on its states BuildingTemperature, BuildingHumidity, BuildingCO2.
+"""
+
+import logging
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+import tools
+from .world import Time
+from .world_tools import (
+    INSULATION_TO_TEMPERATURE_FACTOR,
+    INSULATION_TO_HUMIDITY_FACTOR,
+    INSULATION_TO_CO2_FACTOR,
+)
+
+# States of the rooms stored in the building arrays, one value per room
+BUILDING_STATES = [
+    "temperature_in",
+    "previous_temperature_in",
+    "temperature_out",
+    "saturation_vapour_pressure_in",
+    "vapor_pressure_in",
+    "vapor_pressure_out",
+    "humidity_in",
+    "humidity_out",
+    "co2_in",
+    "co2_out",
+    "brightness_in",
+    "brightness_out",
+    "temperature_factor",
+    "humidity_factor",
+    "co2_factor",
+    "max_power",
+]
+MAX_TEMPERATURE = 35.0  # arbitrary, same as AmbientTemperature
+MIN_TEMPERATURE = 5.0  # arbitrary, same as AmbientTemperature
+
+
+def compute_saturation_vapor_pressure_water(temperatures: np.ndarray) -> np.ndarray:
+    """
+    Compute saturation_vapour_pressure of water for several temperatures at once, same formula as AmbientHumidity.
+    The pressure is nan where the temperature is <= 0.
+    https://journals.ametsoc.org/view/journals/apme/57/6/jamc-d-17-0334.1.xml
+    """
+    with np.errstate(invalid="ignore"):
+        exp_arg = 34.494 - 4924.99 / (temperatures + 237.1)
+        p_sat = np.exp(exp_arg) / np.power(temperatures + 105, 1.57)
+    return np.where(temperatures > 0, np.round(p_sat, 8), np.nan)
+
+
+class Building:
+    """
+    Class to represent the physical world states of all the rooms of a building, with a shared time.
+    Indoor and outdoor temperature, humidity, co2 and brightness of the rooms are stored in arrays with one value per room,
+    temperature, humidity and co2 are updated for all rooms at once by update() with the same rules as
+    AmbientTemperature, AmbientHumidity and AmbientCO2.
+    Each room keeps its World, whose ambient temperature, humidity and co2 are views on a room of the building.
+    """
+
+    def __init__(
+        self,
+        simulation_speed_factor: float,
+        system_dt: float,
+        date_time: str,
+        weather: str,
+        capacity: int = 16,
+    ) -> None:
+        """
+        Initialization of a building object, without rooms.
+
+        simulation_speed_factor : corresponding simulated time between two world updates
+        system_dt : interval in seconds between two world updates
+        date_time : date and time keyword or 'yyyy/mm/dd/hh/mm' string from config file
+        weather : 'clear', 'overcast' or 'dark'
+        capacity : number of rooms for which arrays are allocated, doubled when more rooms are added
+        """
+        self.__date_time, self.weather = tools.check_weather_date(date_time, weather)
+        self.time = Time(simulation_speed_factor, system_dt, self.__date_time)
+        self.rooms: List = []  # Room objects, updated in order by update()
+        self.__first_update = True
+        self.__nb_rooms = 0
+        self.__states: Dict[str, np.ndarray] = {
+            state: np.zeros(capacity) for state in BUILDING_STATES
+        }
+        # Heaters and ACs of all rooms, with the index of their room and the sign of their effect
+        self.__temp_sources = []
+        self.__temp_sources_rooms = np.zeros(0, dtype=int)
+        self.__temp_sources_signs = np.zeros(0)
+
+    def __len__(self) -> int:
+        return self.__nb_rooms
+
+    def __grow(self) -> None:
+        """Double the capacity of the states arrays, views previously returned by get_info() are not updated anymore."""
+        for state, values in self.__states.items():
+            self.__states[state] = np.concatenate((values, np.zeros(len(values))))
+
+    def add_room_world(
+        self,
+        room_insulation: str,
+        temp_out: float,
+        hum_out: float,
+        co2_out: float,
+        temp_in: float,
+        hum_in: float,
+        co2_in: float,
+    ) -> Tuple[int, "BuildingTemperature", "BuildingHumidity", "BuildingCO2"]:
+        """
+        Add the states of the world of a room to the building arrays, called by World() when created with a building.
+
+        room_insulation : 'perfect', 'good', 'average' or 'bad'
+        temp_out, hum_out, co2_out, temp_in, hum_in, co2_in : initial indoor/outdoor values of the room.
+
+        Return the index of the room in the arrays and the views on its temperature, humidity and co2.
+        """
+        index = self.__nb_rooms
+        if index == len(self.__states["temperature_in"]):
+            self.__grow()
+        self.__nb_rooms += 1
+        sat_out, sat_in = compute_saturation_vapor_pressure_water(
+            np.array([temp_out, temp_in], dtype=float)
+        )
+        initial_states = {
+            "temperature_in": temp_in,
+            "previous_temperature_in": temp_in,
+            "temperature_out": temp_out,
+            "saturation_vapour_pressure_in": sat_in,
+            "vapor_pressure_in": round(sat_in * hum_in / 100, 8),
+            "vapor_pressure_out": round(sat_out * hum_out / 100, 8),
+            "humidity_in": hum_in,
+            "humidity_out": hum_out,
+            "co2_in": co2_in,
+            "co2_out": co2_out,
+            "brightness_in": 0,
+            "brightness_out": 0,
+            "temperature_factor": INSULATION_TO_TEMPERATURE_FACTOR[room_insulation],
+            "humidity_factor": INSULATION_TO_HUMIDITY_FACTOR[room_insulation],
+            "co2_factor": INSULATION_TO_CO2_FACTOR[room_insulation],
+            "max_power": 0,
+        }
+        for state, value in initial_states.items():
+            self.__states[state][index] = value
+        return (
+            index,
+            BuildingTemperature(self, index),
+            BuildingHumidity(self, index),
+            BuildingCO2(self, index),
+        )
+
+    def add_temperature_source(self, index: int, tempsource) -> None:
+        """
+        Add a temperature source to the sources of a room: Heater or AC.
+
+        index : index of the room in the building arrays
+        tempsource: InRoomDevice
+        """
+        from devices import Heater, AC
+
+        if isinstance(tempsource.device, Heater):
+            sign = 1
+        elif isinstance(tempsource.device, AC):
+            sign = -1  # The ac update rule is <0
+        else:
+            logging.warning(
+                f"The device {tempsource.name} is not a Heater or a AC, thus cannot be added to temperature sources list."
+            )
+            return
+        self.__temp_sources.append(tempsource)
+        self.__temp_sources_rooms = np.append(self.__temp_sources_rooms, index)
+        self.__temp_sources_signs = np.append(self.__temp_sources_signs, sign)
+        self.__states["max_power"][index] += tempsource.device.max_power
+
+    def get_value(self, state: str, index: int) -> float:
+        """Return the value of a state of the room at index."""
+        return float(self.__states[state][index])
+
+    def set_value(self, state: str, index: int, value: float) -> None:
+        """Set the value of a state of the room at index."""
+        self.__states[state][index] = value
+
+    def __update_temperature(self, ratio: float) -> None:
+        """
+        Update the indoor temperature of all rooms: effect of the heaters and ACs that are on,
+        weighted by their effective power relatively to the total max power of their room,
+        then influence of outdoor temperature through the room's insulation.
+        """
+        n = self.__nb_rooms
+        states = self.__states
+        temperature_in = states["temperature_in"][:n]
+        states["previous_temperature_in"][:n] = temperature_in
+        if self.__temp_sources:
+            effective_powers = np.array(
+                [
+                    source.device.effective_power() if source.device.state else 0
+                    for source in self.__temp_sources
+                ],
+                dtype=float,
+            )
+            total_max_powers = states["max_power"][self.__temp_sources_rooms]
+            update_rules = np.divide(
+                self.__temp_sources_signs * effective_powers,
+                total_max_powers,
+                out=np.zeros(len(effective_powers)),
+                where=total_max_powers > 0,
+            )
+            for source, update_rule in zip(self.__temp_sources, update_rules):
+                if source.device.state:
+                    source.device.update_rule = float(update_rule)
+            temperature_in += (
+                np.bincount(
+                    self.__temp_sources_rooms, weights=update_rules, minlength=n
+                )[:n]
+                * ratio
+            )
+        temperature_in += (states["temperature_out"][:n] - temperature_in) * states[
+            "temperature_factor"
+        ][:n]
+        np.clip(temperature_in, MIN_TEMPERATURE, MAX_TEMPERATURE, out=temperature_in)
+
+    def __update_humidity(self, ratio: float) -> None:
+        """
+        Update the indoor humidity of all rooms from the vapor pressure exchanged with outside through
+        the room's insulation, and the saturation vapor pressure at the new indoor temperature.
+        """
+        n = self.__nb_rooms
+        states = self.__states
+        saturation_vapour_pressure_in = compute_saturation_vapor_pressure_water(
+            np.round(states["temperature_in"][:n], 2)
+        )
+        frozen = np.isnan(saturation_vapour_pressure_in)
+        if frozen.any():
+            logging.warning(
+                f"Cannot compute saturation vapor pressure because temperature <0 in {int(frozen.sum())} room(s)."
+            )
+        vapor_pressure_in = states["vapor_pressure_in"][:n]
+        vapor_pressure_in += (
+            (states["vapor_pressure_out"][:n] - vapor_pressure_in)
+            * states["humidity_factor"][:n]
+            * ratio
+        )
+        np.copyto(
+            states["saturation_vapour_pressure_in"][:n],
+            saturation_vapour_pressure_in,
+            where=~frozen,
+        )
+        np.copyto(
+            states["humidity_in"][:n],
+            100 * vapor_pressure_in / saturation_vapour_pressure_in,
+            where=~frozen,
+        )
+
+    def __update_co2(self, ratio: float) -> None:
+        """Update the indoor co2 of all rooms, it tends toward outdoor co2 depending on the room's insulation."""
+        n = self.__nb_rooms
+        states = self.__states
+        co2_in = states["co2_in"][:n]
+        co2_in += (states["co2_out"][:n] - co2_in) * states["co2_factor"][:n] * ratio
+
+    def update(self, interval: float = 1, gui_mode: bool = False) -> None:
+        """
+        Update the states of all rooms at once, then the sensors of each room by calling Room.update_world().
+        Scheduled instead of Room.update_world() when the rooms are in a building.
+
+        interval : passed to Room.update_world()
+        gui_mode : passed to Room.update_world() of the rooms displayed in a GUI window
+        """
+        if not self.__first_update:
+            self.time.update_datetime()
+            logging.info(
+                f"Building update of {self.__nb_rooms} rooms at {self.time.simulation_time(str_mode=True)}."
+            )
+            ratio = self.time.update_rule_ratio
+            self.__update_temperature(ratio)
+            self.__update_humidity(ratio)
+            self.__update_co2(ratio)
+        self.__first_update = False
+        for room in self.rooms:
+            room.update_world(
+                interval=interval, gui_mode=gui_mode and hasattr(room, "gui_window")
+            )
+
+    def get_info(self) -> Dict[str, Union[List[str], np.ndarray]]:
+        """
+        Return the names of the rooms and read-only views on the states of all rooms, indexed like the rooms.
+        The views reflect the next updates, as long as no room is added to the building.
+        """
+        info = {"rooms": [room.name for room in self.rooms]}
+        for state, values in self.__states.items():
+            view = values[: self.__nb_rooms]
+            view.flags.writeable = False
+            info[state] = view
+        return info
+
+
+class BuildingTemperature:
+    """Class to represent the Temperature of a room of a building, same API as AmbientTemperature."""
+
+    def __init__(self, building: Building, index: int) -> None:
+        """
+        Initialization of the view on the temperature of the room at index in the building arrays.
+        The temperature is updated for all rooms by Building.update().
+        """
+        self.__building = building
+        self.__index = index
+        self.__temp_sensors = []
+
+    def __repr__(self):
+        return f"{self.__building.get_value('temperature_in', self.__index)} °C"
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def temperature_out(self) -> float:
+        return self.__building.get_value("temperature_out", self.__index)
+
+    def add_source(self, tempsource) -> None:
+        """
+        Add a temperature source to the room's sources: Heater or AC.
+
+        tempsource: InRoomDevice
+        """
+        self.__building.add_temperature_source(self.__index, tempsource)
+
+    def add_sensor(self, tempsensor) -> None:
+        """
+        Add a temperature sensor to sensors list: Thermometer.
+
+        tempsensor: InRoomDevice
+        """
+        self.__temp_sensors.append(tempsensor)
+
+    def update(
+        self, first_update: bool = False
+    ) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        Update all temperature sensors of the room with the temperature computed by Building.update().
+
+        Return temperature levels and a rising temp flag for GUI updates.
+        """
+        temperature_in = self.__building.get_value("temperature_in", self.__index)
+        previous_temp = self.__building.get_value(
+            "previous_temperature_in", self.__index
+        )
+        temperature_levels = []
+        for sensor in self.__temp_sensors:  # InRoomDevice objects
+            sensor.device.temperature = temperature_in
+            sensor.device.send_state()
+            temperature_levels.append((sensor.name, sensor.device.temperature))
+        rising_temp = temperature_in > previous_temp
+        if first_update or round(temperature_in, 2) == round(previous_temp, 2):
+            rising_temp = None
+        return temperature_levels, rising_temp
+
+    # CLI, API methods
+    def set_temperature(self, location: str, value: float) -> int:
+        """
+        Set the room indoor and/or outdoor temperature value, called only in Script Mode with API commands.
+        Then updates the temperature measured by sensors.
+
+        location should be 'in' or 'out'.
+        """
+        if location not in ["in", "out"]:
+            logging.error(
+                f"The location should be 'in' or 'out' when setting temperature, but {location} was given."
+            )
+            return 0
+        self.__building.set_value("temperature_" + location, self.__index, float(value))
+        if location == "in":
+            for sensor in self.__temp_sensors:
+                sensor.device.temperature = float(value)
+        return 1
+
+    def get_temperature(self, str_mode: bool = False) -> Union[str, float]:
+        """Return the current temperature value, called with CLI 'getinfo' command."""
+        temp = round(self.__building.get_value("temperature_in", self.__index), 2)
+        return str(temp) + " °C" if str_mode else temp
+
+
+class BuildingHumidity:
+    """Class to represent the Relative Air Humidity of a room of a building, same API as AmbientHumidity."""
+
+    def __init__(self, building: Building, index: int) -> None:
+        """
+        Initialization of the view on the humidity of the room at index in the building arrays.
+        The humidity is updated for all rooms by Building.update().
+        """
+        self.__building = building
+        self.__index = index
+        self.__humidity_sensors = []
+
+    @property
+    def humidity_out(self) -> float:
+        return self.__building.get_value("humidity_out", self.__index)
+
+    def add_sensor(self, humiditysensor) -> None:
+        """
+        Add humidity sensor to the sensors list : HumidityAir and AirSensor.
+
+        humiditysensor: InRoomDevice
+        """
+        self.__humidity_sensors.append(humiditysensor)
+
+    def __update_sensors(self) -> None:
+        humidity_in = round(self.__building.get_value("humidity_in", self.__index), 2)
+        for sensor in self.__humidity_sensors:
+            sensor.device.humidity = humidity_in
+
+    def update(
+        self, temperature: float = None, first_update: bool = False
+    ) -> List[Tuple[str, float]]:
+        """
+        Update all humidity sensors of the room with the humidity computed by Building.update().
+
+        temperature : unused, the building uses the temperature of its arrays.
+
+        Return humidity levels for GUI updates.
+        """
+        self.__update_sensors()
+        return [
+            (sensor.device.name, sensor.device.humidity)
+            for sensor in self.__humidity_sensors
+        ]
+
+    # API, CLI methods
+    def set_humidity(self, location: str, value: float) -> int:
+        """
+        Set the room indoor and/or outdoor humidity value, called only in Script Mode with API commands.
+        Then updates the humidity measured by sensors.
+
+        location should be 'in' or 'out'.
+        """
+        if location not in ["in", "out"]:
+            logging.error(
+                f"The location should be 'in' or 'out' when setting humidity, but {location} was given."
+            )
+            return 0
+        building, index = self.__building, self.__index
+        (saturation_vapour_pressure,) = compute_saturation_vapor_pressure_water(
+            np.array([building.get_value("temperature_" + location, index)])
+        )
+        building.set_value("humidity_" + location, index, float(value))
+        building.set_value(
+            "vapor_pressure_" + location,
+            index,
+            round(saturation_vapour_pressure * float(value) / 100, 8),
+        )
+        if location == "in":
+            building.set_value(
+                "saturation_vapour_pressure_in", index, saturation_vapour_pressure
+            )
+            self.__update_sensors()
+        return 1
+
+    def get_humidity(self, str_mode: bool = False) -> Union[str, float]:
+        """Return the current humidity value, called with CLI 'getinfo' command."""
+        hum = round(self.__building.get_value("humidity_in", self.__index), 2)
+        return str(hum) + " %" if str_mode else hum
+
+
+class BuildingCO2:
+    """Class to represent the CO2 of a room of a building, same API as AmbientCO2."""
+
+    def __init__(self, building: Building, index: int) -> None:
+        """
+        Initialization of the view on the co2 of the room at index in the building arrays.
+        The co2 is updated for all rooms by Building.update().
+        """
+        self.__building = building
+        self.__index = index
+        self.__co2_sensors = []
+
+    @property
+    def co2_out(self) -> float:
+        return self.__building.get_value("co2_out", self.__index)
+
+    def add_sensor(self, co2sensor) -> None:
+        """
+        Add a co2 sensor in sensors list: CO2Sensor.
+
+        co2sensor: InRoomDevice
+        """
+        self.__co2_sensors.append(co2sensor)
+
+    def update(self, first_update: bool = False) -> List[Tuple[str, float]]:
+        """
+        Update all co2 sensors of the room with the co2 computed by Building.update().
+
+        Return co2 levels for GUI updates.
+        """
+        co2_in = int(self.__building.get_value("co2_in", self.__index))
+        co2_levels = []
+        for sensor in self.__co2_sensors:
+            sensor.device.co2 = co2_in
+            co2_levels.append((sensor.device.name, sensor.device.co2))
+        return co2_levels
+
+    # API, CLI
+    def set_co2(self, location: str, value: float) -> int:
+        """
+        Set the room indoor and/or outdoor co2 value, called only in Script Mode with API commands.
+        Then updates the co2 levels measured by sensors.
+
+        location should be 'in' or 'out'.
+        """
+        if location not in ["in", "out"]:
+            logging.error(
+                f"The location should be 'in' or 'out' when setting CO2, but {location} was given."
+            )
+            return 0
+        self.__building.set_value("co2_" + location, self.__index, float(value))
+        if location == "in":
+            for sensor in self.__co2_sensors:
+                sensor.device.co2 = int(float(value))
+        return 1
+
+    def get_co2(self, str_mode: bool = False) -> Union[str, float]:
+        """Return the current co2 value, called with CLI 'getinfo' command."""
+        co2 = round(self.__building.get_value("co2_in", self.__index), 2)
+        return str(co2) + " ppm" if str_mode else co2
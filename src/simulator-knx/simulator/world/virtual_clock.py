@@ -0,0 +1,57 @@
+"""
+Virtual clock for the headless mode: the jobs scheduled on the clock are run in the order of their virtual time,
+as fast as possible, instead of waiting for real time to pass.
+"""
+
+import heapq
+import itertools
+from typing import Callable, List, Tuple
+
+
+class VirtualClock:
+    """
+    Class to represent a clock whose time only advances when asked to, with a queue of timed events.
+    Time is in system seconds, as the system_dt interval between two world updates.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization of a virtual clock at time 0.
+
+        __events : heap of (time, sequence number, job, interval) tuples,
+        the sequence number keeps the events scheduled at the same time in insertion order,
+        interval is None for jobs called once.
+        """
+        self.now = 0.0
+        self.__events: List[Tuple[float, int, Callable[[], None], float]] = []
+        self.__sequence = itertools.count()
+
+    def call_at(self, time: float, job: Callable[[], None], interval: float = None) -> None:
+        """Schedule a job at the given virtual time, and then every interval if it is not None."""
+        heapq.heappush(self.__events, (time, next(self.__sequence), job, interval))
+
+    def add_job(self, job: Callable[[], None], interval: float) -> None:
+        """Schedule a job every interval, starting after one interval as an APScheduler interval job."""
+        self.call_at(self.now + interval, job, interval)
+
+    def run_until(self, time: float) -> int:
+        """
+        Run all the jobs scheduled up to the given virtual time in time order, and advance the clock to it.
+        Jobs can schedule new events, they are run if they are before the given time.
+
+        Return the number of jobs run.
+        """
+        nb_jobs = 0
+        while self.__events and self.__events[0][0] <= time:
+            event_time, _, job, interval = heapq.heappop(self.__events)
+            self.now = event_time
+            if interval is not None:
+                self.call_at(event_time + interval, job, interval)
+            job()
+            nb_jobs += 1
+        self.now = max(self.now, time)
+        return nb_jobs
+
+    def advance(self, seconds: float) -> int:
+        """Run all the jobs scheduled in the next seconds of virtual time, return the number of jobs run."""
+        return self.run_until(self.now + seconds)
@@ -3,6 +3,7 @@ Classes definitions for the simulation of physical world states:
 Time, AmbienLight, AmbientTemperature, AmbientHumidity, AmbientCO2, SoilMoisture, Presence, World
 """
 
+import asyncio
 import time
 import math
 import logging
@@ -10,24 +11,27 @@ from datetime import timedelta, datetime
 from typing import List, Union, Tuple, Dict
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import numpy as np
 from numpy import float32, mean, sign
 
 import tools
 from .world_tools import (
     outdoor_light,
-    compute_distance,
-    compute_distance_from_window,
+    compute_distances,
+    compute_distances_from_windows,
     INSULATION_TO_TEMPERATURE_FACTOR,
     INSULATION_TO_HUMIDITY_FACTOR,
     INSULATION_TO_CO2_FACTOR,
     SOIL_MOISTURE_MIN,
 )
+from .virtual_clock import VirtualClock
 
 
 class Time:
     """
     Class to represent time in simulation, manage scheduling of world updates and evolution of the time and date.
     The scheduler methods manage the regular world updates only when GUI is not used, in the latter case, pyglet library manage scheduling.
+    In headless mode, the scheduler is a virtual clock: the updates are run as fast as possible when script commands wait.
     """
 
     def __init__(
@@ -50,19 +54,31 @@ class Time:
         self.date_time = date_time
         self.__simtim_tick_counter = 0
         self.update_rule_ratio = (self.__system_dt * self.speed_factor) / 3600
+        self.virtual_clock: VirtualClock = None
 
     # Scheduler management, if not in GUI mode
-    def scheduler_init(self) -> AsyncIOScheduler:
-        """Initialize the asyncio scheduler."""
-        self.__scheduler = AsyncIOScheduler()
+    def scheduler_init(self, virtual: bool = False) -> Union[AsyncIOScheduler, VirtualClock]:
+        """
+        Initialize the asyncio scheduler.
+
+        virtual : if True (headless mode), initialize a virtual clock instead, whose jobs are run when sleep() is called.
+        """
+        if virtual:
+            self.virtual_clock = VirtualClock()
+            self.__scheduler = self.virtual_clock
+        else:
+            self.__scheduler = AsyncIOScheduler()
         return self.__scheduler
 
     def scheduler_add_job(self, job_function) -> None:
         """Add a job (function) to the scheduler, and define the interval in seconds between two calls (here system_dt)."""
         try:
-            self.__update_job = self.__scheduler.add_job(
-                job_function, "interval", seconds=self.__system_dt
-            )
+            if self.virtual_clock is not None:
+                self.virtual_clock.add_job(job_function, self.__system_dt)
+            else:
+                self.__update_job = self.__scheduler.add_job(
+                    job_function, "interval", seconds=self.__system_dt
+                )
         except AttributeError:
             logging.warning(
                 "The Scheduler is not initialized: update job cannnot be added."
@@ -71,12 +87,24 @@ class Time:
     def scheduler_start(self) -> None:
         """Start the scheduler and initialize the start simulation time."""
         try:
-            self.__scheduler.start()
+            if self.virtual_clock is None:
+                self.__scheduler.start()
             self.start_time = time.time()
             self._last_tick_time = self.start_time
         except AttributeError:
             logging.warning("The Scheduler is not initialized and cannot be started.")
 
+    async def sleep(self, seconds: float) -> None:
+        """
+        Wait for the given system seconds (simulated time / speed_factor).
+        In headless mode, run the scheduled jobs of the next seconds of virtual time without waiting.
+        """
+        if self.virtual_clock is not None:
+            self.virtual_clock.advance(seconds)
+            await asyncio.sleep(0)  # let other tasks run, as a real sleep would
+        else:
+            await asyncio.sleep(seconds)
+
     # Simulation time management
     def simulation_time(self, str_mode: bool = False) -> Union[str, float, None]:
         """
@@ -102,6 +130,22 @@ class Time:
         )
         return self.date_time
 
+    # Checkpoints
+    def get_state(self) -> Dict[str, Union[str, float]]:
+        """Return the simulation start date and the elapsed simulated seconds, saved in checkpoints."""
+        return {
+            "datetime_init": self.__datetime_init.isoformat(),
+            "elapsed_time": self.simulation_time(str_mode=False),
+        }
+
+    def set_state(self, state: Dict[str, Union[str, float]]) -> None:
+        """Restore the simulated time from a checkpoint, the speed factor of the current simulation is kept."""
+        self.__datetime_init = datetime.fromisoformat(state["datetime_init"])
+        self.__simtim_tick_counter = state["elapsed_time"] / self.speed_factor
+        self.date_time = self.__datetime_init + timedelta(
+            seconds=state["elapsed_time"]
+        )
+
 
 class AmbientLight:
     """Class to represent Light/Brightness in a simulation, Brightness is location-dependant in the room."""
@@ -124,6 +168,9 @@ class AmbientLight:
         self.__light_loss_factor = 0.8
         self.__weather = weather
         self.__lux_out, self.__time_of_day = outdoor_light(date_time, weather)
+        # Lux received by each sensor (rows) per lumen emitted by each light source then window (columns),
+        # None when it must be recomputed because devices were added or moved
+        self.__lux_per_lumen: np.ndarray = None
 
     def add_source(self, lightsource) -> None:
         """
@@ -141,6 +188,7 @@ class AmbientLight:
             lightsource.device.max_lumen_from_out_lux(self.__lux_out)
         elif isinstance(lightsource.device, LightActuator):
             self.__light_sources.append(lightsource)
+        self.locations_changed()
 
     def add_sensor(self, lightsensor) -> None:
         """
@@ -149,58 +197,69 @@ class AmbientLight:
         lightsensor: InRoomDevice
         """
         self.__light_sensors.append(lightsensor)
+        self.locations_changed()
+
+    def locations_changed(self) -> None:
+        """
+        Invalidate the lux received by sensors per lumen emitted by sources,
+        called when a light source, window or sensor is added or moved (InRoomDevice.update_location()).
+        """
+        self.__lux_per_lumen = None
 
-    def __lux_from_lightsource(self, source, distance: float) -> float:
+    def __compute_lux_per_lumen(self) -> np.ndarray:
         """
-        Compute resulting lux at a certain distance of a light source emitting lumens.
+        Compute the lux received by each sensor per lumen emitted by each light source and window.
         lux = lumen/square meter
         With the beam angle of source, we compute the total sphere surface reached by lumens
         at a certain distance from source,
         We then take the fraction corresponding to 1 square meter:
-        (effective_lumen * lumen_ratio) / lux_area = lux/m^2 at a certain distance.
-
-        source: InRoomDevice
+        lumen_ratio / lux_area = lux/m^2 per lumen at a certain distance.
         """
-        if (
-            distance <= 0.01
-        ):  # source and sensor at same place, sensor gets all the light emitted
-            return source.device.effective_lumen()
+        sources = self.__light_sources + self.__windows
         lux_area = 1  # 1 m^2
+        distances = np.concatenate(
+            (
+                compute_distances(self.__light_sources, self.__light_sensors),
+                compute_distances_from_windows(self.__windows, self.__light_sensors),
+            ),
+            axis=1,
+        )
+        beam_angles = np.array([source.device.beam_angle for source in sources], dtype=float)
         # Total surface of sphere reached by light around lightsource
         # https://en.wikipedia.org/wiki/Solid_angle
-        solid_angle = 4 * math.pi * (math.sin(source.device.beam_angle / 4)) ** 2
-        total_beam_cone_surface = solid_angle * distance**2
-        # Fraction of lumen reaching a 1m^2 area at a specific distance from source
-        lumen_ratio = lux_area / total_beam_cone_surface
-        # Lumen reaching the 1m^2 area at distance from source
-        effective_lumen = (
-            source.device.effective_lumen() * lumen_ratio
-        )  # result in lumen [lm]
-        return effective_lumen / lux_area  # result in [lm/m^2]
-
-    def __compute_sensor_brightness(self, brightness_sensor) -> float:
-        """
-        Compute brightness measured by a certain sensor.
-
-        brightness_sensor: InRoomDevice
-        """
-        from system import Window
+        solid_angles = 4 * math.pi * np.sin(beam_angles / 4) ** 2
+        total_beam_cone_surfaces = solid_angles * distances**2
+        # source and sensor at same place, sensor gets all the light emitted
+        same_place = distances <= 0.01
+        with np.errstate(divide="ignore"):
+            # Fraction of lumen reaching a 1m^2 area at a specific distance from source
+            lumen_ratios = lux_area / np.where(same_place, 1, total_beam_cone_surfaces)
+        return np.where(same_place, 1, lumen_ratios / lux_area)
+
+    def __compute_sensors_brightness(self) -> np.ndarray:
+        """
+        Compute brightness measured by all sensors (illuminance in lux=[lm/m^2]),
+        lux values from the sources add up linearly.
+        """
+        if self.__lux_per_lumen is None:
+            self.__lux_per_lumen = self.__compute_lux_per_lumen()
+        # Lumen emitted by light sources that are ON, then by windows
+        emitted_lumen = np.array(
+            [
+                source.device.effective_lumen() if source.device.state else 0
+                for source in self.__light_sources
+            ]
+            + [window.device.effective_lumen() for window in self.__windows],
+            dtype=float,
+        )
+        return self.__lux_per_lumen @ emitted_lumen
 
-        brightness = 0
-        for source in self.__light_sources:
-            if source.device.state:
-                # Compute distance between sensor and source
-                distance = compute_distance(source, brightness_sensor)
-                # Compute the partial brightness (illuminance in lux=[lm/m^2])
-                partial_illuminance = self.__lux_from_lightsource(source, distance)
-                # We can linearly add lux values
-                brightness += partial_illuminance
-
-        for window in self.__windows:
-            distance = compute_distance_from_window(window, brightness_sensor)
-            partial_illuminance = self.__lux_from_lightsource(window, distance)
-            brightness += partial_illuminance
-        return brightness
+    def __update_sensors_brightness(self) -> None:
+        """Update the brightness measured by all sensors."""
+        for sensor, brightness in zip(
+            self.__light_sensors, self.__compute_sensors_brightness()
+        ):
+            sensor.device.brightness = float(brightness)
 
     def update(
         self, date_time: datetime, first_update: bool = False
@@ -220,10 +279,11 @@ class AmbientLight:
             )
             for window in self.__windows:  # update max_lumen
                 window.device.max_lumen_from_out_lux(self.__lux_out)
-        brightness_levels = []
-        for sensor in self.__light_sensors:  # update light sensors values
-            sensor.device.brightness = self.__compute_sensor_brightness(sensor)
-            brightness_levels.append((sensor.device.name, sensor.device.brightness))
+        self.__update_sensors_brightness()  # update light sensors values
+        brightness_levels = [
+            (sensor.device.name, sensor.device.brightness)
+            for sensor in self.__light_sensors
+        ]
 
         return brightness_levels, self.__weather, self.__time_of_day, self.__lux_out
 
@@ -247,8 +307,7 @@ class AmbientLight:
             )
             for window in self.__windows:  # update max_lumen
                 window.device.max_lumen_from_out_lux(self.__lux_out)
-            for sensor in self.__light_sensors:  # update light sensors values
-                sensor.device.brightness = self.__compute_sensor_brightness(sensor)
+            self.__update_sensors_brightness()  # update light sensors values
             return 1
 
     def __compute_global_brightness(self, room) -> float:
@@ -291,12 +350,10 @@ class AmbientLight:
             else:
                 return self.__lux_out
         if room is None:  # Average of all sensors' brightness
-            brightness_levels = []
-            for sensor in self.__light_sensors:
-                brightness_levels.append(
-                    self.__compute_sensor_brightness(sensor)
-                )  # We recompute to have the latest value
-            bright = mean(brightness_levels) if len(brightness_levels) else 0
+            brightness_levels = (
+                self.__compute_sensors_brightness()
+            )  # We recompute to have the latest value
+            bright = float(mean(brightness_levels)) if len(brightness_levels) else 0
         else:  # Use detailed formula to compute global brightness
             bright = self.__compute_global_brightness(room)
 
@@ -452,6 +509,21 @@ class AmbientTemperature:
             temp = round(self.__temperature_in, 2)
         return temp
 
+    # Checkpoints
+    def get_state(self) -> Dict[str, float]:
+        """Return the unrounded temperature values, saved in checkpoints."""
+        return {
+            "temperature_in": float(self.__temperature_in),
+            "temperature_out": float(self.temperature_out),
+        }
+
+    def set_state(self, state: Dict[str, float]) -> None:
+        """Restore the temperature values from a checkpoint, and the values measured by sensors."""
+        self.__temperature_in = state["temperature_in"]
+        self.temperature_out = state["temperature_out"]
+        for sensor in self.__temp_sensors:
+            sensor.device.temperature = self.__temperature_in
+
 
 class AmbientHumidity:
     """Class to represent Relative Air Humidity in a simulation, Humidity is homogeneous in the whole room."""
@@ -608,6 +680,31 @@ class AmbientHumidity:
             hum = round(self.__humidity_in, 2)
         return hum
 
+    # Checkpoints
+    def get_state(self) -> Dict[str, float]:
+        """Return the humidity values and the vapor pressures they are computed from, saved in checkpoints."""
+        return {
+            "temperature_in": float(self.__temperature_in),
+            "humidity_in": float(self.__humidity_in),
+            "humidity_out": float(self.humidity_out),
+            "saturation_vapour_pressure_in": self.__saturation_vapour_pressure_in,
+            "saturation_vapour_pressure_out": self.__saturation_vapour_pressure_out,
+            "vapor_pressure_in": self.__vapor_pressure_in,
+            "vapor_pressure_out": self.__vapor_pressure_out,
+        }
+
+    def set_state(self, state: Dict[str, float]) -> None:
+        """Restore the humidity values from a checkpoint, and the values measured by sensors."""
+        self.__temperature_in = state["temperature_in"]
+        self.__humidity_in = state["humidity_in"]
+        self.humidity_out = state["humidity_out"]
+        self.__saturation_vapour_pressure_in = state["saturation_vapour_pressure_in"]
+        self.__saturation_vapour_pressure_out = state["saturation_vapour_pressure_out"]
+        self.__vapor_pressure_in = state["vapor_pressure_in"]
+        self.__vapor_pressure_out = state["vapor_pressure_out"]
+        for sensor in self.__humidity_sensors:
+            sensor.device.humidity = round(self.__humidity_in, 2)
+
 
 class AmbientCO2:
     """
@@ -701,6 +798,18 @@ class AmbientCO2:
             co2 = round(self.__co2_in, 2)
         return co2
 
+    # Checkpoints
+    def get_state(self) -> Dict[str, float]:
+        """Return the unrounded co2 values, saved in checkpoints."""
+        return {"co2_in": float(self.__co2_in), "co2_out": float(self.co2_out)}
+
+    def set_state(self, state: Dict[str, float]) -> None:
+        """Restore the co2 values from a checkpoint, and the values measured by sensors."""
+        self.__co2_in = state["co2_in"]
+        self.co2_out = state["co2_out"]
+        for sensor in self.__co2_sensors:
+            sensor.device.co2 = int(self.__co2_in)
+
 
 class SoilMoisture:
     """Class to represent Soil Moisture in a simulation"""
@@ -823,6 +932,17 @@ class Presence:
                 sensor.device.state = self.presence
             return 1
 
+    # Checkpoints
+    def get_state(self) -> Dict[str, Union[bool, List[str]]]:
+        """Return the presence value and the entities in the room, saved in checkpoints."""
+        return {"presence": self.presence, "entities": list(self.entities)}
+
+    def set_state(self, state: Dict[str, Union[bool, List[str]]]) -> None:
+        """Restore the presence value and entities from a checkpoint, and the states of the sensors."""
+        self.presence = state["presence"]
+        self.entities = list(state["entities"])
+        self.update()
+
 
 class World:
     """
@@ -843,6 +963,7 @@ class World:
         temp_in: float,
         hum_in: float,
         co2_in: float,
+        building=None,
     ) -> None:
         """
         Initialization of a world object.
@@ -855,10 +976,18 @@ class World:
         weather : 'clear', 'overcast' or 'dark'
         # Temperature, Humidity, CO2
         room_insulation : 'perfect', 'good', 'average' or 'bad'
+        # Building
+        building : if the room is in a Building, the time is the building's time,
+        and the temperature, humidity and co2 are stored in the building arrays and updated with all its rooms.
         """
         # Time
         self.__date_time, self.__weather = tools.check_weather_date(date_time, weather)
-        self.time = Time(simulation_speed_factor, system_dt, self.__date_time)
+        self.__building = building
+        if building is None:
+            self.time = Time(simulation_speed_factor, system_dt, self.__date_time)
+        else:
+            self.time = building.time
+            self.__date_time = building.time.date_time
         # Brightness
         self.ambient_light = AmbientLight(self.__date_time, self.__weather)
         # Temperature
@@ -868,6 +997,24 @@ class World:
             hum_out,
             co2_out,
         )  # does not change during simulation
+        if building is not None:
+            (
+                self.__building_index,
+                self.ambient_temperature,
+                self.ambient_humidity,
+                self.ambient_co2,
+            ) = building.add_room_world(
+                self.__room_insulation, temp_out, hum_out, co2_out, temp_in, hum_in, co2_in
+            )
+        else:
+            self.__init_ambient_states(temp_in, hum_in, co2_in)
+        # Soil Moisture
+        self.soil_moisture = SoilMoisture(self.time.update_rule_ratio)
+        # Presence
+        self.presence = Presence()
+
+    def __init_ambient_states(self, temp_in: float, hum_in: float, co2_in: float) -> None:
+        """Initialize the temperature, humidity and co2 of a world that is not in a building."""
         self.ambient_temperature = AmbientTemperature(
             self.time.update_rule_ratio,
             self.__temp_out,
@@ -887,10 +1034,6 @@ class World:
         self.ambient_co2 = AmbientCO2(
             self.__co2_out, co2_in, self.__room_insulation, self.time.update_rule_ratio
         )
-        # Soil Moisture
-        self.soil_moisture = SoilMoisture(self.time.update_rule_ratio)
-        # Presence
-        self.presence = Presence()
 
     def update(
         self, first_update: bool
@@ -933,7 +1076,10 @@ class World:
             humiditysoil_levels = self.soil_moisture.update(first_update=first_update)
             presence_sensors_states = self.presence.update()
         else:
-            date_time = self.time.update_datetime()
+            if self.__building is None:
+                date_time = self.time.update_datetime()
+            else:  # The building time is updated once for all its rooms
+                date_time = self.time.date_time
             logging.info(
                 f"Simulation update at {self.time.simulation_time(str_mode=True)}."
             )
@@ -950,6 +1096,15 @@ class World:
             co2_levels = self.ambient_co2.update()
             humiditysoil_levels = self.soil_moisture.update()
             presence_sensors_states = self.presence.update()
+        if self.__building is not None:
+            self.__building.set_value(
+                "brightness_in",
+                self.__building_index,
+                float(mean([level for _, level in brightness_levels]))
+                if brightness_levels
+                else 0,
+            )
+            self.__building.set_value("brightness_out", self.__building_index, out_lux)
         return (
             date_time,
             weather,
@@ -1001,6 +1156,49 @@ class World:
             ret = None
         return ret  # None or 1
 
+    @property
+    def weather(self) -> str:
+        """Current weather, 'clear', 'overcast' or 'dark'"""
+        return self.__weather
+
+    # Checkpoints
+    def get_state(self) -> Union[Dict[str, Dict], None]:
+        """
+        Return the states of the world: time, weather, temperature, humidity, co2 and presence, saved in checkpoints.
+        Soil moisture and brightness are measured by the sensors, whose values are saved with the devices' states.
+        Return None if the world is a room of a building, whose states are stored in the building.
+        """
+        if self.__building is not None:
+            logging.error(
+                "The states of a room in a building cannot be saved in a checkpoint."
+            )
+            return None
+        return {
+            "time": self.time.get_state(),
+            "weather": self.__weather,
+            "temperature": self.ambient_temperature.get_state(),
+            "humidity": self.ambient_humidity.get_state(),
+            "co2": self.ambient_co2.get_state(),
+            "presence": self.presence.get_state(),
+        }
+
+    def set_state(self, state: Dict[str, Dict]) -> Union[None, int]:
+        """Restore the states of the world from a checkpoint, return None if the world is a room of a building, 1 otherwise."""
+        if self.__building is not None:
+            logging.error(
+                "The states of a room in a building cannot be restored from a checkpoint."
+            )
+            return None
+        self.time.set_state(state["time"])
+        # The outdoor light is computed from the restored date and the weather
+        self.__weather = state["weather"]
+        self.ambient_light.set_weather(self.time.date_time, self.__weather)
+        self.ambient_temperature.set_state(state["temperature"])
+        self.ambient_humidity.set_state(state["humidity"])
+        self.ambient_co2.set_state(state["co2"])
+        self.presence.set_state(state["presence"])
+        return 1
+
     def get_info(self, ambient: str, room, str_mode: bool) -> Dict[str, str]:
         """Return the current world states values, called with CLI 'getinfo' command."""
         basic_dict_out = {
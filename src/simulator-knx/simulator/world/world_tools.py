@@ -4,7 +4,9 @@ Module that gather usefull functions and definitions for physical world states m
 
 import math
 from datetime import datetime, timezone
-from typing import Tuple
+from typing import List, Tuple
+
+import numpy as np
 
 from astral import LocationInfo
 from astral.sun import sun
@@ -197,3 +199,53 @@ def compute_distance_from_window(window, sensor) -> float:
         else:
             window_nearest_point.location.y = sensor.location.y
             return compute_distance(window_nearest_point, sensor)
+
+
+def compute_distances(sources: List, sensors: List) -> np.ndarray:
+    """
+    Compute euclidian distances between all sensors (rows) and all sources (columns), as compute_distance().
+
+    sources : list of InRoomDevice
+    sensors : list of InRoomDevice
+    """
+    source_positions = np.array(
+        [source.location.pos for source in sources], dtype=float
+    ).reshape(-1, 3)
+    sensor_positions = np.array(
+        [sensor.location.pos for sensor in sensors], dtype=float
+    ).reshape(-1, 3)
+    deltas = sensor_positions[:, np.newaxis, :] - source_positions[np.newaxis, :, :]
+    return np.sqrt((deltas**2).sum(axis=2))
+
+
+def compute_distances_from_windows(windows: List, sensors: List) -> np.ndarray:
+    """
+    Compute closest distances between all sensors (rows) and all windows (columns), as compute_distance_from_window():
+    the nearest point of a window is on its wall axis, between its start and its end.
+
+    windows : list of InRoomDevice of Window
+    sensors : list of InRoomDevice
+    """
+    window_positions = np.array(
+        [window.location.pos for window in windows], dtype=float
+    ).reshape(-1, 3)
+    sensor_positions = np.array(
+        [sensor.location.pos for sensor in sensors], dtype=float
+    ).reshape(-1, 3)
+    window_sizes = np.array([window.device.size[0] for window in windows], dtype=float)
+    # Axis along the wall of each window: x for north/south walls, y for west/east walls
+    window_axes = np.array(
+        [0 if window.device.wall in ["north", "south"] else 1 for window in windows],
+        dtype=int,
+    )
+    nearest_points = np.broadcast_to(
+        window_positions, (len(sensors), len(windows), 3)
+    ).copy()
+    for axis in [0, 1]:
+        on_axis = window_axes == axis
+        starts = window_positions[on_axis, axis]
+        nearest_points[:, on_axis, axis] = np.clip(
+            sensor_positions[:, np.newaxis, axis], starts, starts + window_sizes[on_axis]
+        )
+    deltas = sensor_positions[:, np.newaxis, :] - nearest_points
+    return np.sqrt((deltas**2).sum(axis=2))
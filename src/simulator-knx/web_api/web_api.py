@@ -1,7 +1,7 @@
 from http.client import BAD_REQUEST
 from xmlrpc.client import INTERNAL_ERROR
 from aioreactive import catch
-from flask import Flask, request
+from flask import Flask, Response, request
 from flask import jsonify
 
 # from requests import request
@@ -11,34 +11,89 @@ import threading
 import queue
 from threading import Lock
 import subprocess
+import uuid
+from collections import OrderedDict
+from typing import Optional
 
-data_lock = Lock()
-
-app = Flask(__name__)
-host = "127.0.0.1"
-port = 4646
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4646
 
 SUCCESS_CODE = 200
+ACCEPTED_CODE = 202
+NOT_FOUND_CODE = 404
 INTERNAL_ERROR_CODE = 500
 BAD_REQUEST_CODE = 400
 
+# seconds without events before a comment keeps the connection alive
+EVENT_STREAM_HEARTBEAT = 15
+
+# Handles of the previous starts kept to report them 'stopped', older ones are unknown
+MAX_SIM_HANDLES = 100
+
+
+class SimulationHandle:
+    """Handle returned by /simulator/start, polled to know when the simulator it started waits for SVSHI"""
+
+    def __init__(self, handle_id: str) -> None:
+        self.id = handle_id
+        # 'starting' until the simulator of this start waits for SVSHI connection, then 'ready',
+        # and 'stopped' once the simulation is stopped or started again
+        self.state = "starting"
+        self.__lock = Lock()
+
+    def set_ready(self) -> None:
+        """Called by the interface of the simulation run for this handle, a stopped handle stays stopped"""
+        with self.__lock:
+            if self.state == "starting":
+                self.state = "ready"
+
+    def stop(self) -> None:
+        with self.__lock:
+            self.state = "stopped"
+
+
+class WebApiState:
+    """State of one web API app: its address, the events driving the simulation and the handles of the starts"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        self.host = host
+        self.port = port
+        # set to launch the simulation, cleared when it is stopped
+        self.sim_start_event = threading.Event()
+        # set when the simulation is stopped, initially as it is not running
+        self.sim_stop_event = threading.Event()
+        self.sim_stop_event.set()
+        # name of the config of the web app, None to use the config given to the simulator
+        self.config_webapp_name: Optional[str] = None
+        self.current_sim_handle: Optional[SimulationHandle] = None
+        self.__sim_handles: "OrderedDict[str, SimulationHandle]" = OrderedDict()
+        self.__lock = Lock()
+
+    def start(self) -> SimulationHandle:
+        """Creates the handle of a new start, the handle of the previous one is stopped"""
+        handle = SimulationHandle(uuid.uuid4().hex)
+        with self.__lock:
+            if self.current_sim_handle is not None:
+                self.current_sim_handle.stop()
+            self.current_sim_handle = handle
+            self.__sim_handles[handle.id] = handle
+            while len(self.__sim_handles) > MAX_SIM_HANDLES:
+                self.__sim_handles.popitem(last=False)
+            self.sim_stop_event.clear()
+            self.sim_start_event.set()
+        return handle
+
+    def stop(self) -> None:
+        with self.__lock:
+            if self.current_sim_handle is not None:
+                self.current_sim_handle.stop()
+            self.sim_start_event.clear()
+            self.sim_stop_event.set()
+
+    def get_sim_handle(self, handle_id: str) -> Optional[SimulationHandle]:
+        with self.__lock:
+            return self.__sim_handles.get(handle_id)
 
-class FlaskAppProp:
-    HOST: str = "127.0.0.1"
-    PORT: int = 4646
-
-
-# callback_queue = queue.Queue() #
-sim_start_event = (
-    threading.Event()
-)  # bool event to trigger sim launch: True to launch sim, False to stop it
-sim_stop_event = threading.Event()
-sim_stop_event.set()  # Initialize stop event to True as simulation is not running
-
-sim_waiting_for_svshi = threading.Event()
-
-# config_path_webapp = None
-config_webapp_name = None
 
 SVSHI_HOME = os.environ["SVSHI_HOME"]
 
@@ -48,68 +103,116 @@ sys.path.append("./simulator")
 # TODO prepare simulator stuff if needed
 
 
-@app.route("/simulator/ipAddr", methods=["GET"])
-def getIpAddress():
-    return (
-        jsonify(address=FlaskAppProp.HOST),
-        SUCCESS_CODE,
-    )  # {"isRunning": True}
-
-
-@app.route("/simulator/running", methods=["GET"])
-def isRunning():
-    return (
-        jsonify(isRunning=sim_start_event.is_set()),
-        SUCCESS_CODE,
-    )  # {"isRunning": True}
-
-
-@app.route("/simulator/start", methods=["POST"])
-def startSimulator():
-
-    sim_stop_event.clear()
-    sim_start_event.set()
-    global sim_waiting_for_svshi
-    sim_waiting_for_svshi.wait()  # wait until simulator is waiting for svshi to be run, and return success code 200
-    return jsonify(success=True)
-
-
-@app.route("/simulator/stop", methods=["POST"])
-def stopSimulator():
-    sim_start_event.clear()
-    sim_stop_event.set()
-    return jsonify(success=True)
-
-
-@app.route("/simulator/config", methods=["POST"])
-def setConfig():
-    # app = request.form["app"] # app name str
-    # path = os.path.dirname(os.path.dirname(".")) ### TODO finish this shit
-    config_path = f"{SVSHI_HOME}/src/simulator-knx/config/"  # empty_config
-    empty_config_path = config_path + "webapp_base_config.json"
-    # apps_path = f"{SVSHI_HOME}/src/simulator-knx/svshi_apps/"
-    # app_name = "app_one_two"
-    # app_path = apps_path + app_name + "/"
-    body = request.json
-    print(type(body))
-
-    from simulator.tools import config_from_request
-
-    global config_webapp_name
-    config_webapp_name = config_from_request(empty_config_path, body)
-    print(f"web_api :: webapp name: {config_webapp_name}")
-    return jsonify(success=True), SUCCESS_CODE
-
-
-# @app.route("/simulator/simulation-state", methods=["GET"])
-# def getSimulationState():
-#     # TODO read the state and return it
-#     simulationState = []
-#     return jsonify(simulationState), SUCCESS_CODE
+def create_app(state: WebApiState) -> Flask:
+    """Creates a Flask app serving the web API with the given state, each app has its own state"""
+    app = Flask(__name__)
+
+    @app.route("/simulator/ipAddr", methods=["GET"])
+    def getIpAddress():
+        return (
+            jsonify(address=state.host),
+            SUCCESS_CODE,
+        )  # {"isRunning": True}
+
+    @app.route("/simulator/running", methods=["GET"])
+    def isRunning():
+        return (
+            jsonify(isRunning=state.sim_start_event.is_set()),
+            SUCCESS_CODE,
+        )  # {"isRunning": True}
+
+    @app.route("/simulator/start", methods=["POST"])
+    def startSimulator():
+        # Returns immediately, the handle is polled until the simulator waits for svshi
+        from system import STATE_STREAM
+
+        STATE_STREAM.reset()
+        handle = state.start()
+        return (
+            jsonify(success=True, handle=handle.id, state=handle.state),
+            ACCEPTED_CODE,
+        )
+
+    @app.route("/simulator/start/<handle_id>", methods=["GET"])
+    def getStartState(handle_id):
+        handle = state.get_sim_handle(handle_id)
+        if handle is None:
+            return jsonify(success=False, handle=handle_id), NOT_FOUND_CODE
+        handle_state = handle.state
+        return (
+            jsonify(
+                success=True,
+                handle=handle.id,
+                state=handle_state,
+                ready=handle_state == "ready",
+            ),
+            SUCCESS_CODE,
+        )
+
+    @app.route("/simulator/stop", methods=["POST"])
+    def stopSimulator():
+        state.stop()
+        return jsonify(success=True)
+
+    @app.route("/simulator/config", methods=["POST"])
+    def setConfig():
+        # app = request.form["app"] # app name str
+        # path = os.path.dirname(os.path.dirname(".")) ### TODO finish this shit
+        config_path = f"{SVSHI_HOME}/src/simulator-knx/config/"  # empty_config
+        empty_config_path = config_path + "webapp_base_config.json"
+        # apps_path = f"{SVSHI_HOME}/src/simulator-knx/svshi_apps/"
+        # app_name = "app_one_two"
+        # app_path = apps_path + app_name + "/"
+        body = request.json
+        print(type(body))
+
+        from simulator.tools import config_from_request
+
+        state.config_webapp_name = config_from_request(empty_config_path, body)
+        print(f"web_api :: webapp name: {state.config_webapp_name}")
+        return jsonify(success=True), SUCCESS_CODE
+
+    @app.route("/simulator/simulation-state", methods=["GET"])
+    def getSimulationState():
+        # Last state published by the rooms, the same as the snapshots of the event stream
+        from system import STATE_STREAM
+
+        snapshot = STATE_STREAM.snapshot()
+        return jsonify(seq=snapshot["seq"], rooms=snapshot["rooms"]), SUCCESS_CODE
+
+    @app.route("/simulator/events", methods=["GET"])
+    def streamEvents():
+        # Server-Sent Events: a snapshot, then the deltas of the states and the telegrams,
+        # each client has its own bounded queue and is sent a new snapshot if it does not keep up
+        from system import STATE_STREAM
+        from system.state_stream import format_sse_event
+
+        client = STATE_STREAM.subscribe()
+
+        def events():
+            try:
+                while not client.closed:
+                    batch = client.pop_events(
+                        STATE_STREAM, timeout=EVENT_STREAM_HEARTBEAT
+                    )
+                    if not batch:
+                        yield ": heartbeat\n\n"
+                    for event in batch:
+                        yield format_sse_event(event)
+            finally:  # client disconnected
+                STATE_STREAM.unsubscribe(client)
+
+        return Response(
+            events(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
 
 
 # TODO continue implementing other entrypoints
 
 
 # if __name__ == "__main__":
-#     app.run(host=host, port=port, debug=True)
+#     create_app(WebApiState()).run(host=DEFAULT_HOST, port=DEFAULT_PORT, debug=True)
@@ -1,15 +1,22 @@
+import hashlib
 import inspect
 import json
 import os
 from itertools import groupby
 import textwrap
-from typing import Dict, Final, List, Set
+from typing import Dict, Final, List, Optional, Set, Tuple, cast
 
-from .manipulator import Manipulator, IsolatedFunction
+from .manipulator import _MANIPULATOR_VERSION, Manipulator, IsolatedFunction
+from .profiler import phase
 from .parser import DeviceClass, DeviceInstance, GroupAddress
 from .runtime_svshi_api_functions import check_time_property
 
 
+# Changes to the generation change the hashes of the read and write sets of previous versions
+with open(__file__, "rb") as _generator_file:
+    _GENERATOR_VERSION: Final = hashlib.sha256(_generator_file.read()).hexdigest()
+
+
 class Generator:
     """
     Code generator.
@@ -18,6 +25,10 @@ class Generator:
     __GROUP_ADDRESS_PREFIX: Final = "GA_"
     __SLASH: Final = "/"
     __UNDERSCORE: Final = "_"
+    # Methods of the device classes writing to the physical state, the other ones only read it
+    __WRITING_DEVICE_METHODS: Final = {"on", "off", "set"}
+    # Prefix of the fields standing for the state read by the svshi_api functions, that no app writes
+    __INTERNAL_STATE_FIELD_PREFIX: Final = "internal_state."
 
     __BINARY_SENSOR_TEMPLATE = lambda self, app_name, instance_name, group_address, verification: textwrap.dedent(
         f'''
@@ -352,6 +363,9 @@ class Generator:
         app_names: List[str],
         filenames_per_app: Dict[str, Set[str]],
         isolated_fn_filename: str,
+        cache_filename: Optional[str] = None,
+        nb_workers: int = 1,
+        read_write_sets_filename: Optional[str] = None,
     ):
         self.__verification_filename: str = verification_filename
         self.__runtime_filename: str = runtime_filename
@@ -362,6 +376,7 @@ class Generator:
         self.__app_names = app_names
         self.__files_folder_path = files_folder_path
         self.__isolated_fn_filename = isolated_fn_filename
+        self.__read_write_sets_filename = read_write_sets_filename
 
         instances_names_per_app = {}
         for key, group in groupby(self.__devices_classes, lambda d: d.app):
@@ -370,7 +385,11 @@ class Generator:
             }
 
         self.__manipulator = Manipulator(
-            instances_names_per_app, filenames_per_app, files_folder_path
+            instances_names_per_app,
+            filenames_per_app,
+            files_folder_path,
+            cache_filename,
+            nb_workers,
         )
         self.__code: List[str] = []
         self.__imports: List[str] = []
@@ -601,6 +620,85 @@ class Generator:
         with open(self.__isolated_fn_filename, "w") as f:
             json.dump(dct, f, indent=4)
 
+    def __generate_read_write_sets_json(self, app_priorities: Dict[str, int]):
+        """
+        Generates the JSON file with, for each app, the fields of the physical state and the app states read by its invariant,
+        read and written by its iteration, and a hash of everything its verification depends on: its source, priority,
+        read and write sets, devices with the types of their group addresses, and the versions of the generation.
+        The calls to the svshi_api functions reading the time, the files, the time checks or the isolated functions values are
+        reads of `internal_state.<function name>` fields.
+        """
+        group_address_per_instance = {
+            f"{device.app.name.upper()}_{device.name.upper()}": self.__group_addr_to_field_name(
+                device.address
+            )
+            for device in self.__devices_classes
+        }
+
+        def fields(method_calls: Set[Tuple[str, str]], writing: bool) -> Set[str]:
+            return {
+                group_address_per_instance[instance]
+                for instance, method in method_calls
+                if instance in group_address_per_instance
+                and (method in self.__WRITING_DEVICE_METHODS) == writing
+            }
+
+        def internal_state_fields(internal_state_calls: Set[str]) -> Set[str]:
+            return {
+                f"{self.__INTERNAL_STATE_FIELD_PREFIX}{function_name}"
+                for function_name in internal_state_calls
+            }
+
+        group_address_types = {ga.address: ga.type for ga in self.__group_addresses}
+        devices_per_app: Dict[str, List[List[str]]] = {}
+        for device in self.__devices_classes:
+            devices_per_app.setdefault(device.app.name, []).append(
+                [
+                    device.name,
+                    device.type,
+                    device.address,
+                    group_address_types.get(device.address, ""),
+                ]
+            )
+
+        read_write_sets = {}
+        for app_name, accesses in sorted(self.__manipulator.accesses_per_app.items()):
+            invariant = accesses.invariant
+            iteration = accesses.iteration
+            sets = {
+                "invariant_reads": sorted(
+                    fields(invariant.method_calls, False)
+                    | invariant.read_app_state_fields
+                    | internal_state_fields(invariant.internal_state_calls)
+                ),
+                "iteration_reads": sorted(
+                    fields(iteration.method_calls, False)
+                    | iteration.read_app_state_fields
+                    | internal_state_fields(iteration.internal_state_calls)
+                ),
+                "iteration_writes": sorted(
+                    fields(iteration.method_calls, True)
+                    | iteration.written_app_state_fields
+                ),
+            }
+            key = json.dumps(
+                [
+                    _GENERATOR_VERSION,
+                    _MANIPULATOR_VERSION,
+                    accesses.source_hash,
+                    app_priorities.get(app_name),
+                    sorted(devices_per_app.get(app_name, [])),
+                    sets,
+                ],
+                sort_keys=True,
+            )
+            read_write_sets[app_name] = {
+                "hash": hashlib.sha256(key.encode()).hexdigest(),
+                **sets,
+            }
+        with open(cast(str, self.__read_write_sets_filename), "w") as f:
+            json.dump(read_write_sets, f, indent=4)
+
     def __add_time_check_conditions_to_internal_state(self, filename):
         conds_dict = "{"
         for i in range(0, self.__manipulator.check_counter):
@@ -618,13 +716,16 @@ class Generator:
         self, filename: str, verification: bool, app_priorities: Dict[str, int]
     ):
         os.makedirs(os.path.dirname(filename), exist_ok=True)
-        imports, functions, isolated_functions = self.__manipulator.manipulate_mains(
-            verification, app_priorities
-        )
+        with phase("manipulate_mains"):
+            imports, functions, isolated_functions = self.__manipulator.manipulate_mains(
+                verification, app_priorities
+            )
         if not verification:
             self.__generate_isolated_fn_json(isolated_functions)
+        elif self.__read_write_sets_filename:
+            self.__generate_read_write_sets_json(app_priorities)
 
-        with open(filename, "w") as file:
+        with phase("write_file"), open(filename, "w") as file:
             self.__generate_app_state_class()
             self.__generate_physical_state_class()
             self.__generate_isolated_functions_values_class(isolated_functions)
@@ -1,8 +1,10 @@
+import argparse
 import os
-from typing import Final
+from typing import Final, Optional
 
 from .generator import Generator
 from .parser import Parser
+from .profiler import phase, start_profiling, stop_profiling
 
 SVSHI_HOME: Final = os.environ["SVSHI_HOME"]
 SVSHI_SRC_FOLDER: Final = f"{SVSHI_HOME}/src"
@@ -10,6 +12,9 @@ GENERATED_PATH = f"{SVSHI_HOME}/generated"
 APP_LIBRARY: Final = f"{SVSHI_SRC_FOLDER}/app_library"
 VERIFICATION_MODULE_PATH: Final = f"{SVSHI_SRC_FOLDER}/verification"
 FILES_FOLDER_PATH: Final = f"{SVSHI_SRC_FOLDER}/runtime/files"
+DEFAULT_PROFILE_FILENAME: Final = (
+    f"{VERIFICATION_MODULE_PATH}/verification_profile.json"
+)
 
 
 def main(
@@ -17,18 +22,55 @@ def main(
     app_library_path: str,
     verification_module_path: str,
     files_folder_path: str,
+    nb_workers: int = 1,
+    profile_filename: Optional[str] = None,
 ):
-    parser = Parser(generated_path, app_library_path)
-    group_addresses_with_types = parser.parse_group_addresses()
-    devices_instances = parser.parse_devices_instances()
-    devices_classes = parser.parse_devices_classes()
-    app_names = parser.get_app_names()
-    filenames = parser.get_filenames()
+    if profile_filename is None:
+        generate(
+            generated_path,
+            app_library_path,
+            verification_module_path,
+            files_folder_path,
+            nb_workers,
+        )
+        return
+
+    profiler = start_profiling("verification.main")
+    try:
+        generate(
+            generated_path,
+            app_library_path,
+            verification_module_path,
+            files_folder_path,
+            nb_workers,
+        )
+    finally:
+        profiler.write(profile_filename)
+        stop_profiling()
+
+
+def generate(
+    generated_path: str,
+    app_library_path: str,
+    verification_module_path: str,
+    files_folder_path: str,
+    nb_workers: int,
+):
+    with phase("parse"):
+        parser = Parser(generated_path, app_library_path)
+        group_addresses_with_types = parser.parse_group_addresses()
+        devices_instances = parser.parse_devices_instances()
+        devices_classes = parser.parse_devices_classes()
+        app_names = parser.get_app_names()
+        filenames = parser.get_filenames()
+        app_priorities = parser.get_app_priorities()
 
     verification_filename = f"{verification_module_path}/verification_file.py"
     runtime_filename = f"{verification_module_path}/runtime_file.py"
     conditions_filename = f"{verification_module_path}/conditions.py"
     isolated_fn_filename = f"{verification_module_path}/isolated_fns.json"
+    cache_filename = f"{verification_module_path}/generation_cache.pickle"
+    read_write_sets_filename = f"{verification_module_path}/app_read_write_sets.json"
     generator = Generator(
         verification_filename,
         runtime_filename,
@@ -40,13 +82,42 @@ def main(
         app_names,
         filenames,
         isolated_fn_filename,
+        cache_filename,
+        nb_workers,
+        read_write_sets_filename,
     )
-    app_priorities = parser.get_app_priorities()
-    generator.generate_verification_file(app_priorities=app_priorities)
-    generator.generate_runtime_file(app_priorities=app_priorities)
-    generator.generate_conditions_file()
+    with phase("generate_verification_file"):
+        generator.generate_verification_file(app_priorities=app_priorities)
+    with phase("generate_runtime_file"):
+        generator.generate_runtime_file(app_priorities=app_priorities)
+    with phase("generate_conditions_file"):
+        generator.generate_conditions_file()
     print(verification_filename)
 
 
 if __name__ == "__main__":
-    main(GENERATED_PATH, APP_LIBRARY, VERIFICATION_MODULE_PATH, FILES_FOLDER_PATH)
+    parser = argparse.ArgumentParser(description="Generates the verification files.")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Number of processes manipulating the apps in parallel, default: 1",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        help=f"Write the durations and memory peaks of the phases of the generation as JSON to the given file, default: {DEFAULT_PROFILE_FILENAME}",
+        nargs="?",
+        const=DEFAULT_PROFILE_FILENAME,
+        default=None,
+    )
+    args = parser.parse_args()
+    main(
+        GENERATED_PATH,
+        APP_LIBRARY,
+        VERIFICATION_MODULE_PATH,
+        FILES_FOLDER_PATH,
+        args.workers,
+        args.profile,
+    )
@@ -1,10 +1,21 @@
 import ast
+import concurrent.futures
 import copy
+import hashlib
+import os
+import pickle
 import re
 import astor
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Set, Tuple, Type, Union, Final, cast
 
+from .profiler import phase
+
+
+# Changes to the manipulation invalidate the cached results of previous versions
+with open(__file__, "rb") as _manipulator_file:
+    _MANIPULATOR_VERSION: Final = hashlib.sha256(_manipulator_file.read()).hexdigest()
+
 
 def _print_and_raise(msg: str, exception: Type[Exception]):
     """
@@ -91,6 +102,175 @@ class IsolatedFunction:
     args: ast.arguments
 
 
+@dataclass
+class FunctionAccesses:
+    """
+    The device instances methods called by a function, as (instance name, method name) pairs,
+    the fields of the app state it reads and writes, and the `svshi_api` functions it calls that read the state
+    outside of the devices and apps: the time, the files, the time checks and the values of the isolated functions.
+    """
+
+    method_calls: Set[Tuple[str, str]]
+    read_app_state_fields: Set[str]
+    written_app_state_fields: Set[str]
+    internal_state_calls: Set[str]
+
+
+@dataclass
+class AppAccesses:
+    """
+    The accesses of the invariant and iteration functions of an app, with the instance names and app state fields
+    prefixed by the app name as in the generated files, and the hash of the source of the app.
+    """
+
+    source_hash: str
+    invariant: FunctionAccesses
+    iteration: FunctionAccesses
+
+
+@dataclass
+class AppMainAnalysis:
+    """
+    The result of the analysis of the `main.py` of an app, that does not depend on whether
+    the verification or the runtime file is generated.
+    """
+
+    source: str
+    isolated_functions: Dict[str, IsolatedFunction]
+    calls_per_function: List[Tuple[str, Set[str]]]
+    imported_modules: List[str]
+    accesses_per_function: Dict[str, FunctionAccesses]
+
+
+@dataclass
+class ManipulatedAppMain:
+    """
+    The result of the manipulation of the `main.py` of an app for the verification or the runtime file.
+    """
+
+    imports: List[str]
+    functions: str
+    iteration_function_without_return: ast.FunctionDef
+    isolated_functions: List[IsolatedFunction]
+    accesses: AppAccesses
+    # The id of the first time check of the app, and the nodes holding the ids of its time checks, in order. They are
+    # nodes of `functions_tree` and `iteration_function_without_return`, to renumber the checks when the app is moved
+    first_check: int
+    check_ids: List[ast.Name]
+    # The names of the app states the invariant and iteration functions take as arguments, the ones of all the apps
+    # for the verification file
+    app_states_names: List[str]
+    # The tree `functions` is printed from, to print it again when the other apps change
+    functions_tree: ast.Module
+
+    @property
+    def nb_checks(self) -> int:
+        return len(self.check_ids)
+
+    def renumber_checks(self, first_check: int) -> bool:
+        """
+        Numbers the time checks of the app from `first_check` on, returning whether their ids changed.
+        """
+        changed = first_check != self.first_check and len(self.check_ids) > 0
+        for i, check_id in enumerate(self.check_ids):
+            check_id.id = str(first_check + i)
+        self.first_check = first_check
+        return changed
+
+
+class _AppMainAnalyzer(ast.NodeVisitor):
+    """
+    Collects in a single pass over the AST of a `main.py` its top level function definitions, the names
+    of the functions called by each of them, their accesses and the imported modules.
+    A called function is represented by its name `func` and, for calls of the form `m.func(...)`, by `m.func`.
+    """
+
+    __APP_STATE_NAME: Final = "app_state"
+    __SVSHI_API_INSTANCE_NAME: Final = "svshi_api"
+
+    def __init__(self, internal_state_functions: Set[str]):
+        self.function_defs: List[ast.FunctionDef] = []
+        self.calls_per_function: List[Tuple[str, Set[str]]] = []
+        self.accesses_per_function: Dict[str, FunctionAccesses] = {}
+        self.imported_modules: List[str] = []
+        self.__internal_state_functions = internal_state_functions
+        self.__current_calls: Optional[Set[str]] = None
+        self.__current_accesses: Optional[FunctionAccesses] = None
+
+    def visit_Module(self, node: ast.Module):
+        for stmt in node.body:
+            if isinstance(stmt, ast.FunctionDef):
+                self.function_defs.append(stmt)
+                self.__current_calls = set()
+                self.__current_accesses = FunctionAccesses(set(), set(), set(), set())
+                self.calls_per_function.append((stmt.name, self.__current_calls))
+                self.accesses_per_function[stmt.name] = self.__current_accesses
+                self.generic_visit(stmt)
+                self.__current_calls = None
+                self.__current_accesses = None
+            elif isinstance(stmt, ast.Import):
+                self.imported_modules.extend(n.name for n in stmt.names)
+            elif isinstance(stmt, ast.ImportFrom):
+                self.imported_modules.append(cast(str, stmt.module))
+
+    def visit_Call(self, node: ast.Call):
+        if self.__current_calls is not None:
+            if isinstance(node.func, ast.Attribute):
+                self.__current_calls.add(node.func.attr)
+                if isinstance(node.func.value, ast.Name):
+                    self.__current_calls.add(f"{node.func.value.id}.{node.func.attr}")
+                    accesses = cast(FunctionAccesses, self.__current_accesses)
+                    accesses.method_calls.add((node.func.value.id, node.func.attr))
+                    if (
+                        node.func.value.id == self.__SVSHI_API_INSTANCE_NAME
+                        and node.func.attr in self.__internal_state_functions
+                    ):
+                        accesses.internal_state_calls.add(node.func.attr)
+            elif isinstance(node.func, ast.Name):
+                self.__current_calls.add(node.func.id)
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if (
+            self.__current_accesses is not None
+            and isinstance(node.value, ast.Name)
+            and node.value.id == self.__APP_STATE_NAME
+        ):
+            if isinstance(node.ctx, ast.Store):
+                self.__current_accesses.written_app_state_fields.add(node.attr)
+            else:
+                self.__current_accesses.read_app_state_fields.add(node.attr)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        # The target of an augmented assignment is read before being written
+        if (
+            self.__current_accesses is not None
+            and isinstance(node.target, ast.Attribute)
+            and isinstance(node.target.value, ast.Name)
+            and node.target.value.id == self.__APP_STATE_NAME
+        ):
+            self.__current_accesses.read_app_state_fields.add(node.target.attr)
+        self.generic_visit(node)
+
+
+def _manipulate_app_main_in_worker(
+    instances_names_per_app: Dict[Tuple[str, str], Set[str]],
+    filenames_per_app: Dict[str, Set[str]],
+    files_folder_path: str,
+    app: Tuple[str, str],
+    verification: bool,
+) -> ManipulatedAppMain:
+    """
+    Manipulates the `main.py` of a single app in a worker process, numbering its time checks from 0 on.
+    """
+    manipulator = Manipulator(
+        instances_names_per_app, filenames_per_app, files_folder_path
+    )
+    directory, app_name = app
+    return manipulator.manipulate_app_main(directory, app_name, verification)
+
+
 class Manipulator:
     """
     Python AST manipulator.
@@ -116,6 +296,7 @@ class Manipulator:
     __OPEN_FUNC_NAME: Final = "open"
     __SYSTEM_BEHAVIOUR_FUNC_NAME: Final = "system_behaviour"
     __SVSHI_API_INSTANCE_NAME: Final = "svshi_api"
+    __CHECK_TIME_PROPERTY_NAME: Final = "check_time_property"
     __SVSHI_API_GET_FILE_TEXT_API_FUNC_NAME: Final = "get_file_text_mode"
     __SVSHI_API_GET_FILE_BINARY_API_FUNC_NAME: Final = "get_file_binary_mode"
     __SVSHI_API_GET_FILEPATH_API_FUNC_NAME: Final = "get_file_path"
@@ -144,6 +325,8 @@ class Manipulator:
         instances_names_per_app: Dict[Tuple[str, str], Set[str]],
         filenames_per_app: Dict[str, Set[str]],
         files_folder_path: str,
+        cache_filename: Optional[str] = None,
+        nb_workers: int = 1,
     ):
         self.__app_names = list(
             sorted(map(lambda t: t[1], instances_names_per_app.keys()))
@@ -155,6 +338,22 @@ class Manipulator:
         self.__filenames_per_app = filenames_per_app
         self.__files_folder_path = files_folder_path
         self.check_counter = 0
+        # The nodes holding the ids of the time checks of the app being manipulated
+        self.__app_check_ids: List[ast.Name] = []
+        # The accesses of the apps manipulated by the last call to `manipulate_mains`
+        self.accesses_per_app: Dict[str, AppAccesses] = {}
+        self.__app_main_sources: Dict[Tuple[str, str], str] = {}
+        self.__app_main_analyses: Dict[Tuple[str, str], AppMainAnalysis] = {}
+        # The trees parsed during the analysis, not yet manipulated
+        self.__unused_app_main_trees: Dict[Tuple[str, str], ast.Module] = {}
+        # The manipulated mains of the previous generations, per app name and verification flag, along with the hash
+        # of everything they depend on
+        self.__cache_filename = cache_filename
+        # Number of processes manipulating the app mains, 1 to manipulate them in the current process
+        self.__nb_workers = nb_workers
+        self.__cache: Dict[Tuple[str, bool], Tuple[str, ManipulatedAppMain]] = (
+            self.__load_cache()
+        )
 
     def __period_from_docstring(self, docstring: str) -> int:
         """Return the `period:` value of a docstring."""
@@ -174,96 +373,71 @@ class Manipulator:
             )
         return int(matches[0].group(1))
 
-    def __get_isolated_functions(
-        self,
-        op: Union[
-            ast.stmt,
-            ast.expr,
-            ast.comprehension,
-            List[ast.stmt],
-            List[ast.expr],
-            List[ast.comprehension],
-        ],
-        app_name: str,
-    ) -> Dict[str, IsolatedFunction]:
+    def __get_isolated_function(
+        self, op: ast.FunctionDef, app_name: str
+    ) -> IsolatedFunction:
         """
-        Goes through the AST and returns a Dict containing entries of the form
-        "isolated_func_name" -> IsolatedFunction.
+        Checks the given on_trigger or periodic function definition and returns the corresponding IsolatedFunction.
         """
-        if isinstance(op, (list, tuple)):
-            dicts_list = [self.__get_isolated_functions(v, app_name) for v in list(op)]
-            res = {}
-            for d in dicts_list:
-                for k in d.keys():
-                    res[k] = d[k]
-            return res
-        elif isinstance(op, (ast.List, ast.Tuple)):
-            return self.__get_isolated_functions(op.elts, app_name)
-        elif isinstance(op, ast.FunctionDef) and (
-            op.name.startswith(self.__ISOLATED_FUNC_PREFIXES)
+        doc_string = ast.get_docstring(op)
+        doc_string = "" if doc_string == None else doc_string
+        return_type = op.returns
+        if not return_type:
+            _print_and_raise(
+                f"The function '{op.name}' has no return type.",
+                UntypedIsolatedFunctionException,
+            )
+        if not isinstance(return_type, (ast.Name, ast.Constant)):
+            _print_and_raise(
+                f"The function '{op.name}' has a return type which is not allowed."
+                f" Allowed return types: {self.__ISOLATED_FUNC_ALLOWED_RETURN_TYPES}",
+                UntypedIsolatedFunctionException,
+            )
+        # When the return type is 'None', return_type is ast.Constant
+        return_type_str = (
+            cast(ast.Name, return_type).id
+            if isinstance(return_type, ast.Name)
+            else cast(ast.Constant, return_type).value
+        )
+        if return_type_str != None and len(return_type_str) == 0:
+            _print_and_raise(
+                f"The function '{op.name}' has no return type.",
+                UntypedIsolatedFunctionException,
+            )
+        # We only allow str, int, float, bool or None as return types.
+        # Otherwise, we might need additional imports and verification might timeout.
+        if return_type_str not in self.__ISOLATED_FUNC_ALLOWED_RETURN_TYPES:
+            _print_and_raise(
+                f"The function '{op.name}' has return type {return_type_str}, "
+                "which is not allowed. Allowed return types: "
+                f"{self.__ISOLATED_FUNC_ALLOWED_RETURN_TYPES}",
+                UntypedIsolatedFunctionException,
+            )
+        func_name = op.name
+        args = op.args
+        # We don't allow *args, **kwargs and default values for isolated functions.
+        if args.vararg or args.kwarg or args.defaults:
+            _print_and_raise(
+                f"Function {func_name} is invalid: *args, **kwargs and default "
+                "values are not allowed for `periodic` and `on_trigger` functions.",
+                UnallowedArgsInIsolatedFunctionException,
+            )
+        if func_name.startswith(self.__PERIODIC_FUNC_PREFIX) and (
+            args.args or args.kwonlyargs
         ):
-            doc_string = ast.get_docstring(op)
-            doc_string = "" if doc_string == None else doc_string
-            return_type = op.returns
-            if not return_type:
-                _print_and_raise(
-                    f"The function '{op.name}' has no return type.",
-                    UntypedIsolatedFunctionException,
-                )
-            if not isinstance(return_type, (ast.Name, ast.Constant)):
-                _print_and_raise(
-                    f"The function '{op.name}' has a return type which is not allowed."
-                    f" Allowed return types: {self.__ISOLATED_FUNC_ALLOWED_RETURN_TYPES}",
-                    UntypedIsolatedFunctionException,
-                )
-            # When the return type is 'None', return_type is ast.Constant
-            return_type_str = (
-                cast(ast.Name, return_type).id
-                if isinstance(return_type, ast.Name)
-                else cast(ast.Constant, return_type).value
+            _print_and_raise(
+                f"Function {func_name} is periodic and is not allowed to have any "
+                "argument.",
+                InvalidPeriodicFunctionException,
             )
-            if return_type_str != None and len(return_type_str) == 0:
-                _print_and_raise(
-                    f"The function '{op.name}' has no return type.",
-                    UntypedIsolatedFunctionException,
-                )
-            # We only allow str, int, float, bool or None as return types.
-            # Otherwise, we might need additional imports and verification might timeout.
-            if return_type_str not in self.__ISOLATED_FUNC_ALLOWED_RETURN_TYPES:
-                _print_and_raise(
-                    f"The function '{op.name}' has return type {return_type_str}, "
-                    "which is not allowed. Allowed return types: "
-                    f"{self.__ISOLATED_FUNC_ALLOWED_RETURN_TYPES}",
-                    UntypedIsolatedFunctionException,
-                )
-            func_name = op.name
-            args = op.args
-            # We don't allow *args, **kwargs and default values for isolated functions.
-            if args.vararg or args.kwarg or args.defaults:
-                _print_and_raise(
-                    f"Function {func_name} is invalid: *args, **kwargs and default "
-                    "values are not allowed for `periodic` and `on_trigger` functions.",
-                    UnallowedArgsInIsolatedFunctionException,
-                )
-            if func_name.startswith(self.__PERIODIC_FUNC_PREFIX) and (
-                args.args or args.kwonlyargs
-            ):
-                _print_and_raise(
-                    f"Function {func_name} is periodic and is not allowed to have any "
-                    "argument.",
-                    InvalidPeriodicFunctionException,
-                )
-            new_func_name = f"{app_name}_{func_name}"
-            period = None
-            if func_name.startswith(self.__PERIODIC_FUNC_PREFIX):
-                period = self.__period_from_docstring(doc_string)
-            return {
-                func_name: IsolatedFunction(
-                    func_name, new_func_name, period, return_type_str, args
-                )
-            }
-        else:
-            return {}
+        new_func_name = f"{app_name}_{func_name}"
+        period = None
+        if func_name.startswith(self.__PERIODIC_FUNC_PREFIX):
+            period = self.__period_from_docstring(doc_string)
+        # The arguments are copied as the function definition is later modified in place
+        return IsolatedFunction(
+            func_name, new_func_name, period, return_type_str, copy.deepcopy(args)
+        )
 
     def _check_coherent_fn_call_to_fn_def(
         self,
@@ -275,7 +449,7 @@ class Manipulator:
         """
         Check that the args `call_args`and `call_kwarg_names` of a call are accepted
         by the function whose args are `fn_def_args`.
-        Note: we do not allow default values, *args and **kwargs (see __get_isolated_functions).
+        Note: we do not allow default values, *args and **kwargs (see __get_isolated_function).
         """
         call_kwarg_names = {x.arg for x in call_keywords}
 
@@ -634,8 +808,13 @@ class Manipulator:
                         op.args.append(
                             ast.Name(self.__INTERNAL_STATE_ARGUMENT, ast.Load)
                         )
-                    elif method_name in {"check_time_property"} and not verification:
-                        op.args.append(ast.Name(str(self.check_counter), ast.Load))
+                    elif (
+                        method_name == self.__CHECK_TIME_PROPERTY_NAME
+                        and not verification
+                    ):
+                        check_id = ast.Name(str(self.check_counter), ast.Load)
+                        op.args.append(check_id)
+                        self.__app_check_ids.append(check_id)
                         self.check_counter += 1
                     # If we have svshi_api.get_latest_value or
                     # svshi_api.trigger_if_not_running,
@@ -759,32 +938,33 @@ class Manipulator:
     def __add_app_states_to_fun_def(
         self, f: ast.FunctionDef, only_app_state_app_name: str
     ) -> ast.FunctionDef:
-        state_args = (
-            list(
-                map(
-                    lambda n: ast.arg(
-                        n,
-                        ast.Name(self.__APP_STATE_TYPE, ast.Load),
-                    ),
-                    filter(
-                        lambda n: n.startswith(only_app_state_app_name),
-                        self.__app_states_names,
-                    ),
-                )
+        f.args.args.extend(
+            self.__app_states_args(self.__app_states_names_of(only_app_state_app_name))
+        )
+        return f
+
+    def __app_states_names_of(self, only_app_state_app_name: str) -> List[str]:
+        """
+        Returns the names of the app states added to the invariant and iteration functions of the given app,
+        all of them if only_app_state_app_name equals "".
+        """
+        return list(
+            filter(
+                lambda n: n.startswith(only_app_state_app_name),
+                self.__app_states_names,
             )
-            if only_app_state_app_name != ""
-            else list(
-                map(
-                    lambda n: ast.arg(
-                        n,
-                        ast.Name(self.__APP_STATE_TYPE, ast.Load),
-                    ),
-                    self.__app_states_names,
-                )
+        )
+
+    def __app_states_args(self, app_states_names: List[str]) -> List[ast.arg]:
+        return list(
+            map(
+                lambda n: ast.arg(
+                    n,
+                    ast.Name(self.__APP_STATE_TYPE, ast.Load),
+                ),
+                app_states_names,
             )
         )
-        f.args.args.extend(state_args)
-        return f
 
     def __add_physical_state_to_fun_def(self, f: ast.FunctionDef) -> ast.FunctionDef:
         args = [
@@ -1184,18 +1364,30 @@ class Manipulator:
         functions: List[str] = []
         app_names_to_iteration_function_without_ret: Dict[str, ast.FunctionDef] = {}
         app_names_to_isolated_funcs: Dict[str, List[IsolatedFunction]] = {}
-        for (
-            directory,
-            app_name,
-        ), accepted_names in sorted(self.__instances_names_per_app.items()):
-            (
-                imps,
-                funcs,
-                iteration_func_without_ret,
-                isolated_functions,
-            ) = self.__manipulate_app_main(
-                directory, app_name, accepted_names, verification
-            )
+        apps = sorted(self.__instances_names_per_app.items())
+        if self.__nb_workers > 1 and len(apps) > 1:
+            with phase("manipulate_apps_in_parallel"):
+                manipulated_mains = self.__manipulate_app_mains_in_parallel(
+                    apps, verification
+                )
+        else:
+            manipulated_mains = []
+            for (directory, app_name), accepted_names in apps:
+                with phase("manipulate_app", app=app_name):
+                    manipulated_mains.append(
+                        self.__manipulate_app_main_or_get_cached(
+                            directory, app_name, accepted_names, verification
+                        )
+                    )
+        self.accesses_per_app = {
+            app_name: manipulated.accesses
+            for ((_, app_name), _), manipulated in zip(apps, manipulated_mains)
+        }
+        for ((_, app_name), _), manipulated in zip(apps, manipulated_mains):
+            imps = manipulated.imports
+            funcs = manipulated.functions
+            iteration_func_without_ret = manipulated.iteration_function_without_return
+            isolated_functions = manipulated.isolated_functions
             # Some imports might be a single string containing multiple imports separated by '\n'
             imps = (i for imp in imps for i in imp.split("\n"))
             imports.extend(imps)
@@ -1206,23 +1398,261 @@ class Manipulator:
             app_names_to_isolated_funcs[app_name] = isolated_functions
 
         # Generate the system behaviour function
-        system_behaviour_func = self.__generate_system_behaviour_function(
-            app_names_to_iteration_funcs_without_ret=app_names_to_iteration_function_without_ret,
-            app_priorities=app_priorities,
-            verification=verification,
-        )
-
-        system_behaviour_func_str = astor.to_source(system_behaviour_func)
+        with phase("generate_system_behaviour"):
+            system_behaviour_func = self.__generate_system_behaviour_function(
+                app_names_to_iteration_funcs_without_ret=app_names_to_iteration_function_without_ret,
+                app_priorities=app_priorities,
+                verification=verification,
+            )
+            system_behaviour_func_str = astor.to_source(system_behaviour_func)
         functions.append(system_behaviour_func_str)
 
         isolated_functions = [
             fn for fn_list in app_names_to_isolated_funcs.values() for fn in fn_list
         ]
 
+        self.__save_cache()
+
         # Keep only non-empty imports
         new_imports = [imp.replace("\n", "") for imp in imports if imp]
         return new_imports, functions, isolated_functions
 
+    def __load_cache(self) -> Dict[Tuple[str, bool], Tuple[str, ManipulatedAppMain]]:
+        """
+        Loads the manipulated mains of the previous generations. An unreadable cache is ignored.
+        """
+        if self.__cache_filename is None or not os.path.exists(self.__cache_filename):
+            return {}
+        try:
+            with open(self.__cache_filename, "rb") as file:
+                return pickle.load(file)
+        except Exception:
+            return {}
+
+    def __save_cache(self):
+        """
+        Saves the manipulated mains of the installed apps, if a cache file was given.
+        """
+        if self.__cache_filename is None:
+            return
+        self.__cache = {
+            (app_name, verification): entry
+            for (app_name, verification), entry in self.__cache.items()
+            if app_name in self.__app_names
+        }
+        os.makedirs(os.path.dirname(self.__cache_filename) or ".", exist_ok=True)
+        with open(self.__cache_filename, "wb") as file:
+            pickle.dump(self.__cache, file)
+
+    def manipulate_app_main(
+        self,
+        directory: str,
+        app_name: str,
+        verification: bool,
+    ) -> ManipulatedAppMain:
+        """
+        Manipulates the `main.py` of the given app alone, numbering its time checks from `check_counter` on.
+        """
+        first_check = self.check_counter
+        self.__app_check_ids = []
+        accepted_names = self.__instances_names_per_app[(directory, app_name)]
+        (
+            imports,
+            functions,
+            functions_tree,
+            iteration_func_without_ret,
+            isolated_functions,
+        ) = self.__manipulate_app_main(
+            directory, app_name, accepted_names, verification
+        )
+        return ManipulatedAppMain(
+            imports,
+            functions,
+            iteration_func_without_ret,
+            isolated_functions,
+            self.__app_accesses(directory, app_name, accepted_names),
+            first_check,
+            self.__app_check_ids,
+            self.__app_states_names_of("" if verification else app_name),
+            functions_tree,
+        )
+
+    def __app_accesses(
+        self, directory: str, app_name: str, accepted_names: Set[str]
+    ) -> AppAccesses:
+        """
+        Returns the accesses of the invariant and iteration functions of the given app, named as in the generated files.
+        """
+        analysis = self.__analyse_app_main(directory, app_name)
+        app_state_name = f"{app_name}_{self.__APP_STATE_ARGUMENT}"
+
+        def accesses(function_name: str) -> FunctionAccesses:
+            function_accesses = analysis.accesses_per_function.get(
+                function_name, FunctionAccesses(set(), set(), set(), set())
+            )
+            return FunctionAccesses(
+                {
+                    (f"{app_name.upper()}_{instance}", method)
+                    for instance, method in function_accesses.method_calls
+                    if instance in accepted_names
+                },
+                {
+                    f"{app_state_name}.{field}"
+                    for field in function_accesses.read_app_state_fields
+                },
+                {
+                    f"{app_state_name}.{field}"
+                    for field in function_accesses.written_app_state_fields
+                },
+                function_accesses.internal_state_calls,
+            )
+
+        return AppAccesses(
+            hashlib.sha256(analysis.source.encode()).hexdigest(),
+            accesses(self.__INVARIANT_FUNC_NAME),
+            accesses(self.__ITERATION_FUNC_NAME),
+        )
+
+    def __cache_key(
+        self,
+        directory: str,
+        app_name: str,
+        accepted_names: Set[str],
+        verification: bool,
+    ) -> str:
+        """
+        Returns the hash of the inputs of the manipulation of the given app. The other apps are not part of it: the ids
+        of its time checks and its app states arguments, contracts and returned states are updated when the apps are
+        assembled.
+        """
+        key = hashlib.sha256()
+        for part in [
+            _MANIPULATOR_VERSION,
+            self.__read_app_main(directory, app_name),
+            app_name,
+            str(sorted(accepted_names)),
+            str(verification),
+        ]:
+            key.update(part.encode())
+            key.update(b"\0")
+        return key.hexdigest()
+
+    def __get_cached(
+        self, app_name: str, verification: bool, digest: str
+    ) -> Optional[ManipulatedAppMain]:
+        cached = self.__cache.get((app_name, verification))
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        return None
+
+    def __manipulate_app_main_or_get_cached(
+        self,
+        directory: str,
+        app_name: str,
+        accepted_names: Set[str],
+        verification: bool,
+    ) -> ManipulatedAppMain:
+        """
+        Returns the manipulated main of the given app, reusing the one of the previous generation if the inputs of its
+        manipulation did not change.
+        """
+        digest = self.__cache_key(directory, app_name, accepted_names, verification)
+        manipulated = self.__get_cached(app_name, verification, digest)
+        if manipulated is not None:
+            self.__assemble_app_main(app_name, manipulated, verification)
+            return manipulated
+
+        manipulated = self.manipulate_app_main(directory, app_name, verification)
+        self.__cache[(app_name, verification)] = (digest, manipulated)
+        return manipulated
+
+    def __manipulate_app_mains_in_parallel(
+        self,
+        apps: List[Tuple[Tuple[str, str], Set[str]]],
+        verification: bool,
+    ) -> List[ManipulatedAppMain]:
+        """
+        Manipulates the mains of the given apps in a pool of processes, in the same order as `apps`.
+        The time checks of each app are numbered from 0 in the workers, and renumbered here one app after the other,
+        so that the result is the same as with a sequential manipulation.
+        """
+        results: List[Optional[ManipulatedAppMain]] = []
+        # Index in results and cache key of each app to manipulate
+        jobs: List[Tuple[int, str]] = []
+        for (directory, app_name), accepted_names in apps:
+            digest = self.__cache_key(directory, app_name, accepted_names, verification)
+            cached = self.__get_cached(app_name, verification, digest)
+            if cached is None:
+                jobs.append((len(results), digest))
+            results.append(cached)
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, min(self.__nb_workers, len(jobs)))
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _manipulate_app_main_in_worker,
+                    self.__instances_names_per_app,
+                    self.__filenames_per_app,
+                    self.__files_folder_path,
+                    apps[index][0],
+                    verification,
+                )
+                for index, _ in jobs
+            ]
+            for (index, digest), future in zip(jobs, futures):
+                manipulated = future.result()
+                results[index] = manipulated
+                self.__cache[(apps[index][0][1], verification)] = (digest, manipulated)
+
+        for ((_, app_name), _), manipulated in zip(
+            apps, cast(List[ManipulatedAppMain], results)
+        ):
+            self.__assemble_app_main(app_name, manipulated, verification)
+        return cast(List[ManipulatedAppMain], results)
+
+    def __assemble_app_main(
+        self, app_name: str, manipulated: ManipulatedAppMain, verification: bool
+    ):
+        """
+        Updates in place the parts of a manipulated main that depend on the other apps: the ids of its time checks,
+        numbered from `check_counter` on, and for the verification file its app states arguments, contracts and returned
+        states. The functions are printed again only if they changed.
+        """
+        changed = manipulated.renumber_checks(self.check_counter)
+        self.check_counter += manipulated.nb_checks
+        app_states_names = self.__app_states_names_of("" if verification else app_name)
+        if app_states_names != manipulated.app_states_names:
+            for f in manipulated.functions_tree.body:
+                if not isinstance(f, ast.FunctionDef) or f.name not in (
+                    f"{app_name}_{self.__INVARIANT_FUNC_NAME}",
+                    f"{app_name}_{self.__ITERATION_FUNC_NAME}",
+                ):
+                    continue
+                # The arguments are shared with `iteration_function_without_return`
+                app_states_index = [
+                    isinstance(arg.annotation, ast.Name)
+                    and arg.annotation.id == self.__APP_STATE_TYPE
+                    for arg in f.args.args
+                ].index(True)
+                f.args.args = (
+                    f.args.args[:app_states_index]
+                    + self.__app_states_args(app_states_names)
+                    + f.args.args[
+                        app_states_index + len(manipulated.app_states_names) :
+                    ]
+                )
+                if verification and f.name.endswith(self.__ITERATION_FUNC_NAME):
+                    self.__add_doc_string(
+                        f, self.__construct_contracts(self.__app_names, verification)
+                    )
+                    f.body.pop()
+                    self.__add_return_states(f)
+            manipulated.app_states_names = app_states_names
+            changed = True
+        if changed:
+            manipulated.functions = astor.to_source(manipulated.functions_tree)
+
     def __generate_system_behaviour_function(
         self,
         app_names_to_iteration_funcs_without_ret: Dict[str, ast.FunctionDef],
@@ -1269,99 +1699,23 @@ class Manipulator:
         return behaviour_func
 
     def __check_no_invalid_calls_in_function(
-        self, functions: List[ast.FunctionDef], invalid_func_names: Set[str]
+        self,
+        function_names: List[str],
+        calls_per_function: List[Tuple[str, Set[str]]],
+        invalid_func_names: Set[str],
     ) -> Tuple[bool, str]:
         """
-        Checks that there are no calls to the given functions in the body of the given function definitions.
+        Checks that there are no calls to the given functions in the body of the function definitions with the given names,
+        using the calls collected during the analysis of the app.
         returns a tuple with a boolean indicating whether the list of function definitions is valid (i.e., does not contain any
-        invalid calls) and a str which is the first function defintion that contains an invalid call if the boolean is false
+        invalid calls) and a str which is the name of the first function defintion that contains an invalid call if the boolean is false
 
         an invalid function in the set can be a function name like `func` that gives call of the form `func()` or `m.func()` for any m
         or an instance/module name and a function name like `mod.func2` for calls of the form `mod.func(2)`
         """
-
-        def check(
-            op: Union[
-                ast.stmt,
-                ast.expr,
-                ast.comprehension,
-                ast.keyword,
-                List[ast.stmt],
-                List[ast.expr],
-                List[ast.comprehension],
-                List[ast.keyword],
-            ]
-        ) -> bool:
-            if isinstance(op, (list, tuple)):
-                for o in (check(v) for v in list(op)):
-                    if not o:
-                        return False
-                return True
-            elif isinstance(op, (ast.List, ast.Tuple)):
-                return check(op.elts)
-            elif isinstance(op, ast.BoolOp):
-                return check(op.values)
-            elif isinstance(op, ast.UnaryOp):
-                return check(op.operand)
-            elif isinstance(op, (ast.NamedExpr, ast.Expr)):
-                return check(op.value)
-            elif isinstance(op, ast.Lambda):
-                return check(op.body)
-            elif isinstance(op, ast.Assign):
-                return check(op.value)
-            elif isinstance(op, ast.Return):
-                return check(op.value) if op.value else True
-            elif isinstance(op, ast.Compare):
-                return check(op.left) and check(op.comparators)
-            elif isinstance(op, ast.BinOp):
-                return check(op.left) and check(op.right)
-            elif isinstance(op, (ast.IfExp, ast.If)):
-                return check(op.test) and check(op.body) and check(op.orelse)
-            elif isinstance(op, ast.Dict):
-                return check(op.values)
-            elif isinstance(op, ast.Set):
-                return check(op.elts)
-            elif isinstance(op, ast.comprehension):
-                return check(op.iter) and check(op.ifs)
-            elif isinstance(op, (ast.ListComp, ast.SetComp, ast.GeneratorExp)):
-                return check(op.generators)
-            elif isinstance(op, ast.DictComp):
-                return check(op.value) and check(op.generators)
-            elif isinstance(op, (ast.Yield, ast.YieldFrom)):
-                return check(op.value) if op.value else True
-            elif isinstance(op, ast.FormattedValue):
-                return check(op.value)
-            elif isinstance(op, ast.JoinedStr):
-                return check(op.values)
-            elif isinstance(op, ast.Return):
-                return check(op.value) if op.value else True
-            elif isinstance(op, ast.Call):
-                module_name = "123"  # impossible name as placeholder
-                f_name = ""
-                if isinstance(op.func, ast.Attribute):
-                    # op.func.value is a ast.Name in this case
-                    module_name = cast(ast.Name, op.func.value).id
-                    f_name = op.func.attr
-                elif isinstance(op.func, ast.Name):
-                    f_name = op.func.id
-
-                if (
-                    f_name in invalid_func_names
-                    or f"{module_name}.{f_name}" in invalid_func_names
-                ):
-                    return False
-                else:
-                    return check(op.args) and check(op.keywords)
-            elif isinstance(op, ast.keyword):
-                return check(op.value)
-            elif isinstance(op, ast.FunctionDef):
-                return check(op.body) and (check(op.returns) if op.returns else True)
-            else:
-                return True
-
-        for function in functions:
-            if not check(function):
-                return False, function.name
+        for name, calls in calls_per_function:
+            if name in function_names and not calls.isdisjoint(invalid_func_names):
+                return False, name
 
         return True, ""
 
@@ -1873,37 +2227,85 @@ class Manipulator:
                 op.value = f"{self.__files_folder_path}/{app_name}/{v}"
 
     def __check_presence_forbidden_module(
-        self, imports_ast: List[ast.stmt], forbidden_modules: List[str]
+        self, imported_modules: List[str], forbidden_modules: List[str]
     ) -> Tuple[bool, str]:
         """
-        Checks in the given list of imports if one of the given forbidden module is imported.
+        Checks in the given list of imported modules if one of the given forbidden module is imported.
         Return a tuple whose first element is True if a forbidden module is found, False otherwise and second is the forbidden module found or "" if 1st is False
         """
-        imported_modules = []
-        for imp in imports_ast:
-            if isinstance(imp, ast.Import):
-                for n in imp.names:
-                    imported_modules.append(n.name)
-            elif isinstance(imp, ast.ImportFrom):
-                imported_modules.append(imp.module)
-
-        forbidden_modules_imported = cast(
-            List[str], list(filter(lambda m: m in forbidden_modules, imported_modules))
+        forbidden_modules_imported = list(
+            filter(lambda m: m in forbidden_modules, imported_modules)
         )
         if len(forbidden_modules_imported) > 0:
             return (True, forbidden_modules_imported[0])
         else:
             return (False, "")
 
+    def __read_app_main(self, directory: str, app_name: str) -> str:
+        """
+        Returns the source of the `main.py` of the given app, reading it only once.
+        """
+        key = (directory, app_name)
+        if key not in self.__app_main_sources:
+            with open(f"{directory}/{app_name}/main.py", "r") as file:
+                self.__app_main_sources[key] = file.read()
+        return self.__app_main_sources[key]
+
+    def __analyse_app_main(self, directory: str, app_name: str) -> AppMainAnalysis:
+        """
+        Reads, parses and analyses the `main.py` of the given app, once for both the verification and the runtime files.
+        The isolated functions are checked during the analysis. The parsed tree is kept for the first manipulation, see
+        `__app_main_tree`.
+        """
+        key = (directory, app_name)
+        if key not in self.__app_main_analyses:
+            source = self.__read_app_main(directory, app_name)
+            with phase("parse_app"):
+                module = ast.parse(source)
+                analyzer = _AppMainAnalyzer(
+                    {
+                        *self.__SVSHI_API_FUNCTIONS_WITH_INTERNAL_STATE,
+                        self.__CHECK_TIME_PROPERTY_NAME,
+                        self.__GET_LATEST_VALUE_NAME,
+                    }
+                )
+                analyzer.visit(module)
+            isolated_functions = {
+                f.name: self.__get_isolated_function(f, app_name)
+                for f in analyzer.function_defs
+                if f.name.startswith(self.__ISOLATED_FUNC_PREFIXES)
+            }
+            self.__app_main_analyses[key] = AppMainAnalysis(
+                source,
+                isolated_functions,
+                analyzer.calls_per_function,
+                analyzer.imported_modules,
+                analyzer.accesses_per_function,
+            )
+            self.__unused_app_main_trees[key] = module
+        return self.__app_main_analyses[key]
+
+    def __app_main_tree(self, directory: str, app_name: str) -> ast.Module:
+        """
+        Returns a tree of the `main.py` of the given app that can be manipulated in place.
+        The tree parsed during the analysis is used first. As the manipulations modify their tree, the source read during
+        the analysis is parsed again for each next one (e.g. the runtime file after the verification file), which is
+        several times faster than copying the tree with `copy.deepcopy`. The analysis itself is not run again.
+        """
+        analysis = self.__analyse_app_main(directory, app_name)
+        tree = self.__unused_app_main_trees.pop((directory, app_name), None)
+        return tree if tree is not None else ast.parse(analysis.source)
+
     def __manipulate_app_main(
         self,
         directory: str,
         app_name: str,
         accepted_names: Set[str],
         verification: bool,
-    ) -> Tuple[List[str], str, ast.FunctionDef, List[IsolatedFunction]]:
+    ) -> Tuple[List[str], str, ast.Module, ast.FunctionDef, List[IsolatedFunction]]:
         """
-        Returns the list of imports as strings and the manipulated invariant, function as pretty printed code (as string), the iteration function ast without the return
+        Returns the list of imports as strings and the manipulated invariant, function as pretty printed code (as string) along with
+        the tree it is printed from, the iteration function ast without the return
         statement but with the other manipulation, and the list of IsolatedFunction of the app.
         We keep imports added by the user.
         The manipulation consists in modifying the functions to add the app name, renaming all used files, renaming calls to devices and adding arguments to
@@ -1968,156 +2370,155 @@ class Manipulator:
             )
             return functions_ast, imports_ast, from_imports_ast
 
-        with open(f"{directory}/{app_name}/main.py", "r") as file:
-            module = ast.parse(file.read())
-            module_body = module.body
+        analysis = self.__analyse_app_main(directory, app_name)
+        module_body = self.__app_main_tree(directory, app_name).body
 
-            isolated_func_dict = self.__get_isolated_functions(module_body, app_name)
-            isolated_funcs = list(isolated_func_dict.values())
+        isolated_func_dict = analysis.isolated_functions
+        isolated_funcs = list(isolated_func_dict.values())
 
-            # # We rename all the files, if any
-            # filenames = self.__filenames_per_app[app_name]
-            # if filenames:
-            #     self.__rename_files(module_body, app_name, filenames)
+        # # We rename all the files, if any
+        # filenames = self.__filenames_per_app[app_name]
+        # if filenames:
+        #     self.__rename_files(module_body, app_name, filenames)
 
-            # We rename all the device instances and add the state argument to each of their calls
-            self.__rename_instances_add_state(
-                module_body, app_name, accepted_names, isolated_funcs, verification
+        # We rename all the device instances and add the state argument to each of their calls
+        self.__rename_instances_add_state(
+            module_body, app_name, accepted_names, isolated_funcs, verification
+        )
+
+        # Extract imports, invariant/iteration functions and add the contracts to them if verification is false
+        (
+            functions_ast,
+            imports_ast,
+            from_imports_ast,
+        ) = extract_functions_and_imports(module_body)
+
+        # Contains all the invalid function names: these are not allowed in invariant or iteration functions
+        invalid_func_names = {
+            self.__PRINT_FUNC_NAME,
+            self.__OPEN_FUNC_NAME,
+            f"{self.__SVSHI_API_INSTANCE_NAME}.{self.__SVSHI_API_GET_FILEPATH_API_FUNC_NAME}",
+            f"{self.__SVSHI_API_INSTANCE_NAME}.{self.__SVSHI_API_GET_FILE_TEXT_API_FUNC_NAME}",
+            f"{self.__SVSHI_API_INSTANCE_NAME}.{self.__SVSHI_API_GET_FILE_BINARY_API_FUNC_NAME}",
+        }
+
+        # Check if an invariant function contains a call to an invalid function,
+        # i.e. an isolated function or completely invalid ones
+        isolated_func_names = {
+            uf.name_with_app_name for _, uf in isolated_func_dict.items()
+        }
+        invariant_invalid_func_names = isolated_func_names | invalid_func_names
+        valid, wrong_invariant_func = self.__check_no_invalid_calls_in_function(
+            [self.__INVARIANT_FUNC_NAME],
+            analysis.calls_per_function,
+            invariant_invalid_func_names,
+        )
+        if not valid:
+            _print_and_raise(
+                f"The invariant function '{app_name}_{wrong_invariant_func}' contains a call "
+                f"to a forbidden function in that list: {invariant_invalid_func_names}.",
+                InvalidFunctionCallException,
             )
 
-            # Extract imports, invariant/iteration functions and add the contracts to them if verification is false
-            (
+        iteration_functions = list(
+            filter(
+                lambda f: f.name.endswith(f"_{self.__ITERATION_FUNC_NAME}"),
                 functions_ast,
-                imports_ast,
-                from_imports_ast,
-            ) = extract_functions_and_imports(module_body)
-
-            all_imports_ast = imports_ast + from_imports_ast
-
-            # Contains all the invalid function names: these are not allowed in invariant or iteration functions
-            invalid_func_names = {
-                self.__PRINT_FUNC_NAME,
-                self.__OPEN_FUNC_NAME,
-                f"{self.__SVSHI_API_INSTANCE_NAME}.{self.__SVSHI_API_GET_FILEPATH_API_FUNC_NAME}",
-                f"{self.__SVSHI_API_INSTANCE_NAME}.{self.__SVSHI_API_GET_FILE_TEXT_API_FUNC_NAME}",
-                f"{self.__SVSHI_API_INSTANCE_NAME}.{self.__SVSHI_API_GET_FILE_BINARY_API_FUNC_NAME}",
-            }
+            )
+        )
 
-            # Check if an invariant function contains a call to an invalid function,
-            # i.e. an isolated function or completely invalid ones
-            isolated_func_names = {
-                uf.name_with_app_name for _, uf in isolated_func_dict.items()
-            }
-            invariant_invalid_func_names = isolated_func_names | invalid_func_names
-            valid, wrong_invariant_func = self.__check_no_invalid_calls_in_function(
-                list(
-                    filter(
-                        lambda f: f.name.endswith(f"_{self.__INVARIANT_FUNC_NAME}"),
-                        functions_ast,
-                    )
-                ),
-                invariant_invalid_func_names,
+        # Check if an iteration function contains a call to an invalid function
+        valid, wrong_iteration_func = self.__check_no_invalid_calls_in_function(
+            [self.__ITERATION_FUNC_NAME],
+            analysis.calls_per_function,
+            invalid_func_names,
+        )
+        if not valid:
+            _print_and_raise(
+                f"The iteration function '{app_name}_{wrong_iteration_func}' contains a call "
+                f"to a forbidden function in that list: {invalid_func_names}.",
+                InvalidFunctionCallException,
             )
-            if not valid:
-                _print_and_raise(
-                    f"The invariant function '{wrong_invariant_func}' contains a call "
-                    f"to a forbidden function in that list: {invariant_invalid_func_names}.",
-                    InvalidFunctionCallException,
-                )
 
-            iteration_functions = list(
+        # Replace all calls to isolated functions via svshi_api in place.
+        self.__replace_calls_to_isolated_functions(
+            iteration_functions,
+            verification,
+        )
+
+        if not verification:
+            # Check if an isolated function contains a call to an invalid function
+            isolated_func_definitions = list(
                 filter(
-                    lambda f: f.name.endswith(f"_{self.__ITERATION_FUNC_NAME}"),
+                    lambda f: f.name.startswith(
+                        tuple(
+                            f"{app_name}_{prefix}"
+                            for prefix in self.__ISOLATED_FUNC_PREFIXES
+                        )
+                    ),
                     functions_ast,
                 )
             )
-
-            # Check if an iteration function contains a call to an invalid function
-            valid, wrong_iteration_func = self.__check_no_invalid_calls_in_function(
-                iteration_functions,
-                invalid_func_names,
+            isolated_invalid_func_names = set([self.__OPEN_FUNC_NAME])
+            valid, wrong_isolated_func = self.__check_no_invalid_calls_in_function(
+                list(isolated_func_dict.keys()),
+                analysis.calls_per_function,
+                isolated_invalid_func_names,
             )
             if not valid:
                 _print_and_raise(
-                    f"The iteration function '{wrong_iteration_func}' contains a call "
-                    f"to a forbidden function in that list: {invalid_func_names}.",
+                    f"The function '{app_name}_{wrong_isolated_func}' contains a call to a "
+                    f"forbidden function in that list: {isolated_invalid_func_names}.",
                     InvalidFunctionCallException,
                 )
 
-            # Replace all calls to isolated functions via svshi_api in place.
-            self.__replace_calls_to_isolated_functions(
-                iteration_functions,
-                verification,
-            )
-
-            if not verification:
-                # Check if an isolated function contains a call to an invalid function
-                isolated_func_definitions = list(
-                    filter(
-                        lambda f: f.name.startswith(
-                            tuple(
-                                f"{app_name}_{prefix}"
-                                for prefix in self.__ISOLATED_FUNC_PREFIXES
-                            )
-                        ),
-                        functions_ast,
-                    )
-                )
-                isolated_invalid_func_names = set([self.__OPEN_FUNC_NAME])
-                valid, wrong_isolated_func = self.__check_no_invalid_calls_in_function(
-                    isolated_func_definitions,
-                    isolated_invalid_func_names,
-                )
-                if not valid:
-                    _print_and_raise(
-                        f"The function '{wrong_isolated_func}' contains a call to a "
-                        f"forbidden function in that list: {isolated_invalid_func_names}.",
-                        InvalidFunctionCallException,
-                    )
+            # Add the internal_state as argument to all isolated functions
+            for isolated_def in isolated_func_definitions:
+                self.__add_internal_state_to_fun_def(isolated_def)
 
-                # Add the internal_state as argument to all isolated functions
-                for isolated_def in isolated_func_definitions:
-                    self.__add_internal_state_to_fun_def(isolated_def)
+        # Filesystem related operations
 
-            # Filesystem related operations
-
-            # We add the app_name as arguments to file system calls. They appear only in isolated functions as checked above, which
-            # are in the list only when verification = false
-            self.__add_appname_to_filesystem_functions_args_and_check_mode_arg(
-                functions_ast, app_name
-            )
+        # We add the app_name as arguments to file system calls. They appear only in isolated functions as checked above, which
+        # are in the list only when verification = false
+        self.__add_appname_to_filesystem_functions_args_and_check_mode_arg(
+            functions_ast, app_name
+        )
 
-            # Get the iteration function as an AST without return statement to generate the system behaviour function later
-            # There is only one per app
-            iteration_ast = copy.deepcopy(
-                list(
-                    filter(
-                        lambda f: f.name == f"{app_name}_{self.__ITERATION_FUNC_NAME}",
-                        functions_ast,
-                    )
-                )[0]
-            )
+        # Get the iteration function as an AST without return statement to generate the system behaviour function later
+        # There is only one per app
+        # The statements are not modified from here on, so they can be shared with the system behaviour function: only
+        # the body list is copied, as the return statement is appended to it for verification
+        iteration_ast = copy.copy(
+            list(
+                filter(
+                    lambda f: f.name == f"{app_name}_{self.__ITERATION_FUNC_NAME}",
+                    functions_ast,
+                )
+            )[0]
+        )
+        iteration_ast.body = list(iteration_ast.body)
 
-            # We need to remove the docstring from the iteration_ast
-            iteration_ast = self.__remove_doc_string(iteration_ast)
+        # We need to remove the docstring from the iteration_ast
+        iteration_ast = self.__remove_doc_string(iteration_ast)
 
-            if verification:
-                # Add a return statement that returns the states for verification
-                functions_ast = list(
-                    map(
-                        lambda f: self.__add_return_states(f)
-                        if f.name == f"{app_name}_{self.__ITERATION_FUNC_NAME}"
-                        else f,
-                        functions_ast,
-                    )
+        if verification:
+            # Add a return statement that returns the states for verification
+            functions_ast = list(
+                map(
+                    lambda f: self.__add_return_states(f)
+                    if f.name == f"{app_name}_{self.__ITERATION_FUNC_NAME}"
+                    else f,
+                    functions_ast,
                 )
+            )
 
-            # Check for forbidden imported modules
+        # Check for forbidden imported modules. The imports are only kept for the runtime file
+        if not verification:
             (
                 forbidden_import_flag,
                 forbidden_module_imported,
             ) = self.__check_presence_forbidden_module(
-                imports_ast=all_imports_ast,
+                imported_modules=analysis.imported_modules,
                 forbidden_modules=self.__FORBIDDEN_MODULE_IN_APPS,
             )
             if forbidden_import_flag:
@@ -2127,8 +2528,16 @@ class Manipulator:
                     ForbiddenModuleImported,
                 )
 
-            # Transform to source code
-            functions = astor.to_source(ast.Module(functions_ast))
+        # Transform to source code
+        with phase("to_source"):
+            functions_tree = ast.Module(functions_ast)
+            functions = astor.to_source(functions_tree)
             imports = astor.to_source(ast.Module(imports_ast))
             from_imports = astor.to_source(ast.Module(from_imports_ast))
-            return [imports, from_imports], functions, iteration_ast, isolated_funcs
+        return (
+            [imports, from_imports],
+            functions,
+            functions_tree,
+            iteration_ast,
+            isolated_funcs,
+        )
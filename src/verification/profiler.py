@@ -0,0 +1,147 @@
+"""
+Opt-in profiling of the generation and the verification of the apps.
+
+The code to profile is split in phases with `phase(name, **labels)`, which does nothing unless profiling was started
+with `start_profiling`. Phases can be nested. For each phase, the report contains its duration, the peak of the memory
+allocated by Python during the phase (traced with `tracemalloc`, which slows down the profiled code) and the maximum
+resident set size of the process at its end, which also counts the memory of native libraries such as z3. The latter
+is not reported on Windows, where the `resource` module does not exist.
+"""
+
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, Final, Iterator, List, Optional
+
+_KILOBYTE: Final = 1024
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """
+    Returns the maximum resident set size of the process, None on platforms without the `resource` module (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return max_rss if sys.platform == "darwin" else max_rss * _KILOBYTE
+
+
+class Profiler:
+    """
+    Records the phases of a run as a tree.
+    """
+
+    def __init__(self, name: str):
+        self.__root = self.__new_phase(name, {})
+        # The phases currently running, the innermost last, with the Python memory peak reached by each one
+        # before its currently running child started
+        self.__stack: List[dict] = [self.__root]
+        self.__peaks: List[int] = [0]
+        self.__start = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __new_phase(self, name: str, labels: Dict[str, str]) -> dict:
+        phase = {"name": name}
+        if labels:
+            phase["labels"] = labels
+        phase["children"] = []
+        return phase
+
+    def __current_peak(self) -> int:
+        return tracemalloc.get_traced_memory()[1]
+
+    def __add_max_rss(self, phase: dict):
+        max_rss = _max_rss_bytes()
+        if max_rss is not None:
+            phase["max_rss_bytes"] = max_rss
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Records the code run in the `with` block as a phase with the given name and labels, e.g. the app name.
+        """
+        phase = self.__new_phase(name, {k: str(v) for k, v in labels.items()})
+        self.__stack[-1]["children"].append(phase)
+        self.__peaks[-1] = max(self.__peaks[-1], self.__current_peak())
+        tracemalloc.reset_peak()
+        self.__stack.append(phase)
+        self.__peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase["duration_s"] = time.perf_counter() - start
+            peak = max(self.__peaks.pop(), self.__current_peak())
+            phase["python_memory_peak_bytes"] = peak
+            self.__add_max_rss(phase)
+            self.__stack.pop()
+            # The peak of a phase is also a peak of the phase containing it
+            self.__peaks[-1] = max(self.__peaks[-1], peak)
+            tracemalloc.reset_peak()
+
+    def report(self) -> dict:
+        """
+        Returns the report of the phases recorded so far, with the total duration per phase name.
+        """
+        root = dict(self.__root)
+        root["duration_s"] = time.perf_counter() - self.__start
+        root["python_memory_peak_bytes"] = max(self.__peaks[0], self.__current_peak())
+        self.__add_max_rss(root)
+
+        totals: Dict[str, dict] = {}
+
+        def add_totals(phase: dict):
+            for child in phase["children"]:
+                total = totals.setdefault(
+                    child["name"], {"count": 0, "duration_s": 0.0}
+                )
+                total["count"] += 1
+                total["duration_s"] += child.get("duration_s", 0.0)
+                add_totals(child)
+
+        add_totals(root)
+        return {"phases": root, "totals_per_phase": totals}
+
+    def write(self, filename: str):
+        """
+        Writes the report as JSON to the given file.
+        """
+        with open(filename, "w") as file:
+            json.dump(self.report(), file, indent=4)
+
+
+_profiler: Optional[Profiler] = None
+
+
+def start_profiling(name: str) -> Profiler:
+    """
+    Starts recording the phases in a new profiler, which is returned.
+    """
+    global _profiler
+    _profiler = Profiler(name)
+    return _profiler
+
+
+def stop_profiling():
+    """
+    Stops recording the phases.
+    """
+    global _profiler
+    _profiler = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def phase(name: str, **labels: str) -> contextlib.AbstractContextManager:
+    """
+    Records the code run in the `with` block as a phase if profiling was started, does nothing otherwise.
+    """
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.phase(name, **labels)
@@ -0,0 +1,349 @@
+"""
+Long-lived verification server.
+
+Generating and verifying the apps by calling `verification.main` and then `extended_verification.main`
+in new processes imports z3, CrossHair and astor again on every compilation. This server imports them once and
+answers requests sent as JSON lines, either over a Unix socket or over stdin/stdout.
+
+A request is a JSON object with a "command" field, one of:
+    - "generate": same as running `verification.main`
+    - "verify": same as running `extended_verification.main` on the generated verification file
+    - "generate_and_verify": "generate", then "verify" if the generation succeeded
+    - "ping": answers with the exit code 0
+    - "shutdown": stops the server
+"verify" and "generate_and_verify" optionally accept the "per_condition_timeout", "per_path_timeout",
+"path_encoding", "time_encoding", "adaptive_timeouts", "max_timeout", "deadline" and "full" fields, with the same meaning as the arguments of `extended_verification.main`.
+
+The output lines of the modules are streamed back as they are printed, one JSON object per line, of the form
+{"stdout": line} or {"stderr": line}. The answer to a request always ends with {"exit_code": code}.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import socketserver
+import sys
+import traceback
+from types import ModuleType
+from typing import Callable, Dict, Final, List, Optional, TextIO, Tuple
+
+from .main import (
+    APP_LIBRARY,
+    FILES_FOLDER_PATH,
+    GENERATED_PATH,
+    SVSHI_HOME,
+    VERIFICATION_MODULE_PATH,
+    main as generate,
+)
+
+VERIFICATION_FILE_MODULE_NAME: Final = "verification.verification_file"
+FUNCTIONS_TO_VERIFY_MODULE_NAME: Final = "extended_verification.functions_to_verify"
+DEFAULT_SOCKET_PATH: Final = f"{SVSHI_HOME}/verification_server.sock"
+DEFAULT_PER_CONDITION_TIMEOUT: Final = 30.0
+DEFAULT_PER_PATH_TIMEOUT: Final = 30.0
+
+GENERATE_COMMAND: Final = "generate"
+VERIFY_COMMAND: Final = "verify"
+GENERATE_AND_VERIFY_COMMAND: Final = "generate_and_verify"
+PING_COMMAND: Final = "ping"
+SHUTDOWN_COMMAND: Final = "shutdown"
+
+SUCCESS_EXIT_CODE: Final = 0
+ERROR_EXIT_CODE: Final = 1
+
+
+class _LineWriter(io.TextIOBase):
+    """
+    Text stream that calls `on_line` with every complete line written to it.
+    """
+
+    def __init__(self, on_line: Callable[[str], None]):
+        self.__on_line = on_line
+        self.__buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self.__buffer += s
+        *lines, self.__buffer = self.__buffer.split("\n")
+        for line in lines:
+            self.__on_line(line)
+        return len(s)
+
+    def flush(self):
+        if self.__buffer:
+            self.__on_line(self.__buffer)
+            self.__buffer = ""
+
+
+def _fresh_import(module_name: str) -> ModuleType:
+    """
+    Imports the given module, reloading it from its source file if it was already imported,
+    as the generated files change between requests.
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        return importlib.import_module(module_name)
+    cached = getattr(module, "__cached__", None)
+    if cached and os.path.exists(cached):
+        # The source can be rewritten within the same second with the same size, which would not invalidate the cache
+        os.remove(cached)
+    return importlib.reload(module)
+
+
+def _forget_module(module_name: str):
+    """
+    Removes the given module and its compiled file, so that the next import reads it again from its source file.
+    """
+    module = sys.modules.pop(module_name, None)
+    cached = getattr(module, "__cached__", None)
+    if cached and os.path.exists(cached):
+        os.remove(cached)
+
+
+class VerificationServer:
+    """
+    Runs the generation and the verification of the apps in the current process, keeping the
+    imported modules and the results of the previous verifications between requests.
+    """
+
+    def __init__(
+        self,
+        generated_path: str,
+        app_library_path: str,
+        verification_module_path: str,
+        files_folder_path: str,
+    ):
+        self.__generated_path = generated_path
+        self.__app_library_path = app_library_path
+        self.__verification_module_path = verification_module_path
+        self.__files_folder_path = files_folder_path
+        # Output lines and exit code of the verification, per hash of the verification file and options
+        self.__verification_cache: Dict[str, Tuple[List[Tuple[str, str]], int]] = {}
+
+    def warm_up(self):
+        """
+        Imports the heavy modules used by the verification, so that the first request does not pay for it.
+        """
+        importlib.import_module("extended_verification.main")
+
+    def handle_request(self, request: dict, emit: Callable[[dict], None]) -> bool:
+        """
+        Handles the given request, passing every message of the answer to `emit`.
+        Returns False if the server should stop after this request, True otherwise.
+        """
+        command = request.get("command")
+        if command == SHUTDOWN_COMMAND:
+            emit({"exit_code": SUCCESS_EXIT_CODE})
+            return False
+
+        if command == PING_COMMAND:
+            exit_code = SUCCESS_EXIT_CODE
+        elif command == GENERATE_COMMAND:
+            exit_code = self.__run(self.__generate, emit)
+        elif command == VERIFY_COMMAND:
+            exit_code = self.__verify(request, emit)
+        elif command == GENERATE_AND_VERIFY_COMMAND:
+            exit_code = self.__run(self.__generate, emit)
+            if exit_code == SUCCESS_EXIT_CODE:
+                exit_code = self.__verify(request, emit)
+        else:
+            emit({"stderr": f"Unknown command '{command}'"})
+            exit_code = ERROR_EXIT_CODE
+        emit({"exit_code": exit_code})
+        return True
+
+    def __run(
+        self,
+        f: Callable[[], Optional[int]],
+        emit: Callable[[dict], None],
+        lines: Optional[List[Tuple[str, str]]] = None,
+    ) -> int:
+        """
+        Runs f, streaming what it prints as it goes and appending it to `lines` if given.
+        Returns the exit code that the module would have had if run in a new process.
+        """
+
+        def on_line(stream: str) -> Callable[[str], None]:
+            def f(line: str):
+                if lines is not None:
+                    lines.append((stream, line))
+                emit({stream: line})
+
+            return f
+
+        out = _LineWriter(on_line("stdout"))
+        err = _LineWriter(on_line("stderr"))
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                try:
+                    exit_code = f()
+                except Exception:
+                    traceback.print_exc()
+                    exit_code = ERROR_EXIT_CODE
+        finally:
+            out.flush()
+            err.flush()
+        return SUCCESS_EXIT_CODE if exit_code is None else exit_code
+
+    def __generate(self):
+        generate(
+            self.__generated_path,
+            self.__app_library_path,
+            self.__verification_module_path,
+            self.__files_folder_path,
+        )
+
+    def __verify(self, request: dict, emit: Callable[[dict], None]) -> int:
+        from extended_verification import main as extended_verification
+        from extended_verification import verification_functions
+
+        per_condition_timeout = float(
+            request.get("per_condition_timeout", DEFAULT_PER_CONDITION_TIMEOUT)
+        )
+        per_path_timeout = float(
+            request.get("per_path_timeout", DEFAULT_PER_PATH_TIMEOUT)
+        )
+        path_encoding = request.get(
+            "path_encoding", verification_functions.NESTED_IFS_ENCODING
+        )
+        time_encoding = request.get(
+            "time_encoding", verification_functions.QUANTIFIED_TIME_ENCODING
+        )
+        adaptive_timeouts = bool(request.get("adaptive_timeouts", False))
+        max_timeout = float(
+            request.get("max_timeout", verification_functions.DEFAULT_MAX_TIMEOUT)
+        )
+        deadline = float(
+            request.get("deadline", verification_functions.DEFAULT_DEADLINE)
+        )
+        full = bool(request.get("full", False))
+
+        verification_filename = (
+            f"{self.__verification_module_path}/verification_file.py"
+        )
+        with open(verification_filename, "rb") as file:
+            key = hashlib.sha256(file.read())
+        options = [
+            per_condition_timeout,
+            per_path_timeout,
+            path_encoding,
+            time_encoding,
+            adaptive_timeouts,
+            max_timeout,
+            deadline,
+            full,
+        ]
+        key.update("|".join(map(str, options)).encode())
+        digest = key.hexdigest()
+
+        if digest in self.__verification_cache:
+            cached_lines, exit_code = self.__verification_cache[digest]
+            for stream, line in cached_lines:
+                emit({stream: line})
+            return exit_code
+
+        def verify() -> int:
+            verif_functions = verification_functions.VerificationFunctions(
+                per_path_timeout=per_path_timeout,
+                per_condition_timeout=per_condition_timeout,
+                path_encoding=path_encoding,
+                time_encoding=time_encoding,
+                adaptive_timeouts=adaptive_timeouts,
+                max_timeout=max_timeout,
+                deadline=deadline,
+            )
+            # The functions to verify are rewritten for each module
+            _forget_module(FUNCTIONS_TO_VERIFY_MODULE_NAME)
+            module = _fresh_import(VERIFICATION_FILE_MODULE_NAME)
+            return extended_verification.verify_module(
+                module, verif_functions, compositional=not full
+            )
+
+        lines: List[Tuple[str, str]] = []
+        exit_code = self.__run(verify, emit, lines)
+        if exit_code != ERROR_EXIT_CODE:
+            # Only keep the verdicts, not the crashes that might be caused by the environment
+            self.__verification_cache[digest] = (lines, exit_code)
+        return exit_code
+
+    def serve(self, requests: TextIO, answers: TextIO) -> bool:
+        """
+        Answers the requests read line by line from `requests`, writing the answers to `answers`,
+        until a shutdown request is received or `requests` is exhausted.
+        Returns True if a shutdown was requested, False otherwise.
+        """
+
+        def emit(message: dict):
+            answers.write(json.dumps(message) + "\n")
+            answers.flush()
+
+        for line in requests:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                emit({"stderr": f"Invalid request: {e}"})
+                emit({"exit_code": ERROR_EXIT_CODE})
+                continue
+            if not self.handle_request(request, emit):
+                return True
+        return False
+
+
+def serve_unix_socket(server: VerificationServer, socket_path: str):
+    """
+    Serves the requests of the clients connecting to the Unix socket at the given path, one client at a time,
+    until one of them requests a shutdown.
+    """
+    shutdown_requested = False
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            nonlocal shutdown_requested
+            requests = io.TextIOWrapper(self.rfile, encoding="utf-8")
+            answers = io.TextIOWrapper(self.wfile, encoding="utf-8")
+            shutdown_requested = server.serve(requests, answers)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with socketserver.UnixStreamServer(socket_path, Handler) as unix_server:
+        print(f"Verification server listening on {socket_path}", flush=True)
+        try:
+            while not shutdown_requested:
+                unix_server.handle_request()
+        finally:
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Long-lived server generating and verifying the apps of the library."
+    )
+    parser.add_argument(
+        "-s",
+        "--socket",
+        help=f"Path of the Unix socket to listen on, default: {DEFAULT_SOCKET_PATH}",
+        default=DEFAULT_SOCKET_PATH,
+    )
+    parser.add_argument(
+        "--stdio",
+        help="Read the requests from stdin and write the answers to stdout instead of using a socket",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    server = VerificationServer(
+        GENERATED_PATH, APP_LIBRARY, VERIFICATION_MODULE_PATH, FILES_FOLDER_PATH
+    )
+    server.warm_up()
+    if args.stdio:
+        server.serve(sys.stdin, sys.stdout)
+    else:
+        serve_unix_socket(server, args.socket)
@@ -1,5 +1,9 @@
+import ast
 import filecmp
+import json
 import os
+import shutil
+from typing import List, Optional
 from ..generator import Generator
 from ..parser import Parser
 import pytest
@@ -103,3 +107,289 @@ def test_generator_generate_runtime_file():
     # Cleanup
     os.remove(RUNTIME_FILE_PATH)
     os.remove(ISOLATED_FUNCS_JSON_FILE_PATH)
+
+
+def make_generator(
+    generated_path: str,
+    app_library_path: str,
+    directory: str,
+    cache_filename: str,
+    nb_workers: int = 1,
+    read_write_sets_filename: Optional[str] = None,
+):
+    parser = Parser(generated_path, app_library_path)
+    return (
+        Generator(
+            f"{directory}/verification_file.py",
+            f"{directory}/runtime_file.py",
+            f"{directory}/conditions.py",
+            "files",
+            parser.parse_group_addresses(),
+            parser.parse_devices_instances(),
+            parser.parse_devices_classes(),
+            parser.get_app_names(),
+            parser.get_filenames(),
+            f"{directory}/isolated_fns.json",
+            cache_filename,
+            nb_workers,
+            read_write_sets_filename,
+        ),
+        parser.get_app_priorities(),
+    )
+
+
+def generate_files(
+    generated_path: str,
+    app_library_path: str,
+    directory,
+    cache_filename: str,
+    nb_workers: int = 1,
+) -> List[str]:
+    generator, priorities = make_generator(
+        generated_path, app_library_path, str(directory), cache_filename, nb_workers
+    )
+    generator.generate_verification_file(priorities)
+    generator.generate_runtime_file(priorities)
+    return [
+        (directory / filename).read_text()
+        for filename in [
+            "verification_file.py",
+            "runtime_file.py",
+            "isolated_fns.json",
+        ]
+    ]
+
+
+def read_expected_files() -> List[str]:
+    expected = []
+    for path in [
+        EXPECTED_VERIFICATION_FILE_PATH,
+        EXPECTED_RUNTIME_FILE_PATH,
+        EXPECTED_ISOLATED_FUNCS_JSON_FILE_PATH,
+    ]:
+        with open(path, "r") as file:
+            expected.append(file.read())
+    return expected
+
+
+def test_generator_with_cache_generates_same_files_twice(tmp_path):
+    cache_filename = str(tmp_path / "generation_cache.pickle")
+    generated_path = f"{TESTS_DIRECTORY}/fake_generated"
+    app_library_path = f"{TESTS_DIRECTORY}/fake_app_library"
+
+    first = generate_files(generated_path, app_library_path, tmp_path, cache_filename)
+    assert os.path.exists(cache_filename) == True
+    second = generate_files(generated_path, app_library_path, tmp_path, cache_filename)
+
+    expected = read_expected_files()
+    assert first == expected
+    assert second == expected
+
+
+def test_generator_with_cache_only_manipulates_changed_apps(tmp_path, mocker):
+    generated_path = tmp_path / "generated"
+    shutil.copytree(f"{TESTS_DIRECTORY}/fake_generated", generated_path)
+    app_library_path = tmp_path / "app_library"
+    shutil.copytree(f"{TESTS_DIRECTORY}/fake_app_library", app_library_path)
+    cached_directory = tmp_path / "cached"
+    cached_directory.mkdir()
+    uncached_directory = tmp_path / "uncached"
+    uncached_directory.mkdir()
+    cache_filename = str(tmp_path / "generation_cache.pickle")
+
+    def generate(directory, cache_filename) -> List[str]:
+        return generate_files(
+            str(generated_path), str(app_library_path), directory, cache_filename
+        )
+
+    def main_path(directory, app_name: str):
+        return directory / app_name / "main.py"
+
+    generate(cached_directory, cache_filename)
+
+    # Only the last app changes
+    third_app_main = main_path(app_library_path, "third_app")
+    third_app_main.write_text(third_app_main.read_text() + "\n# Changed\n")
+    parse_spy = mocker.spy(ast, "parse")
+    cached = generate(cached_directory, cache_filename)
+    parsed_sources = [c.args[0] for c in parse_spy.call_args_list]
+    uncached = generate(uncached_directory, None)
+
+    assert cached == uncached
+    assert third_app_main.read_text() in parsed_sources
+    assert main_path(generated_path, "first_app").read_text() not in parsed_sources
+    assert main_path(generated_path, "second_app").read_text() not in parsed_sources
+
+    # The first app gets a new time check, which shifts the ids of the checks of the following apps: they are
+    # renumbered without being manipulated again
+    first_app_main = main_path(generated_path, "first_app")
+    first_app_main.write_text(
+        first_app_main.read_text().replace(
+            "and not app_state.BOOL_1\n",
+            "and not app_state.BOOL_1 and svshi_api.check_time_property(svshi_api.Day(1), svshi_api.Hour(1), True)\n",
+            1,
+        )
+    )
+    parse_spy.reset_mock()
+    cached = generate(cached_directory, cache_filename)
+    parsed_sources = [c.args[0] for c in parse_spy.call_args_list]
+    uncached = generate(uncached_directory, None)
+
+    assert cached == uncached
+    assert "2: CheckState()" in cached[1]
+    assert first_app_main.read_text() in parsed_sources
+    assert main_path(generated_path, "second_app").read_text() not in parsed_sources
+    assert main_path(app_library_path, "third_app").read_text() not in parsed_sources
+
+
+def test_generator_with_cache_does_not_manipulate_other_apps_again_when_an_app_is_added(
+    tmp_path, mocker
+):
+    generated_path = f"{TESTS_DIRECTORY}/fake_generated"
+    app_library_path = tmp_path / "app_library"
+    shutil.copytree(f"{TESTS_DIRECTORY}/fake_app_library", app_library_path)
+    # The third app is installed after the first generation
+    third_app_path = tmp_path / "third_app"
+    shutil.move(str(app_library_path / "third_app"), third_app_path)
+    cache_filename = str(tmp_path / "generation_cache.pickle")
+
+    generate_files(generated_path, str(app_library_path), tmp_path, cache_filename)
+    shutil.move(str(third_app_path), app_library_path / "third_app")
+    parse_spy = mocker.spy(ast, "parse")
+    files = generate_files(
+        generated_path, str(app_library_path), tmp_path, cache_filename
+    )
+    parsed_sources = [c.args[0] for c in parse_spy.call_args_list]
+
+    def main_source(directory, app_name: str) -> str:
+        with open(f"{directory}/{app_name}/main.py", "r") as file:
+            return file.read()
+
+    assert files == read_expected_files()
+    assert main_source(app_library_path, "third_app") in parsed_sources
+    assert main_source(generated_path, "first_app") not in parsed_sources
+    assert main_source(generated_path, "second_app") not in parsed_sources
+
+
+def test_generator_in_parallel_generates_same_files(tmp_path):
+    files = generate_files(
+        f"{TESTS_DIRECTORY}/fake_generated",
+        f"{TESTS_DIRECTORY}/fake_app_library",
+        tmp_path,
+        None,
+        nb_workers=3,
+    )
+
+    assert files == read_expected_files()
+
+
+def test_generator_in_parallel_with_cache_allocates_same_check_ids(tmp_path):
+    generated_path = tmp_path / "generated"
+    shutil.copytree(f"{TESTS_DIRECTORY}/fake_generated", generated_path)
+    first_app_main = generated_path / "first_app" / "main.py"
+    first_app_main.write_text(
+        first_app_main.read_text().replace(
+            "and not app_state.BOOL_1\n",
+            "and not app_state.BOOL_1 and svshi_api.check_time_property(svshi_api.Day(1), svshi_api.Hour(1), True)\n",
+            1,
+        )
+    )
+    parallel_directory = tmp_path / "parallel"
+    parallel_directory.mkdir()
+    sequential_directory = tmp_path / "sequential"
+    sequential_directory.mkdir()
+    cache_filename = str(tmp_path / "generation_cache.pickle")
+
+    def generate(directory, cache_filename, nb_workers: int) -> List[str]:
+        return generate_files(
+            str(generated_path),
+            f"{TESTS_DIRECTORY}/fake_app_library",
+            directory,
+            cache_filename,
+            nb_workers,
+        )
+
+    sequential = generate(sequential_directory, None, 1)
+    parallel = generate(parallel_directory, cache_filename, 2)
+    parallel_cached = generate(parallel_directory, cache_filename, 2)
+
+    assert parallel == sequential
+    assert parallel_cached == sequential
+    assert "2: CheckState()" in parallel[1]
+
+
+def test_generator_generates_read_write_sets(tmp_path):
+    read_write_sets_filename = tmp_path / "app_read_write_sets.json"
+    generator, priorities = make_generator(
+        f"{TESTS_DIRECTORY}/fake_generated",
+        f"{TESTS_DIRECTORY}/fake_app_library",
+        str(tmp_path),
+        None,
+        read_write_sets_filename=str(read_write_sets_filename),
+    )
+    generator.generate_verification_file(priorities)
+
+    read_write_sets = json.loads(read_write_sets_filename.read_text())
+    assert sorted(read_write_sets) == ["first_app", "second_app", "third_app"]
+    for sets in read_write_sets.values():
+        sets.pop("hash")
+    assert read_write_sets["first_app"] == {
+        "invariant_reads": ["GA_0_0_1", "GA_0_0_3", "first_app_app_state.BOOL_1"],
+        "iteration_reads": [
+            "GA_0_0_1",
+            "first_app_app_state.BOOL_1",
+            "internal_state.get_latest_value",
+        ],
+        "iteration_writes": ["first_app_app_state.INT_1"],
+    }
+    assert read_write_sets["second_app"] == {
+        "invariant_reads": [
+            "GA_0_0_1",
+            "GA_0_0_2",
+            "internal_state.check_time_property",
+        ],
+        "iteration_reads": ["GA_0_0_1", "internal_state.get_latest_value"],
+        "iteration_writes": ["GA_0_0_2"],
+    }
+    assert read_write_sets["third_app"] == {
+        "invariant_reads": [
+            "GA_0_0_1",
+            "GA_0_0_2",
+            "GA_0_0_4",
+            "internal_state.check_time_property",
+            "internal_state.get_hour_of_the_day",
+        ],
+        "iteration_reads": [
+            "GA_0_0_4",
+            "GA_0_0_5",
+            "internal_state.get_hour_of_the_day",
+            "internal_state.get_minute_in_hour",
+        ],
+        "iteration_writes": ["GA_0_0_2", "GA_0_0_7"],
+    }
+
+
+def test_generator_read_write_sets_hashes_only_change_for_changed_apps(tmp_path):
+    generated_path = tmp_path / "generated"
+    shutil.copytree(f"{TESTS_DIRECTORY}/fake_generated", generated_path)
+    read_write_sets_filename = tmp_path / "app_read_write_sets.json"
+
+    def generate() -> dict:
+        generator, priorities = make_generator(
+            str(generated_path),
+            f"{TESTS_DIRECTORY}/fake_app_library",
+            str(tmp_path),
+            None,
+            read_write_sets_filename=str(read_write_sets_filename),
+        )
+        generator.generate_verification_file(priorities)
+        return json.loads(read_write_sets_filename.read_text())
+
+    before = generate()
+    second_app_main = generated_path / "second_app" / "main.py"
+    second_app_main.write_text(second_app_main.read_text() + "\n# Changed\n")
+    after = generate()
+
+    assert after["first_app"]["hash"] == before["first_app"]["hash"]
+    assert after["second_app"]["hash"] != before["second_app"]["hash"]
+    assert after["third_app"]["hash"] == before["third_app"]["hash"]
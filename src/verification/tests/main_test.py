@@ -13,6 +13,8 @@ VERIFICATION_FILE_PATH = f"{TESTS_DIRECTORY}/verification_file.py"
 RUNTIME_FILE_PATH = f"{TESTS_DIRECTORY}/runtime_file.py"
 CONDITIONS_FILE_PATH = f"{TESTS_DIRECTORY}/conditions.py"
 ISOLATED_FUNCS_JSON_FILE_PATH = f"{TESTS_DIRECTORY}/isolated_fns.json"
+GENERATION_CACHE_FILE_PATH = f"{TESTS_DIRECTORY}/generation_cache.pickle"
+READ_WRITE_SETS_FILE_PATH = f"{TESTS_DIRECTORY}/app_read_write_sets.json"
 
 
 @contextmanager
@@ -39,6 +41,7 @@ def test_main_generates_files():
     assert os.path.exists(VERIFICATION_FILE_PATH) == True
     assert os.path.exists(RUNTIME_FILE_PATH) == True
     assert os.path.exists(ISOLATED_FUNCS_JSON_FILE_PATH) == True
+    assert os.path.exists(READ_WRITE_SETS_FILE_PATH) == True
     assert out.getvalue().strip() == VERIFICATION_FILE_PATH
 
     # Cleanup
@@ -46,3 +49,5 @@ def test_main_generates_files():
     os.remove(VERIFICATION_FILE_PATH)
     os.remove(RUNTIME_FILE_PATH)
     os.remove(ISOLATED_FUNCS_JSON_FILE_PATH)
+    os.remove(GENERATION_CACHE_FILE_PATH)
+    os.remove(READ_WRITE_SETS_FILE_PATH)
@@ -0,0 +1,99 @@
+import ast
+import builtins
+import textwrap
+from .. import manipulator as manipulator_module
+from ..manipulator import Manipulator
+
+APP_NAME = "synthetic_app"
+NB_BRANCHES = 500
+NB_ISOLATED_FUNCTIONS = 50
+INSTANCES_NAMES = {"BINARY_SENSOR_INSTANCE_NAME", "SWITCH_INSTANCE_NAME"}
+
+
+def synthetic_main() -> str:
+    """
+    Returns the source of a large app, with many branches in its iteration function and many isolated functions.
+    """
+    branches = "".join(
+        textwrap.dedent(
+            f"""
+                if BINARY_SENSOR_INSTANCE_NAME.is_on() and app_state.INT_0 > {i}:
+                    SWITCH_INSTANCE_NAME.on()
+                    app_state.INT_1 = svshi_api.get_hour_of_the_day() + {i}
+                elif svshi_api.get_latest_value(periodic_value_{i % NB_ISOLATED_FUNCTIONS}) == {i}:
+                    SWITCH_INSTANCE_NAME.off()
+                    svshi_api.trigger_if_not_running(on_trigger_log_{i % NB_ISOLATED_FUNCTIONS})({i})
+            """
+        ).replace("\n", "\n    ")
+        for i in range(NB_BRANCHES)
+    )
+    isolated_functions = "".join(
+        textwrap.dedent(
+            f'''
+            def periodic_value_{i}() -> int:
+                """period: {i}"""
+                return {i}
+
+
+            def on_trigger_log_{i}(value: int) -> None:
+                with svshi_api.get_file_text_mode("log.txt", "a") as f:
+                    f.write(str(value))
+            '''
+        )
+        for i in range(NB_ISOLATED_FUNCTIONS)
+    )
+    return (
+        textwrap.dedent(
+            """
+            from instances import app_state, svshi_api, BINARY_SENSOR_INSTANCE_NAME, SWITCH_INSTANCE_NAME
+
+
+            def invariant() -> bool:
+                return not BINARY_SENSOR_INSTANCE_NAME.is_on() or SWITCH_INSTANCE_NAME.is_on()
+
+
+            def iteration():
+            """
+        )
+        + branches
+        + isolated_functions
+    )
+
+
+def test_manipulator_analyses_large_app_once_for_both_files(tmp_path, mocker):
+    app_directory = tmp_path / APP_NAME
+    app_directory.mkdir()
+    main_path = app_directory / "main.py"
+    main_path.write_text(synthetic_main())
+    source = main_path.read_text()
+
+    manipulator = Manipulator(
+        {(str(tmp_path), APP_NAME): INSTANCES_NAMES}, {APP_NAME: set()}, ""
+    )
+    open_spy = mocker.spy(builtins, "open")
+    parse_spy = mocker.spy(ast, "parse")
+    analysis_spy = mocker.spy(manipulator_module._AppMainAnalyzer, "visit_Module")
+
+    _, verification_functions, _ = manipulator.manipulate_mains(
+        verification=True, app_priorities={APP_NAME: 0}
+    )
+    _, runtime_functions, isolated_fns = manipulator.manipulate_mains(
+        verification=False, app_priorities={APP_NAME: 0}
+    )
+
+    # The main.py of the app is read and analysed once for both files. Each file manipulates its own tree in place:
+    # the verification file the one parsed for the analysis, the runtime file one parsed again from the source read
+    opened_mains = [
+        c for c in open_spy.call_args_list if str(c.args[0]) == str(main_path)
+    ]
+    assert len(opened_mains) == 1
+    assert analysis_spy.call_count == 1
+    assert [c.args[0] for c in parse_spy.call_args_list].count(source) == 2
+    assert len(isolated_fns) == 2 * NB_ISOLATED_FUNCTIONS
+    assert manipulator.check_counter == 0
+    assert "isolated_fn_values.synthetic_app_periodic_value_0" in "".join(
+        verification_functions
+    )
+    assert "def synthetic_app_on_trigger_log_0(value: int, internal_state" in "".join(
+        runtime_functions
+    )
@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+
+from ..main import main
+from ..profiler import phase, start_profiling, stop_profiling
+from .main_test import (
+    CONDITIONS_FILE_PATH,
+    FAKE_APP_LIBRARY_PATH,
+    FAKE_GENERATED_PATH,
+    GENERATION_CACHE_FILE_PATH,
+    ISOLATED_FUNCS_JSON_FILE_PATH,
+    READ_WRITE_SETS_FILE_PATH,
+    RUNTIME_FILE_PATH,
+    TESTS_DIRECTORY,
+    VERIFICATION_FILE_PATH,
+    captured_output,
+)
+
+
+def phase_names(phase: dict) -> list:
+    return [child["name"] for child in phase["children"]]
+
+
+def all_phases(phase: dict) -> list:
+    return [phase] + [p for child in phase["children"] for p in all_phases(child)]
+
+
+def test_phase_does_nothing_when_profiling_is_not_started():
+    with phase("unprofiled"):
+        pass
+
+
+def test_profiler_records_nested_phases_with_labels():
+    profiler = start_profiling("test")
+    try:
+        with phase("outer"):
+            for app_name in ["first_app", "second_app"]:
+                with phase("inner", app=app_name):
+                    data = [0] * 100000
+                    del data
+        report = profiler.report()
+    finally:
+        stop_profiling()
+
+    root = report["phases"]
+    assert root["name"] == "test"
+    assert phase_names(root) == ["outer"]
+    outer = root["children"][0]
+    assert phase_names(outer) == ["inner", "inner"]
+    assert [inner["labels"] for inner in outer["children"]] == [
+        {"app": "first_app"},
+        {"app": "second_app"},
+    ]
+    assert all(
+        inner["python_memory_peak_bytes"] >= 800000 for inner in outer["children"]
+    )
+    assert outer["python_memory_peak_bytes"] >= max(
+        inner["python_memory_peak_bytes"] for inner in outer["children"]
+    )
+    assert outer["duration_s"] >= sum(
+        inner["duration_s"] for inner in outer["children"]
+    )
+    assert report["totals_per_phase"]["inner"]["count"] == 2
+    assert report["totals_per_phase"]["outer"]["count"] == 1
+
+
+def test_profiler_reports_python_memory_only_without_resource_module(monkeypatch):
+    # As on Windows, where the resource module does not exist
+    monkeypatch.setitem(sys.modules, "resource", None)
+    profiler = start_profiling("test")
+    try:
+        with phase("outer"):
+            pass
+        report = profiler.report()
+    finally:
+        stop_profiling()
+
+    for p in all_phases(report["phases"]):
+        assert "python_memory_peak_bytes" in p
+        assert "max_rss_bytes" not in p
+
+
+def test_main_writes_profile(tmp_path):
+    profile_filename = str(tmp_path / "profile.json")
+    with captured_output():
+        main(
+            FAKE_GENERATED_PATH,
+            FAKE_APP_LIBRARY_PATH,
+            TESTS_DIRECTORY,
+            "",
+            profile_filename=profile_filename,
+        )
+
+    with open(profile_filename, "r") as file:
+        report = json.load(file)
+    assert phase_names(report["phases"]) == [
+        "parse",
+        "generate_verification_file",
+        "generate_runtime_file",
+        "generate_conditions_file",
+    ]
+    manipulated_apps = [
+        p["labels"]["app"]
+        for p in all_phases(report["phases"])
+        if p["name"] == "manipulate_app"
+    ]
+    assert "first_app" in manipulated_apps
+
+    # Cleanup
+    os.remove(CONDITIONS_FILE_PATH)
+    os.remove(VERIFICATION_FILE_PATH)
+    os.remove(RUNTIME_FILE_PATH)
+    os.remove(ISOLATED_FUNCS_JSON_FILE_PATH)
+    os.remove(GENERATION_CACHE_FILE_PATH)
+    os.remove(READ_WRITE_SETS_FILE_PATH)
@@ -0,0 +1,102 @@
+import json
+import os
+from io import StringIO
+from ..server import VerificationServer
+
+TESTS_DIRECTORY = "tests"
+
+FAKE_GENERATED_PATH = f"{TESTS_DIRECTORY}/fake_generated"
+FAKE_APP_LIBRARY_PATH = f"{TESTS_DIRECTORY}/fake_app_library"
+FAKE_WRONG_APP_LIBRARY_PATH = f"{TESTS_DIRECTORY}/fake_wrong_app_library"
+
+VERIFICATION_FILE_PATH = f"{TESTS_DIRECTORY}/verification_file.py"
+RUNTIME_FILE_PATH = f"{TESTS_DIRECTORY}/runtime_file.py"
+CONDITIONS_FILE_PATH = f"{TESTS_DIRECTORY}/conditions.py"
+ISOLATED_FUNCS_JSON_FILE_PATH = f"{TESTS_DIRECTORY}/isolated_fns.json"
+GENERATION_CACHE_FILE_PATH = f"{TESTS_DIRECTORY}/generation_cache.pickle"
+READ_WRITE_SETS_FILE_PATH = f"{TESTS_DIRECTORY}/app_read_write_sets.json"
+
+
+def serve(server: VerificationServer, *requests: dict):
+    answers = StringIO()
+    shutdown = server.serve(
+        StringIO("\n".join(json.dumps(r) for r in requests) + "\n"), answers
+    )
+    return shutdown, [json.loads(l) for l in answers.getvalue().splitlines()]
+
+
+def remove_generated_files():
+    for path in [
+        CONDITIONS_FILE_PATH,
+        VERIFICATION_FILE_PATH,
+        RUNTIME_FILE_PATH,
+        ISOLATED_FUNCS_JSON_FILE_PATH,
+        GENERATION_CACHE_FILE_PATH,
+        READ_WRITE_SETS_FILE_PATH,
+    ]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def test_server_answers_ping():
+    server = VerificationServer(
+        FAKE_GENERATED_PATH, FAKE_APP_LIBRARY_PATH, TESTS_DIRECTORY, ""
+    )
+    shutdown, answers = serve(server, {"command": "ping"})
+
+    assert shutdown == False
+    assert answers == [{"exit_code": 0}]
+
+
+def test_server_answers_error_to_unknown_command():
+    server = VerificationServer(
+        FAKE_GENERATED_PATH, FAKE_APP_LIBRARY_PATH, TESTS_DIRECTORY, ""
+    )
+    _, answers = serve(server, {"command": "unknown"})
+
+    assert answers[-1] == {"exit_code": 1}
+    assert "stderr" in answers[0]
+
+
+def test_server_stops_on_shutdown():
+    server = VerificationServer(
+        FAKE_GENERATED_PATH, FAKE_APP_LIBRARY_PATH, TESTS_DIRECTORY, ""
+    )
+    shutdown, answers = serve(server, {"command": "shutdown"}, {"command": "ping"})
+
+    assert shutdown == True
+    assert answers == [{"exit_code": 0}]
+
+
+def test_server_generates_files_multiple_times():
+    server = VerificationServer(
+        FAKE_GENERATED_PATH, FAKE_APP_LIBRARY_PATH, TESTS_DIRECTORY, ""
+    )
+    _, answers = serve(server, {"command": "generate"}, {"command": "generate"})
+
+    assert answers == [
+        {"stdout": VERIFICATION_FILE_PATH},
+        {"exit_code": 0},
+        {"stdout": VERIFICATION_FILE_PATH},
+        {"exit_code": 0},
+    ]
+    assert os.path.exists(CONDITIONS_FILE_PATH) == True
+    assert os.path.exists(VERIFICATION_FILE_PATH) == True
+    assert os.path.exists(RUNTIME_FILE_PATH) == True
+    assert os.path.exists(ISOLATED_FUNCS_JSON_FILE_PATH) == True
+
+    remove_generated_files()
+
+
+def test_server_streams_generation_errors_and_keeps_running():
+    server = VerificationServer(
+        FAKE_GENERATED_PATH, FAKE_WRONG_APP_LIBRARY_PATH, TESTS_DIRECTORY, ""
+    )
+    shutdown, answers = serve(server, {"command": "generate"}, {"command": "ping"})
+
+    assert shutdown == False
+    exit_codes = [a["exit_code"] for a in answers if "exit_code" in a]
+    assert exit_codes == [1, 0]
+    assert any("stderr" in a and "Traceback" in a["stderr"] for a in answers)
+
+    remove_generated_files()
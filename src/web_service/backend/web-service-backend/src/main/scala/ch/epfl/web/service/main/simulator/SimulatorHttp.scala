@@ -4,6 +4,7 @@ import upickle.default._
 case class SimulatorHttp(simulatorAddress: String, simulatorPort: Int) extends SimulatorInterface {
 
   val READ_SIMULATOR_REQUEST_TIMEOUT = 600_000 // Milliseconds
+  val START_POLLING_INTERVAL = 200 // Milliseconds
   /** Start a new simulation session with the given devices and bindings.
     * Start the simulator in SVSHI mode and it then waits on SVSHI connection.
     * When the function returns, the simulator is ready for SVSHI connection.
@@ -34,7 +35,28 @@ case class SimulatorHttp(simulatorAddress: String, simulatorPort: Int) extends S
     // Config is ready on simulator side
     debug(s"Send $simulatorAddress:$simulatorPort/simulator/start request")
     val rStart = requests.post(s"http://$simulatorAddress:$simulatorPort/simulator/start", check = false, readTimeout = READ_SIMULATOR_REQUEST_TIMEOUT)
-    if (rStart.statusCode != 200) throw new RuntimeException(s"Cannot start the simulator! See error:\n${rStart.text()}")
+    if (rStart.statusCode == 202) {
+      // The start is asynchronous, the returned handle is polled until the simulator waits for SVSHI
+      waitUntilStarted(ujson.read(rStart.text())("handle").str)(debug)
+    } else if (rStart.statusCode != 200) throw new RuntimeException(s"Cannot start the simulator! See error:\n${rStart.text()}")
+  }
+
+  /** Poll the start handle until the simulator is ready for SVSHI connection
+    *
+    * @param handle
+    */
+  private def waitUntilStarted(handle: String)(debug: String => Unit): Unit = {
+    val deadline = System.currentTimeMillis() + READ_SIMULATOR_REQUEST_TIMEOUT
+    var state = "starting"
+    while (state == "starting") {
+      if (System.currentTimeMillis() > deadline) throw new RuntimeException(s"The simulator did not start before the timeout!")
+      Thread.sleep(START_POLLING_INTERVAL)
+      val r = requests.get(s"http://$simulatorAddress:$simulatorPort/simulator/start/$handle", check = false, readTimeout = READ_SIMULATOR_REQUEST_TIMEOUT)
+      if (r.statusCode != 200) throw new RuntimeException(s"Cannot get the start state of the simulator! See error:\n${r.text()}")
+      state = ujson.read(r.text())("state").str
+      debug(s"Simulator start handle $handle is $state")
+    }
+    if (state != "ready") throw new RuntimeException(s"The simulator was stopped before being ready!")
   }
 
   /** Stop the simulator